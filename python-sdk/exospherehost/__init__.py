@@ -39,8 +39,10 @@ from .runtime import Runtime
 from .node.BaseNode import BaseNode
 from .statemanager import StateManager
 from .signals import PruneSignal, ReQueueAfterSignal
-from .models import UnitesStrategyEnum, UnitesModel, GraphNodeModel, RetryStrategyEnum, RetryPolicyModel, StoreConfigModel, CronTrigger
+from .store import RunStore
+from .fan_in import FanIn
+from .models import UnitesStrategyEnum, UnitesModel, MemoizeModel, GraphNodeModel, RetryStrategyEnum, RetryPolicyModel, StoreConfigModel, CronTrigger
 
 VERSION = __version__
 
-__all__ = ["Runtime", "BaseNode", "StateManager", "VERSION", "PruneSignal", "ReQueueAfterSignal", "UnitesStrategyEnum", "UnitesModel", "GraphNodeModel", "RetryStrategyEnum", "RetryPolicyModel", "StoreConfigModel", "CronTrigger"]
+__all__ = ["Runtime", "BaseNode", "StateManager", "VERSION", "PruneSignal", "ReQueueAfterSignal", "RunStore", "FanIn", "UnitesStrategyEnum", "UnitesModel", "MemoizeModel", "GraphNodeModel", "RetryStrategyEnum", "RetryPolicyModel", "StoreConfigModel", "CronTrigger"]
@@ -0,0 +1,121 @@
+import asyncio
+import random
+import time
+
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Callable
+
+# statuses the state manager sheds load with
+BACKPRESSURE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Seconds to wait from a Retry-After header, given in seconds or as an HTTP date.
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    Bounds retries to a fraction of the requests made, so an overloaded state
+    manager is not hit with a multiple of the normal traffic.
+
+    Every request earns `ratio` of a retry, up to `max_tokens` saved retries,
+    and every retry spends one.
+
+    Args:
+        ratio (float): Retries earned per request.
+        max_tokens (float): Most retries that can be saved up, also the starting amount.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10):
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._tokens = max_tokens
+
+    def deposit(self):
+        self._tokens = min(self._max_tokens, self._tokens + self._ratio)
+
+    def withdraw(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class Backpressure:
+    """
+    Honors the state manager's load shedding for every request of a client.
+
+    A 429 or 503 answer pauses all requests until its Retry-After has passed
+    (or, without one, an exponential backoff with full jitter), then the request
+    is retried while retries remain and the retry budget allows it. Otherwise
+    the 429/503 response is handed to the caller.
+
+    Args:
+        max_retries (int): Most retries of a single request.
+        base_delay (float): First backoff step in seconds when there is no Retry-After.
+        max_delay (float): Longest pause in seconds.
+        budget (RetryBudget | None): Retry budget shared by all requests, a default one when None.
+    """
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.5, max_delay: float = 60, budget: RetryBudget | None = None):
+        self._max_retries = max_retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._budget = budget or RetryBudget()
+        self._paused_until = 0.0
+
+    def delay(self, attempt: int, retry_after: float | None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self._max_delay)
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** attempt))
+
+    def pause(self, delay: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    async def wait(self):
+        """Wait until the state manager accepts requests again."""
+        remaining = self._paused_until - time.monotonic()
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+    @asynccontextmanager
+    async def request(self, method: Callable[..., Any], url: str, max_retries: int | None = None, **kwargs) -> AsyncIterator[Any]:
+        """
+        Send a request with an aiohttp session method, e.g.
+        `async with backpressure.request(session.post, url, json=body) as response:`.
+
+        Args:
+            method (Callable[..., Any]): The session method, such as `session.post`.
+            url (str): The endpoint.
+            max_retries (int | None): Overrides the retries of this request, 0 for callers that retry on their own.
+            **kwargs: Passed to the session method.
+        """
+        if max_retries is None:
+            max_retries = self._max_retries
+        self._budget.deposit()
+        attempt = 0
+        while True:
+            await self.wait()
+            async with method(url, **kwargs) as response:
+                if response.status not in BACKPRESSURE_STATUSES:
+                    yield response
+                    return
+
+                self.pause(self.delay(attempt, parse_retry_after(response.headers.get("Retry-After"))))
+                if attempt >= max_retries or not self._budget.withdraw():
+                    yield response
+                    return
+            attempt += 1
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import Dict
+
+
+class LimiterSlot:
+    """
+    A slot taken from an `AdaptiveLimiter`. It is freed exactly once: by `release` with
+    the outcome of the execution that used it, or by `cancel` when no execution ran in
+    it. Later calls do nothing.
+    """
+
+    def __init__(self, limiter: "AdaptiveLimiter", started_at: float):
+        self._limiter = limiter
+        self.started_at = started_at
+        self._freed = False
+
+    def start(self):
+        """Mark the start of the execution, its latency is measured from here."""
+        self.started_at = time.monotonic()
+
+    async def release(self, failed: bool):
+        """
+        Free the slot and adjust the limit from the outcome of the execution.
+
+        Args:
+            failed (bool): Whether the execution failed.
+        """
+        if self._freed:
+            return
+        self._freed = True
+        await self._limiter._release(self.started_at, failed)
+
+    async def cancel(self):
+        """Free the slot without adjusting the limit."""
+        if self._freed:
+            return
+        self._freed = True
+        await self._limiter._cancel()
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit of one node that adapts with additive increase and
+    multiplicative decrease (AIMD).
+
+    Every execution that succeeds in normal time while at least half of the
+    slots are taken raises the limit by 1/limit, so about half a slot per round
+    of executions; a limit that is far from reached does not grow. A failed
+    execution, or one much slower than the running average latency, cuts the
+    limit by `decrease`, at most once per round: executions that started before
+    the last cut do not cut it again.
+
+    Args:
+        min_limit (int): Lowest limit, at least 1 so the node always makes progress.
+        max_limit (int | None): Highest limit, None for no ceiling.
+        initial_limit (int | None): Starting limit, defaults to `max_limit` and is required without it.
+        decrease (float): Factor the limit is multiplied by on congestion.
+        latency_tolerance (float): How many times the average latency an execution may
+            take before it counts as congestion.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int | None, initial_limit: int | None = None, decrease: float = 0.5, latency_tolerance: float = 2.0):
+        initial_limit = initial_limit if initial_limit is not None else max_limit
+        if initial_limit is None:
+            raise ValueError("An initial limit is required without a max limit")
+
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._decrease = decrease
+        self._latency_tolerance = latency_tolerance
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._latency: float | None = None
+        self._samples = 0
+        self._decreased_at = float("-inf")
+        self._condition = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self) -> LimiterSlot:
+        """
+        Wait for a free slot and take it.
+
+        Returns:
+            LimiterSlot: The slot, to be released or cancelled once the execution is done.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+        return LimiterSlot(self, time.monotonic())
+
+    async def _release(self, started_at: float, failed: bool):
+        now = time.monotonic()
+        latency = now - started_at
+
+        async with self._condition:
+            saturated = 2 * self._in_flight >= int(self._limit)
+            self._in_flight -= 1
+
+            slow = self._latency is not None and self._samples >= 10 and latency > self._latency_tolerance * self._latency
+            if not failed:
+                self._latency = latency if self._latency is None else 0.1 * latency + 0.9 * self._latency
+                self._samples += 1
+
+            if failed or slow:
+                if started_at >= self._decreased_at:
+                    self._limit = max(float(self._min_limit), self._limit * self._decrease)
+                    self._decreased_at = now
+            elif saturated:
+                self._limit += 1 / self._limit
+                if self._max_limit is not None:
+                    self._limit = min(float(self._max_limit), self._limit)
+
+            self._condition.notify_all()
+
+    async def _cancel(self):
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def metrics(self) -> Dict[str, float | int | None]:
+        return {
+            "limit": self.limit,
+            "min_limit": self._min_limit,
+            "max_limit": self._max_limit,
+            "in_flight": self._in_flight,
+            "average_latency": self._latency,
+        }
@@ -0,0 +1,61 @@
+from typing import AsyncIterator
+from aiohttp import ClientSession
+
+from .backpressure import Backpressure
+
+
+class FanIn:
+    """
+    Reader of the outputs united into a unites node, available to a node as
+    `self.fan_in` while it executes.
+
+    The outputs are paged from the state manager in `_id` order, so a node can
+    reduce a fan-out of any size without the whole set ever being held in
+    memory, on either side.
+
+    Requests wait and are retried when the state manager sheds load, like every
+    other request of the runtime.
+
+    Args:
+        endpoint (str): United outputs endpoint of the executing state.
+        key (str): The API key to include in the request headers.
+        backpressure (Backpressure | None): Load shedding handling shared with the runtime, a new one when None.
+    """
+
+    def __init__(self, endpoint: str, key: str, backpressure: Backpressure | None = None):
+        self._endpoint = endpoint
+        self._key = key
+        self._backpressure = backpressure or Backpressure()
+
+    async def outputs(self, identifier: str, page_size: int = 500) -> AsyncIterator[dict]:
+        """
+        Iterate over the outputs of the successful states of a node, limited to
+        the fan-out this unites node joins.
+
+        Args:
+            identifier (str): Identifier of the node whose outputs are read.
+            page_size (int): Number of outputs fetched per request, at most 1000.
+
+        Yields:
+            dict: The outputs of one state.
+
+        Raises:
+            RuntimeError: If a request fails.
+        """
+        cursor = None
+        async with ClientSession() as session:
+            while True:
+                params = {"identifier": identifier, "limit": page_size}
+                if cursor is not None:
+                    params["cursor"] = cursor
+                async with self._backpressure.request(session.get, self._endpoint, params=params, headers={"x-api-key": self._key}) as response: # type: ignore
+                    res = await response.json()
+                    if response.status != 200:
+                        raise RuntimeError(f"Failed to get united outputs of {identifier}: {res}")
+
+                for output in res["outputs"]:
+                    yield output["outputs"]
+
+                if not res["has_more"]:
+                    return
+                cursor = res["cursor"]
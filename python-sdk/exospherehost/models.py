@@ -13,6 +13,10 @@ class UnitesModel(BaseModel):
     strategy: UnitesStrategyEnum = Field(default=UnitesStrategyEnum.ALL_SUCCESS, description="Strategy of the unites")
 
 
+class MemoizeModel(BaseModel):
+    ttl: int = Field(default=3600, gt=0, description="Seconds a successful result of the node is reused for")
+
+
 class GraphNodeModel(BaseModel):
     node_name: str = Field(..., description="Name of the node")
     namespace: str = Field(..., description="Namespace of the node")
@@ -20,6 +24,8 @@ class GraphNodeModel(BaseModel):
     inputs: dict[str, Any] = Field(default_factory=dict, description="Inputs of the node")
     next_nodes: Optional[List[str]] = Field(default=None, description="Next nodes to execute")
     unites: Optional[UnitesModel] = Field(default=None, description="Unites of the node")
+    memoize: Optional[MemoizeModel] = Field(default=None, description="Reuse the outputs of earlier executions of the node with the same inputs")
+    single_flight: bool = Field(default=False, description="Execute states of the node with the same inputs only once while one of them is in flight")
 
     @field_validator('node_name')
     @classmethod
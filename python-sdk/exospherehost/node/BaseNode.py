@@ -1,6 +1,9 @@
+import inspect
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator, Iterator, ClassVar
 from pydantic import BaseModel  
+from ..store import RunStore
+from ..fan_in import FanIn
 
 
 class BaseNode(ABC):
@@ -13,10 +16,32 @@ class BaseNode(ABC):
     output schemas for the node, and must implement the `execute` method containing
     the node's main logic.
 
+    The Runtime keeps a pool of long-lived instances of each node class and hands
+    each instance one state at a time. Expensive resources (models, clients,
+    connection pools) can be created once per instance in `setup` and released in
+    `teardown` instead of on every execution.
+
     Attributes:
         inputs (Optional[BaseNode.Inputs]): The validated input data for the node execution.
+        instances (ClassVar[Optional[int]]): Number of instances the Runtime keeps of this node,
+            which also bounds how many of its states execute at once. None keeps one per allowed
+            concurrent execution.
+        min_concurrency (ClassVar[int]): Lowest number of concurrent executions the Runtime's
+            adaptive limit for this node may drop to.
+        max_concurrency (ClassVar[Optional[int]]): Highest number of concurrent executions, also
+            where the adaptive limit starts. None sets no ceiling: the limit starts at the Runtime's
+            `workers` and keeps growing while it is saturated and executions stay fast.
+        max_batch_size (ClassVar[int]): Most states passed to one `execute_batch` call.
+        max_batch_wait (ClassVar[float]): Seconds the Runtime waits for a batch to fill before
+            executing it anyway.
     """
 
+    instances: ClassVar[Optional[int]] = None
+    min_concurrency: ClassVar[int] = 1
+    max_concurrency: ClassVar[Optional[int]] = None
+    max_batch_size: ClassVar[int] = 32
+    max_batch_wait: ClassVar[float] = 0.05
+
     def __init__(self):
         """
         Initialize a BaseNode instance.
@@ -25,6 +50,8 @@ class BaseNode(ABC):
         with validated input data before execution.
         """
         self.inputs: Optional[BaseNode.Inputs] = None
+        self.store: Optional[RunStore] = None
+        self.fan_in: Optional[FanIn] = None
 
     class Inputs(BaseModel):
         """
@@ -67,23 +94,100 @@ class BaseNode(ABC):
         """
         pass
 
-    async def _execute(self, inputs: Inputs, secrets: Secrets) -> Outputs | List[Outputs]:
+    async def _execute(self, inputs: Inputs, secrets: Secrets, store: Optional[RunStore] = None, fan_in: Optional[FanIn] = None) -> Outputs | List[Outputs] | AsyncIterator[Outputs] | Iterator[Outputs]:
         """
         Internal method to execute the node with validated inputs and secrets.
 
         Args:
             inputs (Inputs): The validated input data for this execution.
             secrets (Secrets): The validated secrets data for this execution.
+            store (Optional[RunStore]): The store of the run this execution belongs to.
+            fan_in (Optional[FanIn]): Reader of the outputs united into this execution.
 
         Returns:
-            Outputs | List[Outputs]: The output(s) produced by the node.
+            Outputs | List[Outputs] | AsyncIterator[Outputs] | Iterator[Outputs]: The output(s) produced by the node,
+                generators are returned unconsumed so the Runtime can stream them.
         """
         self.inputs = inputs
         self.secrets = secrets
-        return await self.execute()
+        self.store = store
+        self.fan_in = fan_in
+        result = self.execute()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _execute_batch(self, inputs: List[Inputs], secrets: Secrets) -> List[Outputs | List[Outputs] | Exception]:
+        """
+        Internal method to execute the node on a batch of validated inputs.
+
+        Args:
+            inputs (List[Inputs]): The validated input data of each state of the batch.
+            secrets (Secrets): The validated secrets of the graph the states belong to.
+
+        Returns:
+            List[Outputs | List[Outputs] | Exception]: One result per input, in the same order.
+        """
+        self.inputs = None
+        self.secrets = secrets
+        self.store = None
+        self.fan_in = None
+        result = self.execute_batch(inputs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def execute_batch(self, inputs: List[Inputs]) -> List[Outputs | List[Outputs] | Exception]:
+        """
+        Optional logic for executing many states of the node at once.
+
+        Nodes that override this method are executed in batches: the Runtime groups
+        claimed states of the node and graph, up to `max_batch_size` states or
+        `max_batch_wait` seconds, and calls it once per group. `execute` is not called
+        for them, but as it is abstract it still has to be implemented, usually by
+        delegating to `execute_batch([self.inputs])`.
+
+        `self.secrets` is set for the batch, `self.inputs`, `self.store` and `self.fan_in`
+        are not available.
+
+        Args:
+            inputs (List[Inputs]): The validated input data of each state of the batch.
+
+        Returns:
+            List[Outputs | List[Outputs] | Exception]: One result per input, in the same order.
+                An exception (including PruneSignal and ReQueueAfterSignal) fails, prunes or
+                requeues only its own state. Generators are not supported.
+
+        Raises:
+            Exception: Any exception raised here is reported for every state of the batch.
+        """
+        raise NotImplementedError("execute_batch is only implemented by nodes that execute states in batches")
+
+    async def setup(self) -> None:
+        """
+        Prepare the instance before its first execution.
+
+        Called once per instance by the Runtime, before the instance executes any state.
+        Override it to load resources shared by every execution of the instance. Secrets
+        are only known per execution, so resources that need them should be created
+        lazily in `execute` and kept on the instance.
+
+        Raises:
+            Exception: Any exception raised here is reported as an error of the state the
+                instance was created for, and the instance is discarded.
+        """
+        pass
+
+    async def teardown(self) -> None:
+        """
+        Release the resources of the instance.
+
+        Called once per instance by the Runtime when it stops. Errors are logged and ignored.
+        """
+        pass
 
     @abstractmethod
-    async def execute(self) -> Outputs | List[Outputs]:
+    async def execute(self) -> Outputs | List[Outputs] | AsyncIterator[Outputs] | Iterator[Outputs]:
         """
         Main logic for the node.
 
@@ -91,8 +195,13 @@ class BaseNode(ABC):
         (populated with validated input data) to perform the node's computation and
         return either a single Outputs instance or a list of Outputs instances.
 
+        For large fan-outs `execute` can instead be an async generator (or return a
+        generator) that yields Outputs instances. The Runtime then sends them to the
+        state manager in chunks while they are produced, so the outputs never have
+        to be held in memory at once and next nodes start before the fan-out ends.
+
         Returns:
-            Outputs | List[Outputs]: The output(s) produced by the node.
+            Outputs | List[Outputs] | AsyncIterator[Outputs] | Iterator[Outputs]: The output(s) produced by the node.
 
         Raises:
             Exception: Any exception raised here will be caught and reported as an error state by the Runtime.
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import List
+
+from .BaseNode import BaseNode
+
+logger = logging.getLogger(__name__)
+
+
+class NodePool:
+    """
+    Pool of long-lived instances of one node class.
+
+    Instances are created and set up lazily, up to `size`, and each one executes a
+    single state at a time. Once the pool is full, executions wait for an instance
+    to be released, so `size` also bounds the concurrency of the node.
+
+    Args:
+        node (type[BaseNode]): The node class to instantiate.
+        size (int | None): Maximum number of instances, None for as many as there are
+            concurrent executions.
+    """
+
+    def __init__(self, node: type[BaseNode], size: int | None):
+        self._node = node
+        self._size = size
+        self._created = 0
+        self._instances: List[BaseNode] = []
+        self._idle: asyncio.Queue[BaseNode] = asyncio.Queue()
+
+    async def acquire(self) -> BaseNode:
+        """
+        Take an idle instance, creating and setting up a new one if the pool is not full.
+
+        Raises:
+            Exception: Any exception raised by the node's constructor or `setup`.
+        """
+        if self._idle.empty() and (self._size is None or self._created < self._size):
+            self._created += 1
+            try:
+                instance = self._node()
+                await instance.setup()
+            except BaseException:
+                self._created -= 1
+                raise
+            self._instances.append(instance)
+            logger.info(f"Set up instance {len(self._instances)}/{self._size or 'unbounded'} of node {self._node.__name__}")
+            return instance
+
+        return await self._idle.get()
+
+    def release(self, instance: BaseNode):
+        """
+        Return an instance to the pool once its execution is done.
+        """
+        self._idle.put_nowait(instance)
+
+    async def close(self):
+        """
+        Tear down every instance created by the pool.
+        """
+        for instance in self._instances:
+            try:
+                await instance.teardown()
+            except Exception as e:
+                logger.error(f"Error tearing down instance of node {self._node.__name__}: {e}")
+
+        self._instances = []
+        self._created = 0
+        self._idle = asyncio.Queue()
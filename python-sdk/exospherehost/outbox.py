@@ -0,0 +1,157 @@
+import asyncio
+import json
+import os
+import uuid
+
+from typing import Any, Dict, List
+
+
+class Outbox:
+    """
+    Append-only record of completion notifications that are not yet delivered.
+
+    Entries are kept in memory and, when a journal path is given, appended to a
+    JSON lines file before delivery is attempted, so they survive restarts of the
+    runtime and are delivered by the next runtime started with the same journal.
+    A delivered entry is acknowledged with another line; the journal is rewritten
+    with only the pending entries once acknowledgements dominate it.
+
+    Entries are synced to disk when recorded, off the event loop and with one
+    fsync shared by all the entries recorded meanwhile. Acknowledgements are not
+    synced: an acknowledgement lost in a crash only causes a duplicate delivery,
+    which the state manager rejects since the state is no longer queued.
+
+    Args:
+        journal_path (str | None): File to journal entries to, in memory only when None.
+    """
+
+    def __init__(self, journal_path: str | None = None):
+        self._journal_path = journal_path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._taken: set[str] = set()
+        self._acks = 0
+        self._journal = None
+        # lines written to the journal, the ones known to be on disk, and the fsync in progress
+        self._written = 0
+        self._synced = 0
+        self._syncing: asyncio.Future | None = None
+
+        if journal_path is not None:
+            self._replay()
+            self._compact()
+
+    def _replay(self):
+        if self._journal_path is None or not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path, "r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # a line torn by a crash mid write
+                    continue
+                if "ack" in record:
+                    self._entries.pop(record["ack"], None)
+                else:
+                    self._entries[record["id"]] = record
+
+    def _compact(self):
+        """Rewrite the journal with the pending entries only."""
+        if self._journal_path is None:
+            return
+        if self._journal is not None:
+            self._journal.close()
+
+        temporary_path = f"{self._journal_path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as journal:
+            for entry in self._entries.values():
+                journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(temporary_path, self._journal_path)
+
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+        self._acks = 0
+        self._synced = self._written
+
+    def _append(self, record: Dict[str, Any]):
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(record) + "\n")
+        self._journal.flush()
+        self._written += 1
+
+    async def _sync(self):
+        """
+        Wait until every line written so far is on disk. The fsync runs in a thread, and
+        writes made while one is running are covered by the next one.
+        """
+        written = self._written
+        while self._synced < written:
+            if self._syncing is None:
+                self._syncing = asyncio.ensure_future(self._fsync())
+            await asyncio.shield(self._syncing)
+
+    async def _fsync(self):
+        written = self._written
+        try:
+            if self._journal is not None:
+                # a descriptor of its own, so a compaction may close the journal meanwhile
+                fd = os.dup(self._journal.fileno())
+                try:
+                    await asyncio.to_thread(os.fsync, fd)
+                finally:
+                    os.close(fd)
+            self._synced = max(self._synced, written)
+        finally:
+            self._syncing = None
+
+    async def put(self, kind: str, state_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record a notification once it is on disk. The entry is returned already taken, for the caller to deliver it right away.
+
+        Args:
+            kind (str): "executed" or "errored".
+            state_id (str): The state the notification is about.
+            body (Dict[str, Any]): JSON body of the notification.
+        """
+        entry = {"id": uuid.uuid4().hex, "kind": kind, "state_id": state_id, "body": body}
+        self._append(entry)
+        await self._sync()
+        self._entries[entry["id"]] = entry
+        self._taken.add(entry["id"])
+        return entry
+
+    def take(self, limit: int) -> List[Dict[str, Any]]:
+        """Take up to `limit` pending entries that nobody is delivering, oldest first."""
+        entries = []
+        for entry_id, entry in self._entries.items():
+            if len(entries) >= limit:
+                break
+            if entry_id not in self._taken:
+                self._taken.add(entry_id)
+                entries.append(entry)
+        return entries
+
+    def release(self, entry: Dict[str, Any]):
+        """Give back an entry whose delivery failed, to be taken again."""
+        self._taken.discard(entry["id"])
+
+    def ack(self, entry: Dict[str, Any]):
+        """Drop a delivered entry."""
+        self._taken.discard(entry["id"])
+        if self._entries.pop(entry["id"], None) is None:
+            return
+        self._append({"ack": entry["id"]})
+        self._acks += 1
+        if self._acks >= 1000 and self._acks > 2 * len(self._entries):
+            self._compact()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        if self._journal is not None:
+            self._compact()
+            self._journal.close()
+            self._journal = None
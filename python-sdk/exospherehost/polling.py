@@ -0,0 +1,85 @@
+import math
+import random
+import time
+
+
+class AdaptivePoller:
+    """
+    Paces the runtime's polls of the state manager.
+
+    A full batch is followed by an immediate poll, since more work is likely
+    waiting. An empty batch (or a failed poll) backs off exponentially, with
+    jitter so idle runtimes do not poll in lockstep. The number of states
+    claimed per poll follows the rate at which the nodes drain their queues, so
+    the queues hold about enough work to last until the next poll.
+
+    Args:
+        min_interval (float): Seconds waited after a partial batch, and the first backoff step.
+        max_interval (float): Longest wait between polls when there is no work.
+        min_batch_size (int): Fewest states claimed per poll.
+        max_batch_size (int): Most states claimed per poll.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, min_batch_size: int, max_batch_size: int):
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._min_batch_size = min_batch_size
+        self._max_batch_size = max_batch_size
+        self._backoff = 0.0
+        self._drain_rate: float | None = None
+        self._poll_latency: float | None = None
+        self._queued_at: float | None = None
+        self._queued = 0
+
+    def _average(self, average: float | None, sample: float) -> float:
+        return sample if average is None else 0.3 * sample + 0.7 * average
+
+    def batch_size(self, queued: int) -> int:
+        """
+        Number of states to claim with the next poll, given the states already queued.
+        """
+        now = time.monotonic()
+        if self._queued_at is not None and now > self._queued_at:
+            drained = max(self._queued - queued, 0)
+            self._drain_rate = self._average(self._drain_rate, drained / (now - self._queued_at))
+
+        if self._drain_rate is None:
+            return self._max_batch_size
+
+        # enough work to keep the nodes busy until the poll after this one lands
+        horizon = (self._poll_latency or 0.0) + max(self._min_interval, 1.0)
+        wanted = math.ceil(self._drain_rate * horizon) - queued
+        return min(max(wanted, self._min_batch_size), self._max_batch_size)
+
+    def polled(self, requested: int, received: int, queued: int, latency: float) -> float:
+        """
+        Record the result of a poll and return the seconds to wait before the next one.
+
+        Args:
+            requested (int): States asked for.
+            received (int): States claimed.
+            queued (int): States queued once the claimed ones were added.
+            latency (float): Seconds the poll took.
+        """
+        self._poll_latency = self._average(self._poll_latency, latency)
+        self._queued_at = time.monotonic()
+        self._queued = queued
+
+        if received >= requested:
+            self._backoff = 0.0
+            return 0.0
+        if received > 0:
+            self._backoff = 0.0
+            return self._min_interval
+        return self._back_off()
+
+    def failed(self) -> float:
+        """
+        Record a failed poll and return the seconds to wait before the next one.
+        """
+        self._queued_at = None
+        return self._back_off()
+
+    def _back_off(self) -> float:
+        self._backoff = min(max(self._backoff * 2, self._min_interval), self._max_interval)
+        return random.uniform(self._backoff / 2, self._backoff)
@@ -1,14 +1,26 @@
 import asyncio
+import inspect
 import os
 import logging
+import signal
+import time
 import traceback
 
+from contextlib import asynccontextmanager
+
 from asyncio import Queue, sleep
-from typing import List, Dict
+from typing import Any, List, Dict, AsyncIterator, Iterator, Tuple
 from pydantic import BaseModel
 from .node.BaseNode import BaseNode
+from .node.NodePool import NodePool
 from aiohttp import ClientSession
 from .signals import PruneSignal, ReQueueAfterSignal
+from .store import RunStore
+from .fan_in import FanIn
+from .polling import AdaptivePoller
+from .concurrency import AdaptiveLimiter, LimiterSlot
+from .backpressure import Backpressure
+from .outbox import Outbox
 
 logger = logging.getLogger(__name__)
 
@@ -54,8 +66,14 @@ class Runtime:
     Key Features:
         - Registers node schemas and runtime metadata with the state manager.
         - Polls for new states to process and enqueues them for execution.
-        - Spawns worker tasks to execute node logic asynchronously.
-        - Notifies the state manager of successful or failed executions.
+        - Queues the states of each node on their own and starts one as soon as its node has a free slot,
+          so a node at its concurrency limit never holds back the states of other nodes.
+        - Reuses long-lived node instances, set up once and torn down when the runtime stops.
+        - Adapts the concurrency of each node to its latency and error rate (AIMD).
+        - Backs off and retries, within a retry budget, when the state manager sheds load.
+        - Notifies the state manager of successful or failed executions through an outbox, retrying
+          notifications that fail and, with a journal, delivering them after a restart.
+        - Drains gracefully on `stop` or SIGTERM, releasing claimed states it did not start.
         - Handles configuration via constructor arguments or environment variables.
 
     Args:
@@ -66,13 +84,30 @@ class Runtime:
             If not provided, will use the EXOSPHERE_STATE_MANAGER_URI environment variable.
         key (str | None, optional): API key for authentication.
             If not provided, will use the EXOSPHERE_API_KEY environment variable.
-        batch_size (int, optional): Number of states to fetch per poll. Defaults to 16.
-        workers (int, optional): Number of concurrent worker tasks. Defaults to 4.
+        batch_size (int, optional): Most states fetched per poll. Defaults to 16.
+        workers (int, optional): Concurrency limit each node without a `max_concurrency` starts at, the
+            limit of such a node then grows while it is saturated. Defaults to 4.
         state_manage_version (str, optional): State manager API version. Defaults to "v0".
-        poll_interval (int, optional): Seconds between polling for new states. Defaults to 1.
+        poll_interval (float, optional): Seconds waited after a poll that did not fill its batch, and
+            the first step of the backoff after empty polls. Full batches are followed by an immediate poll.
+            Defaults to 1.
+        max_poll_interval (float, optional): Longest wait between polls while there is no work. Defaults to 10.
+        min_batch_size (int, optional): Fewest states fetched per poll, the number fetched is otherwise sized
+            from the rate at which the nodes drain their queues. Defaults to 1.
+        output_chunk_size (int, optional): Number of outputs of a generator node sent per request
+            while it is still running. Defaults to 1000, which is also the maximum.
+        secrets_ttl (float, optional): Seconds the secrets of a graph are cached for before they are
+            fetched again. Defaults to 300, 0 disables the cache.
+        outbox_path (str | None, optional): File to journal undelivered execution notifications to, so
+            they are delivered after a restart instead of the states being executed again. Defaults to
+            None, which keeps them in memory only.
+        shutdown_timeout (float, optional): Seconds states being executed are given to finish when the
+            runtime is stopped (`stop` or SIGTERM), also the deadline for delivering pending notifications.
+            Defaults to 30.
 
     Raises:
-        ValueError: If configuration is invalid (e.g., missing URI or key, batch_size/workers < 1).
+        ValueError: If configuration is invalid (e.g., missing URI or key, batch_size/workers < 1, negative secrets_ttl or shutdown_timeout,
+            poll interval or batch size bounds out of order).
         ValidationError: If node classes are invalid or duplicate.
 
     Usage:
@@ -80,7 +115,7 @@ class Runtime:
         runtime.start()
     """
 
-    def __init__(self, namespace: str, name: str, nodes: List[type[BaseNode]], state_manager_uri: str | None = None, key: str | None = None, batch_size: int = 16, workers: int = 4, state_manage_version: str = "v0", poll_interval: int = 1):
+    def __init__(self, namespace: str, name: str, nodes: List[type[BaseNode]], state_manager_uri: str | None = None, key: str | None = None, batch_size: int = 16, workers: int = 4, state_manage_version: str = "v0", poll_interval: float = 1, output_chunk_size: int = 1000, secrets_ttl: float = 300, max_poll_interval: float = 10, min_batch_size: int = 1, outbox_path: str | None = None, shutdown_timeout: float = 30):
 
         _setup_default_logging()
 
@@ -88,21 +123,52 @@ class Runtime:
         self._namespace = namespace
         self._key = key
         self._batch_size = batch_size
-        self._state_queue = Queue(maxsize=2*batch_size)
         self._workers = workers
         self._nodes = nodes
         self._node_names = [node.__name__ for node in nodes]
         self._state_manager_uri = state_manager_uri
         self._state_manager_version = state_manage_version
         self._poll_interval = poll_interval
+        self._max_poll_interval = max_poll_interval
+        self._min_batch_size = min_batch_size
+        self._output_chunk_size = output_chunk_size
+        self._secrets_ttl = secrets_ttl
+        self._secrets_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, str]]] = {}
+        self._secrets_loads: Dict[Tuple[str, str], asyncio.Task[Dict[str, Dict[str, str]]]] = {}
+        self._pending_batches: Dict[Tuple[str, str], List[dict]] = {}
+        self._batch_flushes: set[asyncio.Task] = set()
+        self._shutdown_timeout = shutdown_timeout
+        self._stopping = asyncio.Event()
+        # loop the SIGTERM handler is installed on, and the handler it replaced
+        self._sigterm_loop: asyncio.AbstractEventLoop | None = None
+        self._previous_sigterm: Any = None
+        self._claiming = asyncio.Lock()
+        # claimed states no execution started yet, and states being executed
+        self._unstarted: set[str] = set()
+        self._executing: set[str] = set()
+        self._executions: set[asyncio.Task] = set()
         self._node_mapping = {
             node.__name__: node for node in nodes
         }
+        self._node_queues: Dict[str, Queue] = {
+            node.__name__: Queue() for node in nodes
+        }
 
         self._set_config_from_env()
         self._validate_runtime()
         self._validate_nodes()
 
+        self._poller = AdaptivePoller(poll_interval, max_poll_interval, min_batch_size, batch_size)
+        self._backpressure = Backpressure()
+        self._outbox = Outbox(outbox_path)
+
+        self._limiters = {
+            node.__name__: AdaptiveLimiter(node.min_concurrency, node.max_concurrency, node.max_concurrency or max(workers, node.min_concurrency)) for node in nodes
+        }
+        self._node_pools = {
+            node.__name__: NodePool(node, node.instances or node.max_concurrency) for node in nodes
+        }
+
     def _set_config_from_env(self):
         """
         Set configuration from environment variables if not provided.
@@ -119,13 +185,28 @@ class Runtime:
         Validate runtime configuration.
 
         Raises:
-            ValueError: If batch_size or workers is less than 1, or if required
-                configuration (state_manager_uri, key) is not provided.
+            ValueError: If batch_size or workers is less than 1, output_chunk_size is not
+                between 1 and 1000, secrets_ttl is negative, poll_interval is not positive,
+                max_poll_interval is below poll_interval, min_batch_size is not between 1 and
+                batch_size, shutdown_timeout is negative, or if required configuration (state_manager_uri,
+                key) is not provided.
         """
         if self._batch_size < 1:
             raise ValueError("Batch size should be at least 1")
         if self._workers < 1:
             raise ValueError("Workers should be at least 1")
+        if self._output_chunk_size < 1 or self._output_chunk_size > 1000:
+            raise ValueError("Output chunk size should be between 1 and 1000")
+        if self._secrets_ttl < 0:
+            raise ValueError("Secrets TTL should be at least 0")
+        if self._poll_interval <= 0:
+            raise ValueError("Poll interval should be greater than 0")
+        if self._max_poll_interval < self._poll_interval:
+            raise ValueError("Max poll interval should be at least the poll interval")
+        if self._min_batch_size < 1 or self._min_batch_size > self._batch_size:
+            raise ValueError("Min batch size should be between 1 and the batch size")
+        if self._shutdown_timeout < 0:
+            raise ValueError("Shutdown timeout should be at least 0")
         if self._state_manager_uri is None:
             raise ValueError("State manager URI is not set")
         if self._key is None:
@@ -143,6 +224,12 @@ class Runtime:
         """
         return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/state/{state_id}/executed"
     
+    def _get_append_outputs_endpoint(self, state_id: str):
+        """
+        Construct the endpoint URL for appending outputs of a state that is still executing.
+        """
+        return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/state/{state_id}/executed/append"
+
     def _get_errored_endpoint(self, state_id: str):
         """
         Construct the endpoint URL for notifying errored states.
@@ -160,6 +247,12 @@ class Runtime:
         Construct the endpoint URL for getting secrets.
         """
         return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/state/{state_id}/secrets"
+
+    def _get_bulk_secrets_endpoint(self):
+        """
+        Construct the endpoint URL for getting the secrets of many graphs at once.
+        """
+        return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/secrets"
     
     def _get_prune_endpoint(self, state_id: str):
         """
@@ -173,6 +266,24 @@ class Runtime:
         """
         return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/state/{state_id}/re-enqueue-after"
 
+    def _get_store_endpoint(self, state_id: str):
+        """
+        Construct the endpoint URL of the run store, as seen from a state.
+        """
+        return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/state/{state_id}/store"
+
+    def _get_united_outputs_endpoint(self, state_id: str):
+        """
+        Construct the endpoint URL for reading the outputs united into a state.
+        """
+        return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/state/{state_id}/united-outputs"
+
+    def _get_release_endpoint(self):
+        """
+        Construct the endpoint URL for releasing claimed states.
+        """
+        return f"{self._state_manager_uri}/{str(self._state_manager_version)}/namespace/{self._namespace}/states/release"
+
     async def _register(self):
         """
         Register node schemas and runtime metadata with the state manager.
@@ -200,7 +311,7 @@ class Runtime:
             }
             headers = {"x-api-key": self._key}
             
-            async with session.put(endpoint, json=body, headers=headers) as response: # type: ignore
+            async with self._backpressure.request(session.put, endpoint, json=body, headers=headers) as response: # type: ignore
                 res = await response.json()
 
                 if response.status != 200:
@@ -210,19 +321,26 @@ class Runtime:
                 logger.info(f"Registered nodes: {[f"{self._namespace}/{node.__name__}" for node in self._nodes]}")
                 return res
 
-    async def _enqueue_call(self):
+    async def _enqueue_call(self, batch_size: int | None = None):
         """
         Request a batch of states to process from the state manager.
 
+        Args:
+            batch_size (int | None): Most states to claim, defaults to the runtime's batch size.
+
         Returns:
             dict: Response from the state manager containing states to process.
         """
         async with ClientSession() as session:
             endpoint = self._get_enque_endpoint()
-            body = {"nodes": self._node_names, "batch_size": self._batch_size}
+            body = {
+                "nodes": self._node_names,
+                "batch_size": batch_size or self._batch_size,
+                "include_secrets": any(self._need_secrets(node) for node in self._nodes)
+            }
             headers = {"x-api-key": self._key}
 
-            async with session.post(endpoint, json=body, headers=headers) as response: # type: ignore
+            async with self._backpressure.request(session.post, endpoint, max_retries=0, json=body, headers=headers) as response: # type: ignore
                 res = await response.json()
 
                 if response.status != 200:
@@ -235,83 +353,357 @@ class Runtime:
         """
         Poll the state manager for new states and enqueue them for processing.
 
-        This runs continuously, polling at the configured interval.
+        This runs continuously, paced by the adaptive poller: immediately again after a full
+        batch, after poll_interval after a partial one and with a jittered exponential backoff
+        up to max_poll_interval while there is no work. Polls are not retried on their own when
+        the state manager sheds load, the next one waits for its Retry-After instead.
         """
         while True:
             try:
-                if self._state_queue.qsize() < self._batch_size: 
-                    data = await self._enqueue_call()
-                    for state in data.get("states", []):
-                        await self._state_queue.put(state)
-                    logger.info(f"Enqueued states: {len(data.get('states', []))}")
+                queued = self._queued()
+                if queued >= self._batch_size:
+                    # the nodes are behind, check again shortly instead of claiming more
+                    delay = min(self._poll_interval, 0.1)
+                else:
+                    batch_size = self._poller.batch_size(queued)
+
+                    # a drain waits for a poll in progress, so no claimed state goes untracked
+                    async with self._claiming:
+                        started_at = time.monotonic()
+                        data = await self._enqueue_call(batch_size)
+                        latency = time.monotonic() - started_at
+
+                        states = data.get("states", [])
+                        self._attach_secrets(states, data.get("secrets") or {})
+                        self._prefetch_secrets([state for state in states if "secrets" not in state])
+                        self._unstarted.update(state["state_id"] for state in states)
+                        for state in states:
+                            await self._put_state(state)
+                    logger.info(f"Enqueued states: {len(states)}")
+
+                    delay = self._poller.polled(batch_size, len(states), self._queued(), latency)
             except Exception as e:
                 logger.error(f"Error enqueuing states: {e}")
-                await sleep(self._poll_interval * 2)
+                delay = self._poller.failed()
+
+            await sleep(delay)
+
+    async def _deliver(self, entry: Dict[str, Any]) -> bool:
+        """
+        Send a notification of the outbox.
+
+        Returns:
+            bool: True once the state manager took the notification or rejected it for good,
+                False if it should be retried (network errors, timeouts and 5xx answers).
+        """
+        state_id = entry["state_id"]
+        if entry["kind"] == "executed":
+            endpoint = self._get_executed_endpoint(state_id)
+        else:
+            endpoint = self._get_errored_endpoint(state_id)
+
+        try:
+            async with ClientSession() as session:
+                headers = {"x-api-key": self._key}
+
+                async with self._backpressure.request(session.post, endpoint, json=entry["body"], headers=headers) as response: # type: ignore
+                    res = await response.json()
+
+                    if response.status != 200:
+                        logger.error(f"Failed to notify {entry['kind']} state {state_id}: {res}")
+                        return not (response.status >= 500 or response.status in (408, 429))
+                    return True
+
+        except Exception as e:
+            logger.error(f"Failed to notify {entry['kind']} state {state_id}: {e}")
+            return False
+
+    async def _send(self, entry: Dict[str, Any]) -> bool:
+        """
+        Deliver an entry taken from the outbox and settle it, even when cancelled midway.
+        """
+        delivered = False
+        try:
+            delivered = await self._deliver(entry)
+        finally:
+            if delivered:
+                self._outbox.ack(entry)
+            else:
+                self._outbox.release(entry)
+        return delivered
+
+    async def _flush_outbox(self):
+        """
+        Retry the notifications of the outbox that could not be delivered right away, including the
+        ones journaled by a previous run, up to batch_size at once. Failing deliveries back off
+        exponentially from poll_interval up to max_poll_interval.
+        """
+        delay = 0.0
+        while True:
+            await sleep(delay)
+
+            entries = self._outbox.take(self._batch_size)
+            if len(entries) == 0:
+                delay = self._poll_interval
                 continue
 
-            await sleep(self._poll_interval)
+            delivered = await asyncio.gather(*(self._send(entry) for entry in entries))
+            if all(delivered):
+                delay = 0.0
+            else:
+                logger.warning(f"{len(self._outbox)} notifications are waiting to be delivered")
+                delay = min(max(delay * 2, self._poll_interval), self._max_poll_interval)
 
     async def _notify_executed(self, state_id: str, outputs: List[BaseNode.Outputs]):
         """
         Notify the state manager that a state was executed successfully.
 
+        The notification is recorded in the outbox first and delivered right away, if that
+        fails it is retried in the background instead of being lost.
+
         Args:
             state_id (str): The ID of the executed state.
             outputs (List[BaseNode.Outputs]): Outputs from the node execution.
         """
+        entry = await self._outbox.put("executed", state_id, {"outputs": [output.model_dump() for output in outputs]})
+        self._executing.discard(state_id)
+        await self._send(entry)
+
+
+    async def _append_outputs(self, state_id: str, outputs: List[BaseNode.Outputs], offset: int = 0):
+        """
+        Send a chunk of outputs of a state that is still executing.
+
+        Args:
+            state_id (str): The ID of the executing state.
+            outputs (List[BaseNode.Outputs]): Outputs produced since the last chunk.
+            offset (int): Number of outputs appended before this chunk, the state manager
+                skips the ones an earlier run of the state already appended.
+
+        Raises:
+            RuntimeError: If the state manager rejects the chunk, which stops the node.
+        """
         async with ClientSession() as session:
-            endpoint = self._get_executed_endpoint(state_id)
-            body = {"outputs": [output.model_dump() for output in outputs]}
+            endpoint = self._get_append_outputs_endpoint(state_id)
+            body = {"outputs": [output.model_dump() for output in outputs], "offset": offset}
             headers = {"x-api-key": self._key}
 
-            async with session.post(endpoint, json=body, headers=headers) as response: # type: ignore
+            async with self._backpressure.request(session.post, endpoint, json=body, headers=headers) as response: # type: ignore
                 res = await response.json()
 
                 if response.status != 200:
-                    logger.error(f"Failed to notify executed state {state_id}: {res}")
+                    logger.error(f"Failed to append outputs to state {state_id}: {res}")
+                    raise RuntimeError(f"Failed to append outputs to state {state_id}: {res}")
+
+    async def _stream_outputs(self, state_id: str, outputs: AsyncIterator[BaseNode.Outputs] | Iterator[BaseNode.Outputs]) -> List[BaseNode.Outputs]:
+        """
+        Consume the outputs of a generator node, sending every full chunk as soon
+        as it is produced.
+
+        The first output is held back since it belongs to the executing state
+        itself, it is returned with the last partial chunk for the executed call.
+
+        Args:
+            state_id (str): The ID of the executing state.
+            outputs (AsyncIterator[BaseNode.Outputs] | Iterator[BaseNode.Outputs]): The node's generator.
+
+        Returns:
+            List[BaseNode.Outputs]: Outputs left to send with the executed notification.
+        """
+        first: List[BaseNode.Outputs] = []
+        chunk: List[BaseNode.Outputs] = []
+        offset = 0
+
+        async def collect(output: BaseNode.Outputs):
+            nonlocal chunk, offset
+            if len(first) == 0:
+                first.append(output)
+                return
+            chunk.append(output)
+            if len(chunk) >= self._output_chunk_size:
+                await self._append_outputs(state_id, chunk, offset)
+                offset += len(chunk)
+                chunk = []
+
+        if isinstance(outputs, AsyncIterator):
+            async for output in outputs:
+                await collect(output)
+        else:
+            for output in outputs:
+                await collect(output)
+
+        return first + chunk
 
-      
     async def _notify_errored(self, state_id: str, error: str):
         """
-        Notify the state manager that a state execution failed.
+        Notify the state manager that a state execution failed, through the outbox like `_notify_executed`.
 
         Args:
             state_id (str): The ID of the errored state.
             error (str): The error message.
         """
-        async with ClientSession() as session:
-            endpoint = self._get_errored_endpoint(state_id)
-            body = {"error": error}
-            headers = {"x-api-key": self._key}
+        entry = await self._outbox.put("errored", state_id, {"error": error})
+        self._executing.discard(state_id)
+        await self._send(entry)
 
-            async with session.post(endpoint, json=body, headers=headers) as response: # type: ignore
-                res =  await response.json()
 
-                if response.status != 200:
-                    logger.error(f"Failed to notify errored state {state_id}: {res}")
-
-
-    async def _get_secrets(self, state_id: str) -> Dict[str, str]:
+    async def _fetch_secrets(self, state_id: str) -> Dict[str, str] | None:
         """
-        Get secrets for a state.
+        Fetch the secrets of the graph of a state, returns None if they could not be fetched.
+        An authentication error also drops every cached secret, since the key that fetched them is no longer accepted.
         """
         async with ClientSession() as session:
             endpoint = self._get_secrets_endpoint(state_id)
             headers = {"x-api-key": self._key}
 
-            async with session.get(endpoint, headers=headers) as response: # type: ignore
+            async with self._backpressure.request(session.get, endpoint, headers=headers) as response: # type: ignore
                 res = await response.json()
 
+                if response.status in (401, 403):
+                    self._secrets_cache.clear()
+
                 if response.status != 200:
                     logger.error(f"Failed to get secrets for state {state_id}: {res}")
-                    return {}
+                    return None
                 
                 if "secrets" in res:
                     return res["secrets"]
                 else:
                     logger.error(f"'secrets' not found in response for state {state_id}")
+                    return None
+
+    async def _get_secrets(self, state_id: str) -> Dict[str, str]:
+        """
+        Get secrets for a state.
+        """
+        secrets = await self._fetch_secrets(state_id)
+        return secrets if secrets is not None else {}
+
+    def _secrets_key(self, state: dict) -> Tuple[str, str] | None:
+        """
+        Key of the cached secrets of a state, None when the state can not use the cache.
+        """
+        if self._secrets_ttl == 0 or not state.get("graph_name"):
+            return None
+        return (self._namespace, state["graph_name"])
+
+    def _cached_secrets(self, key: Tuple[str, str]) -> Dict[str, str] | None:
+        cached = self._secrets_cache.get(key)
+        if cached is None:
+            return None
+        expires_at, secrets = cached
+        if expires_at <= time.monotonic():
+            del self._secrets_cache[key]
+            return None
+        return secrets
+
+    def _cache_secrets(self, graphs: Dict[str, Dict[str, str]]):
+        expires_at = time.monotonic() + self._secrets_ttl
+        for graph_name, secrets in graphs.items():
+            self._secrets_cache[(self._namespace, graph_name)] = (expires_at, secrets)
+
+    async def _fetch_bulk_secrets(self, graph_names: List[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Fetch the secrets of many graphs in one request, graphs that could not be fetched are left out.
+        """
+        async with ClientSession() as session:
+            endpoint = self._get_bulk_secrets_endpoint()
+            body = {"graph_names": graph_names}
+            headers = {"x-api-key": self._key}
+
+            async with self._backpressure.request(session.post, endpoint, json=body, headers=headers) as response: # type: ignore
+                res = await response.json()
+
+                if response.status in (401, 403):
+                    self._secrets_cache.clear()
+
+                if response.status != 200:
+                    logger.error(f"Failed to get secrets for graphs {graph_names}: {res}")
                     return {}
 
+                return res.get("graphs", {})
+
+    async def _load_secrets(self, keys: List[Tuple[str, str]], state_id: str | None = None) -> Dict[str, Dict[str, str]]:
+        """
+        Load and cache the secrets of graphs, through the state's own endpoint when a state is given.
+        """
+        try:
+            if state_id is not None:
+                secrets = await self._fetch_secrets(state_id)
+                graphs = {keys[0][1]: secrets} if secrets is not None else {}
+            else:
+                graphs = await self._fetch_bulk_secrets([graph_name for _, graph_name in keys])
+            self._cache_secrets(graphs)
+            return graphs
+        finally:
+            for key in keys:
+                self._secrets_loads.pop(key, None)
+
+    def _start_secrets_load(self, keys: List[Tuple[str, str]], state_id: str | None = None) -> asyncio.Task[Dict[str, Dict[str, str]]]:
+        task = asyncio.create_task(self._load_secrets(keys, state_id))
+        for key in keys:
+            self._secrets_loads[key] = task
+        return task
+
+    def _attach_secrets(self, states: List[dict], graph_secrets: Dict[str, Dict[str, str]]):
+        """
+        Attach the secrets the state manager sent along with a claimed batch to the states of
+        each graph, so they are executed without fetching secrets at all.
+        """
+        for state in states:
+            if state.get("graph_name") in graph_secrets:
+                state["secrets"] = graph_secrets[state["graph_name"]]
+
+    def _prefetch_secrets(self, states: List[dict]):
+        """
+        Start fetching, in a single request, the secrets of every graph of a claimed batch whose
+        secrets are not cached or already being fetched, so executions find them ready instead of
+        fetching them per state.
+        """
+        keys: Dict[Tuple[str, str], None] = {}
+        for state in states:
+            node = self._node_mapping.get(state.get("node_name")) # type: ignore
+            if node is None or not self._need_secrets(node):
+                continue
+            key = self._secrets_key(state)
+            if key is None or key in self._secrets_loads or self._cached_secrets(key) is not None:
+                continue
+            keys[key] = None
+
+        if len(keys) > 0:
+            self._start_secrets_load(list(keys))
+
+    async def _get_state_secrets(self, state: dict) -> Dict[str, str]:
+        """
+        Get the secrets of a state from the cache of its graph, fetching them on a miss.
+        """
+        key = self._secrets_key(state)
+        if key is None:
+            return await self._get_secrets(state["state_id"])
+
+        secrets = self._cached_secrets(key)
+        if secrets is not None:
+            return secrets
+
+        load = self._secrets_loads.get(key)
+        if load is not None:
+            graphs = await asyncio.shield(load)
+            if key[1] in graphs:
+                return graphs[key[1]]
+
+        # nothing in flight for the graph, or the batch fetch missed it
+        graphs = await asyncio.shield(self._secrets_loads.get(key) or self._start_secrets_load([key], state["state_id"]))
+        return graphs.get(key[1], {})
+
+    def _invalidate_secrets(self, state: dict):
+        """
+        Drop the cached secrets of the graph of a state, e.g. after its node failed with them,
+        so a rotated secret is picked up by the next state instead of after the TTL.
+        """
+        key = self._secrets_key(state)
+        if key is not None:
+            self._secrets_cache.pop(key, None)
+
     def _validate_nodes(self):
         """
         Validate that all provided nodes are valid BaseNode subclasses.
@@ -359,6 +751,19 @@ class Runtime:
                 for field_name, field_info in node.Secrets.model_fields.items():
                     if field_info.annotation is not str:
                         errors.append(f"{node.__name__}.Secrets field '{field_name}' must be of type str, got {field_info.annotation}")
+            instances = getattr(node, "instances", None)
+            if instances is not None and (not isinstance(instances, int) or instances < 1):
+                errors.append(f"{node.__name__}.instances must be a positive integer or None, got {instances}")
+            min_concurrency = getattr(node, "min_concurrency", 1)
+            max_concurrency = getattr(node, "max_concurrency", None)
+            if not isinstance(min_concurrency, int) or min_concurrency < 1:
+                errors.append(f"{node.__name__}.min_concurrency must be a positive integer, got {min_concurrency}")
+            elif max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < min_concurrency):
+                errors.append(f"{node.__name__}.max_concurrency must be None or an integer of at least min_concurrency, got {max_concurrency}")
+            if getattr(node, "max_batch_size", 1) < 1:
+                errors.append(f"{node.__name__}.max_batch_size must be at least 1")
+            if getattr(node, "max_batch_wait", 0) < 0:
+                errors.append(f"{node.__name__}.max_batch_wait must be at least 0")
         
         # Find nodes with the same __class__.__name__
         class_names = [node.__name__ for node in self._nodes]
@@ -374,75 +779,446 @@ class Runtime:
         Check if the node needs secrets.
         """
         return len(node.Secrets.model_fields.keys()) > 0
-        
-    async def _worker(self, idx: int):
+
+    def _supports_batch(self, node: type[BaseNode]) -> bool:
+        """
+        Check if the node executes states in batches.
         """
-        Worker task that processes states from the queue.
+        return node.execute_batch is not BaseNode.execute_batch
 
-        Continuously fetches states from the queue, executes the corresponding node,
-        and notifies the state manager of the result.
+    @asynccontextmanager
+    async def _node_instance(self, node: type[BaseNode], slot: LimiterSlot):
         """
-        logger.info(f"Starting worker thread {idx} for nodes: {[f"{self._namespace}/{node.__name__}" for node in self._nodes]}")
+        Take a pooled instance for one execution in a slot of the node's adaptive concurrency
+        limit. The execution's latency, timed from when the instance is ready, and whether it
+        raised (signals aside) adjust the limit. Waiting for an instance or setting one up is
+        not a sample: a failed setup frees the slot without adjusting the limit.
+        """
+        pool = self._node_pools[node.__name__]
+        try:
+            instance = await pool.acquire()
+        except BaseException:
+            await slot.cancel()
+            raise
 
-        while True:
-            state = await self._state_queue.get()
-            node = None
+        slot.start()
+        failed = False
+        try:
+            try:
+                yield instance
+            finally:
+                pool.release(instance)
+        except (PruneSignal, ReQueueAfterSignal):
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            await slot.release(failed)
+
+    def concurrency_metrics(self) -> Dict[str, Dict[str, float | int | None]]:
+        """
+        Current adaptive concurrency of every node.
+
+        Returns:
+            Dict[str, Dict[str, float | int | None]]: Per node name, the current `limit`, its
+                `min_limit` and `max_limit` bounds (None without a ceiling), the executions
+                `in_flight` and the `average_latency` in seconds of successful executions
+                (None before the first).
+        """
+        return {node_name: limiter.metrics() for node_name, limiter in self._limiters.items()}
+
+    def _queued(self) -> int:
+        """
+        Number of queued states and batches no execution started yet, over all nodes.
+        """
+        return sum(queue.qsize() for queue in self._node_queues.values())
+
+    def _track_execution(self, execution: asyncio.Task):
+        self._executions.add(execution)
+        execution.add_done_callback(self._executions.discard)
+
+    async def _put_state(self, state: dict):
+        """
+        Queue a claimed state for its node. States of batch nodes are held in a pending
+        batch per node and graph, which is queued as one item once it holds max_batch_size
+        states or max_batch_wait passed.
+        """
+        node = self._node_mapping.get(state.get("node_name")) # type: ignore
+        if node is None:
+            # nothing would ever execute it, error it right away
+            self._unstarted.discard(state["state_id"])
+            self._track_execution(asyncio.create_task(self._reject_state(state)))
+            return
+
+        if not self._supports_batch(node):
+            await self._node_queues[node.__name__].put(state)
+            return
+
+        key = (node.__name__, state.get("graph_name") or "")
+        states = self._pending_batches.get(key)
+        if states is None:
+            states = []
+            self._pending_batches[key] = states
+            flush = asyncio.create_task(self._flush_batch_after(key, states, node.max_batch_wait))
+            self._batch_flushes.add(flush)
+            flush.add_done_callback(self._batch_flushes.discard)
+
+        states.append(state)
+        if len(states) >= node.max_batch_size:
+            await self._flush_batch(key, states)
 
+    async def _flush_batch(self, key: Tuple[str, str], states: List[dict]):
+        if self._pending_batches.get(key) is not states:
+            return
+        del self._pending_batches[key]
+        await self._node_queues[key[0]].put(states)
+
+    async def _flush_batch_after(self, key: Tuple[str, str], states: List[dict], delay: float):
+        await sleep(delay)
+        await self._flush_batch(key, states)
+
+    async def _reject_state(self, state: dict):
+        """
+        Error a state of a node this runtime does not have.
+        """
+        error = f"Node {state.get('node_name')} is not registered with this runtime"
+        logger.error(f"Error executing state {state['state_id']}: {error}")
+        try:
+            await self._notify_errored(state["state_id"], error)
+        except Exception as e:
+            logger.error(f"Error notifying errored state {state['state_id']}: {e}")
+
+    async def _complete_state(self, node: type[BaseNode], state: dict, result: BaseNode.Outputs | List[BaseNode.Outputs] | BaseException | None):
+        """
+        Report the result of one state of a batch, an exception errors, prunes or requeues the state.
+        """
+        try:
+            if isinstance(result, PruneSignal):
+                await result.send(self._get_prune_endpoint(state["state_id"]), self._key) # type: ignore
+                logger.info(f"Pruned state {state['state_id']} for node {node.__name__}")
+            elif isinstance(result, ReQueueAfterSignal):
+                await result.send(self._get_requeue_after_endpoint(state["state_id"]), self._key) # type: ignore
+                logger.info(f"Requeued state {state['state_id']} for node {node.__name__} after {result.delay}")
+            elif isinstance(result, BaseException):
+                logger.error(f"Error executing state {state['state_id']} for node {node.__name__}: {result}")
+                if self._need_secrets(node):
+                    self._invalidate_secrets(state)
+                await self._notify_errored(state["state_id"], str(result))
+            else:
+                if result is None:
+                    result = []
+                if not isinstance(result, list):
+                    result = [result]
+                await self._notify_executed(state["state_id"], result)
+                logger.info(f"Notified executed state {state['state_id']} for node {node.__name__}")
+        except Exception as e:
+            logger.error(f"Error completing state {state['state_id']} for node {node.__name__}: {e}")
+
+    async def _execute_batch(self, node: type[BaseNode], states: List[dict], slot: LimiterSlot):
+        """
+        Execute a batch of states of one node and graph with a single execute_batch call,
+        then report every state on its own.
+        """
+        logger.info(f"Executing batch of {len(states)} states for node {node.__name__}")
+        results: List[BaseNode.Outputs | List[BaseNode.Outputs] | BaseException | None] = [None] * len(states)
+        batch: List[int] = []
+        inputs = []
+        for idx, state in enumerate(states):
             try:
-                node = self._node_mapping[state["node_name"]]
-                logger.info(f"Executing state {state['state_id']} for node {node.__name__}")
+                inputs.append(node.Inputs(**state["inputs"]))
+                batch.append(idx)
+            except Exception as e:
+                results[idx] = e
 
+        if len(batch) > 0:
+            try:
                 secrets = {}
                 if self._need_secrets(node):
-                    secrets = await self._get_secrets(state["state_id"])
-                    logger.info(f"Got secrets for state {state['state_id']} for node {node.__name__}")
+                    first = states[batch[0]]
+                    secrets = first["secrets"] if "secrets" in first else await self._get_state_secrets(first)
 
-                outputs = await node()._execute(node.Inputs(**state["inputs"]), node.Secrets(**secrets))
-                logger.info(f"Got outputs for state {state['state_id']} for node {node.__name__}")
-                
-                if outputs is None:
-                    outputs = []
-
-                if not isinstance(outputs, list):
-                    outputs = [outputs]
+                async with self._node_instance(node, slot) as instance:
+                    batch_results = await instance._execute_batch(inputs, node.Secrets(**secrets))
 
-                await self._notify_executed(state["state_id"], outputs)
-                logger.info(f"Notified executed state {state['state_id']} for node {node.__name__ if node else "unknown"}")
-            
-            except PruneSignal as prune_signal:
-                logger.info(f"Pruning state {state['state_id']} for node {node.__name__ if node else "unknown"}")
-                await prune_signal.send(self._get_prune_endpoint(state["state_id"]), self._key) # type: ignore
-                logger.info(f"Pruned state {state['state_id']} for node {node.__name__ if node else "unknown"}")
-            
-            except ReQueueAfterSignal as requeue_signal:
-                logger.info(f"Requeuing state {state['state_id']} for node {node.__name__ if node else "unknown"} after {requeue_signal.delay}")
-                await requeue_signal.send(self._get_requeue_after_endpoint(state["state_id"]), self._key) # type: ignore
-                logger.info(f"Requeued state {state['state_id']} for node {node.__name__ if node else "unknown"} after {requeue_signal.delay}")
-                
+                if not isinstance(batch_results, list) or len(batch_results) != len(batch):
+                    raise RuntimeError(f"execute_batch of node {node.__name__} returned {len(batch_results) if isinstance(batch_results, list) else type(batch_results).__name__} results for {len(batch)} inputs")
             except Exception as e:
-                logger.error(f"Error executing state {state['state_id']} for node {node.__name__ if node else "unknown"}: {e}")
                 logger.error(traceback.format_exc())
+                batch_results = [e] * len(batch)
+
+            for idx, result in zip(batch, batch_results):
+                results[idx] = result
+
+        await asyncio.gather(*[self._complete_state(node, state, result) for state, result in zip(states, results)])
+
+    async def _execute_state(self, node: type[BaseNode], state: dict, slot: LimiterSlot):
+        """
+        Execute one state and notify the state manager of the result.
+        """
+        try:
+            logger.info(f"Executing state {state['state_id']} for node {node.__name__}")
+
+            secrets = {}
+            if self._need_secrets(node):
+                secrets = state["secrets"] if "secrets" in state else await self._get_state_secrets(state)
+                logger.info(f"Got secrets for state {state['state_id']} for node {node.__name__}")
+
+            store = RunStore(self._get_store_endpoint(state["state_id"]), self._key, self._backpressure) # type: ignore
+            fan_in = FanIn(self._get_united_outputs_endpoint(state["state_id"]), self._key, self._backpressure) # type: ignore
+
+            async with self._node_instance(node, slot) as instance:
+                outputs = await instance._execute(node.Inputs(**state["inputs"]), node.Secrets(**secrets), store, fan_in)
+
+                if isinstance(outputs, AsyncIterator) or inspect.isgenerator(outputs):
+                    outputs = await self._stream_outputs(state["state_id"], outputs)
 
-                await self._notify_errored(state["state_id"], str(e))
-                logger.info(f"Notified errored state {state['state_id']} for node {node.__name__ if node else "unknown"}")
+            logger.info(f"Got outputs for state {state['state_id']} for node {node.__name__}")
 
-            self._state_queue.task_done() # type: ignore
+            if outputs is None:
+                outputs = []
+
+            if not isinstance(outputs, list):
+                outputs = [outputs]
+
+            await self._notify_executed(state["state_id"], outputs)
+            logger.info(f"Notified executed state {state['state_id']} for node {node.__name__}")
+
+        except PruneSignal as prune_signal:
+            logger.info(f"Pruning state {state['state_id']} for node {node.__name__}")
+            await prune_signal.send(self._get_prune_endpoint(state["state_id"]), self._key) # type: ignore
+            logger.info(f"Pruned state {state['state_id']} for node {node.__name__}")
+
+        except ReQueueAfterSignal as requeue_signal:
+            logger.info(f"Requeuing state {state['state_id']} for node {node.__name__} after {requeue_signal.delay}")
+            await requeue_signal.send(self._get_requeue_after_endpoint(state["state_id"]), self._key) # type: ignore
+            logger.info(f"Requeued state {state['state_id']} for node {node.__name__} after {requeue_signal.delay}")
+
+        except Exception as e:
+            logger.error(f"Error executing state {state['state_id']} for node {node.__name__}: {e}")
+            logger.error(traceback.format_exc())
+
+            if self._need_secrets(node):
+                self._invalidate_secrets(state)
+
+            await self._notify_errored(state["state_id"], str(e))
+            logger.info(f"Notified errored state {state['state_id']} for node {node.__name__}")
+
+    async def _execute(self, node: type[BaseNode], item: dict | List[dict], slot: LimiterSlot):
+        """
+        Execute a queued state or batch in a slot of its node, then free the slot and mark the item done.
+        """
+        state_ids = [state["state_id"] for state in item] if isinstance(item, list) else [item["state_id"]]
+        try:
+            if isinstance(item, list):
+                await self._execute_batch(node, item, slot)
+            else:
+                await self._execute_state(node, item, slot)
+        finally:
+            # an execution that failed before reaching the node frees its slot without feedback
+            await slot.cancel()
+            self._node_queues[node.__name__].task_done()
+        # a cancelled execution stays executing, for the drain to release its states
+        self._executing.difference_update(state_ids)
+
+    async def _dispatch(self, node: type[BaseNode]):
+        """
+        Start the queued states of one node, each one once the node has a free slot.
+
+        Every node is dispatched on its own, so a node at its concurrency limit only holds
+        back its own states, and every execution runs in a task of its own.
+        """
+        queue = self._node_queues[node.__name__]
+        limiter = self._limiters[node.__name__]
+
+        while True:
+            item = await queue.get()
+            try:
+                slot = await limiter.acquire()
+            except BaseException:
+                queue.task_done()
+                raise
+
+            if self._stopping.is_set():
+                # left unstarted, the drain releases it to the state manager
+                await slot.cancel()
+                queue.task_done()
+                continue
+
+            state_ids = [state["state_id"] for state in item] if isinstance(item, list) else [item["state_id"]]
+            self._unstarted.difference_update(state_ids)
+            self._executing.update(state_ids)
+            self._track_execution(asyncio.create_task(self._execute(node, item, slot)))
+
+    async def _dispatch_all(self):
+        """
+        Dispatch the states of every node until cancelled.
+        """
+        logger.info(f"Starting dispatchers for nodes: {[f"{self._namespace}/{node.__name__}" for node in self._nodes]}")
+        await asyncio.gather(*(self._dispatch(node) for node in self._nodes))
+
+    async def _release_states(self, state_ids: List[str]):
+        """
+        Hand claimed states that will not be executed back to the state manager, so other
+        runtimes can claim them right away. Failures are logged, the states are then only
+        picked up again by the state manager's own recovery.
+        """
+        endpoint = self._get_release_endpoint()
+        headers = {"x-api-key": self._key}
+
+        async with ClientSession() as session:
+            for start in range(0, len(state_ids), 1000):
+                body = {"state_ids": state_ids[start:start + 1000]}
+                try:
+                    async with self._backpressure.request(session.post, endpoint, json=body, headers=headers) as response: # type: ignore
+                        res = await response.json()
+
+                        if response.status != 200:
+                            logger.error(f"Failed to release states: {res}")
+                        else:
+                            logger.info(f"Released {res['count']} states")
+                except Exception as e:
+                    logger.error(f"Failed to release states: {e}")
+
+    async def _drain_outbox(self, deadline: float):
+        """
+        Deliver the notifications left in the outbox until it is empty or the deadline passed,
+        each one is attempted at least once.
+        """
+        while len(self._outbox) > 0:
+            entries = self._outbox.take(self._batch_size)
+            if len(entries) == 0:
+                break
+
+            delivered = await asyncio.gather(*(self._send(entry) for entry in entries))
+            if all(delivered):
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            await sleep(min(self._poll_interval, remaining))
+
+        if len(self._outbox) > 0:
+            logger.error(f"{len(self._outbox)} notifications could not be delivered before shutdown")
+
+    async def _drain(self, poller: asyncio.Task, flusher: asyncio.Task, dispatcher: asyncio.Task):
+        """
+        Shut down without losing work: stop polling, let the states being executed finish
+        within shutdown_timeout, release the claimed states that were not started (and the
+        ones cut off by the timeout) and deliver the pending notifications.
+        """
+        deadline = time.monotonic() + self._shutdown_timeout
+        logger.info(f"Draining runtime, waiting up to {self._shutdown_timeout} seconds for {len(self._executing)} executing states")
+
+        # no new states, and no pending batch reaches the queue
+        try:
+            await asyncio.wait_for(self._claiming.acquire(), timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            logger.warning("Poll in progress did not finish within the shutdown timeout")
+        poller.cancel()
+        flushes = list(self._batch_flushes)
+        for flush in flushes:
+            flush.cancel()
+        self._pending_batches.clear()
+        await asyncio.gather(poller, *flushes, return_exceptions=True)
+
+        # no state is started any more, what is left in the queues is released below
+        dispatcher.cancel()
+        await asyncio.gather(dispatcher, return_exceptions=True)
+
+        executions = list(self._executions)
+        if len(executions) > 0:
+            _, unfinished = await asyncio.wait(executions, timeout=max(deadline - time.monotonic(), 0))
+            if len(unfinished) > 0:
+                logger.warning(f"{len(self._executing)} states did not finish within the shutdown timeout")
+                for execution in unfinished:
+                    execution.cancel()
+                await asyncio.gather(*unfinished, return_exceptions=True)
+
+        released = [*self._unstarted, *self._executing]
+        if len(released) > 0:
+            await self._release_states(released)
+        self._unstarted.clear()
+        self._executing.clear()
+
+        flusher.cancel()
+        await asyncio.gather(flusher, return_exceptions=True)
+        await self._drain_outbox(deadline)
+
+    def stop(self):
+        """
+        Stop the runtime gracefully: it stops polling, lets the states being executed finish
+        within `shutdown_timeout`, hands the claimed states it did not start back to the state
+        manager and delivers its pending notifications before `start` returns.
+
+        Also triggered by SIGTERM when the runtime runs on the main thread. The SIGTERM handler
+        in place before the runtime started is restored right away, so a second SIGTERM during
+        the drain gets the process's usual handling.
+        """
+        logger.info("Stopping runtime")
+        self._stopping.set()
+        self._restore_sigterm()
+
+    def _restore_sigterm(self):
+        """
+        Give SIGTERM back to the handler it had before the runtime installed its own.
+        """
+        if self._sigterm_loop is None:
+            return
+        try:
+            self._sigterm_loop.remove_signal_handler(signal.SIGTERM)
+            # None is a handler not installed from Python, which cannot be reinstated
+            if self._previous_sigterm is not None:
+                signal.signal(signal.SIGTERM, self._previous_sigterm)
+        except (RuntimeError, ValueError):
+            # not on the main thread, restored when the runtime exits
+            return
+        self._sigterm_loop = None
 
     async def _start(self):
         """
         Start the runtime event loop.
 
-        Registers nodes, starts the polling and worker tasks, and runs until stopped.
+        Registers nodes, starts the polling, outbox and dispatching tasks, and runs until stopped,
+        draining on `stop` (or SIGTERM) and tearing down the node instances and closing the
+        outbox journal on the way out.
 
         Raises:
             RuntimeError: If the runtime is not connected (no nodes registered).
         """
         await self._register()
-        
+
+        loop = asyncio.get_running_loop()
+        try:
+            self._previous_sigterm = signal.getsignal(signal.SIGTERM)
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+            self._sigterm_loop = loop
+        except (NotImplementedError, RuntimeError, ValueError):
+            # not on the main thread, or not supported on this platform
+            pass
+
         poller = asyncio.create_task(self._enqueue())
-        worker_tasks = [asyncio.create_task(self._worker(idx)) for idx in range(self._workers)]
+        flusher = asyncio.create_task(self._flush_outbox())
+        dispatcher = asyncio.create_task(self._dispatch_all())
+        running = asyncio.gather(poller, dispatcher)
+        stopping = asyncio.create_task(self._stopping.wait())
 
-        await asyncio.gather(poller, *worker_tasks)
+        try:
+            await asyncio.wait([running, stopping], return_when=asyncio.FIRST_COMPLETED)
+            if stopping.done():
+                await self._drain(poller, flusher, dispatcher)
+            else:
+                await running
+        finally:
+            executions = list(self._executions)
+            for task in (poller, flusher, stopping, dispatcher, *executions):
+                task.cancel()
+            await asyncio.gather(running, flusher, stopping, *executions, return_exceptions=True)
+            self._restore_sigterm()
+            for pool in self._node_pools.values():
+                await pool.close()
+            self._outbox.close()
 
     def start(self):
         """
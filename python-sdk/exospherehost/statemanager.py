@@ -1,9 +1,13 @@
 import os
+import json
 import aiohttp
 import asyncio
 import time
 
+from typing import AsyncIterator
+
 from .models import GraphNodeModel, RetryPolicyModel, StoreConfigModel, CronTrigger
+from .backpressure import Backpressure
 
 
 class StateManager:
@@ -13,6 +17,7 @@ class StateManager:
         self._key = key
         self._state_manager_version = state_manager_version
         self._namespace = namespace
+        self._backpressure = Backpressure()
 
         self._set_config_from_env()
 
@@ -28,13 +33,19 @@ class StateManager:
     def _get_trigger_state_endpoint(self, graph_name: str):
         return f"{self._state_manager_uri}/{self._state_manager_version}/namespace/{self._namespace}/graph/{graph_name}/trigger"
     
+    def _get_bulk_trigger_endpoint(self, graph_name: str):
+        return f"{self._state_manager_uri}/{self._state_manager_version}/namespace/{self._namespace}/graph/{graph_name}/trigger/bulk"
+
     def _get_upsert_graph_endpoint(self, graph_name: str):
         return f"{self._state_manager_uri}/{self._state_manager_version}/namespace/{self._namespace}/graph/{graph_name}"
     
     def _get_get_graph_endpoint(self, graph_name: str):
         return f"{self._state_manager_uri}/{self._state_manager_version}/namespace/{self._namespace}/graph/{graph_name}"
 
-    async def trigger(self, graph_name: str, inputs: dict[str, str] | None = None, store: dict[str, str] | None = None, start_delay: int = 0):
+    def _get_events_endpoint(self):
+        return f"{self._state_manager_uri}/{self._state_manager_version}/namespace/{self._namespace}/events"
+
+    async def trigger(self, graph_name: str, inputs: dict[str, str] | None = None, store: dict[str, str] | None = None, start_delay: int = 0, wait: bool = False, wait_timeout: float = 30):
         """
         Trigger execution of a graph.
         
@@ -50,9 +61,16 @@ class StateManager:
             store (dict[str, str] | None): Optional key-value store that will be merged
                 into the graph-level store before execution (beta).
             start_delay (int): Optional delay in milliseconds before the graph starts execution.
+            wait (bool): If True, the state manager holds the request open until the
+                run completes (or `wait_timeout` elapses) and returns the outputs of
+                the leaf states, saving a round of polling for request/response graphs.
+            wait_timeout (float): Maximum time in seconds to wait when `wait` is True
+                (at most 300). A run still running after that is returned with
+                `run_status` "PENDING".
 
         Returns:
-            dict: JSON payload returned by the state-manager API.
+            dict: JSON payload returned by the state-manager API. When waiting it also
+                carries `run_status` and, for completed runs, `outputs`.
         
         Raises:
             Exception: If the request fails.
@@ -68,6 +86,10 @@ class StateManager:
                 inputs={"user_id": "123"},
                 store={"cursor": "0"}  # beta
             )
+
+            # Wait for the run and read the leaf outputs
+            result = await state_manager.trigger("my-graph", inputs={"prompt": "hi"}, wait=True)
+            print(result["run_status"], result["outputs"])
             ```
         """
         if inputs is None: 
@@ -80,16 +102,75 @@ class StateManager:
             "inputs": inputs,
             "store": store
         }
+        timeout = None
+        if wait:
+            body["wait"] = True
+            body["wait_timeout"] = wait_timeout
+            # leave room for the server side wait on top of the request itself
+            timeout = aiohttp.ClientTimeout(total=wait_timeout + 30)
         headers = {
             "x-api-key": self._key
         }
         endpoint = self._get_trigger_state_endpoint(graph_name)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(endpoint, json=body, headers=headers) as response: # type: ignore
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with self._backpressure.request(session.post, endpoint, json=body, headers=headers) as response: # type: ignore
                 if response.status != 200:
                     raise Exception(f"Failed to trigger state: {response.status} {await response.text()}")
                 return await response.json()
             
+    async def trigger_many(self, graph_name: str, triggers: list[dict], batch_size: int = 1000) -> list[str]:
+        """
+        Trigger many runs of a graph with as few requests as possible.
+
+        Each trigger is a dict with the same optional keys as the arguments of
+        `trigger`: `inputs`, `store` and `start_delay`. Triggers are sent to the
+        bulk trigger endpoint `batch_size` at a time; the state manager validates
+        the graph once per batch and writes all runs of a batch in bulk.
+
+        Args:
+            graph_name (str): Name of the graph you want to run.
+            triggers (list[dict]): One dict per run to trigger.
+            batch_size (int): Number of runs per request (at most 10000).
+
+        Returns:
+            list[str]: Run IDs, in the same order as `triggers`.
+
+        Raises:
+            Exception: If a request fails. Runs of earlier batches stay triggered.
+
+        Example:
+            ```python
+            run_ids = await state_manager.trigger_many(
+                "my-graph",
+                [{"inputs": {"user_id": str(user_id)}} for user_id in range(100_000)]
+            )
+            ```
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        headers = {
+            "x-api-key": self._key
+        }
+        endpoint = self._get_bulk_trigger_endpoint(graph_name)
+        run_ids: list[str] = []
+        async with aiohttp.ClientSession() as session:
+            for start in range(0, len(triggers), batch_size):
+                body = {
+                    "triggers": [
+                        {
+                            "inputs": trigger.get("inputs") or {},
+                            "store": trigger.get("store") or {},
+                            "start_delay": trigger.get("start_delay", 0)
+                        } for trigger in triggers[start:start + batch_size]
+                    ]
+                }
+                async with self._backpressure.request(session.post, endpoint, json=body, headers=headers) as response: # type: ignore
+                    if response.status != 200:
+                        raise Exception(f"Failed to trigger runs: {response.status} {await response.text()}")
+                    run_ids.extend((await response.json())["run_ids"])
+        return run_ids
+
     async def get_graph(self, graph_name: str):
         """
         Retrieve information about a specific graph from the state manager.
@@ -120,7 +201,7 @@ class StateManager:
             "x-api-key": self._key
         }
         async with aiohttp.ClientSession() as session:
-            async with session.get(endpoint, headers=headers) as response: # type: ignore
+            async with self._backpressure.request(session.get, endpoint, headers=headers) as response: # type: ignore
                 if response.status != 200:
                     raise Exception(f"Failed to get graph: {response.status} {await response.text()}")
                 return await response.json()
@@ -180,7 +261,7 @@ class StateManager:
             ]
 
         async with aiohttp.ClientSession() as session:
-            async with session.put(endpoint, json=body, headers=headers) as response: # type: ignore
+            async with self._backpressure.request(session.put, endpoint, json=body, headers=headers) as response: # type: ignore
                 if response.status not in [200, 201]:
                     raise Exception(f"Failed to upsert graph: {response.status} {await response.text()}")
                 graph = await response.json()
@@ -198,4 +279,88 @@ class StateManager:
         if validation_state != "VALID":
             raise Exception(f"Graph validation failed: {graph['validation_status']} and errors: {graph['validation_errors']}")
 
-        return graph
\ No newline at end of file
+        return graph
+
+    async def watch_run(self, run_id: str) -> AsyncIterator[dict]:
+        """
+        Stream the state transitions of a run as they happen.
+
+        Opens a server-sent-events connection to the state manager and yields every
+        event of the run. State transitions have ``type == "state"``; the stream ends
+        after a final ``type == "run_completed"`` event carrying the run status
+        (``SUCCESS`` or ``FAILED``).
+
+        Args:
+            run_id (str): The run to watch, as returned by `trigger`.
+
+        Yields:
+            dict: Event payloads sent by the state manager.
+
+        Raises:
+            Exception: If the stream cannot be opened.
+
+        Example:
+            ```python
+            run = await state_manager.trigger("my-graph", inputs={"user_id": "123"})
+            async for event in state_manager.watch_run(run["run_id"]):
+                print(event)
+            ```
+        """
+        endpoint = self._get_events_endpoint()
+        headers = {
+            "x-api-key": self._key,
+            "Accept": "text/event-stream"
+        }
+        # the stream stays open for as long as the run is pending
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=None)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with self._backpressure.request(session.get, endpoint, params={"run_id": run_id}, headers=headers) as response: # type: ignore
+                if response.status != 200:
+                    raise Exception(f"Failed to watch run: {response.status} {await response.text()}")
+
+                data_lines: list[str] = []
+                async for raw_line in response.content:
+                    line = raw_line.decode("utf-8").rstrip("\r\n")
+
+                    if line == "":
+                        if len(data_lines) == 0:
+                            continue
+                        event = json.loads("\n".join(data_lines))
+                        data_lines = []
+                        yield event
+                        if event.get("type") == "run_completed":
+                            return
+                        continue
+
+                    # lines starting with ':' are keep-alive comments
+                    if line.startswith("data:"):
+                        data_lines.append(line[len("data:"):].lstrip())
+
+    async def wait_for_run(self, run_id: str, timeout: float | None = None, reconnect_interval: float = 1.0) -> dict:
+        """
+        Wait until a run has no pending states left, without polling.
+
+        Built on `watch_run`; if the event stream is interrupted it is reopened, and
+        the state manager reports the run as completed right away if it finished in
+        the meantime.
+
+        Args:
+            run_id (str): The run to wait for.
+            timeout (float | None): Seconds to wait before giving up, waits forever when None.
+            reconnect_interval (float): Seconds to wait before reopening an interrupted stream.
+
+        Returns:
+            dict: The ``run_completed`` event, its ``status`` is ``SUCCESS`` or ``FAILED``.
+
+        Raises:
+            TimeoutError: If the run does not complete within `timeout`.
+        """
+        async with asyncio.timeout(timeout):
+            while True:
+                try:
+                    async for event in self.watch_run(run_id):
+                        if event.get("type") == "run_completed":
+                            return event
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(reconnect_interval)
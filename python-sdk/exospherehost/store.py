@@ -0,0 +1,102 @@
+from urllib.parse import quote
+from aiohttp import ClientSession
+
+from .backpressure import Backpressure
+
+
+class RunStore:
+    """
+    Key-value store shared by all nodes of a graph run, available to a node as
+    `self.store` while it executes.
+
+    Values are strings, every operation is a single atomic update on the state
+    manager, and values written here can be read by later nodes through
+    `${{ store.key }}` inputs.
+
+    Requests wait and are retried when the state manager sheds load, like every
+    other request of the runtime.
+
+    Args:
+        endpoint (str): Store endpoint of the executing state.
+        key (str): The API key to include in the request headers.
+        backpressure (Backpressure | None): Load shedding handling shared with the runtime, a new one when None.
+    """
+
+    def __init__(self, endpoint: str, key: str, backpressure: Backpressure | None = None):
+        self._endpoint = endpoint
+        self._key = key
+        self._backpressure = backpressure or Backpressure()
+
+    def _get_key_endpoint(self, key: str) -> str:
+        return f"{self._endpoint}/{quote(key, safe='')}"
+
+    async def get(self, key: str) -> str | None:
+        """
+        Get the value of a key.
+
+        Returns:
+            str | None: The value, or None if the key is not set.
+
+        Raises:
+            RuntimeError: If the request fails.
+        """
+        async with ClientSession() as session:
+            async with self._backpressure.request(session.get, self._get_key_endpoint(key), headers={"x-api-key": self._key}) as response: # type: ignore
+                res = await response.json()
+                if response.status != 200:
+                    raise RuntimeError(f"Failed to get store key {key}: {res}")
+                return res["value"]
+
+    async def set(self, key: str, value: str) -> None:
+        """
+        Set a key, overwriting its value if it is already set.
+
+        Raises:
+            RuntimeError: If the request fails.
+        """
+        async with ClientSession() as session:
+            async with self._backpressure.request(session.put, self._get_key_endpoint(key), json={"value": value}, headers={"x-api-key": self._key}) as response: # type: ignore
+                res = await response.json()
+                if response.status != 200:
+                    raise RuntimeError(f"Failed to set store key {key}: {res}")
+
+    async def compare_and_set(self, key: str, expected: str | None, value: str) -> bool:
+        """
+        Set a key only if it currently holds expected.
+
+        Args:
+            key (str): The key to set.
+            expected (str | None): The value the key must hold, None if the key must not be set yet.
+            value (str): The new value.
+
+        Returns:
+            bool: Whether the value was set.
+
+        Raises:
+            RuntimeError: If the request fails.
+        """
+        async with ClientSession() as session:
+            endpoint = f"{self._get_key_endpoint(key)}/compare-and-set"
+            async with self._backpressure.request(session.post, endpoint, json={"expected": expected, "value": value}, headers={"x-api-key": self._key}) as response: # type: ignore
+                res = await response.json()
+                if response.status != 200:
+                    raise RuntimeError(f"Failed to compare and set store key {key}: {res}")
+                return res["swapped"]
+
+    async def increment(self, key: str, by: int = 1) -> int:
+        """
+        Atomically add to an integer key, a key that is not set counts as 0.
+
+        Returns:
+            int: The value after the increment.
+
+        Raises:
+            RuntimeError: If the request fails or the key does not hold an integer.
+        """
+        async with ClientSession() as session:
+            endpoint = f"{self._get_key_endpoint(key)}/increment"
+            async with self._backpressure.request(session.post, endpoint, json={"by": by}, headers={"x-api-key": self._key}) as response: # type: ignore
+                res = await response.json()
+                if response.status != 200:
+                    raise RuntimeError(f"Failed to increment store key {key}: {res}")
+                return int(res["value"])
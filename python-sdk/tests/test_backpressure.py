@@ -0,0 +1,111 @@
+import pytest
+import time
+from email.utils import formatdate
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from exospherehost.backpressure import Backpressure, RetryBudget, parse_retry_after
+
+
+def make_method(*statuses, retry_after=None):
+    responses = []
+    for status in statuses:
+        response = MagicMock()
+        response.status = status
+        response.headers = {"Retry-After": retry_after} if retry_after is not None else {}
+        context = AsyncMock()
+        context.__aenter__.return_value = response
+        context.__aexit__.return_value = None
+        responses.append(context)
+    return MagicMock(side_effect=responses)
+
+
+class TestParseRetryAfter:
+    def test_seconds(self):
+        assert parse_retry_after("3") == 3
+
+    def test_http_date(self):
+        assert 8 <= parse_retry_after(formatdate(timeval=time.time() + 10, usegmt=True)) <= 10 # type: ignore
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+
+
+class TestRetryBudget:
+    def test_retries_are_bounded_by_requests(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+
+        assert budget.withdraw()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+
+        budget.deposit()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert budget.withdraw()
+
+
+class TestBackpressure:
+    @pytest.mark.asyncio
+    async def test_success_is_not_retried(self):
+        method = make_method(200)
+
+        async with Backpressure().request(method, "http://test", json={}) as response:
+            assert response.status == 200
+
+        method.assert_called_once_with("http://test", json={})
+
+    @pytest.mark.asyncio
+    async def test_shed_request_waits_for_retry_after(self):
+        method = make_method(429, 503, 200, retry_after="2")
+
+        with patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            async with Backpressure().request(method, "http://test") as response:
+                assert response.status == 200
+
+        assert method.call_count == 3
+        assert mock_sleep.await_count == 2
+        for call in mock_sleep.await_args_list:
+            assert call.args[0] == pytest.approx(2, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        method = make_method(503, 503, 503)
+
+        with patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock):
+            async with Backpressure(max_retries=2).request(method, "http://test") as response:
+                assert response.status == 503
+
+        assert method.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_no_retries_when_budget_is_spent(self):
+        method = make_method(429, 200)
+        backpressure = Backpressure(budget=RetryBudget(ratio=0, max_tokens=0))
+
+        with patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock):
+            async with backpressure.request(method, "http://test") as response:
+                assert response.status == 429
+
+        method.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_shed_request_pauses_later_requests(self):
+        backpressure = Backpressure()
+
+        async with backpressure.request(make_method(503, retry_after="5"), "http://test", max_retries=0) as response:
+            assert response.status == 503
+
+        with patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            async with backpressure.request(make_method(200), "http://test"):
+                pass
+
+        mock_sleep.assert_awaited_once()
+        assert mock_sleep.await_args.args[0] == pytest.approx(5, abs=0.1) # type: ignore
+
+    def test_backoff_without_retry_after_is_jittered_and_capped(self):
+        backpressure = Backpressure(base_delay=1, max_delay=4)
+
+        with patch('exospherehost.backpressure.random.uniform', side_effect=lambda low, high: high):
+            assert [backpressure.delay(attempt, None) for attempt in range(4)] == [1, 2, 4, 4]
+        assert backpressure.delay(0, 100) == 4
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from exospherehost.concurrency import AdaptiveLimiter
+
+
+class TestAdaptiveLimiter:
+    def test_starts_at_max(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=8)
+
+        assert limiter.limit == 8
+        assert limiter.metrics() == {"limit": 8, "min_limit": 1, "max_limit": 8, "in_flight": 0, "average_latency": None}
+
+    def test_initial_limit_is_required_without_max(self):
+        with pytest.raises(ValueError, match="An initial limit is required without a max limit"):
+            AdaptiveLimiter(min_limit=1, max_limit=None)
+
+    @pytest.mark.asyncio
+    async def test_failure_halves_limit_down_to_min(self):
+        limiter = AdaptiveLimiter(min_limit=2, max_limit=8)
+
+        for expected in [4, 2, 2]:
+            slot = await limiter.acquire()
+            await slot.release(failed=True)
+            assert limiter.limit == expected
+
+    @pytest.mark.asyncio
+    async def test_failures_of_one_round_decrease_once(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=8)
+
+        slots = [await limiter.acquire() for _ in range(4)]
+        for slot in slots:
+            await slot.release(failed=True)
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_saturated_success_increases_additively_up_to_max(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=4)
+        slot = await limiter.acquire()
+        await slot.release(failed=True)
+        assert limiter.limit == 2
+
+        with patch('exospherehost.concurrency.time.monotonic', return_value=0):
+            for _ in range(2):
+                slots = [await limiter.acquire() for _ in range(limiter.limit)]
+                for slot in slots:
+                    await slot.release(failed=False)
+            assert limiter.limit == 3
+
+            for _ in range(10):
+                slots = [await limiter.acquire() for _ in range(limiter.limit)]
+                for slot in slots:
+                    await slot.release(failed=False)
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_unsaturated_success_keeps_limit(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=None, initial_limit=4)
+
+        with patch('exospherehost.concurrency.time.monotonic', return_value=0):
+            for _ in range(20):
+                slot = await limiter.acquire()
+                await slot.release(failed=False)
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_limit_without_max_keeps_growing(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=None, initial_limit=2)
+
+        with patch('exospherehost.concurrency.time.monotonic', return_value=0):
+            for _ in range(40):
+                slots = [await limiter.acquire() for _ in range(limiter.limit)]
+                for slot in slots:
+                    await slot.release(failed=False)
+
+        assert limiter.limit >= 20
+        assert limiter.metrics()["max_limit"] is None
+
+    @pytest.mark.asyncio
+    async def test_slow_execution_decreases_limit(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=8)
+
+        with patch('exospherehost.concurrency.time.monotonic') as mock_monotonic:
+            for i in range(10):
+                mock_monotonic.side_effect = [i, i + 1]
+                slot = await limiter.acquire()
+                await slot.release(failed=False)
+            assert limiter.limit == 8
+            assert limiter.metrics()["average_latency"] == pytest.approx(1)
+
+            mock_monotonic.side_effect = [100, 105]
+            slot = await limiter.acquire()
+            await slot.release(failed=False)
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_slot_is_freed_once(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=8)
+
+        slot = await limiter.acquire()
+        await slot.release(failed=True)
+        await slot.cancel()
+        await slot.release(failed=True)
+
+        assert limiter.limit == 4
+        assert limiter.metrics()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancel_keeps_limit(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=8)
+
+        slot = await limiter.acquire()
+        await slot.cancel()
+
+        assert limiter.limit == 8
+        assert limiter.metrics()["in_flight"] == 0
+        assert limiter.metrics()["average_latency"] is None
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_free_slot(self):
+        limiter = AdaptiveLimiter(min_limit=1, max_limit=1)
+        slot = await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert limiter.metrics()["in_flight"] == 1
+
+        await slot.release(failed=False)
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.metrics()["in_flight"] == 1
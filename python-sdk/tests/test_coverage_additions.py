@@ -73,7 +73,7 @@ async def test_runtime_enqueue_puts_states_and_sleeps(monkeypatch):
         except asyncio.CancelledError:
             pass
 
-    assert rt._state_queue.qsize() >= 1
+    assert rt._node_queues[_DummyNode.__name__].qsize() >= 1
 
 
 def test_runtime_validate_nodes_not_subclass(monkeypatch):
@@ -124,8 +124,8 @@ async def test_worker_handles_prune_signal(monkeypatch):
     rt = Runtime(namespace="ns", name="rt", nodes=[_PruneNode], workers=1)
 
     with patch('exospherehost.signals.PruneSignal.send', new=AsyncMock(return_value=None)) as send_mock:
-        await rt._state_queue.put({"state_id": "s1", "node_name": _PruneNode.__name__, "inputs": {"a": "1"}})
-        worker = asyncio.create_task(rt._worker(1))
+        await rt._put_state({"state_id": "s1", "node_name": _PruneNode.__name__, "inputs": {"a": "1"}})
+        worker = asyncio.create_task(rt._dispatch_all())
         await asyncio.sleep(0.02)
         worker.cancel()
         try:
@@ -143,8 +143,8 @@ async def test_worker_handles_requeue_signal(monkeypatch):
     rt = Runtime(namespace="ns", name="rt", nodes=[_RequeueNode], workers=1)
 
     with patch('exospherehost.signals.ReQueueAfterSignal.send', new=AsyncMock(return_value=None)) as send_mock:
-        await rt._state_queue.put({"state_id": "s2", "node_name": _RequeueNode.__name__, "inputs": {"a": "1"}})
-        worker = asyncio.create_task(rt._worker(2))
+        await rt._put_state({"state_id": "s2", "node_name": _RequeueNode.__name__, "inputs": {"a": "1"}})
+        worker = asyncio.create_task(rt._dispatch_all())
         await asyncio.sleep(0.02)
         worker.cancel()
         try:
@@ -163,7 +163,7 @@ async def test_runtime_start_creates_tasks(monkeypatch):
 
     with patch.object(rt, "_register", new=AsyncMock(return_value=None)):
         with patch.object(rt, "_enqueue", new=AsyncMock(side_effect=asyncio.CancelledError())):
-            with patch.object(rt, "_worker", new=AsyncMock(side_effect=asyncio.CancelledError())):
+            with patch.object(rt, "_dispatch_all", new=AsyncMock(side_effect=asyncio.CancelledError())):
                 t = asyncio.create_task(rt._start())
                 await asyncio.sleep(0.01)
                 t.cancel()
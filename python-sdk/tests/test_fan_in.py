@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pydantic import BaseModel
+
+from exospherehost.fan_in import FanIn
+from exospherehost.node.BaseNode import BaseNode
+
+
+def create_mock_aiohttp_session(responses):
+    """Helper function to create a mocked aiohttp session answering GETs with the given responses in order."""
+    mock_session = AsyncMock()
+
+    contexts = []
+    for response in responses:
+        mock_get_context = AsyncMock()
+        mock_get_context.__aenter__.return_value = response
+        mock_get_context.__aexit__.return_value = None
+        contexts.append(mock_get_context)
+
+    mock_session.get = MagicMock(side_effect=contexts)
+
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+
+    return mock_session
+
+
+def create_response(body, status=200):
+    response = AsyncMock()
+    response.status = status
+    response.json = AsyncMock(return_value=body)
+    return response
+
+
+ENDPOINT = "http://localhost:8080/v0/namespace/test_namespace/state/state123/united-outputs"
+
+
+class TestFanIn:
+    @pytest.mark.asyncio
+    async def test_outputs_pages_until_exhausted(self):
+        session = create_mock_aiohttp_session([
+            create_response({"outputs": [{"state_id": "a", "outputs": {"n": 1}}, {"state_id": "b", "outputs": {"n": 2}}], "cursor": "b", "has_more": True}),
+            create_response({"outputs": [{"state_id": "c", "outputs": {"n": 3}}], "cursor": "c", "has_more": False}),
+        ])
+
+        with patch('exospherehost.fan_in.ClientSession', return_value=session):
+            outputs = [output async for output in FanIn(ENDPOINT, "test_key").outputs("processor", page_size=2)]
+
+        assert outputs == [{"n": 1}, {"n": 2}, {"n": 3}]
+        assert session.get.call_count == 2
+        first_call, second_call = session.get.call_args_list
+        assert first_call[0][0] == ENDPOINT
+        assert first_call[1]["params"] == {"identifier": "processor", "limit": 2}
+        assert first_call[1]["headers"] == {"x-api-key": "test_key"}
+        assert second_call[1]["params"] == {"identifier": "processor", "limit": 2, "cursor": "b"}
+
+    @pytest.mark.asyncio
+    async def test_outputs_empty(self):
+        session = create_mock_aiohttp_session([create_response({"outputs": [], "cursor": None, "has_more": False})])
+
+        with patch('exospherehost.fan_in.ClientSession', return_value=session):
+            outputs = [output async for output in FanIn(ENDPOINT, "test_key").outputs("processor")]
+
+        assert outputs == []
+
+    @pytest.mark.asyncio
+    async def test_shed_request_is_retried_after_retry_after(self):
+        shed_response = create_response({"detail": "state manager is overloaded, retry later"}, status=503)
+        shed_response.headers = {"Retry-After": "3"}
+        session = create_mock_aiohttp_session([
+            shed_response,
+            create_response({"outputs": [{"state_id": "a", "outputs": {"n": 1}}], "cursor": "a", "has_more": False}),
+        ])
+
+        with patch('exospherehost.fan_in.ClientSession', return_value=session), \
+             patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            outputs = [output async for output in FanIn(ENDPOINT, "test_key").outputs("processor")]
+
+        assert outputs == [{"n": 1}]
+        assert session.get.call_count == 2
+        assert mock_sleep.await_args.args[0] == pytest.approx(3, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_failure_raises(self):
+        session = create_mock_aiohttp_session([create_response({"detail": "State does not belong to a unites node"}, status=400)])
+
+        with patch('exospherehost.fan_in.ClientSession', return_value=session):
+            with pytest.raises(RuntimeError, match="Failed to get united outputs of processor"):
+                async for _ in FanIn(ENDPOINT, "test_key").outputs("processor"):
+                    pass
+
+
+class SumNode(BaseNode):
+    class Inputs(BaseModel):
+        pass
+
+    class Outputs(BaseModel):
+        total: str
+
+    class Secrets(BaseModel):
+        pass
+
+    async def execute(self):
+        total = 0
+        async for outputs in self.fan_in.outputs("processor"): # type: ignore
+            total += int(outputs["n"])
+        return self.Outputs(total=str(total))
+
+
+@pytest.mark.asyncio
+async def test_node_receives_fan_in():
+    async def outputs(identifier):
+        for n in ("1", "2", "3"):
+            yield {"n": n}
+
+    fan_in = MagicMock(spec=FanIn)
+    fan_in.outputs = outputs
+
+    result = await SumNode()._execute(SumNode.Inputs(), SumNode.Secrets(), None, fan_in)
+
+    assert result.total == "6" # type: ignore
@@ -164,9 +164,9 @@ class TestRuntimeStateManagerIntegration:
             runtime._node_mapping["test_state_1"] = IntegrationTestNode
             
             # Put state in queue and run worker
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             await asyncio.sleep(0.1)
             worker_task.cancel()
             
@@ -264,9 +264,9 @@ class TestNodeExecutionIntegration:
             # Add state to node mapping
             runtime._node_mapping[state["state_id"]] = MultiOutputNode
             
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             await asyncio.sleep(0.1)
             worker_task.cancel()
             
@@ -310,9 +310,9 @@ class TestNodeExecutionIntegration:
             # Fix the bug in the runtime by adding state_id to node mapping
             runtime._node_mapping["test_state_1"] = ErrorProneNode
             
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             await asyncio.sleep(0.1)
             worker_task.cancel()
             
@@ -372,9 +372,9 @@ class TestEndToEndWorkflow:
             state = enqueue_result["states"][0]
             # Add state to node mapping
             runtime._node_mapping[state["state_id"]] = IntegrationTestNode
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             await asyncio.sleep(0.1)
             worker_task.cancel()
             
@@ -501,11 +501,11 @@ class TestConcurrencyIntegration:
             
             # Put states in queue
             for state in states:
-                await runtime._state_queue.put(state)
+                await runtime._put_state(state)
             
             # Start multiple workers
             worker_tasks = [
-                asyncio.create_task(runtime._worker(i)) for i in range(3)
+                asyncio.create_task(runtime._dispatch_all()) for i in range(3)
             ]
             
             await asyncio.sleep(0.1)
@@ -5,6 +5,7 @@ from exospherehost.models import (
     GraphNodeModel,
     UnitesModel,
     UnitesStrategyEnum,
+    MemoizeModel,
     StoreConfigModel,
     RetryPolicyModel,
 )
@@ -58,6 +59,23 @@ def test_graph_node_model_trimming_and_defaults():
     assert model.unites.identifier == "unite1"
     # Default enum value check
     assert model.unites.strategy == UnitesStrategyEnum.ALL_SUCCESS
+    assert model.memoize is None
+    assert model.single_flight is False
+
+
+def test_graph_node_model_memoize():
+    model = GraphNodeModel(node_name="n", namespace="ns", identifier="id1", memoize=MemoizeModel(ttl=60))
+    assert model.memoize is not None
+    assert model.memoize.ttl == 60
+    assert model.model_dump()["memoize"] == {"ttl": 60}
+
+    with pytest.raises(ValueError):
+        MemoizeModel(ttl=0)
+
+
+def test_graph_node_model_single_flight():
+    model = GraphNodeModel(node_name="n", namespace="ns", identifier="id1", single_flight=True)
+    assert model.model_dump()["single_flight"] is True
 
 
 @pytest.mark.parametrize(
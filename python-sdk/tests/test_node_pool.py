@@ -0,0 +1,114 @@
+import asyncio
+import pytest
+from pydantic import BaseModel
+
+from exospherehost.node.BaseNode import BaseNode
+from exospherehost.node.NodePool import NodePool
+
+
+class PooledNode(BaseNode):
+    created = 0
+
+    class Inputs(BaseModel):
+        name: str
+
+    class Outputs(BaseModel):
+        message: str
+
+    def __init__(self):
+        super().__init__()
+        PooledNode.created += 1
+        self.set_up = False
+        self.torn_down = False
+
+    async def setup(self):
+        self.set_up = True
+
+    async def teardown(self):
+        self.torn_down = True
+
+    async def execute(self):
+        return self.Outputs(message=self.inputs.name) # type: ignore
+
+
+class FailingSetupNode(PooledNode):
+    async def setup(self):
+        raise RuntimeError("setup failed")
+
+
+class FailingTeardownNode(PooledNode):
+    async def teardown(self):
+        raise RuntimeError("teardown failed")
+
+
+@pytest.fixture(autouse=True)
+def reset_created():
+    PooledNode.created = 0
+
+
+class TestNodePool:
+    @pytest.mark.asyncio
+    async def test_instances_are_set_up_once_and_reused(self):
+        pool = NodePool(PooledNode, 2)
+
+        first = await pool.acquire()
+        pool.release(first)
+        second = await pool.acquire()
+
+        assert first is second
+        assert first.set_up is True # type: ignore
+        assert PooledNode.created == 1
+
+    @pytest.mark.asyncio
+    async def test_pool_grows_up_to_size(self):
+        pool = NodePool(PooledNode, 2)
+
+        first = await pool.acquire()
+        second = await pool.acquire()
+
+        assert first is not second
+        assert PooledNode.created == 2
+
+    @pytest.mark.asyncio
+    async def test_full_pool_waits_for_release(self):
+        pool = NodePool(PooledNode, 1)
+        instance = await pool.acquire()
+
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        pool.release(instance)
+        assert await waiter is instance
+        assert PooledNode.created == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_setup_frees_the_slot(self):
+        pool = NodePool(FailingSetupNode, 1)
+
+        with pytest.raises(RuntimeError, match="setup failed"):
+            await pool.acquire()
+        with pytest.raises(RuntimeError, match="setup failed"):
+            await asyncio.wait_for(pool.acquire(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_close_tears_down_every_instance(self):
+        pool = NodePool(PooledNode, 2)
+        first = await pool.acquire()
+        second = await pool.acquire()
+        pool.release(first)
+
+        await pool.close()
+
+        assert first.torn_down is True # type: ignore
+        assert second.torn_down is True # type: ignore
+
+        # a closed pool starts over with fresh instances
+        assert await pool.acquire() is not first
+
+    @pytest.mark.asyncio
+    async def test_teardown_errors_are_ignored(self):
+        pool = NodePool(FailingTeardownNode, 1)
+        await pool.acquire()
+
+        await pool.close()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import threading
+import pytest
+from unittest.mock import patch
+
+from exospherehost.outbox import Outbox
+
+
+class TestOutbox:
+    @pytest.mark.asyncio
+    async def test_put_takes_entry(self):
+        outbox = Outbox()
+        entry = await outbox.put("executed", "state_1", {"outputs": []})
+
+        assert len(outbox) == 1
+        assert outbox.take(10) == []
+
+        outbox.release(entry)
+        assert outbox.take(10) == [entry]
+
+    @pytest.mark.asyncio
+    async def test_take_is_oldest_first_and_limited(self):
+        outbox = Outbox()
+        entries = [await outbox.put("errored", f"state_{idx}", {"error": "boom"}) for idx in range(3)]
+        for entry in entries:
+            outbox.release(entry)
+
+        assert outbox.take(2) == entries[:2]
+        assert outbox.take(2) == entries[2:]
+
+    @pytest.mark.asyncio
+    async def test_ack_drops_entry(self):
+        outbox = Outbox()
+        entry = await outbox.put("executed", "state_1", {"outputs": []})
+        outbox.ack(entry)
+
+        assert len(outbox) == 0
+        outbox.ack(entry)
+        assert len(outbox) == 0
+
+    @pytest.mark.asyncio
+    async def test_journal_survives_restart(self, tmp_path):
+        path = str(tmp_path / "outbox.jsonl")
+        outbox = Outbox(path)
+        delivered = await outbox.put("executed", "state_1", {"outputs": [{"message": "a"}]})
+        pending = await outbox.put("errored", "state_2", {"error": "boom"})
+        outbox.ack(delivered)
+
+        # no close, as after a crash
+        restarted = Outbox(path)
+
+        assert len(restarted) == 1
+        assert restarted.take(10) == [pending]
+
+    @pytest.mark.asyncio
+    async def test_torn_journal_line_is_skipped(self, tmp_path):
+        path = tmp_path / "outbox.jsonl"
+        entry = {"id": "abc", "kind": "errored", "state_id": "state_1", "body": {"error": "boom"}}
+        path.write_text(json.dumps(entry) + "\n" + '{"id": "de', encoding="utf-8")
+
+        outbox = Outbox(str(path))
+
+        assert outbox.take(10) == [entry]
+
+    @pytest.mark.asyncio
+    async def test_close_compacts_journal(self, tmp_path):
+        path = tmp_path / "outbox.jsonl"
+        outbox = Outbox(str(path))
+        for idx in range(3):
+            outbox.ack(await outbox.put("executed", f"state_{idx}", {"outputs": []}))
+        pending = await outbox.put("executed", "state_3", {"outputs": []})
+        outbox.close()
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [pending]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_puts_share_an_fsync_off_the_loop(self, tmp_path):
+        outbox = Outbox(str(tmp_path / "outbox.jsonl"))
+        threads = []
+
+        def fsync(fd):
+            threads.append(threading.current_thread())
+
+        with patch('exospherehost.outbox.os.fsync', side_effect=fsync):
+            entries = await asyncio.gather(*(outbox.put("executed", f"state_{idx}", {"outputs": []}) for idx in range(10)))
+
+        assert len(entries) == 10
+        assert len(outbox) == 10
+        assert 1 <= len(threads) <= 2
+        assert threading.main_thread() not in threads
+
+    @pytest.mark.asyncio
+    async def test_failed_fsync_fails_put(self, tmp_path):
+        outbox = Outbox(str(tmp_path / "outbox.jsonl"))
+
+        with patch('exospherehost.outbox.os.fsync', side_effect=OSError("disk full")):
+            with pytest.raises(OSError, match="disk full"):
+                await outbox.put("executed", "state_1", {"outputs": []})
+
+        assert len(outbox) == 0
+        entry = await outbox.put("executed", "state_2", {"outputs": []})
+        assert outbox.take(10) == []
+        outbox.release(entry)
+        assert outbox.take(10) == [entry]
@@ -14,7 +14,7 @@ def test_package_all_imports():
     """Test that __all__ contains all expected exports."""
     from exospherehost import __all__
     
-    expected_exports = ["Runtime", "BaseNode", "StateManager", "VERSION", "PruneSignal", "ReQueueAfterSignal", "UnitesStrategyEnum", "UnitesModel", "GraphNodeModel", "RetryStrategyEnum", "RetryPolicyModel", "StoreConfigModel", "CronTrigger"]
+    expected_exports = ["Runtime", "BaseNode", "StateManager", "VERSION", "PruneSignal", "ReQueueAfterSignal", "RunStore", "FanIn", "UnitesStrategyEnum", "UnitesModel", "MemoizeModel", "GraphNodeModel", "RetryStrategyEnum", "RetryPolicyModel", "StoreConfigModel", "CronTrigger"]
     
     for export in expected_exports:
         assert export in __all__, f"{export} should be in __all__"
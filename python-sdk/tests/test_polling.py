@@ -0,0 +1,70 @@
+import pytest
+from unittest.mock import patch
+
+from exospherehost.polling import AdaptivePoller
+
+
+@pytest.fixture
+def poller():
+    return AdaptivePoller(min_interval=1, max_interval=8, min_batch_size=2, max_batch_size=16)
+
+
+class TestAdaptivePoller:
+    def test_full_batch_polls_immediately(self, poller):
+        assert poller.polled(requested=16, received=16, queued=16, latency=0.01) == 0
+
+    def test_partial_batch_waits_min_interval(self, poller):
+        assert poller.polled(requested=16, received=3, queued=3, latency=0.01) == 1
+
+    def test_empty_batches_back_off_with_jitter_up_to_max(self, poller):
+        with patch('exospherehost.polling.random.uniform', side_effect=lambda low, high: high):
+            delays = [poller.polled(requested=16, received=0, queued=0, latency=0.01) for _ in range(6)]
+
+        assert delays == [1, 2, 4, 8, 8, 8]
+
+    def test_jitter_stays_within_backoff(self, poller):
+        for _ in range(5):
+            poller.failed()
+        for _ in range(100):
+            delay = poller.failed()
+            assert 4 <= delay <= 8
+
+    def test_work_resets_backoff(self, poller):
+        with patch('exospherehost.polling.random.uniform', side_effect=lambda low, high: high):
+            for _ in range(4):
+                poller.polled(requested=16, received=0, queued=0, latency=0.01)
+            poller.polled(requested=16, received=1, queued=1, latency=0.01)
+
+            assert poller.polled(requested=16, received=0, queued=0, latency=0.01) == 1
+
+    def test_failures_back_off(self, poller):
+        with patch('exospherehost.polling.random.uniform', side_effect=lambda low, high: high):
+            assert [poller.failed() for _ in range(3)] == [1, 2, 4]
+
+    def test_batch_size_starts_at_max(self, poller):
+        assert poller.batch_size(queued=0) == 16
+
+    def test_batch_size_follows_drain_rate(self, poller):
+        with patch('exospherehost.polling.time.monotonic') as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            poller.polled(requested=16, received=10, queued=10, latency=0.0)
+
+            # 5 states drained in 1 second, about 5 states are needed until the next poll
+            mock_monotonic.return_value = 101.0
+            assert poller.batch_size(queued=5) == 2
+
+    def test_batch_size_is_bounded(self, poller):
+        with patch('exospherehost.polling.time.monotonic') as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            poller.polled(requested=16, received=16, queued=16, latency=0.0)
+
+            mock_monotonic.return_value = 100.1
+            assert poller.batch_size(queued=0) == 16
+
+    def test_batch_size_shrinks_to_min_when_nothing_drains(self, poller):
+        with patch('exospherehost.polling.time.monotonic') as mock_monotonic:
+            mock_monotonic.return_value = 100.0
+            poller.polled(requested=16, received=4, queued=4, latency=0.0)
+
+            mock_monotonic.return_value = 110.0
+            assert poller.batch_size(queued=4) == 2
@@ -0,0 +1,146 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pydantic import BaseModel
+
+from exospherehost.store import RunStore
+from exospherehost.node.BaseNode import BaseNode
+
+
+def create_mock_aiohttp_session():
+    """Helper function to create a properly mocked aiohttp session."""
+    mock_session = AsyncMock()
+
+    mock_post_response = AsyncMock()
+    mock_get_response = AsyncMock()
+    mock_put_response = AsyncMock()
+
+    mock_post_context = AsyncMock()
+    mock_post_context.__aenter__.return_value = mock_post_response
+    mock_post_context.__aexit__.return_value = None
+
+    mock_get_context = AsyncMock()
+    mock_get_context.__aenter__.return_value = mock_get_response
+    mock_get_context.__aexit__.return_value = None
+
+    mock_put_context = AsyncMock()
+    mock_put_context.__aenter__.return_value = mock_put_response
+    mock_put_context.__aexit__.return_value = None
+
+    mock_session.post = MagicMock(return_value=mock_post_context)
+    mock_session.get = MagicMock(return_value=mock_get_context)
+    mock_session.put = MagicMock(return_value=mock_put_context)
+
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.__aexit__.return_value = None
+
+    return mock_session, mock_post_response, mock_get_response, mock_put_response
+
+
+ENDPOINT = "http://localhost:8080/v0/namespace/test_namespace/state/state123/store"
+
+
+@pytest.fixture
+def mock_session():
+    mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+    for response in (mock_post_response, mock_get_response, mock_put_response):
+        response.status = 200
+    with patch('exospherehost.store.ClientSession', return_value=mock_session):
+        yield mock_session, mock_post_response, mock_get_response, mock_put_response
+
+
+class TestRunStore:
+    @pytest.mark.asyncio
+    async def test_get(self, mock_session):
+        session, _, get_response, _ = mock_session
+        get_response.json = AsyncMock(return_value={"key": "cursor", "value": "page-2"})
+
+        assert await RunStore(ENDPOINT, "test_key").get("cursor") == "page-2"
+        assert session.get.call_args[0][0] == f"{ENDPOINT}/cursor"
+        assert session.get.call_args[1]["headers"] == {"x-api-key": "test_key"}
+
+    @pytest.mark.asyncio
+    async def test_get_quotes_key(self, mock_session):
+        session, _, get_response, _ = mock_session
+        get_response.json = AsyncMock(return_value={"key": "a/b", "value": None})
+
+        assert await RunStore(ENDPOINT, "test_key").get("a/b") is None
+        assert session.get.call_args[0][0] == f"{ENDPOINT}/a%2Fb"
+
+    @pytest.mark.asyncio
+    async def test_set(self, mock_session):
+        session, _, _, put_response = mock_session
+        put_response.json = AsyncMock(return_value={"key": "cursor", "value": "page-3"})
+
+        await RunStore(ENDPOINT, "test_key").set("cursor", "page-3")
+        assert session.put.call_args[1]["json"] == {"value": "page-3"}
+
+    @pytest.mark.asyncio
+    async def test_compare_and_set(self, mock_session):
+        session, post_response, _, _ = mock_session
+        post_response.json = AsyncMock(return_value={"key": "lock", "swapped": False, "value": "other"})
+
+        assert await RunStore(ENDPOINT, "test_key").compare_and_set("lock", None, "mine") is False
+        assert session.post.call_args[0][0] == f"{ENDPOINT}/lock/compare-and-set"
+        assert session.post.call_args[1]["json"] == {"expected": None, "value": "mine"}
+
+    @pytest.mark.asyncio
+    async def test_increment(self, mock_session):
+        session, post_response, _, _ = mock_session
+        post_response.json = AsyncMock(return_value={"key": "counter", "value": "7"})
+
+        assert await RunStore(ENDPOINT, "test_key").increment("counter", 2) == 7
+        assert session.post.call_args[0][0] == f"{ENDPOINT}/counter/increment"
+        assert session.post.call_args[1]["json"] == {"by": 2}
+
+    @pytest.mark.asyncio
+    async def test_shed_request_is_retried_after_retry_after(self, mock_session):
+        session, post_response, _, _ = mock_session
+        post_response.json = AsyncMock(return_value={"key": "counter", "value": "7"})
+
+        shed_response = MagicMock()
+        shed_response.status = 503
+        shed_response.headers = {"Retry-After": "2"}
+        shed_context = AsyncMock()
+        shed_context.__aenter__.return_value = shed_response
+        shed_context.__aexit__.return_value = None
+        session.post = MagicMock(side_effect=[shed_context, session.post.return_value])
+
+        with patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            assert await RunStore(ENDPOINT, "test_key").increment("counter", 2) == 7
+
+        assert session.post.call_count == 2
+        assert mock_sleep.await_args.args[0] == pytest.approx(2, abs=0.1)
+
+    @pytest.mark.asyncio
+    async def test_failure_raises(self, mock_session):
+        _, post_response, _, _ = mock_session
+        post_response.status = 400
+        post_response.json = AsyncMock(return_value={"detail": "Store key counter does not hold an integer"})
+
+        with pytest.raises(RuntimeError, match="Failed to increment store key counter"):
+            await RunStore(ENDPOINT, "test_key").increment("counter")
+
+
+class StoreNode(BaseNode):
+    class Inputs(BaseModel):
+        pass
+
+    class Outputs(BaseModel):
+        count: str
+
+    class Secrets(BaseModel):
+        pass
+
+    async def execute(self):
+        return self.Outputs(count=str(await self.store.increment("count"))) # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_node_receives_store():
+    store = AsyncMock(spec=RunStore)
+    store.increment.return_value = 1
+
+    result = await StoreNode()._execute(StoreNode.Inputs(), StoreNode.Secrets(), store)
+
+    assert result.count == "1" # type: ignore
+    store.increment.assert_awaited_once_with("count")
@@ -1,10 +1,14 @@
 import pytest
 import asyncio
 import logging
-from unittest.mock import AsyncMock, patch, MagicMock
+import os
+import signal
+import time
+from unittest.mock import AsyncMock, patch, MagicMock, PropertyMock
 from pydantic import BaseModel
 from exospherehost.runtime import Runtime, _setup_default_logging
 from exospherehost.node.BaseNode import BaseNode
+from exospherehost.signals import PruneSignal
 
 
 def create_mock_aiohttp_session():
@@ -70,6 +74,21 @@ class MockTestNodeWithListOutput(BaseNode):
         return [self.Outputs(numbers=str(i)) for i in range(count)]
 
 
+class MockTestNodeWithGeneratorOutput(BaseNode):
+    class Inputs(BaseModel):
+        count: str
+
+    class Outputs(BaseModel):
+        numbers: str
+
+    class Secrets(BaseModel):
+        api_key: str
+
+    async def execute(self):
+        for i in range(int(self.inputs.count)): # type: ignore
+            yield self.Outputs(numbers=str(i))
+
+
 class MockTestNodeWithError(BaseNode):
     class Inputs(BaseModel):
         should_fail: str
@@ -161,6 +180,16 @@ class TestRuntimeInitialization:
                 workers=0
             )
 
+    def test_runtime_validation_output_chunk_size_out_of_range(self, mock_env_vars):
+        for output_chunk_size in (0, 1001):
+            with pytest.raises(ValueError, match="Output chunk size should be between 1 and 1000"):
+                Runtime(
+                    namespace="test_namespace",
+                    name="test_runtime",
+                    nodes=[MockTestNode],
+                    output_chunk_size=output_chunk_size
+                )
+
     def test_runtime_validation_missing_uri(self, monkeypatch):
         monkeypatch.delenv("EXOSPHERE_STATE_MANAGER_URI", raising=False)
         monkeypatch.setenv("EXOSPHERE_API_KEY", "test_key")
@@ -195,6 +224,24 @@ class TestRuntimeEndpointConstruction:
         expected = "http://localhost:8080/v1/namespace/test_namespace/state/state123/executed"
         assert endpoint == expected
 
+    def test_get_store_endpoint(self, runtime_config):
+        runtime = Runtime(**runtime_config)
+        endpoint = runtime._get_store_endpoint("state123")
+        expected = "http://localhost:8080/v1/namespace/test_namespace/state/state123/store"
+        assert endpoint == expected
+
+    def test_get_united_outputs_endpoint(self, runtime_config):
+        runtime = Runtime(**runtime_config)
+        endpoint = runtime._get_united_outputs_endpoint("state123")
+        expected = "http://localhost:8080/v1/namespace/test_namespace/state/state123/united-outputs"
+        assert endpoint == expected
+
+    def test_get_append_outputs_endpoint(self, runtime_config):
+        runtime = Runtime(**runtime_config)
+        endpoint = runtime._get_append_outputs_endpoint("state123")
+        expected = "http://localhost:8080/v1/namespace/test_namespace/state/state123/executed/append"
+        assert endpoint == expected
+
     def test_get_errored_endpoint(self, runtime_config):
         runtime = Runtime(**runtime_config)
         endpoint = runtime._get_errored_endpoint("state123")
@@ -275,6 +322,51 @@ class TestRuntimeEnqueue:
             with pytest.raises(RuntimeError, match="Failed to enqueue states"):
                 await runtime._enqueue_call()
 
+    @pytest.mark.asyncio
+    async def test_enqueue_repolls_immediately_after_full_batch(self, runtime_config):
+        runtime_config["batch_size"] = 2
+        full_batch = {"states": [{"state_id": str(idx), "node_name": "MockTestNode", "inputs": {"name": "a"}} for idx in range(2)]}
+        with patch('exospherehost.runtime.Runtime._enqueue_call', new_callable=AsyncMock) as mock_enqueue_call:
+            mock_enqueue_call.side_effect = [full_batch, {"states": []}, {"states": []}]
+
+            runtime = Runtime(**runtime_config)
+            enqueue_task = asyncio.create_task(runtime._enqueue())
+            await asyncio.sleep(0.05)
+            runtime._node_queues["MockTestNode"].get_nowait()
+            runtime._node_queues["MockTestNode"].get_nowait()
+            await asyncio.sleep(0.2)
+            enqueue_task.cancel()
+            try:
+                await enqueue_task
+            except asyncio.CancelledError:
+                pass
+
+            # the empty poll that follows backs off for at least half the poll interval
+            assert mock_enqueue_call.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_enqueue_skips_poll_while_queue_is_full(self, runtime_config):
+        runtime_config["batch_size"] = 1
+        with patch('exospherehost.runtime.Runtime._enqueue_call', new_callable=AsyncMock) as mock_enqueue_call:
+            runtime = Runtime(**runtime_config)
+            await runtime._node_queues["MockTestNode"].put({"state_id": "queued"})
+
+            enqueue_task = asyncio.create_task(runtime._enqueue())
+            await asyncio.sleep(0.05)
+            enqueue_task.cancel()
+            try:
+                await enqueue_task
+            except asyncio.CancelledError:
+                pass
+
+            mock_enqueue_call.assert_not_called()
+
+    def test_invalid_poll_bounds(self, runtime_config):
+        with pytest.raises(ValueError, match="Max poll interval should be at least the poll interval"):
+            Runtime(**runtime_config, max_poll_interval=0.5)
+        with pytest.raises(ValueError, match="Min batch size should be between 1 and the batch size"):
+            Runtime(**runtime_config, min_batch_size=6)
+
 
 class TestRuntimeWorker:
     @pytest.mark.asyncio
@@ -295,10 +387,10 @@ class TestRuntimeWorker:
             }
             
             # Put state in queue
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
             # Run worker for one iteration
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             
             # Wait a bit for processing
             await asyncio.sleep(0.1)
@@ -338,9 +430,9 @@ class TestRuntimeWorker:
                 "inputs": {"count": "3"}
             }
             
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             await asyncio.sleep(0.1)
             worker_task.cancel()
             try:
@@ -355,6 +447,56 @@ class TestRuntimeWorker:
             assert call_args[0][1][1].numbers == "1"
             assert call_args[0][1][2].numbers == "2"
 
+    @pytest.mark.asyncio
+    async def test_worker_with_generator_output_streams_chunks(self, runtime_config):
+        runtime_config["nodes"] = [MockTestNodeWithGeneratorOutput]
+        runtime_config["output_chunk_size"] = 2
+
+        with patch('exospherehost.runtime.Runtime._get_secrets') as mock_get_secrets, \
+             patch('exospherehost.runtime.Runtime._append_outputs') as mock_append_outputs, \
+             patch('exospherehost.runtime.Runtime._notify_executed') as mock_notify_executed:
+
+            mock_get_secrets.return_value = {"api_key": "test_key"}
+
+            runtime = Runtime(**runtime_config)
+
+            state = {
+                "state_id": "test_state_1",
+                "node_name": "MockTestNodeWithGeneratorOutput",
+                "inputs": {"count": "6"}
+            }
+
+            await runtime._put_state(state)
+
+            worker_task = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            worker_task.cancel()
+            try:
+                await worker_task
+            except asyncio.CancelledError:
+                pass
+
+            # The first output is kept for the state itself, the rest go out in full chunks
+            assert [[output.numbers for output in call.args[1]] for call in mock_append_outputs.call_args_list] == [["1", "2"], ["3", "4"]]
+            # each chunk says where it starts, so a re-run does not append the same outputs twice
+            assert [call.args[2] for call in mock_append_outputs.call_args_list] == [0, 2]
+
+            mock_notify_executed.assert_called_once()
+            assert [output.numbers for output in mock_notify_executed.call_args[0][1]] == ["0", "5"]
+
+    @pytest.mark.asyncio
+    async def test_stream_outputs_from_sync_generator(self, runtime_config):
+        runtime_config["output_chunk_size"] = 1
+
+        with patch('exospherehost.runtime.Runtime._append_outputs') as mock_append_outputs:
+            runtime = Runtime(**runtime_config)
+
+            outputs = (MockTestNode.Outputs(message=str(i)) for i in range(3))
+            remaining = await runtime._stream_outputs("test_state_1", outputs)
+
+            assert [output.message for output in remaining] == ["0"]
+            assert mock_append_outputs.call_count == 2
+
     @pytest.mark.asyncio
     async def test_worker_with_none_output(self, runtime_config):
         runtime_config["nodes"] = [MockTestNodeWithNoneOutput]
@@ -373,9 +515,9 @@ class TestRuntimeWorker:
                 "inputs": {"name": "test"}
             }
             
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             await asyncio.sleep(0.1)
             worker_task.cancel()
             try:
@@ -405,9 +547,9 @@ class TestRuntimeWorker:
                 "inputs": {"should_fail": "true"}
             }
             
-            await runtime._state_queue.put(state)
+            await runtime._put_state(state)
             
-            worker_task = asyncio.create_task(runtime._worker(1))
+            worker_task = asyncio.create_task(runtime._dispatch_all())
             await asyncio.sleep(0.1)
             worker_task.cancel()
             try:
@@ -421,7 +563,451 @@ class TestRuntimeWorker:
             assert "Test error" in call_args[0][1]  # error message
 
 
+class TestRuntimeNodeInstances:
+    @pytest.mark.asyncio
+    async def test_store_and_fan_in_share_runtime_backpressure(self, runtime_config):
+        seen = []
+
+        class BackpressureNode(MockTestNode):
+            async def execute(self):
+                seen.append((self.store._backpressure, self.fan_in._backpressure)) # type: ignore
+                return self.Outputs(message="ok")
+
+        runtime_config["nodes"] = [BackpressureNode]
+        with patch('exospherehost.runtime.Runtime._get_secrets', new_callable=AsyncMock) as mock_get_secrets, \
+             patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock):
+            mock_get_secrets.return_value = {"api_key": "test_key"}
+
+            runtime = Runtime(**runtime_config)
+            await runtime._put_state({"state_id": "state_1", "node_name": "BackpressureNode", "inputs": {"name": "a"}})
+
+            dispatcher = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+
+            assert seen == [(runtime._backpressure, runtime._backpressure)]
+
+    @pytest.mark.asyncio
+    async def test_worker_reuses_node_instance(self, runtime_config):
+        instances = []
+
+        class TrackedNode(MockTestNode):
+            async def setup(self):
+                instances.append(self)
+
+        runtime_config["nodes"] = [TrackedNode]
+        with patch('exospherehost.runtime.Runtime._get_secrets', new_callable=AsyncMock) as mock_get_secrets, \
+             patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed:
+            mock_get_secrets.return_value = {"api_key": "test_key"}
+
+            runtime = Runtime(**runtime_config)
+            for idx in range(3):
+                await runtime._put_state({"state_id": f"state_{idx}", "node_name": "TrackedNode", "inputs": {"name": str(idx)}})
+
+            worker_task = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            worker_task.cancel()
+            try:
+                await worker_task
+            except asyncio.CancelledError:
+                pass
+
+            assert mock_notify_executed.call_count == 3
+            assert len(instances) == 1
+
+    @pytest.mark.asyncio
+    async def test_pool_size_defaults_to_max_concurrency(self, runtime_config):
+        class LimitedNode(MockTestNode):
+            instances = 1
+
+        class BoundedNode(MockTestNode):
+            max_concurrency = 3
+
+        runtime_config["nodes"] = [MockTestNode, LimitedNode, BoundedNode]
+        runtime = Runtime(**runtime_config)
+
+        assert runtime._node_pools["MockTestNode"]._size is None
+        assert runtime._node_pools["LimitedNode"]._size == 1
+        assert runtime._node_pools["BoundedNode"]._size == 3
+
+    def test_invalid_instances(self, runtime_config):
+        class InvalidNode(MockTestNode):
+            instances = 0
+
+        runtime_config["nodes"] = [InvalidNode]
+        with pytest.raises(ValueError, match="InvalidNode.instances must be a positive integer"):
+            Runtime(**runtime_config)
+
+    @pytest.mark.asyncio
+    async def test_start_tears_down_instances(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._register', new_callable=AsyncMock), \
+             patch('exospherehost.runtime.Runtime._enqueue', new_callable=AsyncMock), \
+             patch('exospherehost.runtime.Runtime._dispatch_all', new_callable=AsyncMock), \
+             patch('exospherehost.runtime.NodePool.close', new_callable=AsyncMock) as mock_close:
+            runtime = Runtime(**runtime_config)
+            await runtime._start()
+
+            mock_close.assert_called_once()
+
+
+class TestRuntimeConcurrency:
+    def test_limits_default_to_workers(self, runtime_config):
+        class BoundedNode(MockTestNode):
+            min_concurrency = 2
+            max_concurrency = 4
+
+        runtime_config["nodes"] = [MockTestNode, BoundedNode]
+        runtime = Runtime(**runtime_config)
+        metrics = runtime.concurrency_metrics()
+
+        assert metrics["MockTestNode"]["limit"] == runtime_config["workers"]
+        assert metrics["MockTestNode"]["min_limit"] == 1
+        assert metrics["MockTestNode"]["max_limit"] is None
+        assert metrics["BoundedNode"]["limit"] == 4
+        assert metrics["BoundedNode"]["min_limit"] == 2
+        assert metrics["BoundedNode"]["max_limit"] == 4
+        assert runtime._node_pools["BoundedNode"]._size == 4
+
+    @pytest.mark.asyncio
+    async def test_node_at_its_limit_does_not_hold_back_other_nodes(self, runtime_config):
+        class SerialNode(MockSlowNode):
+            max_concurrency = 1
+
+        runtime_config["nodes"] = [SerialNode, MockTestNode]
+        with patch('exospherehost.runtime.Runtime._get_secrets', new_callable=AsyncMock) as mock_get_secrets, \
+             patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed, \
+             patch.object(SerialNode, "delay", 5):
+            mock_get_secrets.return_value = {"api_key": "test_key"}
+
+            runtime = Runtime(**runtime_config)
+            for idx in range(3):
+                await runtime._put_state({"state_id": f"serial_{idx}", "node_name": "SerialNode", "inputs": {"name": str(idx)}})
+            await runtime._put_state({"state_id": "other", "node_name": "MockTestNode", "inputs": {"name": "a"}})
+
+            dispatcher = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            dispatcher.cancel()
+            executions = list(runtime._executions)
+            for execution in executions:
+                execution.cancel()
+            await asyncio.gather(dispatcher, *executions, return_exceptions=True)
+
+            assert [call.args[0] for call in mock_notify_executed.call_args_list] == ["other"]
+            assert runtime._executing == {"serial_0"}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_not_bounded_by_workers(self, runtime_config):
+        class WideNode(MockSlowNode):
+            max_concurrency = 50
+
+        runtime_config["nodes"] = [WideNode]
+        runtime_config["workers"] = 2
+        with patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed:
+            runtime = Runtime(**runtime_config)
+            for idx in range(50):
+                await runtime._put_state({"state_id": f"state_{idx}", "node_name": "WideNode", "inputs": {"name": str(idx)}})
+
+            dispatcher = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            assert runtime.concurrency_metrics()["WideNode"]["in_flight"] == 50
+
+            await asyncio.sleep(0.3)
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+
+            assert mock_notify_executed.call_count == 50
+
+    @pytest.mark.asyncio
+    async def test_unregistered_node_is_errored(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._notify_errored', new_callable=AsyncMock) as mock_notify_errored:
+            runtime = Runtime(**runtime_config)
+            runtime._unstarted.add("state_1")
+            await runtime._put_state({"state_id": "state_1", "node_name": "OtherNode", "inputs": {}})
+            await asyncio.gather(*runtime._executions)
+
+            mock_notify_errored.assert_called_once_with("state_1", "Node OtherNode is not registered with this runtime")
+            assert runtime._unstarted == set()
+
+    def test_invalid_concurrency(self, runtime_config):
+        class InvalidMinNode(MockTestNode):
+            min_concurrency = 0
+
+        class InvalidMaxNode(MockTestNode):
+            min_concurrency = 3
+            max_concurrency = 2
+
+        runtime_config["nodes"] = [InvalidMinNode, InvalidMaxNode]
+        with pytest.raises(ValueError) as exc_info:
+            Runtime(**runtime_config)
+
+        assert "InvalidMinNode.min_concurrency must be a positive integer" in str(exc_info.value)
+        assert "InvalidMaxNode.max_concurrency must be None or an integer of at least min_concurrency" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_errors_decrease_limit(self, runtime_config):
+        runtime_config["nodes"] = [MockTestNodeWithError]
+        runtime_config["workers"] = 4
+        with patch('exospherehost.runtime.Runtime._get_secrets', new_callable=AsyncMock) as mock_get_secrets, \
+             patch('exospherehost.runtime.Runtime._notify_errored', new_callable=AsyncMock) as mock_notify_errored:
+            mock_get_secrets.return_value = {"api_key": "test_key"}
+
+            runtime = Runtime(**runtime_config)
+            await runtime._put_state({"state_id": "state_1", "node_name": "MockTestNodeWithError", "inputs": {"should_fail": "true"}})
+
+            worker_task = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            worker_task.cancel()
+            try:
+                await worker_task
+            except asyncio.CancelledError:
+                pass
+
+            mock_notify_errored.assert_called_once()
+            metrics = runtime.concurrency_metrics()["MockTestNodeWithError"]
+            assert metrics["limit"] == 2
+            assert metrics["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_setup_failure_keeps_limit(self, runtime_config):
+        class BrokenSetupNode(MockTestNode):
+            async def setup(self):
+                raise RuntimeError("setup failed")
+
+        runtime_config["nodes"] = [BrokenSetupNode]
+        runtime_config["workers"] = 4
+        with patch('exospherehost.runtime.Runtime._get_secrets', new_callable=AsyncMock) as mock_get_secrets, \
+             patch('exospherehost.runtime.Runtime._notify_errored', new_callable=AsyncMock) as mock_notify_errored:
+            mock_get_secrets.return_value = {"api_key": "test_key"}
+
+            runtime = Runtime(**runtime_config)
+            await runtime._put_state({"state_id": "state_1", "node_name": "BrokenSetupNode", "inputs": {"name": "a"}})
+
+            dispatcher = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+
+            mock_notify_errored.assert_called_once()
+            assert "setup failed" in mock_notify_errored.call_args.args[1]
+            metrics = runtime.concurrency_metrics()["BrokenSetupNode"]
+            assert metrics["limit"] == 4
+            assert metrics["in_flight"] == 0
+            assert metrics["average_latency"] is None
+
+    @pytest.mark.asyncio
+    async def test_setup_time_is_not_sampled(self, runtime_config):
+        class SlowSetupNode(MockTestNode):
+            async def setup(self):
+                await asyncio.sleep(0.2)
+
+        runtime_config["nodes"] = [SlowSetupNode]
+        with patch('exospherehost.runtime.Runtime._get_secrets', new_callable=AsyncMock) as mock_get_secrets, \
+             patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed:
+            mock_get_secrets.return_value = {"api_key": "test_key"}
+
+            runtime = Runtime(**runtime_config)
+            await runtime._put_state({"state_id": "state_1", "node_name": "SlowSetupNode", "inputs": {"name": "a"}})
+
+            dispatcher = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.3)
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+
+            mock_notify_executed.assert_called_once()
+            assert runtime.concurrency_metrics()["SlowSetupNode"]["average_latency"] < 0.1
+
+
+class MockBatchNode(BaseNode):
+    max_batch_size = 3
+    max_batch_wait = 0.05
+    batches: list = []
+
+    class Inputs(BaseModel):
+        name: str
+
+    class Outputs(BaseModel):
+        message: str
+
+    async def execute(self):
+        return (await self.execute_batch([self.inputs]))[0] # type: ignore
+
+    async def execute_batch(self, inputs):
+        MockBatchNode.batches.append([item.name for item in inputs])
+        results = []
+        for item in inputs:
+            if item.name == "fail":
+                results.append(ValueError("item failed"))
+            elif item.name == "prune":
+                results.append(PruneSignal({"reason": "pruned"}))
+            else:
+                results.append(self.Outputs(message=f"Hello {item.name}"))
+        return results
+
+
+class TestRuntimeBatchExecution:
+    @pytest.fixture(autouse=True)
+    def reset_batches(self):
+        MockBatchNode.batches = []
+
+    async def run_dispatcher(self, runtime, states):
+        for state in states:
+            await runtime._put_state(state)
+        dispatcher = asyncio.create_task(runtime._dispatch_all())
+        await asyncio.sleep(0.2)
+        dispatcher.cancel()
+        try:
+            await dispatcher
+        except asyncio.CancelledError:
+            pass
+
+    @pytest.mark.asyncio
+    async def test_states_are_grouped_into_batches(self, runtime_config):
+        runtime_config["nodes"] = [MockBatchNode]
+        with patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed:
+            runtime = Runtime(**runtime_config)
+            states = [{"state_id": f"s{idx}", "node_name": "MockBatchNode", "graph_name": "g1", "inputs": {"name": str(idx)}} for idx in range(4)]
+
+            await self.run_dispatcher(runtime, states)
+
+            assert sorted(len(batch) for batch in MockBatchNode.batches) == [1, 3]
+            assert mock_notify_executed.call_count == 4
+            outputs = {call.args[0]: call.args[1][0].message for call in mock_notify_executed.call_args_list}
+            assert outputs == {f"s{idx}": f"Hello {idx}" for idx in range(4)}
+            assert runtime._node_queues["MockBatchNode"]._unfinished_tasks == 0 # type: ignore
+
+    @pytest.mark.asyncio
+    async def test_batches_are_split_per_graph(self, runtime_config):
+        runtime_config["nodes"] = [MockBatchNode]
+        with patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock):
+            runtime = Runtime(**runtime_config)
+            states = [
+                {"state_id": "s1", "node_name": "MockBatchNode", "graph_name": "g1", "inputs": {"name": "a"}},
+                {"state_id": "s2", "node_name": "MockBatchNode", "graph_name": "g2", "inputs": {"name": "b"}},
+            ]
+
+            await self.run_dispatcher(runtime, states)
+
+            assert sorted(MockBatchNode.batches) == [["a"], ["b"]]
+
+    @pytest.mark.asyncio
+    async def test_per_item_errors_and_signals(self, runtime_config):
+        runtime_config["nodes"] = [MockBatchNode]
+        with patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed, \
+             patch('exospherehost.runtime.Runtime._notify_errored', new_callable=AsyncMock) as mock_notify_errored, \
+             patch('exospherehost.signals.PruneSignal.send', new_callable=AsyncMock) as mock_prune_send:
+            runtime = Runtime(**runtime_config)
+            states = [
+                {"state_id": "ok", "node_name": "MockBatchNode", "graph_name": "g1", "inputs": {"name": "a"}},
+                {"state_id": "failed", "node_name": "MockBatchNode", "graph_name": "g1", "inputs": {"name": "fail"}},
+                {"state_id": "pruned", "node_name": "MockBatchNode", "graph_name": "g1", "inputs": {"name": "prune"}},
+            ]
+
+            await self.run_dispatcher(runtime, states)
+
+            mock_notify_executed.assert_called_once()
+            assert mock_notify_executed.call_args.args[0] == "ok"
+            mock_notify_errored.assert_called_once_with("failed", "item failed")
+            mock_prune_send.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_invalid_inputs_error_only_their_state(self, runtime_config):
+        runtime_config["nodes"] = [MockBatchNode]
+        with patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed, \
+             patch('exospherehost.runtime.Runtime._notify_errored', new_callable=AsyncMock) as mock_notify_errored:
+            runtime = Runtime(**runtime_config)
+            states = [
+                {"state_id": "ok", "node_name": "MockBatchNode", "graph_name": "g1", "inputs": {"name": "a"}},
+                {"state_id": "invalid", "node_name": "MockBatchNode", "graph_name": "g1", "inputs": {}},
+            ]
+
+            await self.run_dispatcher(runtime, states)
+
+            assert MockBatchNode.batches == [["a"]]
+            mock_notify_executed.assert_called_once()
+            mock_notify_errored.assert_called_once()
+            assert mock_notify_errored.call_args.args[0] == "invalid"
+
+    @pytest.mark.asyncio
+    async def test_wrong_result_count_errors_whole_batch(self, runtime_config):
+        class ShortBatchNode(MockBatchNode):
+            async def execute_batch(self, inputs):
+                return []
+
+        runtime_config["nodes"] = [ShortBatchNode]
+        with patch('exospherehost.runtime.Runtime._notify_errored', new_callable=AsyncMock) as mock_notify_errored:
+            runtime = Runtime(**runtime_config)
+            states = [{"state_id": f"s{idx}", "node_name": "ShortBatchNode", "graph_name": "g1", "inputs": {"name": str(idx)}} for idx in range(2)]
+
+            await self.run_dispatcher(runtime, states)
+
+            assert mock_notify_errored.call_count == 2
+            assert "returned 0 results for 2 inputs" in mock_notify_errored.call_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_other_nodes_are_queued_directly(self, runtime_config):
+        runtime_config["nodes"] = [MockTestNode, MockBatchNode]
+        runtime = Runtime(**runtime_config)
+        state = {"state_id": "s1", "node_name": "MockTestNode", "graph_name": "g1", "inputs": {"name": "a"}}
+
+        await runtime._put_state(state)
+
+        assert runtime._node_queues["MockTestNode"].get_nowait() is state
+        assert runtime._pending_batches == {}
+
+    def test_supports_batch(self, runtime_config):
+        runtime_config["nodes"] = [MockTestNode, MockBatchNode]
+        runtime = Runtime(**runtime_config)
+
+        assert runtime._supports_batch(MockBatchNode) is True
+        assert runtime._supports_batch(MockTestNode) is False
+
+    def test_invalid_max_batch_size(self, runtime_config):
+        class InvalidBatchNode(MockBatchNode):
+            max_batch_size = 0
+
+        runtime_config["nodes"] = [InvalidBatchNode]
+        with pytest.raises(ValueError, match="InvalidBatchNode.max_batch_size must be at least 1"):
+            Runtime(**runtime_config)
+
+
 class TestRuntimeNotification:
+    @pytest.mark.asyncio
+    async def test_notify_executed_retries_when_shed(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class, \
+             patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            type(mock_post_response).status = PropertyMock(side_effect=[503, 200, 200])
+            mock_post_response.headers = {"Retry-After": "1"}
+            mock_post_response.json = AsyncMock(return_value={"status": "success"})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            await runtime._notify_executed("test_state_1", [MockTestNode.Outputs(message="test output")]) # type: ignore
+
+            assert mock_session.post.call_count == 2
+            mock_sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_enqueue_call_is_not_retried_when_shed(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 429
+            mock_post_response.headers = {"Retry-After": "3"}
+            mock_post_response.json = AsyncMock(return_value={"detail": "overloaded"})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            with pytest.raises(RuntimeError, match="Failed to enqueue states"):
+                await runtime._enqueue_call()
+
+            mock_session.post.assert_called_once()
+            assert runtime._backpressure._paused_until > 0
+
     @pytest.mark.asyncio
     async def test_notify_executed_success(self, runtime_config):
         with patch('exospherehost.runtime.ClientSession') as mock_session_class:
@@ -460,6 +1046,39 @@ class TestRuntimeNotification:
             # Should not raise exception, just log error
             await runtime._notify_executed("test_state_1", outputs) # type: ignore
 
+    @pytest.mark.asyncio
+    async def test_append_outputs_success(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 200
+            mock_post_response.json = AsyncMock(return_value={"status": "QUEUED", "count": 1})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            await runtime._append_outputs("test_state_1", [MockTestNode.Outputs(message="test output")]) # type: ignore
+
+            mock_session.post.assert_called_once()
+            assert mock_session.post.call_args[0][0] == runtime._get_append_outputs_endpoint("test_state_1")
+            assert mock_session.post.call_args[1]["json"] == {"outputs": [{"message": "test output"}], "offset": 0}
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_failure(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 400
+            mock_post_response.json = AsyncMock(return_value={"detail": "State is not queued"})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+
+            # Unlike the executed notification this raises, so the node stops producing
+            with pytest.raises(RuntimeError, match="Failed to append outputs"):
+                await runtime._append_outputs("test_state_1", [MockTestNode.Outputs(message="test output")]) # type: ignore
+
     @pytest.mark.asyncio
     async def test_notify_errored_success(self, runtime_config):
         with patch('exospherehost.runtime.ClientSession') as mock_session_class:
@@ -497,6 +1116,93 @@ class TestRuntimeNotification:
             await runtime._notify_errored("test_state_1", "Test error message")
 
 
+class TestRuntimeOutbox:
+    @pytest.mark.asyncio
+    async def test_failed_notification_stays_in_outbox(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 500
+            mock_post_response.json = AsyncMock(return_value={"error": "Internal server error"})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            await runtime._notify_executed("test_state_1", [MockTestNode.Outputs(message="test output")]) # type: ignore
+
+            assert len(runtime._outbox) == 1
+            entry = runtime._outbox.take(10)[0]
+            assert entry["state_id"] == "test_state_1"
+            assert entry["body"] == {"outputs": [{"message": "test output"}]}
+
+    @pytest.mark.asyncio
+    async def test_rejected_notification_is_dropped(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 400
+            mock_post_response.json = AsyncMock(return_value={"detail": "State is not queued"})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            await runtime._notify_errored("test_state_1", "Test error message")
+
+            assert len(runtime._outbox) == 0
+
+    @pytest.mark.asyncio
+    async def test_network_error_stays_in_outbox(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession', side_effect=ConnectionError("down")):
+            runtime = Runtime(**runtime_config)
+            await runtime._notify_errored("test_state_1", "Test error message")
+
+            assert len(runtime._outbox) == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_delivers_journaled_notifications(self, runtime_config, tmp_path):
+        runtime_config["outbox_path"] = str(tmp_path / "outbox.jsonl")
+
+        with patch('exospherehost.runtime.Runtime._deliver', new_callable=AsyncMock) as mock_deliver:
+            mock_deliver.return_value = False
+            runtime = Runtime(**runtime_config)
+            await runtime._notify_executed("test_state_1", [MockTestNode.Outputs(message="test output")]) # type: ignore
+            await runtime._notify_errored("test_state_2", "Test error message")
+
+        # a new runtime picks the notifications up from the journal
+        runtime = Runtime(**runtime_config)
+        with patch('exospherehost.runtime.Runtime._deliver', new_callable=AsyncMock) as mock_deliver:
+            mock_deliver.return_value = True
+
+            flush_task = asyncio.create_task(runtime._flush_outbox())
+            await asyncio.sleep(0.05)
+            flush_task.cancel()
+            try:
+                await flush_task
+            except asyncio.CancelledError:
+                pass
+
+            delivered = [call.args[0] for call in mock_deliver.call_args_list]
+            assert [(entry["kind"], entry["state_id"]) for entry in delivered] == [("executed", "test_state_1"), ("errored", "test_state_2")]
+            assert len(runtime._outbox) == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_backs_off_while_delivery_fails(self, runtime_config):
+        runtime = Runtime(**runtime_config)
+        entry = await runtime._outbox.put("errored", "test_state_1", {"error": "boom"})
+        runtime._outbox.release(entry)
+
+        with patch('exospherehost.runtime.Runtime._deliver', new_callable=AsyncMock) as mock_deliver, \
+             patch('exospherehost.runtime.sleep', new_callable=AsyncMock) as mock_sleep:
+            mock_deliver.return_value = False
+            mock_sleep.side_effect = [None, None, None, asyncio.CancelledError()]
+
+            with pytest.raises(asyncio.CancelledError):
+                await runtime._flush_outbox()
+
+            assert [call.args[0] for call in mock_sleep.await_args_list] == [0, 1, 2, 4]
+            assert len(runtime._outbox) == 1
+
+
 class TestRuntimeSecrets:
     @pytest.mark.asyncio
     async def test_get_secrets_success(self, runtime_config):
@@ -530,16 +1236,211 @@ class TestRuntimeSecrets:
             assert result == {}
 
 
+class TestRuntimeSecretsCache:
+    @pytest.mark.asyncio
+    async def test_secrets_cached_per_graph(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._fetch_secrets', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = {"api_key": "secret_key"}
+
+            runtime = Runtime(**runtime_config)
+            first = await runtime._get_state_secrets({"state_id": "1", "graph_name": "g1"})
+            second = await runtime._get_state_secrets({"state_id": "2", "graph_name": "g1"})
+            await runtime._get_state_secrets({"state_id": "3", "graph_name": "g2"})
+
+            assert first == second == {"api_key": "secret_key"}
+            assert [call.args[0] for call in mock_fetch.call_args_list] == ["1", "3"]
+
+    @pytest.mark.asyncio
+    async def test_secrets_refetched_after_ttl(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._fetch_secrets', new_callable=AsyncMock) as mock_fetch, \
+             patch('exospherehost.runtime.time.monotonic') as mock_monotonic:
+            mock_fetch.return_value = {"api_key": "secret_key"}
+            mock_monotonic.return_value = 1000
+
+            runtime = Runtime(**runtime_config, secrets_ttl=10)
+            await runtime._get_state_secrets({"state_id": "1", "graph_name": "g1"})
+            mock_monotonic.return_value = 1011
+            await runtime._get_state_secrets({"state_id": "2", "graph_name": "g1"})
+
+            assert mock_fetch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_fetch_not_cached(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._fetch_secrets', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch.return_value = None
+
+            runtime = Runtime(**runtime_config)
+            assert await runtime._get_state_secrets({"state_id": "1", "graph_name": "g1"}) == {}
+            assert await runtime._get_state_secrets({"state_id": "2", "graph_name": "g1"}) == {}
+
+            assert mock_fetch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_bypassed_without_graph_name_or_ttl(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._get_secrets', new_callable=AsyncMock) as mock_get_secrets:
+            mock_get_secrets.return_value = {"api_key": "secret_key"}
+
+            runtime = Runtime(**runtime_config)
+            await runtime._get_state_secrets({"state_id": "1"})
+            runtime = Runtime(**runtime_config, secrets_ttl=0)
+            await runtime._get_state_secrets({"state_id": "2", "graph_name": "g1"})
+
+            assert [call.args[0] for call in mock_get_secrets.call_args_list] == ["1", "2"]
+            assert runtime._secrets_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_prefetch_one_request_per_batch(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._fetch_bulk_secrets', new_callable=AsyncMock) as mock_fetch_bulk, \
+             patch('exospherehost.runtime.Runtime._fetch_secrets', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch_bulk.return_value = {"g1": {"api_key": "k1"}, "g2": {"api_key": "k2"}}
+
+            runtime = Runtime(**runtime_config)
+            runtime._prefetch_secrets([
+                {"state_id": "1", "node_name": "MockTestNode", "graph_name": "g1"},
+                {"state_id": "2", "node_name": "MockTestNode", "graph_name": "g1"},
+                {"state_id": "3", "node_name": "MockTestNode", "graph_name": "g2"},
+            ])
+
+            assert await runtime._get_state_secrets({"state_id": "1", "graph_name": "g1"}) == {"api_key": "k1"}
+            assert await runtime._get_state_secrets({"state_id": "3", "graph_name": "g2"}) == {"api_key": "k2"}
+
+            mock_fetch_bulk.assert_called_once_with(["g1", "g2"])
+            mock_fetch.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_enqueue_requests_inline_secrets(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 200
+            mock_post_response.json = AsyncMock(return_value={"states": []})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            await runtime._enqueue_call()
+
+            assert mock_session.post.call_args[1]["json"]["include_secrets"] is True
+
+    @pytest.mark.asyncio
+    async def test_inline_secrets_skip_fetch(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._enqueue_call', new_callable=AsyncMock) as mock_enqueue_call, \
+             patch('exospherehost.runtime.Runtime._fetch_bulk_secrets', new_callable=AsyncMock) as mock_fetch_bulk, \
+             patch('exospherehost.runtime.Runtime._fetch_secrets', new_callable=AsyncMock) as mock_fetch, \
+             patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed:
+            mock_enqueue_call.return_value = {
+                "states": [
+                    {"state_id": "1", "node_name": "MockTestNode", "graph_name": "g1", "inputs": {"name": "a"}},
+                    {"state_id": "2", "node_name": "MockTestNode", "graph_name": "g2", "inputs": {"name": "b"}}
+                ],
+                "secrets": {"g1": {"api_key": "k1"}}
+            }
+            mock_fetch_bulk.return_value = {"g2": {"api_key": "k2"}}
+
+            runtime = Runtime(**runtime_config)
+            enqueue_task = asyncio.create_task(runtime._enqueue())
+            worker_task = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            for task in (enqueue_task, worker_task):
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+            # only the graph without inline secrets is fetched
+            mock_fetch_bulk.assert_called_once_with(["g2"])
+            mock_fetch.assert_not_called()
+            assert mock_notify_executed.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_prefetch_miss_falls_back_to_state(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._fetch_bulk_secrets', new_callable=AsyncMock) as mock_fetch_bulk, \
+             patch('exospherehost.runtime.Runtime._fetch_secrets', new_callable=AsyncMock) as mock_fetch:
+            mock_fetch_bulk.return_value = {}
+            mock_fetch.return_value = {"api_key": "k1"}
+
+            runtime = Runtime(**runtime_config)
+            runtime._prefetch_secrets([{"state_id": "1", "node_name": "MockTestNode", "graph_name": "g1"}])
+
+            assert await runtime._get_state_secrets({"state_id": "1", "graph_name": "g1"}) == {"api_key": "k1"}
+            mock_fetch.assert_called_once_with("1")
+
+    @pytest.mark.asyncio
+    async def test_fetch_bulk_secrets(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 200
+            mock_post_response.json = AsyncMock(return_value={"graphs": {"g1": {"api_key": "k1"}}, "states": {}})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            result = await runtime._fetch_bulk_secrets(["g1", "g2"])
+
+            assert result == {"g1": {"api_key": "k1"}}
+            call_args = mock_session.post.call_args
+            assert call_args[0][0] == "http://localhost:8080/v1/namespace/test_namespace/secrets"
+            assert call_args[1]["json"] == {"graph_names": ["g1", "g2"]}
+
+    @pytest.mark.asyncio
+    async def test_auth_error_clears_cache(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_get_response.status = 401
+            mock_get_response.json = AsyncMock(return_value={"detail": "Invalid API key"})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            runtime._secrets_cache[("test_namespace", "g1")] = (float("inf"), {"api_key": "old"})
+
+            assert await runtime._get_secrets("test_state_1") == {}
+            assert runtime._secrets_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_worker_error_invalidates_graph_secrets(self, runtime_config):
+        runtime_config["nodes"] = [MockTestNodeWithError]
+        with patch('exospherehost.runtime.Runtime._fetch_secrets', new_callable=AsyncMock) as mock_fetch, \
+             patch('exospherehost.runtime.Runtime._notify_errored', new_callable=AsyncMock) as mock_notify_errored:
+            mock_fetch.return_value = {"api_key": "rotated"}
+
+            runtime = Runtime(**runtime_config)
+            await runtime._put_state({
+                "state_id": "test_state_1",
+                "node_name": "MockTestNodeWithError",
+                "graph_name": "g1",
+                "inputs": {"should_fail": "true"}
+            })
+
+            worker_task = asyncio.create_task(runtime._dispatch_all())
+            await asyncio.sleep(0.1)
+            worker_task.cancel()
+            try:
+                await worker_task
+            except asyncio.CancelledError:
+                pass
+
+            mock_notify_errored.assert_called_once()
+            assert ("test_namespace", "g1") not in runtime._secrets_cache
+
+    def test_negative_secrets_ttl(self, runtime_config):
+        with pytest.raises(ValueError, match="Secrets TTL should be at least 0"):
+            Runtime(**runtime_config, secrets_ttl=-1)
+
+
 class TestRuntimeStart:
     @pytest.mark.asyncio
     async def test_start_with_existing_loop(self, runtime_config):
         with patch('exospherehost.runtime.Runtime._register') as mock_register, \
              patch('exospherehost.runtime.Runtime._enqueue') as mock_enqueue, \
-             patch('exospherehost.runtime.Runtime._worker') as mock_worker:
+             patch('exospherehost.runtime.Runtime._dispatch_all') as mock_dispatch_all:
             
             mock_register.return_value = None
             mock_enqueue.return_value = None
-            mock_worker.return_value = None
+            mock_dispatch_all.return_value = None
             
             runtime = Runtime(**runtime_config)
             
@@ -558,11 +1459,11 @@ class TestRuntimeStart:
     def test_start_without_loop(self, runtime_config):
         with patch('exospherehost.runtime.Runtime._register') as mock_register, \
              patch('exospherehost.runtime.Runtime._enqueue') as mock_enqueue, \
-             patch('exospherehost.runtime.Runtime._worker') as mock_worker:
+             patch('exospherehost.runtime.Runtime._dispatch_all') as mock_dispatch_all:
             
             mock_register.return_value = None
             mock_enqueue.return_value = None
-            mock_worker.return_value = None
+            mock_dispatch_all.return_value = None
             
             Runtime(**runtime_config)
             
@@ -571,6 +1472,167 @@ class TestRuntimeStart:
             # but we're mocking the async methods to avoid that
 
 
+class MockSlowNode(BaseNode):
+    delay = 0.2
+
+    class Inputs(BaseModel):
+        name: str
+
+    class Outputs(BaseModel):
+        message: str
+
+    class Secrets(BaseModel):
+        pass
+
+    async def execute(self):
+        await asyncio.sleep(self.delay)
+        return self.Outputs(message=f"done {self.inputs.name}") # type: ignore
+
+
+def slow_states(count):
+    return {"states": [{"state_id": f"state_{idx}", "node_name": "MockSlowNode", "inputs": {"name": str(idx)}} for idx in range(count)]}
+
+
+class TestRuntimeShutdown:
+    @pytest.mark.asyncio
+    async def test_stop_finishes_executing_and_releases_unstarted_states(self, runtime_config):
+        runtime_config["nodes"] = [MockSlowNode]
+        runtime_config["workers"] = 1
+        with patch('exospherehost.runtime.Runtime._register', new_callable=AsyncMock), \
+             patch('exospherehost.runtime.Runtime._enqueue_call', new_callable=AsyncMock) as mock_enqueue_call, \
+             patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed, \
+             patch('exospherehost.runtime.Runtime._release_states', new_callable=AsyncMock) as mock_release_states:
+            mock_enqueue_call.side_effect = [slow_states(3)] + [{"states": []}] * 10
+
+            runtime = Runtime(**runtime_config)
+            task = asyncio.create_task(runtime._start())
+            await asyncio.sleep(0.05)
+            runtime.stop()
+            await asyncio.wait_for(task, timeout=2)
+
+            mock_notify_executed.assert_called_once()
+            assert mock_notify_executed.call_args.args[0] == "state_0"
+            mock_release_states.assert_awaited_once()
+            assert sorted(mock_release_states.call_args.args[0]) == ["state_1", "state_2"]
+
+    @pytest.mark.asyncio
+    async def test_states_cut_off_by_timeout_are_released(self, runtime_config):
+        runtime_config["nodes"] = [MockSlowNode]
+        runtime_config["workers"] = 1
+        runtime_config["shutdown_timeout"] = 0.05
+        with patch('exospherehost.runtime.Runtime._register', new_callable=AsyncMock), \
+             patch('exospherehost.runtime.Runtime._enqueue_call', new_callable=AsyncMock) as mock_enqueue_call, \
+             patch('exospherehost.runtime.Runtime._notify_executed', new_callable=AsyncMock) as mock_notify_executed, \
+             patch('exospherehost.runtime.Runtime._release_states', new_callable=AsyncMock) as mock_release_states, \
+             patch.object(MockSlowNode, "delay", 5):
+            mock_enqueue_call.side_effect = [slow_states(1)] + [{"states": []}] * 10
+
+            runtime = Runtime(**runtime_config)
+            task = asyncio.create_task(runtime._start())
+            await asyncio.sleep(0.05)
+            runtime.stop()
+            await asyncio.wait_for(task, timeout=2)
+
+            mock_notify_executed.assert_not_called()
+            assert mock_release_states.call_args.args[0] == ["state_0"]
+
+    @pytest.mark.asyncio
+    async def test_sigterm_stops_runtime(self, runtime_config):
+        with patch('exospherehost.runtime.Runtime._register', new_callable=AsyncMock), \
+             patch('exospherehost.runtime.Runtime._enqueue_call', new_callable=AsyncMock) as mock_enqueue_call:
+            mock_enqueue_call.return_value = {"states": []}
+
+            runtime = Runtime(**runtime_config)
+            task = asyncio.create_task(runtime._start())
+            await asyncio.sleep(0.05)
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(task, timeout=2)
+
+            assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+    @pytest.mark.asyncio
+    async def test_stop_restores_previous_sigterm_handler(self, runtime_config):
+        def previous_handler(signum, frame):
+            pass
+
+        signal.signal(signal.SIGTERM, previous_handler)
+        try:
+            with patch('exospherehost.runtime.Runtime._register', new_callable=AsyncMock), \
+                 patch('exospherehost.runtime.Runtime._enqueue_call', new_callable=AsyncMock) as mock_enqueue_call:
+                mock_enqueue_call.return_value = {"states": []}
+
+                runtime = Runtime(**runtime_config)
+                task = asyncio.create_task(runtime._start())
+                await asyncio.sleep(0.05)
+                assert signal.getsignal(signal.SIGTERM) is not previous_handler
+
+                runtime.stop()
+                # restored before the drain, not only once the runtime exits
+                assert signal.getsignal(signal.SIGTERM) is previous_handler
+                await asyncio.wait_for(task, timeout=2)
+
+                assert signal.getsignal(signal.SIGTERM) is previous_handler
+        finally:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    @pytest.mark.asyncio
+    async def test_failed_runtime_restores_previous_sigterm_handler(self, runtime_config):
+        def previous_handler(signum, frame):
+            pass
+
+        signal.signal(signal.SIGTERM, previous_handler)
+        try:
+            with patch('exospherehost.runtime.Runtime._register', new_callable=AsyncMock), \
+                 patch('exospherehost.runtime.Runtime._enqueue', new_callable=AsyncMock) as mock_enqueue:
+                mock_enqueue.side_effect = RuntimeError("boom")
+
+                runtime = Runtime(**runtime_config)
+                with pytest.raises(RuntimeError, match="boom"):
+                    await runtime._start()
+
+                assert signal.getsignal(signal.SIGTERM) is previous_handler
+        finally:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    @pytest.mark.asyncio
+    async def test_drain_delivers_pending_notifications(self, runtime_config):
+        runtime = Runtime(**runtime_config)
+        for idx in range(3):
+            runtime._outbox.release(await runtime._outbox.put("errored", f"state_{idx}", {"error": "boom"}))
+
+        with patch('exospherehost.runtime.Runtime._deliver', new_callable=AsyncMock) as mock_deliver, \
+             patch('exospherehost.runtime.sleep', new_callable=AsyncMock) as mock_sleep:
+            mock_deliver.side_effect = [True, False, True, True]
+            await runtime._drain_outbox(time.monotonic() + 5)
+
+            assert mock_deliver.await_count == 4
+            mock_sleep.assert_awaited_once()
+            assert len(runtime._outbox) == 0
+
+    @pytest.mark.asyncio
+    async def test_release_states_in_chunks(self, runtime_config):
+        with patch('exospherehost.runtime.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 200
+            mock_post_response.json = AsyncMock(return_value={"count": 1000, "status": "CREATED"})
+
+            mock_session_class.return_value = mock_session
+
+            runtime = Runtime(**runtime_config)
+            await runtime._release_states([f"state_{idx}" for idx in range(1500)])
+
+            assert mock_session.post.call_count == 2
+            assert mock_session.post.call_args_list[0].args[0] == runtime._get_release_endpoint()
+            assert len(mock_session.post.call_args_list[0].kwargs["json"]["state_ids"]) == 1000
+            assert len(mock_session.post.call_args_list[1].kwargs["json"]["state_ids"]) == 500
+
+    def test_invalid_shutdown_timeout(self, runtime_config):
+        runtime_config["shutdown_timeout"] = -1
+        with pytest.raises(ValueError, match="Shutdown timeout should be at least 0"):
+            Runtime(**runtime_config)
+
+
 class TestLoggingSetup:
     def test_setup_default_logging_with_existing_handlers(self):
         # Test that it doesn't interfere with existing logging
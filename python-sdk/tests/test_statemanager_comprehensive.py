@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock, PropertyMock
 from exospherehost.statemanager import StateManager
 from exospherehost.models import GraphNodeModel
 
@@ -131,6 +131,27 @@ class TestStateManagerTrigger:
             
             assert result == {"status": "success"}
 
+    @pytest.mark.asyncio
+    async def test_trigger_and_wait(self, state_manager_config):
+        with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            response = {"status": "CREATED", "run_id": "run1", "run_status": "SUCCESS", "outputs": [{"identifier": "leaf", "outputs": {"answer": "42"}}]}
+            mock_post_response.status = 200
+            mock_post_response.json = AsyncMock(return_value=response)
+
+            mock_session_class.return_value = mock_session
+
+            sm = StateManager(**state_manager_config)
+            result = await sm.trigger("test_graph", inputs={"prompt": "hi"}, wait=True, wait_timeout=10)
+
+            assert result == response
+            body = mock_session.post.call_args.kwargs["json"]
+            assert body["wait"] is True
+            assert body["wait_timeout"] == 10
+            # the client timeout must outlast the server side wait
+            assert mock_session_class.call_args.kwargs["timeout"].total > 10
+
     @pytest.mark.asyncio
     async def test_trigger_failure(self, state_manager_config):
         with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class:
@@ -147,6 +168,25 @@ class TestStateManagerTrigger:
             with pytest.raises(Exception, match="Failed to trigger state: 400 Bad request"):
                 await sm.trigger("test_graph", inputs=state["inputs"])
 
+    @pytest.mark.asyncio
+    async def test_trigger_retries_when_shed(self, state_manager_config):
+        with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class, \
+             patch('exospherehost.backpressure.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            type(mock_post_response).status = PropertyMock(side_effect=[429, 200, 200])
+            mock_post_response.headers = {"Retry-After": "2"}
+            mock_post_response.json = AsyncMock(return_value={"status": "success"})
+
+            mock_session_class.return_value = mock_session
+
+            sm = StateManager(**state_manager_config)
+            result = await sm.trigger("test_graph", inputs={"key": "value"})
+
+            assert result == {"status": "success"}
+            assert mock_session.post.call_count == 2
+            assert mock_sleep.await_args.args[0] == pytest.approx(2, abs=0.1) # type: ignore
+
 
 class TestStateManagerGetGraph:
     @pytest.mark.asyncio
@@ -394,4 +434,166 @@ class TestStateManagerUpsertGraph:
                 polling_interval=2
             )
             
-            assert result["validation_status"] == "VALID" 
\ No newline at end of file
+            assert result["validation_status"] == "VALID" 
+
+class AsyncLines:
+    """Async iterator over raw SSE lines, like aiohttp's response.content."""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._lines)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+SSE_LINES = [
+    b": keep-alive\n",
+    b"\n",
+    b"event: state\n",
+    b'data: {"type": "state", "state_id": "s1", "status": "QUEUED"}\n',
+    b"\n",
+    b"event: run_completed\n",
+    b'data: {"type": "run_completed", "run_id": "run1", "status": "SUCCESS"}\n',
+    b"\n",
+]
+
+
+class TestStateManagerTriggerMany:
+    def test_get_bulk_trigger_endpoint(self, state_manager_config):
+        sm = StateManager(**state_manager_config)
+        assert sm._get_bulk_trigger_endpoint("g") == "http://localhost:8080/v1/namespace/test_namespace/graph/g/trigger/bulk"
+
+    @pytest.mark.asyncio
+    async def test_trigger_many_batches_requests(self, state_manager_config):
+        with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 200
+            mock_post_response.json = AsyncMock(side_effect=[
+                {"status": "CREATED", "run_ids": ["r0", "r1"]},
+                {"status": "CREATED", "run_ids": ["r2"]},
+            ])
+
+            mock_session_class.return_value = mock_session
+
+            sm = StateManager(**state_manager_config)
+            triggers = [{"inputs": {"i": "0"}}, {"store": {"k": "v"}, "start_delay": 5}, {}]
+            run_ids = await sm.trigger_many("g", triggers, batch_size=2)
+
+            assert run_ids == ["r0", "r1", "r2"]
+            assert mock_session.post.call_count == 2
+            first_body = mock_session.post.call_args_list[0].kwargs["json"]
+            assert first_body["triggers"] == [
+                {"inputs": {"i": "0"}, "store": {}, "start_delay": 0},
+                {"inputs": {}, "store": {"k": "v"}, "start_delay": 5},
+            ]
+
+    @pytest.mark.asyncio
+    async def test_trigger_many_failure(self, state_manager_config):
+        with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_post_response.status = 400
+            mock_post_response.text = AsyncMock(return_value="Invalid trigger at index 0")
+
+            mock_session_class.return_value = mock_session
+
+            sm = StateManager(**state_manager_config)
+            with pytest.raises(Exception, match="Failed to trigger runs: 400"):
+                await sm.trigger_many("g", [{}])
+
+    @pytest.mark.asyncio
+    async def test_trigger_many_invalid_batch_size(self, state_manager_config):
+        sm = StateManager(**state_manager_config)
+        with pytest.raises(ValueError):
+            await sm.trigger_many("g", [{}], batch_size=0)
+
+
+class TestStateManagerWatchRun:
+    def test_get_events_endpoint(self, state_manager_config):
+        sm = StateManager(**state_manager_config)
+        assert sm._get_events_endpoint() == "http://localhost:8080/v1/namespace/test_namespace/events"
+
+    @pytest.mark.asyncio
+    async def test_watch_run_yields_events(self, state_manager_config):
+        with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_get_response.status = 200
+            mock_get_response.content = AsyncLines(SSE_LINES)
+
+            mock_session_class.return_value = mock_session
+
+            sm = StateManager(**state_manager_config)
+            events = [event async for event in sm.watch_run("run1")]
+
+            assert events == [
+                {"type": "state", "state_id": "s1", "status": "QUEUED"},
+                {"type": "run_completed", "run_id": "run1", "status": "SUCCESS"},
+            ]
+            assert mock_session.get.call_args.kwargs["params"] == {"run_id": "run1"}
+
+    @pytest.mark.asyncio
+    async def test_watch_run_failure(self, state_manager_config):
+        with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_get_response.status = 401
+            mock_get_response.text = AsyncMock(return_value="Invalid API key")
+
+            mock_session_class.return_value = mock_session
+
+            sm = StateManager(**state_manager_config)
+            with pytest.raises(Exception, match="Failed to watch run: 401 Invalid API key"):
+                async for _ in sm.watch_run("run1"):
+                    pass
+
+    @pytest.mark.asyncio
+    async def test_wait_for_run_returns_completion(self, state_manager_config):
+        with patch('exospherehost.statemanager.aiohttp.ClientSession') as mock_session_class:
+            mock_session, mock_post_response, mock_get_response, mock_put_response = create_mock_aiohttp_session()
+
+            mock_get_response.status = 200
+            mock_get_response.content = AsyncLines(SSE_LINES)
+
+            mock_session_class.return_value = mock_session
+
+            sm = StateManager(**state_manager_config)
+            result = await sm.wait_for_run("run1", timeout=5)
+
+            assert result["status"] == "SUCCESS"
+
+    @pytest.mark.asyncio
+    async def test_wait_for_run_reconnects_after_interrupted_stream(self, state_manager_config):
+        sm = StateManager(**state_manager_config)
+        calls = []
+
+        async def fake_watch_run(run_id):
+            calls.append(run_id)
+            if len(calls) == 1:
+                yield {"type": "state", "status": "QUEUED"}
+                return
+            yield {"type": "run_completed", "status": "FAILED"}
+
+        with patch.object(sm, "watch_run", fake_watch_run):
+            result = await sm.wait_for_run("run1", timeout=5, reconnect_interval=0)
+
+        assert result["status"] == "FAILED"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_wait_for_run_timeout(self, state_manager_config):
+        sm = StateManager(**state_manager_config)
+
+        async def fake_watch_run(run_id):
+            yield {"type": "state", "status": "QUEUED"}
+
+        with patch.object(sm, "watch_run", fake_watch_run):
+            with pytest.raises(TimeoutError):
+                await sm.wait_for_run("run1", timeout=0.05, reconnect_interval=0.01)
@@ -14,6 +14,10 @@ class Settings(BaseModel):
     secrets_encryption_key: str = Field(..., description="Key for encrypting secrets")
     trigger_workers: int = Field(default=1, description="Number of workers to run the trigger cron")
     trigger_retention_hours: int = Field(default=720, description="Number of hours to retain completed/failed triggers before cleanup")
+    event_bus_mode: str = Field(default="memory", description="Source of state events, 'memory' for in-process events or 'change_stream' to follow MongoDB when running several replicas")
+    max_in_flight_requests: int = Field(default=1000, description="Requests handled at once before new ones are shed with 429, 0 disables the check")
+    max_background_tasks: int = Field(default=1000, description="Background tasks running at once before new requests are shed with 503, 0 disables the check")
+    max_mongo_latency_ms: float = Field(default=1000, description="Average MongoDB command latency in milliseconds before new requests are shed with 503, 0 disables the check")
     
     @classmethod
     def from_env(cls) -> "Settings":
@@ -23,7 +27,11 @@ class Settings(BaseModel):
             state_manager_secret=os.getenv("STATE_MANAGER_SECRET"), # type: ignore
             secrets_encryption_key=os.getenv("SECRETS_ENCRYPTION_KEY"), # type: ignore
             trigger_workers=int(os.getenv("TRIGGER_WORKERS", 1)), # type: ignore
-            trigger_retention_hours=int(os.getenv("TRIGGER_RETENTION_HOURS", 720)) # type: ignore
+            trigger_retention_hours=int(os.getenv("TRIGGER_RETENTION_HOURS", 720)), # type: ignore
+            event_bus_mode=os.getenv("EVENT_BUS_MODE", "memory"), # type: ignore
+            max_in_flight_requests=int(os.getenv("MAX_IN_FLIGHT_REQUESTS", 1000)), # type: ignore
+            max_background_tasks=int(os.getenv("MAX_BACKGROUND_TASKS", 1000)), # type: ignore
+            max_mongo_latency_ms=float(os.getenv("MAX_MONGO_LATENCY_MS", 1000)) # type: ignore
         )
 
 
@@ -0,0 +1,117 @@
+from beanie import PydanticObjectId
+from app.models.executed_models import AppendOutputsRequestModel, AppendOutputsResponseModel
+
+from fastapi import HTTPException, status, BackgroundTasks
+
+from app.models.db.state import State
+from app.models.state_status_enum import StateStatusEnum
+from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
+from app.tasks.create_next_states import create_next_states
+from app.tasks.release_single_flight import release_single_flight_followers
+
+logger = LogsManager().get_logger()
+
+# Fields copied from a state onto the states created for its appended outputs
+APPEND_SOURCE_PROJECTION = {
+    "node_name": 1,
+    "namespace_name": 1,
+    "identifier": 1,
+    "graph_name": 1,
+    "run_id": 1,
+    "status": 1,
+    "inputs": 1,
+    "parents": 1,
+    "memoize_ttl": 1,
+    "single_flight_key": 1,
+    "appended_count": 1
+}
+
+
+async def append_outputs(namespace_name: str, state_id: PydanticObjectId, body: AppendOutputsRequestModel, x_exosphere_request_id: str, background_tasks: BackgroundTasks) -> AppendOutputsResponseModel:
+    """
+    Fan out a chunk of outputs of a state that is still executing.
+
+    Each output becomes an executed sibling of the state, exactly like the
+    extra outputs of /executed, and its next states are created right away, so
+    downstream nodes start before the node has finished producing. The state
+    itself stays queued until /executed is called with its own output, which
+    also keeps any unites waiting on the fan-out from firing early.
+
+    Chunks carry the offset of their first output and the state counts what
+    it has appended, so outputs already appended by an earlier run of the
+    state (a released state, or the errored state a retry was created for)
+    are skipped instead of being fanned out twice.
+    """
+    try:
+        logger.info(f"Appending {len(body.outputs)} outputs to state {state_id} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        records = await State.find_records([state_id], projection=APPEND_SOURCE_PROJECTION)
+        if len(records) == 0 or records[0].namespace_name != namespace_name:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
+
+        state = records[0]
+        if state.status != StateStatusEnum.QUEUED:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="State is not queued")
+
+        if body.offset > state.appended_count:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Outputs appended out of order, expected offset {state.appended_count}")
+
+        outputs = body.outputs[state.appended_count - body.offset:]
+        if len(outputs) == 0:
+            logger.info(f"Outputs of state {state_id} already appended up to offset {state.appended_count}", x_exosphere_request_id=x_exosphere_request_id)
+            return AppendOutputsResponseModel(status=StateStatusEnum.QUEUED, count=0)
+
+        # a streamed fan-out is neither memoized nor shared with single flight
+        # followers, /executed only sees its last output
+        updates: dict = {"appended_count": body.offset + len(body.outputs)}
+        if state.memoize_ttl is not None or state.single_flight_key is not None:
+            updates.update({"memoize_ttl": None, "single_flight_key": None})
+
+        # claim the positions, a concurrent append of the same outputs loses
+        claimed = await State.get_pymongo_collection().update_one(
+            {
+                "_id": state.id,
+                "status": StateStatusEnum.QUEUED,
+                "appended_count": state.appended_count if state.appended_count > 0 else {"$in": [0, None]}
+            },
+            {"$set": updates}
+        )
+        if claimed.modified_count == 0:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Outputs of the state were appended concurrently")
+
+        if state.single_flight_key is not None:
+            background_tasks.add_task(release_single_flight_followers, state, StateStatusEnum.CREATED, {"single_flight_key": None})
+
+        new_states = [
+            State.new_document(
+                node_name=state.node_name,
+                namespace_name=state.namespace_name,
+                identifier=state.identifier,
+                graph_name=state.graph_name,
+                run_id=state.run_id,
+                status=StateStatusEnum.EXECUTED,
+                inputs=state.inputs,
+                outputs=output,
+                error=None,
+                parents=state.parents
+            ) for output in outputs
+        ]
+        try:
+            inserted_ids = (await State.insert_documents(new_states, ordered=False)).inserted_ids
+        except Exception:
+            # give the positions back so the outputs are appended again by a retry
+            await State.get_pymongo_collection().update_one(
+                {"_id": state.id, "appended_count": updates["appended_count"]},
+                {"$set": {"appended_count": state.appended_count}}
+            )
+            raise
+        EventBus().publish_documents(new_states)
+
+        background_tasks.add_task(create_next_states, list(inserted_ids), state.identifier, state.namespace_name, state.graph_name, state.parents)
+
+        return AppendOutputsResponseModel(status=StateStatusEnum.QUEUED, count=len(inserted_ids))
+
+    except Exception as e:
+        logger.error(f"Error appending outputs to state {state_id} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+        raise e
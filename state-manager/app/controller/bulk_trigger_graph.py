@@ -0,0 +1,97 @@
+from fastapi import HTTPException
+
+from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
+from app.models.trigger_graph_model import BulkTriggerGraphRequestModel, BulkTriggerGraphResponseModel
+from app.models.state_status_enum import StateStatusEnum
+from app.models.db.state import State
+from app.models.db.store import Store
+from app.models.db.run import Run
+from app.controller.trigger_graph import get_triggerable_graph_template, resolve_root_inputs, check_required_store_keys
+
+import uuid
+import time
+
+logger = LogsManager().get_logger()
+
+# Runs written per round of inserts, bounds both the batch size sent to
+# MongoDB and the number of documents held in memory at once
+BULK_TRIGGER_CHUNK_SIZE = 1000
+
+
+async def bulk_trigger_graph(namespace_name: str, graph_name: str, body: BulkTriggerGraphRequestModel, x_exosphere_request_id: str) -> BulkTriggerGraphResponseModel:
+    """
+    Trigger many runs of a graph in one request.
+
+    The graph template is loaded and validated once, then every trigger is
+    validated before anything is written, so a bad item fails the whole
+    request. Runs, stores and root states are written with unordered bulk
+    inserts, a chunk of runs at a time. A root state is only inserted after
+    its run and stores exist.
+    """
+    try:
+        logger.info(f"Bulk triggering {len(body.triggers)} runs of graph {graph_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        graph_template = await get_triggerable_graph_template(namespace_name, graph_name, x_exosphere_request_id)
+        root = graph_template.get_root_node()
+
+        resolved_inputs = []
+        for index, trigger in enumerate(body.triggers):
+            try:
+                resolved_inputs.append(resolve_root_inputs(graph_template, root, trigger.inputs, trigger.store))
+                check_required_store_keys(graph_template, trigger.store)
+            except HTTPException as e:
+                raise HTTPException(status_code=e.status_code, detail=f"Invalid trigger at index {index}: {e.detail}")
+
+        run_ids = [str(uuid.uuid4()) for _ in body.triggers]
+        now = int(time.time() * 1000)
+        event_bus = EventBus()
+
+        for start in range(0, len(body.triggers), BULK_TRIGGER_CHUNK_SIZE):
+            end = start + BULK_TRIGGER_CHUNK_SIZE
+            chunk = list(zip(run_ids[start:end], body.triggers[start:end], resolved_inputs[start:end]))
+
+            await Run.insert_many(
+                [Run(run_id=run_id, namespace_name=namespace_name, graph_name=graph_name) for run_id, _, _ in chunk],
+                ordered=False
+            )
+
+            new_stores = [
+                Store(
+                    run_id=run_id,
+                    namespace=namespace_name,
+                    graph_name=graph_name,
+                    key=key,
+                    value=value
+                ) for run_id, trigger, _ in chunk for key, value in trigger.store.items()
+            ]
+            if len(new_stores) > 0:
+                await Store.insert_many(new_stores, ordered=False)
+
+            new_states = [
+                State(
+                    node_name=root.node_name,
+                    namespace_name=namespace_name,
+                    identifier=root.identifier,
+                    graph_name=graph_name,
+                    run_id=run_id,
+                    status=StateStatusEnum.CREATED,
+                    enqueue_after=now + trigger.start_delay,
+                    inputs=inputs,
+                    outputs={},
+                    error=None
+                ) for run_id, trigger, inputs in chunk
+            ]
+            inserted_ids = (await State.insert_many(new_states, ordered=False)).inserted_ids
+            event_bus.publish_inserted(new_states, inserted_ids)
+
+        logger.info(f"Bulk triggered {len(run_ids)} runs of graph {graph_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        return BulkTriggerGraphResponseModel(
+            status=StateStatusEnum.CREATED,
+            run_ids=run_ids
+        )
+
+    except Exception as e:
+        logger.error(f"Error bulk triggering graph {graph_name} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise e
@@ -1,18 +1,37 @@
 import asyncio
 import time
 
+from datetime import datetime
+
 from ..models.enqueue_request import EnqueueRequestModel
 from ..models.enqueue_response import EnqueueResponseModel, StateModel
 from ..models.db.state import State
+from ..models.db.state_record import StateRecord
 from ..models.state_status_enum import StateStatusEnum
 
 from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
+from app.singletons.secrets_cache import SecretsCache
 from pymongo import ReturnDocument
 
 logger = LogsManager().get_logger()
 
+# Fields a claimed state is sent to the runtime with, plus what the event bus
+# needs. Outputs, data, the ancestor map and the fingerprint stay in the database.
+CLAIM_PROJECTION = {
+    "_id": 1,
+    "node_name": 1,
+    "identifier": 1,
+    "inputs": 1,
+    "created_at": 1,
+    "status": 1,
+    "run_id": 1,
+    "namespace_name": 1,
+    "graph_name": 1
+}
+
 
-async def find_state(namespace_name: str, nodes: list[str]) -> State | None:
+async def find_state(namespace_name: str, nodes: list[str]) -> StateRecord | None:
     data = await State.get_pymongo_collection().find_one_and_update(
         {
             "namespace_name": namespace_name,
@@ -23,11 +42,12 @@ async def find_state(namespace_name: str, nodes: list[str]) -> State | None:
             "enqueue_after": {"$lte": int(time.time() * 1000)}
         },
         {
-            "$set": {"status": StateStatusEnum.QUEUED}
+            "$set": {"status": StateStatusEnum.QUEUED, "updated_at": datetime.now()}
         },
+        projection=CLAIM_PROJECTION,
         return_document=ReturnDocument.AFTER
     )
-    return State(**data) if data else None
+    return StateRecord(data) if data else None
 
 async def enqueue_states(namespace_name: str, body: EnqueueRequestModel, x_exosphere_request_id: str) -> EnqueueResponseModel:
     
@@ -47,6 +67,26 @@ async def enqueue_states(namespace_name: str, body: EnqueueRequestModel, x_exosp
             if result is not None:
                 states.append(result)
 
+        event_bus = EventBus()
+        for state in states:
+            event_bus.publish(state)
+
+        secrets = None
+        if body.include_secrets:
+            # each graph's secrets are sent once, however many of its states were claimed.
+            # The states are already claimed, so a graph whose secrets cannot be read is
+            # left out and the runtime fetches them itself
+            graph_names = list(dict.fromkeys(state.graph_name for state in states))
+            secrets_cache = SecretsCache()
+            graph_secrets = await asyncio.gather(*[secrets_cache.get_secrets(namespace_name, graph_name) for graph_name in graph_names], return_exceptions=True)
+            secrets = {}
+            for graph_name, values in zip(graph_names, graph_secrets):
+                if isinstance(values, Exception):
+                    logger.error(f"Error getting secrets of graph {graph_name}: {values}", x_exosphere_request_id=x_exosphere_request_id)
+                    continue
+                if values is not None:
+                    secrets[graph_name] = values
+
         response = EnqueueResponseModel(
             count=len(states),
             namespace=namespace_name,
@@ -55,12 +95,14 @@ async def enqueue_states(namespace_name: str, body: EnqueueRequestModel, x_exosp
                 StateModel(
                     state_id=str(state.id),
                     node_name=state.node_name,
+                    graph_name=state.graph_name,
                     identifier=state.identifier,
                     inputs=state.inputs,
                     created_at=state.created_at
                 )
                 for state in states
-            ]
+            ],
+            secrets=secrets
         )
         return response
     
@@ -8,19 +8,29 @@ from pymongo.errors import DuplicateKeyError
 from app.models.db.state import State
 from app.models.state_status_enum import StateStatusEnum
 from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
 from app.models.db.graph_template_model import GraphTemplate
+from app.tasks.release_single_flight import release_single_flight_followers
 
 logger = LogsManager().get_logger()
 
+# Fields of a state needed to decide whether it is retried, the rest comes back from the transition
+RETRY_DECISION_PROJECTION = {
+    "status": 1,
+    "graph_name": 1,
+    "retry_count": 1
+}
+
 async def errored_state(namespace_name: str, state_id: PydanticObjectId, body: ErroredRequestModel, x_exosphere_request_id: str) -> ErroredResponseModel:
 
     try:
         logger.info(f"Errored state {state_id} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
 
-        state = await State.find_one(State.id == state_id)
-        if not state:
+        records = await State.find_records([state_id], projection=RETRY_DECISION_PROJECTION)
+        if len(records) == 0:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
-        
+        state = records[0]
+
         if state.status != StateStatusEnum.QUEUED and state.status != StateStatusEnum.EXECUTED:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="State is not queued or executed")
         
@@ -28,16 +38,27 @@ async def errored_state(namespace_name: str, state_id: PydanticObjectId, body: E
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="State is already executed")
         
         try:
-            graph_template = await GraphTemplate.get(namespace_name, state.graph_name)
+            retry_policy = await GraphTemplate.get_retry_policy(namespace_name, state.graph_name)
         except Exception as e:
             logger.error(f"Error getting graph template {state.graph_name} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
             if isinstance(e, ValueError) and "Graph template not found" in str(e):
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Graph template not found")
             raise e
 
-        retry_created = False
+        retry_created = state.retry_count < retry_policy.max_retries
+
+        # claim the transition first so duplicate notifications can never create two retries
+        state = await State.transition(
+            state_id,
+            [StateStatusEnum.QUEUED],
+            {"status": StateStatusEnum.RETRY_CREATED if retry_created else StateStatusEnum.ERRORED, "error": body.error}
+        )
+        if not state:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="State is not queued")
+
+        event_bus = EventBus()
 
-        if state.retry_count < graph_template.retry_policy.max_retries:
+        if retry_created:
             try:
                 retry_state = State(
                     node_name=state.node_name,
@@ -51,24 +72,29 @@ async def errored_state(namespace_name: str, state_id: PydanticObjectId, body: E
                     error=None,
                     parents=state.parents,
                     does_unites=state.does_unites,
-                    enqueue_after= int(time.time() * 1000) + graph_template.retry_policy.compute_delay(state.retry_count + 1),
+                    enqueue_after= int(time.time() * 1000) + retry_policy.compute_delay(state.retry_count + 1),
                     retry_count=state.retry_count + 1,
-                    fanout_id=state.fanout_id
+                    fanout_id=state.fanout_id,
+                    memoize_ttl=state.memoize_ttl,
+                    single_flight_key=state.single_flight_key,
+                    appended_count=state.appended_count
                 )
                 retry_state = await retry_state.insert()
+                event_bus.publish(retry_state)
                 logger.info(f"Retry state {retry_state.id} created for state {state_id}", x_exosphere_request_id=x_exosphere_request_id)
-                retry_created = True
             except DuplicateKeyError:
                 logger.info(f"Duplicate retry state detected for state {state_id}. A retry state with the same unique key already exists.", x_exosphere_request_id=x_exosphere_request_id)
-                retry_created = True
+            except Exception as e:
+                # without its retry the state has errored for good, rather than leave the run waiting on a retry that does not exist
+                logger.error(f"Error creating retry state for state {state_id}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+                retry_created = False
+                state = await State.transition(state_id, [StateStatusEnum.RETRY_CREATED], {"status": StateStatusEnum.ERRORED}) or state
 
-        if retry_created:
-            state.status = StateStatusEnum.RETRY_CREATED
-        else:
-            state.status = StateStatusEnum.ERRORED
-            
-        state.error = body.error
-        await state.save()
+        event_bus.publish(state)
+
+        # a retry keeps leading the flight, only a final error fails the followers
+        if not retry_created and state.single_flight_key is not None:
+            await release_single_flight_followers(state, StateStatusEnum.ERRORED, {"error": f"Single flight leader {state_id} errored: {body.error}"})
 
         return ErroredResponseModel(status=StateStatusEnum.ERRORED, retry_created=retry_created)
 
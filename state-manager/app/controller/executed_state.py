@@ -4,9 +4,12 @@ from app.models.executed_models import ExecutedRequestModel, ExecutedResponseMod
 from fastapi import HTTPException, status, BackgroundTasks
 
 from app.models.db.state import State
+from app.models.db.memoized_result import MemoizedResult
 from app.models.state_status_enum import StateStatusEnum
 from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
 from app.tasks.create_next_states import create_next_states
+from app.tasks.release_single_flight import release_single_flight_followers
 
 logger = LogsManager().get_logger()
 
@@ -15,30 +18,25 @@ async def executed_state(namespace_name: str, state_id: PydanticObjectId, body:
     try:
         logger.info(f"Executed state {state_id} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
 
-        state = await State.find_one(State.id == state_id)
-        if not state or not state.id:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
+        outputs = body.outputs[0] if len(body.outputs) > 0 else {}
+        state = await State.transition(state_id, [StateStatusEnum.QUEUED], {"status": StateStatusEnum.EXECUTED, "outputs": outputs})
 
-        if state.status != StateStatusEnum.QUEUED:
+        if not state or not state.id:
+            if await State.get_status(state_id) is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="State is not queued")
-        
-        next_state_ids = []
-        if len(body.outputs) == 0:
-            state.status = StateStatusEnum.EXECUTED
-            state.outputs = {}
-            await state.save()
 
-            next_state_ids.append(state.id)
+        # only single results are memoized, a fan-out is not replayed from the cache
+        if state.memoize_ttl is not None and len(body.outputs) <= 1:
+            await MemoizedResult.remember(state.namespace_name, state.node_name, state.inputs, outputs, state.memoize_ttl)
 
-        else:            
-            state.outputs = body.outputs[0]
-            state.status = StateStatusEnum.EXECUTED
-            await state.save()
-            next_state_ids.append(state.id)
+        event_bus = EventBus()
+        event_bus.publish(state)
+        next_state_ids = [state.id]
 
-            new_states = []
-            for output in body.outputs[1:]:
-                new_states.append(State(
+        if len(body.outputs) > 1:
+            new_states = [
+                State.new_document(
                     node_name=state.node_name,
                     namespace_name=state.namespace_name,
                     identifier=state.identifier,
@@ -49,14 +47,21 @@ async def executed_state(namespace_name: str, state_id: PydanticObjectId, body:
                     outputs=output,
                     error=None,
                     parents=state.parents
-                ))                
-
-            if len(new_states) > 0:
-                inserted_ids = (await State.insert_many(new_states)).inserted_ids
-                next_state_ids.extend(inserted_ids)
+                ) for output in body.outputs[1:]
+            ]
+            inserted_ids = (await State.insert_documents(new_states)).inserted_ids
+            event_bus.publish_documents(new_states)
+            next_state_ids.extend(inserted_ids)
 
         background_tasks.add_task(create_next_states, next_state_ids, state.identifier, state.namespace_name, state.graph_name, state.parents)
 
+        if state.single_flight_key is not None:
+            if len(body.outputs) <= 1:
+                background_tasks.add_task(release_single_flight_followers, state, StateStatusEnum.EXECUTED, {"outputs": outputs})
+            else:
+                # a fan-out is not shared, the followers run on their own
+                background_tasks.add_task(release_single_flight_followers, state, StateStatusEnum.CREATED, {"single_flight_key": None})
+
         return ExecutedResponseModel(status=StateStatusEnum.EXECUTED)
 
     except Exception as e:
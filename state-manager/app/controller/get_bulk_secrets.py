@@ -0,0 +1,44 @@
+import asyncio
+
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+
+from app.singletons.logs_manager import LogsManager
+from app.singletons.secrets_cache import SecretsCache
+from app.models.bulk_secrets_models import BulkSecretsRequestModel, BulkSecretsResponseModel
+from app.models.db.state import State
+
+logger = LogsManager().get_logger()
+
+
+async def get_bulk_secrets(namespace_name: str, body: BulkSecretsRequestModel, x_exosphere_request_id: str) -> BulkSecretsResponseModel:
+    """
+    Get the secrets of many graphs at once, named directly or through states.
+
+    Secrets are returned once per graph, states only carry the name of their
+    graph, so a batch of states of the same graph costs a single lookup.
+    """
+    try:
+        try:
+            state_ids = [PydanticObjectId(state_id) for state_id in body.state_ids]
+        except InvalidId as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid state id: {str(e)}")
+
+        states: dict[str, str] = {}
+        if len(state_ids) > 0:
+            records = await State.find_records(state_ids, projection={"namespace_name": 1, "graph_name": 1})
+            states = {str(record.id): record.graph_name for record in records if record.namespace_name == namespace_name}
+
+        graph_names = list(dict.fromkeys([*body.graph_names, *states.values()]))
+        secrets_cache = SecretsCache()
+        secrets = await asyncio.gather(*[secrets_cache.get_secrets(namespace_name, graph_name) for graph_name in graph_names])
+        graphs = {graph_name: graph_secrets for graph_name, graph_secrets in zip(graph_names, secrets) if graph_secrets is not None}
+
+        logger.info(f"Retrieved secrets of {len(graphs)} graphs for {len(states)} states in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        return BulkSecretsResponseModel(graphs=graphs, states=states)
+
+    except Exception as e:
+        logger.error(f"Error getting bulk secrets in namespace {namespace_name}", error=e, x_exosphere_request_id=x_exosphere_request_id)
+        raise
@@ -1,38 +1,78 @@
 """
 Controller for building graph structure from states by run ID
 """
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from ..models.db.state import State
-from ..models.graph_structure_models import GraphStructureResponse, GraphNode, GraphEdge
+from ..models.graph_structure_models import GraphStructureResponse, GraphNode, GraphEdge, CollapsedGraphNode
 from ..models.state_status_enum import StateStatusEnum
 from ..singletons.logs_manager import LogsManager
 
 
-async def get_graph_structure(namespace: str, run_id: str, request_id: str) -> GraphStructureResponse:
+# Fields needed to draw a state on the graph, parents are reduced server side to
+# the direct parent so the accumulated ancestor map never leaves the database
+GRAPH_NODE_PROJECTION = {
+    "_id": 1,
+    "node_name": 1,
+    "identifier": 1,
+    "status": 1,
+    "error": 1,
+    "updated_at": 1,
+    "parent": {"$arrayElemAt": [{"$objectToArray": "$parents"}, -1]}
+}
+
+
+def get_collapsed_node_id(identifier: str) -> str:
+    return f"collapsed:{identifier}"
+
+
+async def get_graph_structure(namespace: str, run_id: str, request_id: str, collapse_threshold: Optional[int] = None) -> GraphStructureResponse:
     """
     Build a graph structure from states for a given run ID
-    
+
+    States are streamed from the database with a narrow projection (no inputs,
+    outputs, data or ancestor maps), so memory stays proportional to the
+    response rather than to the stored documents.
+
     Args:
         namespace: The namespace to search in
         run_id: The run ID to filter by
         request_id: Request ID for logging
-        
+        collapse_threshold: If set, identifiers with more states than this are
+            collapsed into a single node carrying per-status counts
+
     Returns:
         GraphStructureResponse containing nodes and edges
     """
     logger = LogsManager().get_logger()
-    
+
     try:
         logger.info(f"Building graph structure for run ID: {run_id} in namespace: {namespace}", x_exosphere_request_id=request_id)
-        
-        # Find all states for the run ID in the namespace
-        states = await State.find(
-            State.run_id == run_id,
-            State.namespace_name == namespace
-        ).to_list()
-        
-        if not states:
+
+        run_filter = {
+            "run_id": run_id,
+            "namespace_name": namespace
+        }
+        collection = State.get_pymongo_collection()
+
+        # Count states per identifier and status on the server, this drives both
+        # the execution summary and the decision of which identifiers to collapse
+        summary_cursor = await collection.aggregate(
+            [
+                {"$match": run_filter},
+                {
+                    "$group": {
+                        "_id": {"identifier": "$identifier", "status": "$status"},
+                        "count": {"$sum": 1},
+                        "node_name": {"$first": "$node_name"},
+                        "graph_name": {"$first": "$graph_name"}
+                    }
+                }
+            ]
+        )
+        summary = await summary_cursor.to_list()
+
+        if not summary:
             logger.warning(f"No states found for run ID: {run_id}", x_exosphere_request_id=request_id)
             return GraphStructureResponse(
                 graph_name="",
@@ -43,78 +83,104 @@ async def get_graph_structure(namespace: str, run_id: str, request_id: str) -> G
                 edge_count=0,
                 execution_summary={status.value: 0 for status in StateStatusEnum}
             )
-        
-        # Get graph name from first state (all states in a run should have same graph name)
-        graph_name = states[0].graph_name
-        
-        # Create nodes from states
-        nodes: List[GraphNode] = []
-        state_id_to_node: Dict[str, GraphNode] = {}
-        
-        for state in states:
-            node = GraphNode(
-                id=str(state.id),
-                node_name=state.node_name,
-                identifier=state.identifier,
-                status=state.status,
-                error=state.error
-            )
-            nodes.append(node)
-            state_id_to_node[str(state.id)] = node
-        
-        # Create edges from parent relationships
-        edges: List[GraphEdge] = []
-        edge_id_counter = 0
-
-        root_states = []
-        
-        for state in states:
-            state_id = str(state.id)
-            
-            # Process parent relationships - only create edges for direct parents
-            # Since parents are accumulated, we only want the direct parent (not all ancestors)
-
-            if len(state.parents) == 0:
-                root_states.append(state_id_to_node[str(state.id)])
-                continue        
-
-            if state.parents:
-                # Get the most recent parent (the one that was added last)
-                # In Python 3.7+, dict.items() preserves insertion order
-                # The most recent parent should be the last one added
-                parent_items = list(state.parents.items())
-                if parent_items:                    
-                    _ , parent_id = parent_items[-1]                                   
-
-                    parent_id_str = str(parent_id)
-                    
-                    # Check if parent exists in our nodes (should be in same run)
-                    if parent_id_str in state_id_to_node:
-                        edge = GraphEdge(
-                            source=parent_id_str,
-                            target=state_id,
-                        )
-                        edges.append(edge)
-                        edge_id_counter += 1
-        
+
+        # Get graph name from first group (all states in a run should have same graph name)
+        graph_name = summary[0]["graph_name"]
+
         # Build execution summary - initialize all possible states with zero counts
         execution_summary: Dict[str, int] = {status.value: 0 for status in StateStatusEnum}
-        for state in states:
-            status = state.status.value
-            execution_summary[status] += 1
-        
-        logger.info(f"Built graph structure with {len(nodes)} nodes and {len(edges)} edges for run ID: {run_id}", x_exosphere_request_id=request_id)
-        
+        identifier_counts: Dict[str, int] = {}
+        for group in summary:
+            execution_summary[group["_id"]["status"]] += group["count"]
+            identifier = group["_id"]["identifier"]
+            identifier_counts[identifier] = identifier_counts.get(identifier, 0) + group["count"]
+
+        collapsed_nodes: Dict[str, CollapsedGraphNode] = {}
+        if collapse_threshold is not None:
+            for group in summary:
+                identifier = group["_id"]["identifier"]
+                if identifier_counts[identifier] <= collapse_threshold:
+                    continue
+                if identifier not in collapsed_nodes:
+                    collapsed_nodes[identifier] = CollapsedGraphNode(
+                        id=get_collapsed_node_id(identifier),
+                        node_name=group["node_name"],
+                        identifier=identifier,
+                        state_count=identifier_counts[identifier],
+                        status_counts={}
+                    )
+                collapsed_nodes[identifier].status_counts[group["_id"]["status"]] = group["count"]
+
+        nodes: List[GraphNode] = []
+        root_states: List[GraphNode] = []
+        node_ids: set[str] = set()
+
+        # Parents are accumulated, so only the direct parent (the one added last)
+        # is used for edges. Edges to plain nodes are kept as candidates until the
+        # stream is done, since the parent may not be part of this run.
+        candidate_edges: List[GraphEdge] = []
+        collapsed_edges: Dict[tuple[str, str], GraphEdge] = {}
+
+        states_cursor = await collection.aggregate(
+            [
+                {"$match": run_filter},
+                {"$project": GRAPH_NODE_PROJECTION}
+            ]
+        )
+
+        async for state in states_cursor:
+            identifier = state["identifier"]
+            parent = state.get("parent")
+
+            if identifier in collapsed_nodes:
+                target = collapsed_nodes[identifier].id
+            else:
+                node = GraphNode(
+                    id=str(state["_id"]),
+                    node_name=state["node_name"],
+                    identifier=identifier,
+                    status=state["status"],
+                    error=state.get("error")
+                )
+                nodes.append(node)
+                node_ids.add(node.id)
+                target = node.id
+
+                if not parent:
+                    root_states.append(node)
+
+            if not parent:
+                continue
+
+            if parent["k"] in collapsed_nodes:
+                source = collapsed_nodes[parent["k"]].id
+            else:
+                source = str(parent["v"])
+
+            if identifier in collapsed_nodes or parent["k"] in collapsed_nodes:
+                if (source, target) not in collapsed_edges:
+                    collapsed_edges[(source, target)] = GraphEdge(source=source, target=target)
+            else:
+                candidate_edges.append(GraphEdge(source=source, target=target))
+
+        # Check if parent exists in our nodes (should be in same run)
+        edges: List[GraphEdge] = [edge for edge in candidate_edges if edge.source in node_ids]
+        collapsed_node_ids = {collapsed_node.id for collapsed_node in collapsed_nodes.values()}
+        edges.extend(edge for edge in collapsed_edges.values() if edge.source in node_ids or edge.source in collapsed_node_ids)
+
+        logger.info(f"Built graph structure with {len(nodes)} nodes, {len(collapsed_nodes)} collapsed nodes and {len(edges)} edges for run ID: {run_id}", x_exosphere_request_id=request_id)
+
         return GraphStructureResponse(
             root_states=root_states,
             graph_name=graph_name,
             nodes=nodes,
+            collapsed_nodes=list(collapsed_nodes.values()),
             edges=edges,
-            node_count=len(nodes),
+            node_count=len(nodes) + len(collapsed_nodes),
             edge_count=len(edges),
             execution_summary=execution_summary
         )
-        
+
     except Exception as e:
         logger.error(f"Error building graph structure for run ID {run_id} in namespace {namespace}: {str(e)}", x_exosphere_request_id=request_id)
         raise
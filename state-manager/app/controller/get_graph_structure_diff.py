@@ -0,0 +1,131 @@
+"""
+Controller for incrementally fetching graph structure changes by run ID
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status
+
+from ..models.db.state import State
+from ..models.graph_structure_models import GraphDiffResponse, GraphNode, GraphEdge
+from ..singletons.logs_manager import LogsManager
+from .get_graph_structure import GRAPH_NODE_PROJECTION
+
+# updated_at is set by the writing replica before its write commits, so a change
+# may become visible with a timestamp up to this much in the past. The cursor
+# never moves past now - CURSOR_LAG and changes inside the window are re-sent.
+CURSOR_LAG = timedelta(seconds=5)
+
+MIN_OBJECT_ID = PydanticObjectId("000000000000000000000000")
+
+
+def encode_cursor(updated_at: datetime, state_id: PydanticObjectId) -> str:
+    return f"{updated_at.isoformat()}|{state_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, PydanticObjectId]:
+    updated_at, state_id = cursor.split("|", 1)
+    return datetime.fromisoformat(updated_at), PydanticObjectId(state_id)
+
+
+async def get_graph_structure_diff(namespace: str, run_id: str, cursor: Optional[str], limit: int, request_id: str) -> GraphDiffResponse:
+    """
+    Get the nodes and edges of a run that changed after a cursor
+
+    States are read in (updated_at, _id) order from the run_id/updated_at/_id
+    index, so the cost of a call is proportional to the number of changes
+    rather than to the size of the run.
+
+    The returned cursor stops CURSOR_LAG behind the current time, so a write
+    that commits late with an older updated_at is still returned by a later
+    call. Changes inside that window may be returned more than once.
+
+    Args:
+        namespace: The namespace to search in
+        run_id: The run ID to filter by
+        cursor: Cursor returned by a previous call, None to start from the beginning
+        limit: Maximum number of changed nodes to return
+        request_id: Request ID for logging
+
+    Returns:
+        GraphDiffResponse containing changed nodes, their edges and the next cursor
+    """
+    logger = LogsManager().get_logger()
+
+    try:
+        logger.info(f"Getting graph structure changes for run ID: {run_id} in namespace: {namespace} after cursor: {cursor}", x_exosphere_request_id=request_id)
+
+        if limit < 1:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Limit should be at least 1")
+
+        run_filter: dict = {
+            "run_id": run_id,
+            "namespace_name": namespace
+        }
+
+        horizon = datetime.now() - CURSOR_LAG
+        position: tuple[datetime, PydanticObjectId] | None = None
+
+        if cursor:
+            try:
+                updated_at, state_id = decode_cursor(cursor)
+                position = (updated_at, state_id)
+            except Exception:
+                logger.error(f"Invalid graph cursor: {cursor}", x_exosphere_request_id=request_id)
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {cursor}")
+
+            run_filter["$or"] = [
+                {"updated_at": {"$gt": updated_at}},
+                {"updated_at": updated_at, "_id": {"$gt": state_id}}
+            ]
+
+        states_cursor = await State.get_pymongo_collection().aggregate(
+            [
+                {"$match": run_filter},
+                {"$sort": {"updated_at": 1, "_id": 1}},
+                {"$limit": limit},
+                {"$project": GRAPH_NODE_PROJECTION}
+            ]
+        )
+
+        nodes: List[GraphNode] = []
+        edges: List[GraphEdge] = []
+        last_position: tuple[datetime, PydanticObjectId] | None = None
+
+        async for state in states_cursor:
+            node = GraphNode(
+                id=str(state["_id"]),
+                node_name=state["node_name"],
+                identifier=state["identifier"],
+                status=state["status"],
+                error=state.get("error")
+            )
+            nodes.append(node)
+
+            parent = state.get("parent")
+            if parent:
+                edges.append(GraphEdge(source=str(parent["v"]), target=node.id))
+
+            last_position = (state["updated_at"], state["_id"])
+
+        # the page is complete up to its last state, but only settled changes are passed for good
+        has_more = len(nodes) == limit
+        if last_position is not None and last_position[0] > horizon:
+            last_position = max((horizon, MIN_OBJECT_ID), position) if position is not None else (horizon, MIN_OBJECT_ID)
+            has_more = False
+        if last_position is not None:
+            position = last_position
+
+        logger.info(f"Found {len(nodes)} changed nodes for run ID: {run_id}", x_exosphere_request_id=request_id)
+
+        return GraphDiffResponse(
+            nodes=nodes,
+            edges=edges,
+            cursor=encode_cursor(*position) if position is not None else None,
+            has_more=has_more
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting graph structure changes for run ID {run_id} in namespace {namespace}: {str(e)}", x_exosphere_request_id=request_id)
+        raise
@@ -0,0 +1,25 @@
+"""
+Controller for reading the memoization hit and miss counts of a namespace
+"""
+from ..models.memo_metrics_models import MemoMetricsResponseModel, NodeMemoMetricsModel
+from ..singletons.memo_metrics import MemoMetrics
+from ..singletons.logs_manager import LogsManager
+
+logger = LogsManager().get_logger()
+
+
+async def get_memo_metrics(namespace_name: str, x_exosphere_request_id: str) -> MemoMetricsResponseModel:
+    try:
+        logger.info(f"Getting memoization metrics for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        return MemoMetricsResponseModel(
+            namespace=namespace_name,
+            nodes=[
+                NodeMemoMetricsModel(node_name=node_name, hits=hits, misses=misses)
+                for node_name, (hits, misses) in sorted(MemoMetrics().get(namespace_name).items())
+            ]
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting memoization metrics for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+        raise e
@@ -55,7 +55,7 @@ async def get_runs(namespace_name: str, page: int, size: int, x_exosphere_reques
                         "pending_count": {
                             "$sum": {
                                 "$cond": {
-                                    "if": {"$in": ["$status", [StateStatusEnum.CREATED, StateStatusEnum.QUEUED, StateStatusEnum.EXECUTED]]},
+                                    "if": {"$in": ["$status", [StateStatusEnum.CREATED, StateStatusEnum.QUEUED, StateStatusEnum.EXECUTED, StateStatusEnum.PARKED]]},
                                     "then": 1,
                                     "else": 0
                                 }
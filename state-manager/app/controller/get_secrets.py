@@ -1,7 +1,8 @@
 from app.singletons.logs_manager import LogsManager
 from app.models.secrets_response import SecretsResponseModel
 from app.models.db.state import State
-from app.models.db.graph_template_model import GraphTemplate
+from app.singletons.secrets_cache import SecretsCache
+from beanie import PydanticObjectId
 
 logger = LogsManager().get_logger()
 
@@ -22,8 +23,9 @@ async def get_secrets(namespace_name: str, state_id: str, x_exosphere_request_id
         ValueError: If state is not found or graph template is not found
     """
     try:
-        # Get the state
-        state = await State.get(state_id)
+        # Only the graph of the state is needed, its inputs and outputs are never loaded
+        states = await State.find_records([PydanticObjectId(state_id)], projection={"namespace_name": 1, "graph_name": 1})
+        state = states[0] if states else None
         if not state:
             logger.error(f"State {state_id} not found", x_exosphere_request_id=x_exosphere_request_id)
             raise ValueError(f"State {state_id} not found")
@@ -33,19 +35,13 @@ async def get_secrets(namespace_name: str, state_id: str, x_exosphere_request_id
             logger.error(f"State {state_id} does not belong to namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
             raise ValueError(f"State {state_id} does not belong to namespace {namespace_name}")
         
-        # Get the graph template to retrieve secrets
-        graph_template = await GraphTemplate.find_one(
-            GraphTemplate.name == state.graph_name,
-            GraphTemplate.namespace == namespace_name
-        )
+        # Decrypted secrets are cached per graph template version
+        secrets_dict = await SecretsCache().get_secrets(namespace_name, state.graph_name)
         
-        if not graph_template:
+        if secrets_dict is None:
             logger.error(f"Graph template {state.graph_name} not found in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
             raise ValueError(f"Graph template {state.graph_name} not found in namespace {namespace_name}")
         
-        # Get the secrets from the graph template
-        secrets_dict = graph_template.get_secrets()
-        
         logger.info(f"Retrieved {len(secrets_dict)} secrets for state {state_id}", x_exosphere_request_id=x_exosphere_request_id)
         
         return SecretsResponseModel(secrets=secrets_dict)
@@ -0,0 +1,86 @@
+"""
+Controller for streaming the outputs of the fan-out states a unites state waited on
+"""
+from typing import Optional
+
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status
+
+from ..models.db.graph_template_model import GraphTemplate
+from ..models.db.state import State
+from ..models.state_status_enum import StateStatusEnum
+from ..models.united_outputs_models import UnitedOutputModel, UnitedOutputsResponseModel
+from ..singletons.logs_manager import LogsManager
+
+logger = LogsManager().get_logger()
+
+
+async def get_united_outputs(namespace_name: str, state_id: PydanticObjectId, identifier: str, cursor: Optional[str], limit: int, x_exosphere_request_id: str) -> UnitedOutputsResponseModel:
+    """
+    Page through the outputs of the successful states of `identifier` that a
+    unites state waited on, i.e. the states below the same `unites` parent.
+
+    Pages are read in _id order with only the outputs projected, so a node can
+    aggregate a fan-out of any width without it ever being loaded at once.
+
+    Args:
+        namespace_name: The namespace of the state
+        state_id: ID of the state of a unites node
+        identifier: Identifier of the fanned-out node whose outputs are read
+        cursor: Cursor returned by a previous call, None to start from the beginning
+        limit: Maximum number of outputs to return
+        x_exosphere_request_id: Request ID for logging
+
+    Returns:
+        UnitedOutputsResponseModel containing a page of outputs and the next cursor
+    """
+    try:
+        logger.info(f"Getting united outputs of {identifier} for state {state_id} in namespace {namespace_name} after cursor {cursor}", x_exosphere_request_id=x_exosphere_request_id)
+
+        if limit < 1 or limit > 1000:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Limit should be between 1 and 1000")
+
+        after_id = None
+        if cursor:
+            try:
+                after_id = PydanticObjectId(cursor)
+            except Exception:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {cursor}")
+
+        records = await State.find_records([state_id], projection={"namespace_name": 1, "graph_name": 1, "run_id": 1, "identifier": 1, "parents": 1})
+        if len(records) == 0 or records[0].namespace_name != namespace_name:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
+        state = records[0]
+
+        graph_template = await GraphTemplate.get(namespace_name, state.graph_name)
+        node_template = graph_template.get_node_by_identifier(state.identifier)
+        if node_template is None or node_template.unites is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="State does not belong to a unites node")
+
+        unites_id = state.parents.get(node_template.unites.identifier)
+        if unites_id is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unites identifier {node_template.unites.identifier} not found in parents")
+
+        query: dict = {
+            "run_id": state.run_id,
+            "identifier": identifier,
+            "status": StateStatusEnum.SUCCESS,
+            f"parents.{node_template.unites.identifier}": unites_id
+        }
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+
+        outputs = [
+            UnitedOutputModel(state_id=str(data["_id"]), outputs=data.get("outputs", {}))
+            async for data in State.get_pymongo_collection().find(query, projection={"outputs": 1}, sort=[("_id", 1)], limit=limit)
+        ]
+
+        return UnitedOutputsResponseModel(
+            outputs=outputs,
+            cursor=outputs[-1].state_id if len(outputs) > 0 else cursor,
+            has_more=len(outputs) == limit
+        )
+
+    except Exception as e:
+        logger.error(f"Error getting united outputs of {identifier} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+        raise e
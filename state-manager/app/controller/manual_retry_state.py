@@ -2,6 +2,7 @@ from pymongo.errors import DuplicateKeyError
 from app.models.manual_retry import ManualRetryRequestModel, ManualRetryResponseModel
 from beanie import PydanticObjectId
 from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
 from app.models.state_status_enum import StateStatusEnum
 from fastapi import HTTPException, status
 from app.models.db.state import State
@@ -39,6 +40,10 @@ async def manual_retry_state(namespace_name: str, state_id: PydanticObjectId, bo
             state.status = StateStatusEnum.RETRY_CREATED
             await state.save()
 
+            event_bus = EventBus()
+            event_bus.publish(retry_state)
+            event_bus.publish(state)
+
             return ManualRetryResponseModel(id=str(retry_state.id), status=retry_state.status)
         except DuplicateKeyError:
             logger.info(f"Duplicate retry state detected for state {state_id}. A retry state with the same unique key already exists.", x_exosphere_request_id=x_exosphere_request_id)
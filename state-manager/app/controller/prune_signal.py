@@ -5,6 +5,8 @@ from beanie import PydanticObjectId
 from app.models.db.state import State
 from app.models.state_status_enum import StateStatusEnum
 from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
+from app.tasks.release_single_flight import release_single_flight_followers
 
 logger = LogsManager().get_logger()
 
@@ -13,17 +15,16 @@ async def prune_signal(namespace_name: str, state_id: PydanticObjectId, body: Pr
     try:
         logger.info(f"Received prune signal for state {state_id} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
 
-        state = await State.find_one(State.id == state_id)
+        state = await State.transition(state_id, [StateStatusEnum.QUEUED], {"status": StateStatusEnum.PRUNED, "data": body.data})
 
         if not state:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
-        
-        if state.status != StateStatusEnum.QUEUED:
+            if await State.get_status(state_id) is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="State is not queued")
-        
-        state.status = StateStatusEnum.PRUNED
-        state.data = body.data
-        await state.save()
+
+        EventBus().publish(state)
+
+        await release_single_flight_followers(state, StateStatusEnum.PRUNED, {"data": body.data})
 
         return SignalResponseModel(status=StateStatusEnum.PRUNED, enqueue_after=state.enqueue_after)
 
@@ -6,6 +6,7 @@ import time
 from app.models.db.state import State
 from app.models.state_status_enum import StateStatusEnum
 from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
 
 logger = LogsManager().get_logger()
 
@@ -14,16 +15,17 @@ async def re_queue_after_signal(namespace_name: str, state_id: PydanticObjectId,
     try:
         logger.info(f"Received re-queue after signal for state {state_id} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
 
-        state = await State.find_one(State.id == state_id)
+        enqueue_after = int(time.time() * 1000) + body.enqueue_after
+
+        # any status may be re-queued, so there is no status precondition
+        state = await State.transition(state_id, None, {"status": StateStatusEnum.CREATED, "enqueue_after": enqueue_after})
 
         if not state:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
 
-        state.status = StateStatusEnum.CREATED
-        state.enqueue_after = int(time.time() * 1000) + body.enqueue_after
-        await state.save()
+        EventBus().publish(state)
 
-        return SignalResponseModel(status=StateStatusEnum.CREATED, enqueue_after=state.enqueue_after)
+        return SignalResponseModel(status=StateStatusEnum.CREATED, enqueue_after=enqueue_after)
 
     except Exception as e:
         logger.error(f"Error re-queueing state {state_id} for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, status
+
+from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
+from app.models.release_states_models import ReleaseStatesRequestModel, ReleaseStatesResponseModel
+from app.models.db.state import State
+from app.models.state_status_enum import StateStatusEnum
+
+logger = LogsManager().get_logger()
+
+
+async def release_states(namespace_name: str, body: ReleaseStatesRequestModel, x_exosphere_request_id: str) -> ReleaseStatesResponseModel:
+    """
+    Hand states a runtime claimed but never started back to CREATED with one
+    bulk update, so any runtime can claim them right away. Used by runtimes
+    shutting down. Only states still QUEUED are released.
+    """
+    try:
+        try:
+            state_ids = [PydanticObjectId(state_id) for state_id in body.state_ids]
+        except InvalidId as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid state id: {str(e)}")
+
+        collection = State.get_pymongo_collection()
+        query = {
+            "_id": {"$in": state_ids},
+            "namespace_name": namespace_name,
+            "status": StateStatusEnum.QUEUED
+        }
+        queued_ids = [data["_id"] async for data in collection.find(query, projection={"_id": 1})]
+
+        released_ids = []
+        if len(queued_ids) > 0:
+            released_at = datetime.now()
+            result = await collection.update_many(
+                {**query, "_id": {"$in": queued_ids}},
+                {"$set": {"status": StateStatusEnum.CREATED, "updated_at": released_at}}
+            )
+            released_ids = queued_ids
+            if result.modified_count < len(queued_ids):
+                # some were started in between, only publish the ones this update moved
+                released_ids = [
+                    data["_id"] async for data in collection.find(
+                        {"_id": {"$in": queued_ids}, "status": StateStatusEnum.CREATED, "updated_at": released_at},
+                        projection={"_id": 1}
+                    )
+                ]
+
+        if len(released_ids) > 0:
+            await EventBus().publish_by_ids(released_ids, StateStatusEnum.CREATED)
+
+        logger.info(f"Released {len(released_ids)} of {len(state_ids)} states in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        return ReleaseStatesResponseModel(count=len(released_ids), status=StateStatusEnum.CREATED)
+
+    except Exception as e:
+        logger.error(f"Error releasing states in namespace {namespace_name}", error=e, x_exosphere_request_id=x_exosphere_request_id)
+        raise
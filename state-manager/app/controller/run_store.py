@@ -0,0 +1,92 @@
+"""
+Controllers for the run store operations available to executing nodes
+"""
+from beanie import PydanticObjectId
+from fastapi import HTTPException, status
+from pymongo.errors import OperationFailure
+
+from app.models.db.state import State
+from app.models.db.state_record import StateRecord
+from app.models.db.store import Store
+from app.models.store_models import (
+    StoreValueResponseModel,
+    SetStoreValueRequestModel,
+    CompareAndSetStoreRequestModel,
+    CompareAndSetStoreResponseModel,
+    IncrementStoreRequestModel
+)
+from app.singletons.logs_manager import LogsManager
+
+logger = LogsManager().get_logger()
+
+
+async def get_store_scope(namespace_name: str, state_id: PydanticObjectId) -> StateRecord:
+    """Resolve the run whose store a state reads and writes."""
+    records = await State.find_records([state_id], projection={"namespace_name": 1, "graph_name": 1, "run_id": 1})
+    if len(records) == 0 or records[0].namespace_name != namespace_name:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="State not found")
+    return records[0]
+
+
+async def get_store_value(namespace_name: str, state_id: PydanticObjectId, key: str, x_exosphere_request_id: str) -> StoreValueResponseModel:
+    try:
+        logger.info(f"Getting store key {key} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        state = await get_store_scope(namespace_name, state_id)
+        value = await Store.get_value(state.run_id, namespace_name, state.graph_name, key)
+
+        return StoreValueResponseModel(key=key, value=value)
+
+    except Exception as e:
+        logger.error(f"Error getting store key {key} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+        raise e
+
+
+async def set_store_value(namespace_name: str, state_id: PydanticObjectId, key: str, body: SetStoreValueRequestModel, x_exosphere_request_id: str) -> StoreValueResponseModel:
+    try:
+        logger.info(f"Setting store key {key} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        state = await get_store_scope(namespace_name, state_id)
+        await Store.set_value(state.run_id, namespace_name, state.graph_name, key, body.value)
+
+        return StoreValueResponseModel(key=key, value=body.value)
+
+    except Exception as e:
+        logger.error(f"Error setting store key {key} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+        raise e
+
+
+async def compare_and_set_store_value(namespace_name: str, state_id: PydanticObjectId, key: str, body: CompareAndSetStoreRequestModel, x_exosphere_request_id: str) -> CompareAndSetStoreResponseModel:
+    try:
+        logger.info(f"Compare and set store key {key} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        state = await get_store_scope(namespace_name, state_id)
+        swapped = await Store.compare_and_set(state.run_id, namespace_name, state.graph_name, key, body.expected, body.value)
+
+        if swapped:
+            return CompareAndSetStoreResponseModel(key=key, swapped=True, value=body.value)
+
+        # report the value that won so the caller can retry against it
+        value = await Store.get_value(state.run_id, namespace_name, state.graph_name, key)
+        return CompareAndSetStoreResponseModel(key=key, swapped=False, value=value)
+
+    except Exception as e:
+        logger.error(f"Error compare and setting store key {key} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+        raise e
+
+
+async def increment_store_value(namespace_name: str, state_id: PydanticObjectId, key: str, body: IncrementStoreRequestModel, x_exosphere_request_id: str) -> StoreValueResponseModel:
+    try:
+        logger.info(f"Incrementing store key {key} by {body.by} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+
+        state = await get_store_scope(namespace_name, state_id)
+        try:
+            value = await Store.increment(state.run_id, namespace_name, state.graph_name, key, body.by)
+        except OperationFailure:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Store key {key} does not hold an integer")
+
+        return StoreValueResponseModel(key=key, value=value)
+
+    except Exception as e:
+        logger.error(f"Error incrementing store key {key} for state {state_id} in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id, error=e)
+        raise e
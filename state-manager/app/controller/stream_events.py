@@ -0,0 +1,72 @@
+"""
+Controller for streaming state transitions as server-sent events
+"""
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from ..models.event_models import RunCompletedEventModel
+from ..models.run_models import RunStatusEnum
+from ..singletons.event_bus import EventBus
+from ..singletons.logs_manager import LogsManager
+from ..utils.run_status import get_run_status, SETTLED_STATUSES
+
+logger = LogsManager().get_logger()
+
+
+def format_sse(event: BaseModel) -> str:
+    return f"event: {getattr(event, 'type')}\ndata: {event.model_dump_json()}\n\n"
+
+
+async def check_run_exists(namespace_name: str, run_id: str, x_exosphere_request_id: str) -> None:
+    """Raise a 404 for a run that has no state in the namespace, before any event is streamed."""
+    if await get_run_status(namespace_name, run_id) is None:
+        logger.error(f"Run {run_id} not found in namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Run {run_id} not found")
+
+
+async def stream_events(namespace_name: str, run_id: str | None, x_exosphere_request_id: str, keep_alive_interval: float = 15.0) -> AsyncIterator[str]:
+    """
+    Stream state events of a namespace, or of a single run when run_id is given.
+
+    Run streams end with a run_completed event once the run has no pending
+    states left, which is also sent immediately if the run is already done.
+    Comment lines are sent while idle so proxies keep the connection open.
+    """
+    event_bus = EventBus()
+    # subscribe before checking the run so no transition can slip in between
+    subscription = event_bus.subscribe(namespace_name, run_id)
+
+    try:
+        logger.info(f"Streaming events for namespace {namespace_name} and run {run_id}", x_exosphere_request_id=x_exosphere_request_id)
+
+        if run_id is not None:
+            run_status = await get_run_status(namespace_name, run_id)
+            if run_status is None:
+                return
+            if run_status != RunStatusEnum.PENDING:
+                yield format_sse(RunCompletedEventModel(run_id=run_id, namespace_name=namespace_name, status=run_status))
+                return
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=keep_alive_interval)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            yield format_sse(event)
+
+            if run_id is not None and event.status in SETTLED_STATUSES:
+                run_status = await get_run_status(namespace_name, run_id)
+                if run_status is None:
+                    return
+                if run_status != RunStatusEnum.PENDING:
+                    yield format_sse(RunCompletedEventModel(run_id=run_id, namespace_name=namespace_name, status=run_status))
+                    return
+
+    finally:
+        event_bus.unsubscribe(subscription)
+        logger.info(f"Stopped streaming events for namespace {namespace_name} and run {run_id}", x_exosphere_request_id=x_exosphere_request_id)
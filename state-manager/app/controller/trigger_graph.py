@@ -1,7 +1,9 @@
 from fastapi import HTTPException
 
 from app.singletons.logs_manager import LogsManager
-from app.models.trigger_graph_model import TriggerGraphRequestModel, TriggerGraphResponseModel
+from app.singletons.event_bus import EventBus
+from app.models.trigger_graph_model import TriggerGraphRequestModel, TriggerGraphResponseModel, LeafOutputModel
+from app.models.run_models import RunStatusEnum
 from app.models.state_status_enum import StateStatusEnum
 from app.models.db.state import State
 from app.models.db.store import Store
@@ -9,6 +11,7 @@ from app.models.db.run import Run
 from app.models.db.graph_template_model import GraphTemplate
 from app.models.node_template_model import NodeTemplate
 from app.models.dependent_string import DependentString
+from app.utils.run_status import wait_for_run_status
 
 import uuid
 import time
@@ -26,48 +29,76 @@ def check_required_store_keys(graph_template: GraphTemplate, store: dict[str, st
 
 def construct_inputs(node: NodeTemplate, inputs: dict[str, str]) -> dict[str, str]:
     return {key: inputs.get(key, value) for key, value in node.inputs.items()}
-    
 
-async def trigger_graph(namespace_name: str, graph_name: str, body: TriggerGraphRequestModel, x_exosphere_request_id: str) -> TriggerGraphResponseModel:
+
+async def get_triggerable_graph_template(namespace_name: str, graph_name: str, x_exosphere_request_id: str) -> GraphTemplate:
     try:
-        run_id = str(uuid.uuid4())
-        logger.info(f"Triggering graph {graph_name} with run_id {run_id}", x_exosphere_request_id=x_exosphere_request_id)
+        graph_template = await GraphTemplate.get(namespace_name, graph_name)
+    except ValueError as e:
+        logger.error(f"Graph template not found for namespace {namespace_name} and graph {graph_name}", x_exosphere_request_id=x_exosphere_request_id)
+        if "Graph template not found" in str(e):
+            raise HTTPException(status_code=404, detail=f"Graph template not found for namespace {namespace_name} and graph {graph_name}")
+        else:
+            raise e
 
-        try:
-            graph_template = await GraphTemplate.get(namespace_name, graph_name)
-        except ValueError as e:
-            logger.error(f"Graph template not found for namespace {namespace_name} and graph {graph_name}", x_exosphere_request_id=x_exosphere_request_id)
-            if "Graph template not found" in str(e):
-                raise HTTPException(status_code=404, detail=f"Graph template not found for namespace {namespace_name} and graph {graph_name}")
-            else:
-                raise e
-            
-        if not graph_template.is_valid():
-            raise HTTPException(status_code=400, detail="Graph template is not valid")
-        
-        root = graph_template.get_root_node()
-        inputs = construct_inputs(root, body.inputs)
+    if not graph_template.is_valid():
+        raise HTTPException(status_code=400, detail="Graph template is not valid")
 
-        try:
-            for field, value in inputs.items():
-                dependent_string = DependentString.create_dependent_string(value)
-
-                for dependent in dependent_string.dependents.values():
-                    if dependent.identifier != "store":
-                        raise HTTPException(status_code=400, detail=f"Root node can have only store identifier as dependent but got {dependent.identifier}")
-                    elif dependent.field not in body.store:
-                        if dependent.field in graph_template.store_config.default_values.keys():
-                            dependent_string.set_value(dependent.identifier, dependent.field, graph_template.store_config.default_values[dependent.field])
-                        else:
-                            raise HTTPException(status_code=400, detail=f"Dependent {dependent.field} not found in store for root node {root.identifier}")
+    return graph_template
+
+
+def resolve_root_inputs(graph_template: GraphTemplate, root: NodeTemplate, trigger_inputs: dict[str, str], store: dict[str, str]) -> dict[str, str]:
+    inputs = construct_inputs(root, trigger_inputs)
+
+    try:
+        for field, value in inputs.items():
+            dependent_string = DependentString.create_dependent_string(value)
+
+            for dependent in dependent_string.dependents.values():
+                if dependent.identifier != "store":
+                    raise HTTPException(status_code=400, detail=f"Root node can have only store identifier as dependent but got {dependent.identifier}")
+                elif dependent.field not in store:
+                    if dependent.field in graph_template.store_config.default_values.keys():
+                        dependent_string.set_value(dependent.identifier, dependent.field, graph_template.store_config.default_values[dependent.field])
                     else:
-                        dependent_string.set_value(dependent.identifier, dependent.field, body.store[dependent.field])
+                        raise HTTPException(status_code=400, detail=f"Dependent {dependent.field} not found in store for root node {root.identifier}")
+                else:
+                    dependent_string.set_value(dependent.identifier, dependent.field, store[dependent.field])
+
+            inputs[field] = dependent_string.generate_string()
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid input: {e}")
 
-                inputs[field] = dependent_string.generate_string()
+    return inputs
 
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid input: {e}")
 
+async def get_leaf_outputs(graph_template: GraphTemplate, run_id: str) -> list[LeafOutputModel]:
+    leaf_identifiers = [node.identifier for node in graph_template.nodes if not node.next_nodes]
+
+    cursor = State.get_pymongo_collection().find(
+        {"run_id": run_id, "identifier": {"$in": leaf_identifiers}, "status": StateStatusEnum.SUCCESS},
+        projection={"_id": 1, "identifier": 1, "node_name": 1, "outputs": 1}
+    )
+    return [
+        LeafOutputModel(
+            state_id=str(data["_id"]),
+            identifier=data["identifier"],
+            node_name=data["node_name"],
+            outputs=data["outputs"]
+        )
+        async for data in cursor
+    ]
+    
+
+async def trigger_graph(namespace_name: str, graph_name: str, body: TriggerGraphRequestModel, x_exosphere_request_id: str) -> TriggerGraphResponseModel:
+    try:
+        run_id = str(uuid.uuid4())
+        logger.info(f"Triggering graph {graph_name} with run_id {run_id}", x_exosphere_request_id=x_exosphere_request_id)
+
+        graph_template = await get_triggerable_graph_template(namespace_name, graph_name, x_exosphere_request_id)
+        root = graph_template.get_root_node()
+        inputs = resolve_root_inputs(graph_template, root, body.inputs, body.store)
 
         check_required_store_keys(graph_template, body.store)
 
@@ -103,11 +134,39 @@ async def trigger_graph(namespace_name: str, graph_name: str, body: TriggerGraph
             outputs={},
             error=None
         )
-        await new_state.insert()
+        if not body.wait:
+            await new_state.insert()
+            EventBus().publish(new_state)
+
+            return TriggerGraphResponseModel(
+                status=StateStatusEnum.CREATED,
+                run_id=run_id
+            )
+
+        event_bus = EventBus()
+        # subscribe before the root state exists so no transition of the run is missed
+        subscription = event_bus.subscribe(namespace_name, run_id)
+        try:
+            await new_state.insert()
+            event_bus.publish(new_state)
+
+            run_status = await wait_for_run_status(subscription, run_id, body.wait_timeout)
+        finally:
+            event_bus.unsubscribe(subscription)
+
+        if run_status is None or run_status == RunStatusEnum.PENDING:
+            logger.info(f"Run {run_id} still pending after waiting {body.wait_timeout}s", x_exosphere_request_id=x_exosphere_request_id)
+            return TriggerGraphResponseModel(
+                status=StateStatusEnum.CREATED,
+                run_id=run_id,
+                run_status=run_status
+            )
 
         return TriggerGraphResponseModel(
             status=StateStatusEnum.CREATED,
-            run_id=run_id
+            run_id=run_id,
+            run_status=run_status,
+            outputs=await get_leaf_outputs(graph_template, run_id)
         )
 
     except Exception as e:
@@ -5,6 +5,7 @@ from app.models.graph_template_validation_status import GraphTemplateValidationS
 from app.tasks.verify_graph import verify_graph
 from app.models.db.trigger import DatabaseTriggers
 from app.models.trigger_models import TriggerStatusEnum, TriggerTypeEnum
+from app.singletons.secrets_cache import SecretsCache
 from beanie.operators import In
 
 from fastapi import BackgroundTasks, HTTPException
@@ -61,6 +62,8 @@ async def upsert_graph_template(namespace_name: str, graph_name: str, body: Upse
             logger.error("Error validating graph template", error=e, x_exosphere_request_id=x_exosphere_request_id)
             raise HTTPException(status_code=400, detail=f"Error validating graph template: {str(e)}")
         
+        SecretsCache().invalidate(namespace_name, graph_name)
+
         if len(old_triggers) > 0:
             await DatabaseTriggers.find(
                 DatabaseTriggers.graph_name == graph_name,
@@ -15,6 +15,7 @@ from .middlewares.unhandled_exceptions_middleware import (
     UnhandledExceptionsMiddleware,
 )
 from .middlewares.request_id_middleware import RequestIdMiddleware
+from .middlewares.load_shedding_middleware import LoadSheddingMiddleware
 
 # injecting models
 from .models.db.state import State
@@ -23,6 +24,8 @@ from .models.db.registered_node import RegisteredNode
 from .models.db.store import Store
 from .models.db.run import Run
 from .models.db.trigger import DatabaseTriggers
+from .models.db.memoized_result import MemoizedResult
+from .models.db.single_flight import SingleFlight
 
 # injecting routes
 from .routes import router, global_router
@@ -38,12 +41,20 @@ from .utils.check_database_health import check_database_health
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from .tasks.trigger_cron import trigger_cron
+from .tasks.release_single_flight import sweep_parked_followers
 
 # init tasks
 from .tasks.init_tasks import init_tasks
+
+# state events
+from .singletons.event_bus import EventBus
+
+# load shedding
+from .singletons.load_monitor import MongoLatencyListener
+import asyncio
  
 # Define models list
-DOCUMENT_MODELS = [State, GraphTemplate, RegisteredNode, Store, Run, DatabaseTriggers]
+DOCUMENT_MODELS = [State, GraphTemplate, RegisteredNode, Store, Run, DatabaseTriggers, MemoizedResult, SingleFlight]
 
 scheduler = AsyncIOScheduler()
 
@@ -57,7 +68,7 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
 
     # initializing beanie
-    client = AsyncMongoClient(settings.mongo_uri)
+    client = AsyncMongoClient(settings.mongo_uri, event_listeners=[MongoLatencyListener()])
     db = client[settings.mongo_database_name]
     await init_beanie(db, document_models=DOCUMENT_MODELS)
     logger.info("beanie dbs initialized")
@@ -83,12 +94,30 @@ async def lifespan(app: FastAPI):
         max_instances=1,
         id="every_minute_task"
     )
+    scheduler.add_job(
+        sweep_parked_followers,
+        CronTrigger.from_crontab("* * * * *"),
+        replace_existing=True,
+        misfire_grace_time=60,
+        coalesce=True,
+        max_instances=1,
+        id="sweep_parked_followers"
+    )
     scheduler.start()
 
+    # following state changes of all replicas when configured
+    change_stream_task = None
+    event_bus = EventBus()
+    if event_bus.uses_change_stream():
+        change_stream_task = asyncio.create_task(event_bus.watch_change_stream())
+        logger.info("state change stream started")
+
     # main logic of the server
     yield
 
     # end of the server
+    if change_stream_task is not None:
+        change_stream_task.cancel()
     await client.close()
     scheduler.shutdown()
     logger.info("server stopped")
@@ -112,9 +141,11 @@ app = FastAPI(
 # Add middlewares in inner-to-outer order (last added runs first on request):  
 # 1) UnhandledExceptions (inner)  
 app.add_middleware(UnhandledExceptionsMiddleware)  
-# 2) Request ID (middle)  
+# 2) Load shedding, inside request ID so shed requests are logged with one  
+app.add_middleware(LoadSheddingMiddleware)  
+# 3) Request ID (middle)  
 app.add_middleware(RequestIdMiddleware)  
-# 3) CORS (outermost)  
+# 4) CORS (outermost)  
 app.add_middleware(CORSMiddleware, **get_cors_config())  
 
 
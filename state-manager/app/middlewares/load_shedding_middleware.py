@@ -0,0 +1,82 @@
+import re
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.singletons.load_monitor import LoadMonitor
+from app.singletons.logs_manager import LogsManager
+
+logger = LogsManager().get_logger()
+
+EXEMPT_PATHS = {"/health"}
+
+# requests that finish or hand back work are never shed: triggers waiting for their
+# runs hold their slots until these arrive, shedding them would keep the replica
+# overloaded for as long as the waits last
+EXEMPT_PATH_PATTERN = re.compile(
+    r"^/v0/namespace/[^/]+/(state/[^/]+/(executed|executed/append|errored|prune|re-enqueue-after)|states/release)$"
+)
+
+
+class LoadSheddingMiddleware:
+    """
+    Rejects requests with 429/503 and a Retry-After header while the replica
+    is saturated, so clients back off instead of piling up timeouts.
+
+    Written as a plain ASGI middleware to see when the response is sent: a
+    request counts as in flight until its response starts, and its background
+    tasks count from the end of the response until the app returns. Streamed
+    responses count as neither while they stream.
+
+    Requests that complete, prune, requeue or release states are never shed,
+    they are what frees the replica.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        load_monitor = LoadMonitor()
+        overload = None if EXEMPT_PATH_PATTERN.match(scope["path"]) else load_monitor.overload()
+        if overload is not None:
+            status_code, retry_after = overload
+            logger.warning(
+                "request shed",
+                path=scope["path"],
+                status_code=status_code,
+                retry_after=retry_after,
+                **load_monitor.metrics()
+            )
+            response = JSONResponse(
+                status_code=status_code,
+                content={"success": False, "detail": "state manager is overloaded, retry later"},
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        responded = False
+        sent = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal responded, sent
+            await send(message)
+            if message["type"] == "http.response.start" and not responded:
+                responded = True
+                load_monitor.request_responded()
+            elif message["type"] == "http.response.body" and not message.get("more_body", False) and not sent:
+                sent = True
+                load_monitor.background_started()
+
+        load_monitor.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not responded:
+                load_monitor.request_responded()
+            if sent:
+                load_monitor.background_finished()
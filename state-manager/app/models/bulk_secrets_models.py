@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Self
+
+
+class BulkSecretsRequestModel(BaseModel):
+    state_ids: list[str] = Field(default_factory=list, max_length=1000, description="IDs of states whose graph secrets are requested")
+    graph_names: list[str] = Field(default_factory=list, max_length=1000, description="Names of graphs whose secrets are requested")
+
+    @model_validator(mode="after")
+    def validate_not_empty(self) -> Self:
+        if len(self.state_ids) == 0 and len(self.graph_names) == 0:
+            raise ValueError("At least one state id or graph name is required")
+        return self
+
+
+class BulkSecretsResponseModel(BaseModel):
+    graphs: Dict[str, Dict[str, str]] = Field(..., description="Secrets of each requested graph, graphs that do not exist are left out")
+    states: Dict[str, str] = Field(..., description="Graph name of each requested state, states that do not exist in the namespace are left out")
@@ -271,9 +271,21 @@ class GraphTemplate(BaseDatabaseModel):
         return self
     
     def get_secrets(self) -> Dict[str, str]:
-        if not self.secrets:
+        return GraphTemplate.decrypt_secrets(self.secrets)
+
+    @staticmethod
+    def decrypt_secrets(secrets: Dict[str, str] | None) -> Dict[str, str]:
+        if not secrets:
             return {}
-        return {secret_name: get_encrypter().decrypt(secret_value) for secret_name, secret_value in self.secrets.items()}
+        return {secret_name: get_encrypter().decrypt(secret_value) for secret_name, secret_value in secrets.items()}
+
+    @classmethod
+    async def find_encrypted_secrets(cls, namespace: str, name: str) -> dict | None:
+        """Load only the id, updated_at and encrypted secrets of a template, None if it does not exist."""
+        return await cls.get_pymongo_collection().find_one(
+            {"namespace": namespace, "name": name},
+            projection={"secrets": 1, "updated_at": 1}
+        )
     
     def get_secret(self, secret_name: str) -> str | None:
         if not self.secrets:
@@ -323,6 +335,17 @@ class GraphTemplate(BaseDatabaseModel):
             raise ValueError(f"Graph template not found for namespace: {namespace} and graph name: {graph_name}")
         return graph_template
     
+    @classmethod
+    async def get_retry_policy(cls, namespace: str, graph_name: str) -> RetryPolicyModel:
+        """Load only the retry policy of a template."""
+        data = await cls.get_pymongo_collection().find_one(
+            {"namespace": namespace, "name": graph_name},
+            projection={"retry_policy": 1}
+        )
+        if not data:
+            raise ValueError(f"Graph template not found for namespace: {namespace} and graph name: {graph_name}")
+        return RetryPolicyModel.model_validate(data.get("retry_policy") or {})
+
     @staticmethod
     async def get_valid(namespace: str, graph_name: str, polling_interval: float = 1.0, timeout: float = 300.0) -> "GraphTemplate":
         # Validate polling_interval and timeout
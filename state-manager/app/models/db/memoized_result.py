@@ -0,0 +1,73 @@
+from beanie import Document
+from pydantic import Field
+from pymongo import IndexModel
+from typing import Any
+from datetime import datetime, timedelta, timezone
+import hashlib
+import json
+
+
+def compute_inputs_hash(inputs: dict[str, Any]) -> str:
+    payload = json.dumps(
+        inputs,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=True,
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class MemoizedResult(Document):
+    namespace: str = Field(..., description="Namespace of the node")
+    node_name: str = Field(..., description="Name of the node")
+    inputs_hash: str = Field(..., description="Hash of the inputs the node was executed with")
+    outputs: dict[str, Any] = Field(..., description="Outputs of the execution")
+    expires_at: datetime = Field(..., description="Time after which the result is no longer reused")
+
+    class Settings:
+        name = "memoized_results"
+        indexes = [
+            IndexModel(
+                [
+                    ("namespace", 1),
+                    ("node_name", 1),
+                    ("inputs_hash", 1),
+                ],
+                unique=True,
+                name="uniq_namespace_node_name_inputs_hash"
+            ),
+            IndexModel(
+                [
+                    ("expires_at", 1),
+                ],
+                name="ttl_expires_at",
+                expireAfterSeconds=0
+            )
+        ]
+
+    @staticmethod
+    async def get_outputs(namespace: str, node_name: str, inputs_hashes: list[str]) -> dict[str, dict[str, Any]]:
+        """
+        Read the unexpired results of a node for many inputs with a single query,
+        keyed by inputs hash. Expired documents are filtered out here since the
+        TTL monitor only removes them periodically.
+        """
+        cursor = MemoizedResult.get_pymongo_collection().find(
+            {
+                "namespace": namespace,
+                "node_name": node_name,
+                "inputs_hash": {"$in": inputs_hashes},
+                "expires_at": {"$gt": datetime.now(timezone.utc)}
+            },
+            projection={"_id": 0, "inputs_hash": 1, "outputs": 1}
+        )
+        return {data["inputs_hash"]: data["outputs"] async for data in cursor}
+
+    @staticmethod
+    async def remember(namespace: str, node_name: str, inputs: dict[str, Any], outputs: dict[str, Any], ttl: int) -> None:
+        """Store the outputs of a successful execution for ttl seconds, replacing any previous result."""
+        await MemoizedResult.get_pymongo_collection().update_one(
+            {"namespace": namespace, "node_name": node_name, "inputs_hash": compute_inputs_hash(inputs)},
+            {"$set": {"outputs": outputs, "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl)}},
+            upsert=True
+        )
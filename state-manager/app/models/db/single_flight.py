@@ -0,0 +1,90 @@
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import IndexModel
+from pymongo.errors import BulkWriteError
+from datetime import datetime, timedelta, timezone
+
+# a leader that never reports back must not park its inputs forever
+SINGLE_FLIGHT_TTL = timedelta(days=1)
+
+
+class SingleFlight(Document):
+    namespace: str = Field(..., description="Namespace of the node")
+    node_name: str = Field(..., description="Name of the node")
+    inputs_hash: str = Field(..., description="Hash of the inputs being computed")
+    state_id: PydanticObjectId = Field(..., description="ID of the leader state computing the inputs")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Time the leader was elected")
+
+    class Settings:
+        name = "single_flights"
+        indexes = [
+            IndexModel(
+                [
+                    ("namespace", 1),
+                    ("node_name", 1),
+                    ("inputs_hash", 1),
+                ],
+                unique=True,
+                name="uniq_namespace_node_name_inputs_hash"
+            ),
+            IndexModel(
+                [
+                    ("created_at", 1),
+                ],
+                name="ttl_created_at",
+                expireAfterSeconds=int(SINGLE_FLIGHT_TTL.total_seconds())
+            )
+        ]
+
+    @staticmethod
+    async def claim(namespace: str, node_name: str, candidates: list[tuple[str, PydanticObjectId]]) -> set[PydanticObjectId]:
+        """
+        Try to make each (inputs hash, state id) candidate the leader of its
+        inputs with a single unordered insert. A candidate loses to an earlier
+        candidate with the same inputs, or to a leader already in flight.
+        Returns the ids of the elected leaders.
+        """
+        firsts: dict[str, PydanticObjectId] = {}
+        for inputs_hash, state_id in candidates:
+            firsts.setdefault(inputs_hash, state_id)
+        if len(firsts) == 0:
+            return set()
+
+        documents = [
+            {"namespace": namespace, "node_name": node_name, "inputs_hash": inputs_hash, "state_id": state_id, "created_at": datetime.now(timezone.utc)}
+            for inputs_hash, state_id in firsts.items()
+        ]
+        lost: set[int] = set()
+        try:
+            await SingleFlight.get_pymongo_collection().insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                # anything but a duplicate key means the election itself failed
+                if write_error.get("code") != 11000:
+                    raise
+                lost.add(write_error["index"])
+
+        return {document["state_id"] for index, document in enumerate(documents) if index not in lost}
+
+    @staticmethod
+    async def get_claimed(namespace: str, node_name: str, inputs_hashes: list[str]) -> set[str]:
+        """Return which of the inputs still have a leader in flight."""
+        cursor = SingleFlight.get_pymongo_collection().find(
+            {"namespace": namespace, "node_name": node_name, "inputs_hash": {"$in": inputs_hashes}},
+            projection={"_id": 0, "inputs_hash": 1}
+        )
+        return {data["inputs_hash"] async for data in cursor}
+
+    @staticmethod
+    async def release(namespace: str, node_name: str, inputs_hash: str) -> None:
+        """End the flight of some inputs, the next state with these inputs becomes a leader again."""
+        await SingleFlight.get_pymongo_collection().delete_one(
+            {"namespace": namespace, "node_name": node_name, "inputs_hash": inputs_hash}
+        )
+
+    @staticmethod
+    async def expire() -> None:
+        """End the flights older than SINGLE_FLIGHT_TTL now, rather than when the TTL monitor gets to them."""
+        await SingleFlight.get_pymongo_collection().delete_many(
+            {"created_at": {"$lt": datetime.now(timezone.utc) - SINGLE_FLIGHT_TTL}}
+        )
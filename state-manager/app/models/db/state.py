@@ -1,15 +1,37 @@
-from pymongo import IndexModel
+from pymongo import IndexModel, ReturnDocument
 from .base import BaseDatabaseModel
 from ..state_status_enum import StateStatusEnum
+from .state_record import StateRecord
 from pydantic import Field
 from beanie import Insert, PydanticObjectId, Replace, Save, before_event
 from pymongo.results import InsertManyResult
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
+from datetime import datetime
 import hashlib
 import json
 import time
 import uuid
 
+def compute_state_fingerprint(node_name: str, namespace_name: str, identifier: str, graph_name: str, run_id: str, retry_count: int, parents: dict[str, PydanticObjectId], manual_retry_fanout_id: str) -> str:
+    data = {
+        "node_name": node_name,
+        "namespace_name": namespace_name,
+        "identifier": identifier,
+        "graph_name": graph_name,
+        "run_id": run_id,
+        "retry_count": retry_count,
+        "parents": {k: str(v) for k, v in parents.items()},
+        "manual_retry_fanout_id": manual_retry_fanout_id,
+    }
+    payload = json.dumps(
+        data,
+        sort_keys=True,            # canonical key ordering at all levels
+        separators=(",", ":"),     # no whitespace variance
+        ensure_ascii=True,         # normalized non-ASCII escapes
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
 class State(BaseDatabaseModel):
     node_name: str = Field(..., description="Name of the node of the state")
     namespace_name: str = Field(..., description="Name of the namespace of the state")
@@ -28,39 +50,150 @@ class State(BaseDatabaseModel):
     retry_count: int = Field(default=0, description="Number of times the state has been retried")
     fanout_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Fanout ID of the state")
     manual_retry_fanout_id: str = Field(default="", description="Fanout ID from a manual retry request, ensuring unique retries for unite nodes.")
+    memoize_ttl: Optional[int] = Field(default=None, description="Seconds the outputs of this state are memoized for, None when the node is not memoized")
+    single_flight_key: Optional[str] = Field(default=None, description="Inputs hash of a state of a single flight node, shared by its leader and parked followers")
+    single_flight_release_id: Optional[str] = Field(default=None, description="ID of the release that completed this parked follower")
+    appended_count: int = Field(default=0, description="Number of outputs appended while executing, carried over to retries so a re-run does not append them again")
 
     @before_event([Insert, Replace, Save])
     def _generate_fingerprint(self):
         if not self.does_unites:
             self.state_fingerprint = ""
             return
-        
-        data = {
-            "node_name": self.node_name,
-            "namespace_name": self.namespace_name,
-            "identifier": self.identifier,
-            "graph_name": self.graph_name,
-            "run_id": self.run_id,
-            "retry_count": self.retry_count,
-            "parents": {k: str(v) for k, v in self.parents.items()},
-            "manual_retry_fanout_id": self.manual_retry_fanout_id,
-        }
-        payload = json.dumps(
-            data,
-            sort_keys=True,            # canonical key ordering at all levels
-            separators=(",", ":"),     # no whitespace variance
-            ensure_ascii=True,         # normalized non-ASCII escapes
-        ).encode("utf-8")
-        self.state_fingerprint = hashlib.sha256(payload).hexdigest()    
-    
+
+        self.state_fingerprint = compute_state_fingerprint(
+            node_name=self.node_name,
+            namespace_name=self.namespace_name,
+            identifier=self.identifier,
+            graph_name=self.graph_name,
+            run_id=self.run_id,
+            retry_count=self.retry_count,
+            parents=self.parents,
+            manual_retry_fanout_id=self.manual_retry_fanout_id
+        )
+
     @classmethod
-    async def insert_many(cls, documents: list["State"]) -> InsertManyResult:
+    async def insert_many(cls, documents: list["State"], **pymongo_kwargs: Any) -> InsertManyResult:
         """Override insert_many to ensure fingerprints are generated before insertion."""
         # Generate fingerprints for states that need them
         for state in documents:
             state._generate_fingerprint()
         
-        return await super().insert_many(documents) # type: ignore
+        return await super().insert_many(documents, **pymongo_kwargs) # type: ignore
+
+    @classmethod
+    async def transition(cls, state_id: PydanticObjectId, from_statuses: list[StateStatusEnum] | None, updates: dict[str, Any], unset: list[str] | None = None) -> Optional[StateRecord]:
+        """
+        Atomically $set only the given fields on a state, and $unset the fields in
+        unset, provided it is still in one of from_statuses (any status when None),
+        in a single round trip. Returns the updated state, or None if the state
+        does not exist or has already moved on (e.g. a duplicate notification).
+        """
+        query: dict[str, Any] = {"_id": state_id}
+        if from_statuses is not None:
+            query["status"] = {"$in": from_statuses}
+
+        update: dict[str, Any] = {"$set": {**updates, "updated_at": datetime.now()}}
+        if unset:
+            update["$unset"] = {field: "" for field in unset}
+
+        data = await cls.get_pymongo_collection().find_one_and_update(
+            query,
+            update,
+            return_document=ReturnDocument.AFTER
+        )
+        return StateRecord(data) if data else None
+
+    @classmethod
+    async def get_status(cls, state_id: PydanticObjectId) -> StateStatusEnum | None:
+        """Return only the status of a state, or None if it does not exist."""
+        data = await cls.get_pymongo_collection().find_one({"_id": state_id}, projection={"status": 1})
+        return StateStatusEnum(data["status"]) if data else None
+
+    @classmethod
+    async def find_records(cls, state_ids: list[PydanticObjectId], projection: dict[str, Any] | None = None) -> list[StateRecord]:
+        """Load states as lightweight records, skipping model validation."""
+        cursor = cls.get_pymongo_collection().find({"_id": {"$in": state_ids}}, projection=projection)
+        return [StateRecord(data) async for data in cursor]
+
+    @classmethod
+    async def find_record_chunks(cls, state_ids: list[PydanticObjectId], chunk_size: int, projection: dict[str, Any] | None = None) -> AsyncIterator[list[StateRecord]]:
+        """Stream states as records in lists of at most chunk_size, so callers never hold all of them at once."""
+        cursor = cls.get_pymongo_collection().find({"_id": {"$in": state_ids}}, projection=projection, batch_size=chunk_size)
+        chunk: list[StateRecord] = []
+        async for data in cursor:
+            chunk.append(StateRecord(data))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if len(chunk) > 0:
+            yield chunk
+
+    @classmethod
+    def new_document(
+        cls,
+        *,
+        node_name: str,
+        namespace_name: str,
+        identifier: str,
+        graph_name: str,
+        run_id: str,
+        status: StateStatusEnum,
+        inputs: dict[str, Any],
+        outputs: dict[str, Any],
+        parents: dict[str, PydanticObjectId] | None = None,
+        does_unites: bool = False,
+        error: Optional[str] = None,
+        memoize_ttl: Optional[int] = None,
+        single_flight_key: Optional[str] = None
+    ) -> dict[str, Any]:
+        """
+        Build the raw document of a new state with the same defaults as State,
+        for bulk inserts through insert_documents. Inputs are trusted server
+        side values, so no validation happens here.
+        """
+        parents = parents or {}
+        now = datetime.now()
+        state_fingerprint = ""
+        if does_unites:
+            state_fingerprint = compute_state_fingerprint(
+                node_name=node_name,
+                namespace_name=namespace_name,
+                identifier=identifier,
+                graph_name=graph_name,
+                run_id=run_id,
+                retry_count=0,
+                parents=parents,
+                manual_retry_fanout_id=""
+            )
+        return {
+            "node_name": node_name,
+            "namespace_name": namespace_name,
+            "identifier": identifier,
+            "graph_name": graph_name,
+            "run_id": run_id,
+            "status": status,
+            "inputs": inputs,
+            "outputs": outputs,
+            "data": {},
+            "error": error,
+            "parents": parents,
+            "does_unites": does_unites,
+            "state_fingerprint": state_fingerprint,
+            "enqueue_after": int(time.time() * 1000),
+            "retry_count": 0,
+            "fanout_id": str(uuid.uuid4()),
+            "manual_retry_fanout_id": "",
+            "memoize_ttl": memoize_ttl,
+            "single_flight_key": single_flight_key,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    @classmethod
+    async def insert_documents(cls, documents: list[dict[str, Any]], **pymongo_kwargs: Any) -> InsertManyResult:
+        """Insert documents built by new_document; the driver sets their _id in place."""
+        return await cls.get_pymongo_collection().insert_many(documents, **pymongo_kwargs)
         
     class Settings:
         indexes = [
@@ -102,5 +235,50 @@ class State(BaseDatabaseModel):
                     ("status", 1),
                 ],
                 name="run_id_status_index"
+            ),
+            IndexModel(
+                [
+                    ("run_id", 1),
+                    ("updated_at", 1),
+                    ("_id", 1),
+                ],
+                name="run_id_updated_at_id_index"
+            ),
+            IndexModel(
+                [
+                    ("run_id", 1),
+                    ("identifier", 1),
+                    ("_id", 1),
+                ],
+                name="run_id_identifier_index"
+            ),
+            IndexModel(
+                [
+                    ("single_flight_key", 1),
+                    ("status", 1),
+                ],
+                name="single_flight_key_status_index",
+                partialFilterExpression={
+                    "single_flight_key": {"$type": "string"}
+                }
+            ),
+            IndexModel(
+                [
+                    ("single_flight_release_id", 1),
+                ],
+                name="single_flight_release_id_index",
+                partialFilterExpression={
+                    "single_flight_release_id": {"$type": "string"}
+                }
+            ),
+            IndexModel(
+                [
+                    ("status", 1),
+                    ("updated_at", 1),
+                ],
+                name="parked_updated_at_index",
+                partialFilterExpression={
+                    "status": StateStatusEnum.PARKED.value
+                }
             )
         ]
\ No newline at end of file
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any
+
+from beanie import PydanticObjectId
+
+from ..state_status_enum import StateStatusEnum
+
+
+class StateRecord:
+    """
+    Read-only view over a raw (possibly projected) state document.
+
+    Used on hot paths instead of State so reading a document costs a few
+    attribute assignments rather than a full pydantic validation. Fields left
+    out by a projection fall back to empty values.
+    """
+    __slots__ = (
+        "id",
+        "node_name",
+        "namespace_name",
+        "identifier",
+        "graph_name",
+        "run_id",
+        "status",
+        "inputs",
+        "outputs",
+        "error",
+        "parents",
+        "does_unites",
+        "enqueue_after",
+        "retry_count",
+        "fanout_id",
+        "memoize_ttl",
+        "single_flight_key",
+        "appended_count",
+        "created_at",
+    )
+
+    def __init__(self, data: dict[str, Any]):
+        self.id: PydanticObjectId = data["_id"]
+        self.node_name: str = data.get("node_name", "")
+        self.namespace_name: str = data.get("namespace_name", "")
+        self.identifier: str = data.get("identifier", "")
+        self.graph_name: str = data.get("graph_name", "")
+        self.run_id: str = data.get("run_id", "")
+        self.status: StateStatusEnum | None = StateStatusEnum(data["status"]) if "status" in data else None
+        self.inputs: dict[str, Any] = data.get("inputs", {})
+        self.outputs: dict[str, Any] = data.get("outputs", {})
+        self.error: str | None = data.get("error")
+        self.parents: dict[str, PydanticObjectId] = data.get("parents", {})
+        self.does_unites: bool = data.get("does_unites", False)
+        self.enqueue_after: int = data.get("enqueue_after", 0)
+        self.retry_count: int = data.get("retry_count", 0)
+        self.fanout_id: str = data.get("fanout_id", "")
+        self.memoize_ttl: int | None = data.get("memoize_ttl")
+        self.single_flight_key: str | None = data.get("single_flight_key")
+        self.appended_count: int = data.get("appended_count", 0)
+        self.created_at: datetime | None = data.get("created_at")
@@ -1,6 +1,7 @@
 from beanie import Document
 from pydantic import Field
-from pymongo import IndexModel
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 class Store(Document):
     run_id: str = Field(..., description="Run ID of the corresponding graph execution")
@@ -34,3 +35,63 @@ class Store(Document):
         if store is None:
             return None
         return store.value
+
+    @staticmethod
+    async def get_values(run_id: str, namespace: str, graph_name: str) -> dict[str, str]:
+        """Read every key of a run's store with a single query."""
+        cursor = Store.get_pymongo_collection().find(
+            {"run_id": run_id, "namespace": namespace, "graph_name": graph_name},
+            projection={"_id": 0, "key": 1, "value": 1}
+        )
+        return {data["key"]: data["value"] async for data in cursor}
+
+    @staticmethod
+    async def set_value(run_id: str, namespace: str, graph_name: str, key: str, value: str) -> None:
+        """Create or overwrite a key of a run's store."""
+        await Store.get_pymongo_collection().update_one(
+            {"run_id": run_id, "namespace": namespace, "graph_name": graph_name, "key": key},
+            {"$set": {"value": value}},
+            upsert=True
+        )
+
+    @staticmethod
+    async def compare_and_set(run_id: str, namespace: str, graph_name: str, key: str, expected: str | None, value: str) -> bool:
+        """
+        Set a key only if it currently holds expected, where None means the key
+        must not exist yet. Returns whether the value was swapped.
+        """
+        collection = Store.get_pymongo_collection()
+        if expected is None:
+            try:
+                await collection.insert_one({"run_id": run_id, "namespace": namespace, "graph_name": graph_name, "key": key, "value": value})
+            except DuplicateKeyError:
+                return False
+            return True
+
+        result = await collection.update_one(
+            {"run_id": run_id, "namespace": namespace, "graph_name": graph_name, "key": key, "value": expected},
+            {"$set": {"value": value}}
+        )
+        return result.matched_count == 1
+
+    @staticmethod
+    async def increment(run_id: str, namespace: str, graph_name: str, key: str, by: int) -> str:
+        """
+        Atomically add by to an integer key, a missing key counts as 0. Values stay
+        strings like every other store value, so the addition runs as a pipeline
+        update on the server. Fails if the current value is not an integer.
+        """
+        data = await Store.get_pymongo_collection().find_one_and_update(
+            {"run_id": run_id, "namespace": namespace, "graph_name": graph_name, "key": key},
+            [
+                {
+                    "$set": {
+                        "value": {"$toString": {"$add": [{"$toLong": {"$ifNull": ["$value", "0"]}}, by]}}
+                    }
+                }
+            ],
+            upsert=True,
+            projection={"_id": 0, "value": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        return data["value"]
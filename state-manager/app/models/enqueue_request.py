@@ -3,4 +3,5 @@ from pydantic import BaseModel, Field
 
 class EnqueueRequestModel(BaseModel):
     nodes: list[str] = Field(..., description="Names of the nodes of the states")
-    batch_size: int = Field(..., description="Batch size of the states")
\ No newline at end of file
+    batch_size: int = Field(..., description="Batch size of the states")
+    include_secrets: bool = Field(default=False, description="Whether to return the secrets of the graphs of the claimed states")
\ No newline at end of file
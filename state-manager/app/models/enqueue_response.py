@@ -6,6 +6,7 @@ from datetime import datetime
 class StateModel(BaseModel):
     state_id: str = Field(..., description="ID of the state")
     node_name: str = Field(..., description="Name of the node of the state")
+    graph_name: str = Field(..., description="Name of the graph of the state")
     identifier: str = Field(..., description="Identifier of the node for which state is created")
     inputs: dict[str, Any] = Field(..., description="Inputs of the state")
     created_at: datetime = Field(..., description="Date and time when the state was created")
@@ -17,3 +18,4 @@ class EnqueueResponseModel(BaseModel):
     namespace: str = Field(..., description="ID of the namespace")
     status: str = Field(..., description="Status of the state")
     states: list[StateModel] = Field(..., description="List of states")
+    secrets: dict[str, dict[str, str]] | None = Field(default=None, description="Secrets of each graph of the states, by graph name, only when requested")
@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Literal
+from .state_status_enum import StateStatusEnum
+from .run_models import RunStatusEnum
+
+
+class StateEventModel(BaseModel):
+    """Event published whenever a state is created or changes status"""
+    type: Literal["state"] = Field(default="state", description="Type of the event")
+    state_id: str = Field(..., description="ID of the state")
+    run_id: str = Field(..., description="Run ID of the state")
+    namespace_name: str = Field(..., description="Namespace of the state")
+    graph_name: str = Field(..., description="Graph name of the state")
+    node_name: str = Field(..., description="Name of the node of the state")
+    identifier: str = Field(..., description="Identifier of the node for which state is created")
+    status: StateStatusEnum = Field(..., description="Status of the state after the transition")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Date and time of the transition")
+
+
+class RunCompletedEventModel(BaseModel):
+    """Event sent on a run stream once no state of the run is pending anymore"""
+    type: Literal["run_completed"] = Field(default="run_completed", description="Type of the event")
+    run_id: str = Field(..., description="Run ID of the completed run")
+    namespace_name: str = Field(..., description="Namespace of the run")
+    status: RunStatusEnum = Field(..., description="Final status of the run")
@@ -7,4 +7,13 @@ class ExecutedRequestModel(BaseModel):
 
 
 class ExecutedResponseModel(BaseModel):
-    status: StateStatusEnum = Field(..., description="Status of the state")
\ No newline at end of file
+    status: StateStatusEnum = Field(..., description="Status of the state")
+
+class AppendOutputsRequestModel(BaseModel):
+    outputs: List[dict[str, Any]] = Field(..., min_length=1, max_length=1000, description="Chunk of outputs produced so far by a state that is still executing")
+    offset: int = Field(default=0, ge=0, description="Position of the first output of the chunk among all outputs appended by the state")
+
+
+class AppendOutputsResponseModel(BaseModel):
+    status: StateStatusEnum = Field(..., description="Status of the state, which stays queued until it is executed")
+    count: int = Field(..., description="Number of states created for the appended outputs")
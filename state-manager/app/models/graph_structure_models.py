@@ -11,6 +11,15 @@ class GraphNode(BaseModel):
     error: Optional[str] = Field(None, description="Error message if any")
 
 
+class CollapsedGraphNode(BaseModel):
+    """Represents all fan-out siblings of one identifier collapsed into a single node"""
+    id: str = Field(..., description="Unique identifier for the collapsed node")
+    node_name: str = Field(..., description="Name of the node")
+    identifier: str = Field(..., description="Identifier of the node")
+    state_count: int = Field(..., description="Number of states collapsed into this node")
+    status_counts: Dict[str, int] = Field(..., description="Number of collapsed states per status")
+
+
 class GraphEdge(BaseModel):
     """Represents an edge in the graph structure"""
     source: str = Field(..., description="Source node ID")
@@ -22,7 +31,16 @@ class GraphStructureResponse(BaseModel):
     root_states: List[GraphNode] = Field(..., description="Roots")
     graph_name: str = Field(..., description="Graph name")
     nodes: List[GraphNode] = Field(..., description="List of nodes in the graph")
+    collapsed_nodes: List[CollapsedGraphNode] = Field(default_factory=list, description="Fan-out siblings collapsed by identifier, edges may reference their IDs")
     edges: List[GraphEdge] = Field(..., description="List of edges in the graph")
     node_count: int = Field(..., description="Number of nodes")
     edge_count: int = Field(..., description="Number of edges")
     execution_summary: Dict[str, int] = Field(..., description="Summary of execution statuses")
+
+
+class GraphDiffResponse(BaseModel):
+    """Response model for incremental graph structure API"""
+    nodes: List[GraphNode] = Field(..., description="Nodes created or updated since the cursor")
+    edges: List[GraphEdge] = Field(..., description="Edges from the changed nodes to their direct parents")
+    cursor: Optional[str] = Field(None, description="Cursor to pass on the next call to only receive later changes")
+    has_more: bool = Field(..., description="Whether more changes are pending after this cursor")
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class NodeMemoMetricsModel(BaseModel):
+    node_name: str = Field(..., description="Name of the memoized node")
+    hits: int = Field(..., description="States completed from a memoized result")
+    misses: int = Field(..., description="States enqueued because no memoized result was found")
+
+
+class MemoMetricsResponseModel(BaseModel):
+    namespace: str = Field(..., description="The namespace")
+    nodes: List[NodeMemoMetricsModel] = Field(..., description="Memoization metrics of each memoized node, counted since this replica started")
@@ -14,6 +14,10 @@ class Unites(BaseModel):
     strategy: UnitesStrategyEnum = Field(default=UnitesStrategyEnum.ALL_SUCCESS, description="Strategy of the unites")
 
 
+class Memoize(BaseModel):
+    ttl: int = Field(default=3600, gt=0, description="Seconds a successful result of the node is reused for")
+
+
 class NodeTemplate(BaseModel):
     node_name: str = Field(..., description="Name of the node")
     namespace: str = Field(..., description="Namespace of the node")
@@ -21,6 +25,8 @@ class NodeTemplate(BaseModel):
     inputs: dict[str, Any] = Field(..., description="Inputs of the node")
     next_nodes: Optional[List[str]] = Field(None, description="Next nodes to execute")
     unites: Optional[Unites] = Field(None, description="Unites of the node")
+    memoize: Optional[Memoize] = Field(None, description="Reuse the outputs of earlier executions of the node with the same inputs")
+    single_flight: bool = Field(False, description="Execute states of the node with the same inputs only once while one of them is in flight")
 
     @field_validator('node_name')
     @classmethod
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+from .state_status_enum import StateStatusEnum
+
+
+class ReleaseStatesRequestModel(BaseModel):
+    state_ids: list[str] = Field(..., min_length=1, max_length=1000, description="IDs of queued states the runtime claimed but will not execute")
+
+
+class ReleaseStatesResponseModel(BaseModel):
+    count: int = Field(..., description="Number of states released, states that were no longer queued are left as they are")
+    status: StateStatusEnum = Field(..., description="Status the released states were moved to")
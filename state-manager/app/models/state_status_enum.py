@@ -7,6 +7,7 @@ class StateStatusEnum(str, Enum):
     CREATED = 'CREATED'
     QUEUED = 'QUEUED'
     EXECUTED = 'EXECUTED'
+    PARKED = 'PARKED'
 
     # Errored
     ERRORED = 'ERRORED'
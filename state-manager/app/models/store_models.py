@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class StoreValueResponseModel(BaseModel):
+    key: str = Field(..., description="Key of the run store")
+    value: Optional[str] = Field(None, description="Current value of the key, None if the key is not set")
+
+
+class SetStoreValueRequestModel(BaseModel):
+    value: str = Field(..., description="Value to set")
+
+
+class CompareAndSetStoreRequestModel(BaseModel):
+    expected: Optional[str] = Field(..., description="Value the key must currently hold, None if the key must not be set yet")
+    value: str = Field(..., description="Value to set if the key holds the expected value")
+
+
+class CompareAndSetStoreResponseModel(BaseModel):
+    key: str = Field(..., description="Key of the run store")
+    swapped: bool = Field(..., description="Whether the value was set")
+    value: Optional[str] = Field(None, description="Value of the key after the operation")
+
+
+class IncrementStoreRequestModel(BaseModel):
+    by: int = Field(default=1, description="Amount to add to the integer value of the key, a missing key counts as 0")
@@ -1,11 +1,35 @@
 from pydantic import BaseModel, Field
+from typing import Any, Optional
 from .state_status_enum import StateStatusEnum
+from .run_models import RunStatusEnum
 
 class TriggerGraphRequestModel(BaseModel):
     store: dict[str, str] = Field(default_factory=dict, description="Store for the runtime")
     inputs: dict[str, str] = Field(default_factory=dict, description="Inputs for the graph execution")
     start_delay: int = Field(default=0, ge=0, description="Start delay in milliseconds")
+    wait: bool = Field(default=False, description="Hold the request open until the run completes or wait_timeout elapses")
+    wait_timeout: float = Field(default=30, gt=0, le=300, description="Maximum time in seconds to wait for the run to complete")
+
+class BulkTriggerItemModel(BaseModel):
+    store: dict[str, str] = Field(default_factory=dict, description="Store for the runtime")
+    inputs: dict[str, str] = Field(default_factory=dict, description="Inputs for the graph execution")
+    start_delay: int = Field(default=0, ge=0, description="Start delay in milliseconds")
+
+class BulkTriggerGraphRequestModel(BaseModel):
+    triggers: list[BulkTriggerItemModel] = Field(..., min_length=1, max_length=10000, description="Runs to trigger, one per item")
+
+class BulkTriggerGraphResponseModel(BaseModel):
+    status: StateStatusEnum = Field(..., description="Status of the root states")
+    run_ids: list[str] = Field(..., description="Run IDs in the same order as the triggers")
+
+class LeafOutputModel(BaseModel):
+    state_id: str = Field(..., description="ID of the leaf state")
+    identifier: str = Field(..., description="Identifier of the leaf node")
+    node_name: str = Field(..., description="Name of the leaf node")
+    outputs: dict[str, Any] = Field(..., description="Outputs of the leaf state")
 
 class TriggerGraphResponseModel(BaseModel):
     status: StateStatusEnum = Field(..., description="Status of the states")
-    run_id: str = Field(..., description="Unique run ID generated for this graph execution")
\ No newline at end of file
+    run_id: str = Field(..., description="Unique run ID generated for this graph execution")
+    run_status: Optional[RunStatusEnum] = Field(None, description="Status of the run, only set when waiting for the run (PENDING if the wait timed out)")
+    outputs: Optional[list[LeafOutputModel]] = Field(None, description="Outputs of the successful leaf states, only set when the run completed while waiting")
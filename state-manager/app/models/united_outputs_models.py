@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+
+class UnitedOutputModel(BaseModel):
+    state_id: str = Field(..., description="ID of the state that produced the outputs")
+    outputs: dict[str, Any] = Field(..., description="Outputs of the state")
+
+
+class UnitedOutputsResponseModel(BaseModel):
+    outputs: List[UnitedOutputModel] = Field(..., description="Outputs of the united states after the cursor, in creation order")
+    cursor: Optional[str] = Field(None, description="Cursor to pass on the next call to continue after this page")
+    has_more: bool = Field(..., description="Whether more outputs may follow this page")
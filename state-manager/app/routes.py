@@ -1,4 +1,5 @@
 from fastapi import APIRouter, status, Request, Depends, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from uuid import uuid4
 from beanie import PydanticObjectId
 
@@ -8,12 +9,16 @@ from app.singletons.logs_manager import LogsManager
 from .models.enqueue_response import EnqueueResponseModel
 from .models.enqueue_request import EnqueueRequestModel
 from .controller.enqueue_states import enqueue_states
+from .models.release_states_models import ReleaseStatesRequestModel, ReleaseStatesResponseModel
+from .controller.release_states import release_states
 
-from .models.trigger_graph_model import TriggerGraphRequestModel, TriggerGraphResponseModel
+from .models.trigger_graph_model import TriggerGraphRequestModel, TriggerGraphResponseModel, BulkTriggerGraphRequestModel, BulkTriggerGraphResponseModel
 from .controller.trigger_graph import trigger_graph
+from .controller.bulk_trigger_graph import bulk_trigger_graph
 
-from .models.executed_models import ExecutedRequestModel, ExecutedResponseModel
+from .models.executed_models import ExecutedRequestModel, ExecutedResponseModel, AppendOutputsRequestModel, AppendOutputsResponseModel
 from .controller.executed_state import executed_state
+from .controller.append_outputs import append_outputs
 
 from .models.errored_models import ErroredRequestModel, ErroredResponseModel
 from .controller.errored_state import errored_state
@@ -28,6 +33,17 @@ from .controller.register_nodes import register_nodes
 
 from .models.secrets_response import SecretsResponseModel
 from .controller.get_secrets import get_secrets
+from .models.bulk_secrets_models import BulkSecretsRequestModel, BulkSecretsResponseModel
+from .controller.get_bulk_secrets import get_bulk_secrets
+
+from .models.store_models import StoreValueResponseModel, SetStoreValueRequestModel, CompareAndSetStoreRequestModel, CompareAndSetStoreResponseModel, IncrementStoreRequestModel
+from .controller.run_store import get_store_value, set_store_value, compare_and_set_store_value, increment_store_value
+
+from .models.united_outputs_models import UnitedOutputsResponseModel
+from .controller.get_united_outputs import get_united_outputs
+
+from .models.memo_metrics_models import MemoMetricsResponseModel
+from .controller.get_memo_metrics import get_memo_metrics
 
 from .models.list_models import ListRegisteredNodesResponse, ListGraphTemplatesResponse, ListNamespacesResponse
 from .controller.list_registered_nodes import list_registered_nodes
@@ -37,12 +53,15 @@ from .controller.list_namespaces import list_namespaces
 from .models.run_models import RunsResponse
 from .controller.get_runs import get_runs
 
-from .models.graph_structure_models import GraphStructureResponse
+from .models.graph_structure_models import GraphStructureResponse, GraphDiffResponse
 from .controller.get_graph_structure import get_graph_structure
+from .controller.get_graph_structure_diff import get_graph_structure_diff
 
 from .models.node_run_details_models import NodeRunDetailsResponse
 from .controller.get_node_run_details import get_node_run_details
 
+from .controller.stream_events import stream_events, check_run_exists
+
 ### signals
 from .models.signal_models import SignalResponseModel
 from .models.signal_models import PruneRequestModel
@@ -84,6 +103,26 @@ async def enqueue_state(namespace_name: str, body: EnqueueRequestModel, request:
     return await enqueue_states(namespace_name, body, x_exosphere_request_id)
 
 
+@router.post(
+    "/states/release",
+    response_model=ReleaseStatesResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Queued states released back to created successfully",
+    tags=["state"]
+)
+async def release_states_route(namespace_name: str, body: ReleaseStatesRequestModel, request: Request, api_key: str = Depends(check_api_key)):
+
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await release_states(namespace_name, body, x_exosphere_request_id)
+
+
 @router.post(
     "/graph/{graph_name}/trigger",
     response_model=TriggerGraphResponseModel,
@@ -103,6 +142,25 @@ async def trigger_graph_route(namespace_name: str, graph_name: str, body: Trigge
 
     return await trigger_graph(namespace_name, graph_name, body, x_exosphere_request_id)
 
+@router.post(
+    "/graph/{graph_name}/trigger/bulk",
+    response_model=BulkTriggerGraphResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Graph triggered successfully for every item with new run IDs",
+    tags=["graph"]
+)
+async def bulk_trigger_graph_route(namespace_name: str, graph_name: str, body: BulkTriggerGraphRequestModel, request: Request, api_key: str = Depends(check_api_key)):
+
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await bulk_trigger_graph(namespace_name, graph_name, body, x_exosphere_request_id)
+
 @router.post(
     "/state/{state_id}/executed",
     response_model=ExecutedResponseModel,
@@ -123,6 +181,26 @@ async def executed_state_route(namespace_name: str, state_id: str, body: Execute
     return await executed_state(namespace_name, PydanticObjectId(state_id), body, x_exosphere_request_id, background_tasks)
 
 
+@router.post(
+    "/state/{state_id}/executed/append",
+    response_model=AppendOutputsResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Outputs appended successfully",
+    tags=["state"]
+)
+async def append_outputs_route(namespace_name: str, state_id: str, body: AppendOutputsRequestModel, request: Request, background_tasks: BackgroundTasks, api_key: str = Depends(check_api_key)):
+
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await append_outputs(namespace_name, PydanticObjectId(state_id), body, x_exosphere_request_id, background_tasks)
+
+
 @router.post(
     "/state/{state_id}/errored",
     response_model=ErroredResponseModel,
@@ -276,6 +354,120 @@ async def get_secrets_route(namespace_name: str, state_id: str, request: Request
     return await get_secrets(namespace_name, state_id, x_exosphere_request_id)
 
 
+@router.post(
+    "/secrets",
+    response_model=BulkSecretsResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Secrets of the requested graphs retrieved successfully",
+    tags=["graph"]
+)
+async def get_bulk_secrets_route(namespace_name: str, body: BulkSecretsRequestModel, request: Request, api_key: str = Depends(check_api_key)):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await get_bulk_secrets(namespace_name, body, x_exosphere_request_id)
+
+
+@router.get(
+    "/state/{state_id}/store/{key}",
+    response_model=StoreValueResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Store value retrieved successfully",
+    tags=["state"]
+)
+async def get_store_value_route(namespace_name: str, state_id: str, key: str, request: Request, api_key: str = Depends(check_api_key)):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await get_store_value(namespace_name, PydanticObjectId(state_id), key, x_exosphere_request_id)
+
+
+@router.put(
+    "/state/{state_id}/store/{key}",
+    response_model=StoreValueResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Store value set successfully",
+    tags=["state"]
+)
+async def set_store_value_route(namespace_name: str, state_id: str, key: str, body: SetStoreValueRequestModel, request: Request, api_key: str = Depends(check_api_key)):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await set_store_value(namespace_name, PydanticObjectId(state_id), key, body, x_exosphere_request_id)
+
+
+@router.post(
+    "/state/{state_id}/store/{key}/compare-and-set",
+    response_model=CompareAndSetStoreResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Store value compared and set successfully",
+    tags=["state"]
+)
+async def compare_and_set_store_value_route(namespace_name: str, state_id: str, key: str, body: CompareAndSetStoreRequestModel, request: Request, api_key: str = Depends(check_api_key)):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await compare_and_set_store_value(namespace_name, PydanticObjectId(state_id), key, body, x_exosphere_request_id)
+
+
+@router.post(
+    "/state/{state_id}/store/{key}/increment",
+    response_model=StoreValueResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Store value incremented successfully",
+    tags=["state"]
+)
+async def increment_store_value_route(namespace_name: str, state_id: str, key: str, body: IncrementStoreRequestModel, request: Request, api_key: str = Depends(check_api_key)):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await increment_store_value(namespace_name, PydanticObjectId(state_id), key, body, x_exosphere_request_id)
+
+
+@router.get(
+    "/state/{state_id}/united-outputs",
+    response_model=UnitedOutputsResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="United outputs retrieved successfully",
+    tags=["state"]
+)
+async def get_united_outputs_route(namespace_name: str, state_id: str, identifier: str, request: Request, api_key: str = Depends(check_api_key), cursor: str | None = None, limit: int = 500):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await get_united_outputs(namespace_name, PydanticObjectId(state_id), identifier, cursor, limit, x_exosphere_request_id)
+
+
 @router.get(
     "/nodes/",
     response_model=ListRegisteredNodesResponse,
@@ -300,6 +492,25 @@ async def list_registered_nodes_route(namespace_name: str, request: Request, api
     )
 
 
+@router.get(
+    "/nodes/memoization",
+    response_model=MemoMetricsResponseModel,
+    status_code=status.HTTP_200_OK,
+    response_description="Memoization metrics fetched successfully",
+    tags=["nodes"]
+)
+async def get_memo_metrics_route(namespace_name: str, request: Request, api_key: str = Depends(check_api_key)):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await get_memo_metrics(namespace_name, x_exosphere_request_id)
+
+
 @router.get(
     "/graphs/",
     response_model=ListGraphTemplatesResponse,
@@ -350,7 +561,26 @@ async def get_runs_route(namespace_name: str, page: int, size: int, request: Req
     response_description="Graph structure for run ID retrieved successfully",
     tags=["runs"]
 )
-async def get_graph_structure_route(namespace_name: str, run_id: str, request: Request, api_key: str = Depends(check_api_key)):
+async def get_graph_structure_route(namespace_name: str, run_id: str, request: Request, api_key: str = Depends(check_api_key), collapse_threshold: int | None = None):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    return await get_graph_structure(namespace_name, run_id, x_exosphere_request_id, collapse_threshold)
+
+
+@router.get(
+    "/states/run/{run_id}/graph/diff",
+    response_model=GraphDiffResponse,
+    status_code=status.HTTP_200_OK,
+    response_description="Graph structure changes for run ID retrieved successfully",
+    tags=["runs"]
+)
+async def get_graph_structure_diff_route(namespace_name: str, run_id: str, request: Request, api_key: str = Depends(check_api_key), cursor: str | None = None, limit: int = 1000):
     x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
 
     if api_key:
@@ -359,7 +589,7 @@ async def get_graph_structure_route(namespace_name: str, run_id: str, request: R
         logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
 
-    return await get_graph_structure(namespace_name, run_id, x_exosphere_request_id)
+    return await get_graph_structure_diff(namespace_name, run_id, cursor, limit, x_exosphere_request_id)
 
 
 @router.get(
@@ -381,6 +611,32 @@ async def get_node_run_details_route(namespace_name: str, graph_name: str, run_i
     return await get_node_run_details(namespace_name, graph_name, run_id, node_id, x_exosphere_request_id)
 
 
+@router.get(
+    "/events",
+    status_code=status.HTTP_200_OK,
+    response_class=StreamingResponse,
+    response_description="Server-sent events of state transitions in the namespace, or in a single run",
+    tags=["runs"]
+)
+async def stream_events_route(namespace_name: str, request: Request, api_key: str = Depends(check_api_key), run_id: str | None = None):
+    x_exosphere_request_id = getattr(request.state, "x_exosphere_request_id", str(uuid4()))
+
+    if api_key:
+        logger.info(f"API key is valid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+    else:
+        logger.error(f"API key is invalid for namespace {namespace_name}", x_exosphere_request_id=x_exosphere_request_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key")
+
+    if run_id is not None:
+        await check_run_exists(namespace_name, run_id, x_exosphere_request_id)
+
+    return StreamingResponse(
+        stream_events(namespace_name, run_id, x_exosphere_request_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # Global endpoints (not namespace-specific)
 @global_router.get(
     "/namespaces",
@@ -0,0 +1,200 @@
+import asyncio
+import time
+
+from beanie import PydanticObjectId
+from bson import Timestamp
+
+from .SingletonDecorator import singleton
+from .logs_manager import LogsManager
+from ..config.settings import get_settings
+from ..models.db.state import State
+from ..models.db.state_record import StateRecord
+from ..models.event_models import StateEventModel
+from ..models.state_status_enum import StateStatusEnum
+
+logger = LogsManager().get_logger()
+
+CHANGE_STREAM_MODE = "change_stream"
+
+
+class Subscription:
+    """
+    A bounded queue of state events for one listener, optionally scoped to a run.
+    When the listener falls behind, the oldest events are dropped so a slow
+    client can never grow the server's memory.
+    """
+
+    def __init__(self, namespace_name: str, run_id: str | None = None, max_size: int = 1024):
+        self.namespace_name = namespace_name
+        self.run_id = run_id
+        self._queue: asyncio.Queue[StateEventModel] = asyncio.Queue(maxsize=max_size)
+
+    def matches(self, event: StateEventModel) -> bool:
+        if event.namespace_name != self.namespace_name:
+            return False
+        return self.run_id is None or event.run_id == self.run_id
+
+    def put(self, event: StateEventModel) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def get(self) -> StateEventModel:
+        return await self._queue.get()
+
+
+@singleton
+class EventBus:
+    """
+    In-process fan-out of state transitions to subscribers (SSE streams and
+    waiting triggers). Controllers publish after every transition they make.
+
+    In 'change_stream' mode the controllers' publishes are ignored and events
+    are sourced from a MongoDB change stream instead, so every replica sees
+    the transitions made by every other replica. The stream is only open
+    while someone is subscribed.
+    """
+
+    def __init__(self):
+        self._subscriptions: set[Subscription] = set()
+        self._use_change_stream = get_settings().event_bus_mode == CHANGE_STREAM_MODE
+        self._subscribed = asyncio.Event()
+        self._subscribed_since = time.time()
+
+    def subscribe(self, namespace_name: str, run_id: str | None = None) -> Subscription:
+        subscription = Subscription(namespace_name, run_id)
+        if len(self._subscriptions) == 0:
+            self._subscribed_since = time.time()
+        self._subscriptions.add(subscription)
+        self._subscribed.set()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+        if len(self._subscriptions) == 0:
+            self._subscribed.clear()
+
+    def has_subscribers(self) -> bool:
+        return not self._use_change_stream and len(self._subscriptions) > 0
+
+    def deliver(self, event: StateEventModel) -> None:
+        for subscription in list(self._subscriptions):
+            if subscription.matches(event):
+                subscription.put(event)
+
+    def publish(self, state: State | StateRecord, status: StateStatusEnum | None = None, state_id: PydanticObjectId | None = None) -> None:
+        """Publish a transition of a state the caller already holds in memory."""
+        if not self.has_subscribers():
+            return
+        self.deliver(
+            StateEventModel(
+                state_id=str(state_id or state.id),
+                run_id=state.run_id,
+                namespace_name=state.namespace_name,
+                graph_name=state.graph_name,
+                node_name=state.node_name,
+                identifier=state.identifier,
+                status=status or state.status # type: ignore
+            )
+        )
+
+    def publish_inserted(self, states: list[State], inserted_ids: list) -> None:
+        """Publish the creation of states inserted in bulk, which do not carry their ids."""
+        if not self.has_subscribers():
+            return
+        for state, state_id in zip(states, inserted_ids):
+            self.publish(state, state_id=state_id)
+
+    def publish_documents(self, documents: list[dict]) -> None:
+        """Publish the creation of raw state documents inserted with State.insert_documents."""
+        if not self.has_subscribers():
+            return
+        for document in documents:
+            self.publish(StateRecord(document))
+
+    async def publish_by_ids(self, state_ids: list[PydanticObjectId], status: StateStatusEnum) -> None:
+        """
+        Publish a transition made by a bulk update. The states are only looked up
+        (with a narrow projection) when someone is listening.
+        """
+        if not self.has_subscribers() or len(state_ids) == 0:
+            return
+        try:
+            cursor = State.get_pymongo_collection().find(
+                {"_id": {"$in": state_ids}},
+                projection={"run_id": 1, "namespace_name": 1, "graph_name": 1, "node_name": 1, "identifier": 1}
+            )
+            async for data in cursor:
+                self.deliver(
+                    StateEventModel(
+                        state_id=str(data["_id"]),
+                        run_id=data["run_id"],
+                        namespace_name=data["namespace_name"],
+                        graph_name=data["graph_name"],
+                        node_name=data["node_name"],
+                        identifier=data["identifier"],
+                        status=status
+                    )
+                )
+        except Exception as e:
+            logger.error(f"Error publishing {status} events for {len(state_ids)} states: {e}")
+
+    async def watch_change_stream(self) -> None:
+        """
+        Feed subscribers from a MongoDB change stream on the states collection, requires a replica set.
+
+        The stream is opened when the first listener subscribes, starting from the
+        time it subscribed so transitions made while the stream opens are not
+        missed, and closed within a second of the last listener leaving. After a
+        failure the stream resumes where it stopped.
+        """
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}},
+            {
+                "$project": {
+                    "fullDocument._id": 1,
+                    "fullDocument.run_id": 1,
+                    "fullDocument.namespace_name": 1,
+                    "fullDocument.graph_name": 1,
+                    "fullDocument.node_name": 1,
+                    "fullDocument.identifier": 1,
+                    "fullDocument.status": 1,
+                }
+            }
+        ]
+        resume_token = None
+        while True:
+            await self._subscribed.wait()
+            if resume_token is not None:
+                start = {"resume_after": resume_token}
+            else:
+                start = {"start_at_operation_time": Timestamp(int(self._subscribed_since) - 1, 0)}
+            try:
+                async with await State.get_pymongo_collection().watch(pipeline, full_document="updateLookup", max_await_time_ms=1000, **start) as stream:
+                    while self._subscribed.is_set():
+                        change = await stream.try_next()
+                        resume_token = stream.resume_token
+                        data = change.get("fullDocument") if change else None
+                        if not data:
+                            continue
+                        self.deliver(
+                            StateEventModel(
+                                state_id=str(data["_id"]),
+                                run_id=data["run_id"],
+                                namespace_name=data["namespace_name"],
+                                graph_name=data["graph_name"],
+                                node_name=data["node_name"],
+                                identifier=data["identifier"],
+                                status=data["status"]
+                            )
+                        )
+                # closed for lack of listeners, the next ones start from when they subscribed
+                resume_token = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"State change stream failed, restarting: {e}")
+                await asyncio.sleep(1)
+
+    def uses_change_stream(self) -> bool:
+        return self._use_change_stream
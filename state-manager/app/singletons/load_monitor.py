@@ -0,0 +1,101 @@
+import math
+import time
+
+from pymongo import monitoring
+
+from .SingletonDecorator import singleton
+from ..config.settings import get_settings
+
+MAX_RETRY_AFTER = 30
+
+# commands that wait by design (change streams, topology checks) say nothing about saturation
+IGNORED_COMMANDS = {"getMore", "hello", "isMaster", "ismaster", "ping", "killCursors", "endSessions"}
+
+
+@singleton
+class LoadMonitor:
+    """
+    Saturation of this replica: requests being handled, background tasks
+    still running after their response was sent, and the average latency of
+    MongoDB commands. Requests arriving while any of them is above its limit
+    are shed with a Retry-After that grows with the overload.
+
+    A limit of 0 disables its check.
+    """
+
+    def __init__(self, latency_window: float = 10.0):
+        settings = get_settings()
+        self._max_in_flight_requests = settings.max_in_flight_requests
+        self._max_background_tasks = settings.max_background_tasks
+        self._max_mongo_latency_ms = settings.max_mongo_latency_ms
+        self._latency_window = latency_window
+        self._in_flight_requests = 0
+        self._background_tasks = 0
+        self._mongo_latency_ms: float | None = None
+        self._mongo_latency_at = 0.0
+
+    def request_started(self) -> None:
+        self._in_flight_requests += 1
+
+    def request_responded(self) -> None:
+        self._in_flight_requests -= 1
+
+    def background_started(self) -> None:
+        self._background_tasks += 1
+
+    def background_finished(self) -> None:
+        self._background_tasks -= 1
+
+    def record_mongo_latency(self, latency_ms: float) -> None:
+        self._mongo_latency_ms = latency_ms if self._mongo_latency_ms is None else 0.2 * latency_ms + 0.8 * self._mongo_latency_ms
+        self._mongo_latency_at = time.monotonic()
+
+    def mongo_latency_ms(self) -> float | None:
+        """Average latency of recent MongoDB commands, None when there were none lately."""
+        if self._mongo_latency_ms is None or time.monotonic() - self._mongo_latency_at > self._latency_window:
+            return None
+        return self._mongo_latency_ms
+
+    def overload(self) -> tuple[int, int] | None:
+        """
+        Return the (status code, Retry-After seconds) to shed a request with, or
+        None when the replica can take it. Too many requests answer 429, a
+        saturated database or background backlog 503.
+        """
+        requests_ratio = self._ratio(self._in_flight_requests, self._max_in_flight_requests)
+        mongo_latency_ms = self.mongo_latency_ms()
+        backend_ratio = max(
+            self._ratio(self._background_tasks, self._max_background_tasks),
+            self._ratio(mongo_latency_ms or 0, self._max_mongo_latency_ms)
+        )
+
+        if backend_ratio >= 1:
+            return 503, min(MAX_RETRY_AFTER, math.ceil(backend_ratio))
+        if requests_ratio >= 1:
+            return 429, min(MAX_RETRY_AFTER, math.ceil(requests_ratio))
+        return None
+
+    def _ratio(self, value: float, limit: float) -> float:
+        return value / limit if limit > 0 else 0.0
+
+    def metrics(self) -> dict[str, float | int | None]:
+        return {
+            "in_flight_requests": self._in_flight_requests,
+            "background_tasks": self._background_tasks,
+            "mongo_latency_ms": self.mongo_latency_ms(),
+        }
+
+
+class MongoLatencyListener(monitoring.CommandListener):
+    """Feeds the duration of every MongoDB command to the LoadMonitor."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        if event.command_name not in IGNORED_COMMANDS:
+            LoadMonitor().record_mongo_latency(event.duration_micros / 1000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        if event.command_name not in IGNORED_COMMANDS:
+            LoadMonitor().record_mongo_latency(event.duration_micros / 1000)
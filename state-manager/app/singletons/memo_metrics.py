@@ -0,0 +1,32 @@
+from .SingletonDecorator import singleton
+
+MemoKey = tuple[str, str]
+
+
+@singleton
+class MemoMetrics:
+    """
+    Hits and misses of node memoization per (namespace, node name), counted
+    since this replica started.
+    """
+
+    def __init__(self):
+        self._hits: dict[MemoKey, int] = {}
+        self._misses: dict[MemoKey, int] = {}
+
+    def record(self, namespace: str, node_name: str, hits: int, misses: int) -> None:
+        key = (namespace, node_name)
+        self._hits[key] = self._hits.get(key, 0) + hits
+        self._misses[key] = self._misses.get(key, 0) + misses
+
+    def get(self, namespace: str) -> dict[str, tuple[int, int]]:
+        """Return (hits, misses) of every memoized node of a namespace."""
+        return {
+            node_name: (hits, self._misses.get((key_namespace, node_name), 0))
+            for (key_namespace, node_name), hits in self._hits.items()
+            if key_namespace == namespace
+        }
+
+    def clear(self) -> None:
+        self._hits.clear()
+        self._misses.clear()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+from .SingletonDecorator import singleton
+from ..models.db.graph_template_model import GraphTemplate
+
+SecretsKey = tuple[str, str]
+SecretsVersion = tuple[Any, datetime | None]
+
+
+@singleton
+class SecretsCache:
+    """
+    Bounded LRU cache of the decrypted secrets of graph templates, so templates
+    are loaded and decrypted once per change rather than once per state.
+
+    Each entry remembers the id and updated_at of the template it was decrypted
+    from. Upserts through this state manager wipe the graph, upserts made on
+    other replicas are picked up once the entry expires. An expired entry is
+    revalidated with a projected query and only decrypted again when the
+    template version changed.
+    """
+
+    def __init__(self, max_graphs: int = 1024, ttl: float = 60.0):
+        self._max_graphs = max_graphs
+        self._ttl = ttl
+        self._entries: OrderedDict[SecretsKey, tuple[float, SecretsVersion, dict[str, str]]] = OrderedDict()
+        self._loading: dict[SecretsKey, asyncio.Future[tuple[SecretsVersion, dict[str, str]] | None]] = {}
+
+    async def get_secrets(self, namespace: str, graph_name: str) -> dict[str, str] | None:
+        """Decrypted secrets of a graph, None if the graph template does not exist."""
+        key = (namespace, graph_name)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, _, secrets = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return secrets
+
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(key, entry))
+            self._loading[key] = loading
+            loading.add_done_callback(lambda future: self._loaded(key, future))
+
+        loaded = await asyncio.shield(loading)
+        return loaded[1] if loaded is not None else None
+
+    async def _load(self, key: SecretsKey, stale: tuple[float, SecretsVersion, dict[str, str]] | None) -> tuple[SecretsVersion, dict[str, str]] | None:
+        data = await GraphTemplate.find_encrypted_secrets(*key)
+        if data is None:
+            return None
+
+        version = (data["_id"], data.get("updated_at"))
+        if stale is not None and stale[1] == version:
+            return version, stale[2]
+        return version, GraphTemplate.decrypt_secrets(data.get("secrets"))
+
+    def _loaded(self, key: SecretsKey, future: asyncio.Future[tuple[SecretsVersion, dict[str, str]] | None]) -> None:
+        # a load that was invalidated while in flight must not be cached
+        if self._loading.get(key) is not future:
+            return
+        del self._loading[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        loaded = future.result()
+        if loaded is None:
+            self._entries.pop(key, None)
+            return
+
+        version, secrets = loaded
+        self._entries[key] = (time.monotonic() + self._ttl, version, secrets)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_graphs:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: str, graph_name: str) -> None:
+        key = (namespace, graph_name)
+        self._entries.pop(key, None)
+        self._loading.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._loading.clear()
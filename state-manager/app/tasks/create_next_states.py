@@ -2,27 +2,44 @@ from beanie import PydanticObjectId
 from pymongo.errors import DuplicateKeyError, BulkWriteError
 from beanie.operators import In, NotIn
 from app.singletons.logs_manager import LogsManager
+from app.singletons.event_bus import EventBus
+from app.singletons.memo_metrics import MemoMetrics
 from app.models.db.graph_template_model import GraphTemplate
 from app.models.db.state import State
+from app.models.db.state_record import StateRecord
+from app.models.db.memoized_result import MemoizedResult, compute_inputs_hash
+from app.models.db.single_flight import SingleFlight
+from app.models.db.store import Store
 from app.models.state_status_enum import StateStatusEnum
 from app.models.node_template_model import NodeTemplate
 from app.models.db.registered_node import RegisteredNode
-from app.models.db.store import Store
 from app.models.dependent_string import DependentString
 from app.models.node_template_model import UnitesStrategyEnum
 from json_schema_to_pydantic import create_model
 from pydantic import BaseModel
 from typing import Type
+from datetime import datetime
 import asyncio
 
 logger = LogsManager().get_logger()
 
+# Current states are read and their next states written this many at a time, so
+# memory does not grow with the width of a fan-out
+NEXT_STATES_CHUNK_SIZE = 1000
+
+# States completed without being executed whose next states are created at once.
+# Chunked rather than behind a shared semaphore since the next states of a
+# completed state can be completed themselves, which would wait on the same permits
+COMPLETED_NEXT_STATES_CONCURRENCY = 32
+
 async def mark_success_states(state_ids: list[PydanticObjectId]):
     await State.find(
         In(State.id, state_ids)
     ).set({
-        "status": StateStatusEnum.SUCCESS
+        "status": StateStatusEnum.SUCCESS,
+        "updated_at": datetime.now()
     }) # type: ignore
+    await EventBus().publish_by_ids(state_ids, StateStatusEnum.SUCCESS)
 
 
 async def check_unites_satisfied(namespace: str, graph_name: str, node_template: NodeTemplate, parents: dict[str, PydanticObjectId]) -> bool:
@@ -49,7 +66,7 @@ async def check_unites_satisfied(namespace: str, graph_name: str, node_template:
             any_one_pending = await State.find_one(
                 State.namespace_name == namespace,
                 State.graph_name == graph_name,
-                In(State.status, [StateStatusEnum.CREATED, StateStatusEnum.QUEUED, StateStatusEnum.EXECUTED]),
+                In(State.status, [StateStatusEnum.CREATED, StateStatusEnum.QUEUED, StateStatusEnum.EXECUTED, StateStatusEnum.PARKED]),
                 {
                     f"parents.{node_template.unites.identifier}": unites_id
                 }
@@ -60,7 +77,92 @@ async def check_unites_satisfied(namespace: str, graph_name: str, node_template:
     return True
 
 
-def validate_dependencies(next_state_node_template: NodeTemplate, next_state_input_model: Type[BaseModel], identifier: str, parents: dict[str, State]) -> None:
+async def apply_memoized_results(node_template: NodeTemplate, new_states: list[dict]) -> list[dict]:
+    """
+    Complete the new states of a memoized node whose inputs already have an
+    unexpired result, so they are inserted as executed with the cached outputs
+    and never enqueued. Returns the completed states.
+    """
+    inputs_hashes = [compute_inputs_hash(new_state["inputs"]) for new_state in new_states]
+    cached_outputs = await MemoizedResult.get_outputs(node_template.namespace, node_template.node_name, list(set(inputs_hashes)))
+
+    memoized_states = []
+    for new_state, inputs_hash in zip(new_states, inputs_hashes):
+        outputs = cached_outputs.get(inputs_hash)
+        if outputs is None:
+            continue
+        new_state["status"] = StateStatusEnum.EXECUTED
+        new_state["outputs"] = outputs
+        new_state["memoize_ttl"] = None
+        memoized_states.append(new_state)
+
+    MemoMetrics().record(node_template.namespace, node_template.node_name, len(memoized_states), len(new_states) - len(memoized_states))
+    return memoized_states
+
+
+async def create_completed_next_states(completed_states: list[dict]) -> None:
+    """
+    Carry the run on past states completed without being executed (memoized
+    states, released single flight followers) as if they had just been. Each
+    one has its own parents, and a failure is recorded on the completed state
+    itself, so it must not fail the others. At most COMPLETED_NEXT_STATES_CONCURRENCY
+    of them are processed at once.
+    """
+    for start in range(0, len(completed_states), COMPLETED_NEXT_STATES_CONCURRENCY):
+        chunk = completed_states[start:start + COMPLETED_NEXT_STATES_CONCURRENCY]
+        results = await asyncio.gather(
+            *[
+                create_next_states([completed_state["_id"]], completed_state["identifier"], completed_state["namespace_name"], completed_state["graph_name"], completed_state["parents"])
+                for completed_state in chunk
+            ],
+            return_exceptions=True
+        )
+        for completed_state, result in zip(chunk, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error creating next states of completed state {completed_state['_id']}", error=result)
+
+
+async def park_single_flight_followers(node_template: NodeTemplate, new_states: list[dict]) -> list[dict]:
+    """
+    Elect one leader per distinct inputs among the new states of a single flight
+    node, the others are parked until their leader reports back. Ids are set up
+    front so the leaders are known before the states are inserted. Returns the
+    parked followers.
+    """
+    candidates = []
+    for new_state in new_states:
+        new_state["_id"] = PydanticObjectId()
+        new_state["single_flight_key"] = compute_inputs_hash(new_state["inputs"])
+        candidates.append((new_state["single_flight_key"], new_state["_id"]))
+
+    leader_ids = await SingleFlight.claim(node_template.namespace, node_template.node_name, candidates)
+
+    followers = []
+    for new_state in new_states:
+        if new_state["_id"] not in leader_ids:
+            new_state["status"] = StateStatusEnum.PARKED
+            followers.append(new_state)
+    return followers
+
+
+async def unpark_orphaned_followers(node_template: NodeTemplate, followers: list[dict]) -> None:
+    """
+    A leader can report back between a follower losing the election and the
+    follower being inserted. Leaders end their flight before releasing, so an
+    inserted follower whose flight has already ended is run on its own rather
+    than left parked for good. Its single flight key is dropped, so it does not
+    end a later flight on the same inputs once it has run.
+    """
+    claimed = await SingleFlight.get_claimed(node_template.namespace, node_template.node_name, list({follower["single_flight_key"] for follower in followers}))
+    for follower in followers:
+        if follower["single_flight_key"] in claimed:
+            continue
+        state = await State.transition(follower["_id"], [StateStatusEnum.PARKED], {"status": StateStatusEnum.CREATED}, unset=["single_flight_key"])
+        if state is not None:
+            EventBus().publish(state)
+
+
+def validate_dependencies(next_state_node_template: NodeTemplate, next_state_input_model: Type[BaseModel], identifier: str, parents: dict[str, StateRecord]) -> None:
     """Validate that all dependencies exist before processing them."""
     # 1) Confirm each model field is present in next_state_node_template.inputs
     for field_name in next_state_input_model.model_fields.keys():
@@ -87,6 +189,8 @@ def validate_dependencies(next_state_node_template: NodeTemplate, next_state_inp
 
 
 async def create_next_states(state_ids: list[PydanticObjectId], identifier: str, namespace: str, graph_name: str, parents_ids: dict[str, PydanticObjectId]):
+    # states whose next states have all been created, which a later failure must not error
+    created_ids: set[PydanticObjectId] = set()
 
     try:
         if len(state_ids) == 0:
@@ -105,8 +209,7 @@ async def create_next_states(state_ids: list[PydanticObjectId], identifier: str,
         
         cached_registered_nodes: dict[tuple[str, str], RegisteredNode] = {}
         cached_input_models: dict[tuple[str, str], Type[BaseModel]] = {}
-        cached_store_values: dict[tuple[str, str], str] = {}
-        new_states_coroutines = []
+        cached_store_values: dict[str, dict[str, str]] = {}
 
         async def get_registered_node(node_template: NodeTemplate) -> RegisteredNode:
             key = (node_template.namespace, node_template.node_name)
@@ -124,19 +227,19 @@ async def create_next_states(state_ids: list[PydanticObjectId], identifier: str,
             return cached_input_models[key]
         
         async def get_store_value(run_id: str, field: str) -> str:
-            key = (run_id, field)
-            if key not in cached_store_values:
-                store_value = await Store.get_value(run_id, namespace, graph_name, field)
-                
+            # the store is read once per call, the states of a call complete together
+            if run_id not in cached_store_values:
+                cached_store_values[run_id] = await Store.get_values(run_id, namespace, graph_name)
+            store_value = cached_store_values[run_id].get(field)
+
+            if store_value is None:
+                store_value = graph_template.store_config.default_values.get(field)
                 if store_value is None:
-                    store_value = graph_template.store_config.default_values.get(field)
-                    if store_value is None:
-                        raise ValueError(f"Store value not found for field '{field}' in namespace '{namespace}' and graph '{graph_name}'")
+                    raise ValueError(f"Store value not found for field '{field}' in namespace '{namespace}' and graph '{graph_name}'")
 
-                cached_store_values[key] = store_value
-            return cached_store_values[key]
+            return store_value
 
-        async def generate_next_state(next_state_input_model: Type[BaseModel], next_state_node_template: NodeTemplate, parents: dict[str, State], current_state: State) -> State:
+        async def generate_next_state(next_state_input_model: Type[BaseModel], next_state_node_template: NodeTemplate, parents: dict[str, StateRecord], current_state: StateRecord) -> dict:
             next_state_input_data = {}
 
             for field_name, _ in next_state_input_model.model_fields.items():
@@ -162,7 +265,7 @@ async def create_next_states(state_ids: list[PydanticObjectId], identifier: str,
                 current_state.identifier: current_state.id
             }
 
-            return State(
+            return State.new_document(
                 node_name=next_state_node_template.node_name,
                 identifier=next_state_node_template.identifier,
                 namespace_name=next_state_node_template.namespace,
@@ -173,25 +276,21 @@ async def create_next_states(state_ids: list[PydanticObjectId], identifier: str,
                 outputs={},
                 does_unites=next_state_node_template.unites is not None,
                 run_id=current_state.run_id,
-                error=None
+                error=None,
+                memoize_ttl=next_state_node_template.memoize.ttl if next_state_node_template.memoize is not None else None
             )
 
-        current_states = await State.find(
-            In(State.id, state_ids)
-        ).to_list()
-
         if not parents_ids:
             parent_states = []
         else:
-            parent_states = await State.find(
-                In(State.id, list(parents_ids.values()))
-            ).to_list()
+            parent_states = await State.find_records(list(parents_ids.values()))
 
         parents = {}
         for parent_state in parent_states:
             parents[parent_state.identifier] = parent_state
 
         pending_unites = []
+        next_states_templates: list[tuple[Type[BaseModel], NodeTemplate]] = []
        
         for next_state_identifier in next_state_identifiers:
             next_state_node_template = graph_template.get_node_by_identifier(next_state_identifier)
@@ -204,16 +303,46 @@ async def create_next_states(state_ids: list[PydanticObjectId], identifier: str,
                 
             next_state_input_model = await get_input_model(next_state_node_template)
             validate_dependencies(next_state_node_template, next_state_input_model, identifier, parents)
+            next_states_templates.append((next_state_input_model, next_state_node_template))
 
-            for current_state in current_states:                
-                new_states_coroutines.append(generate_next_state(next_state_input_model, next_state_node_template, parents, current_state))
-        
-        if len(new_states_coroutines) > 0:
-            await State.insert_many(await asyncio.gather(*new_states_coroutines))
-        await mark_success_states(state_ids)
+        # Each chunk is fully written and its states marked successful before the next
+        # one is read, which bounds the documents held at once, lets other tasks on the
+        # loop run in between and keeps the progress made if a later chunk fails
+        if len(next_states_templates) > 0:
+            async for current_states in State.find_record_chunks(state_ids, NEXT_STATES_CHUNK_SIZE):
+                for next_state_input_model, next_state_node_template in next_states_templates:
+                    new_states = await asyncio.gather(
+                        *[generate_next_state(next_state_input_model, next_state_node_template, parents, current_state) for current_state in current_states]
+                    )
+                    memoized_states = []
+                    if next_state_node_template.memoize is not None:
+                        memoized_states = await apply_memoized_results(next_state_node_template, new_states)
+                    parked_states = []
+                    if next_state_node_template.single_flight:
+                        parked_states = await park_single_flight_followers(
+                            next_state_node_template, [new_state for new_state in new_states if new_state["status"] == StateStatusEnum.CREATED]
+                        )
+                    await State.insert_documents(new_states, ordered=False)
+                    EventBus().publish_documents(new_states)
+                    if len(memoized_states) > 0:
+                        await create_completed_next_states(memoized_states)
+                    if len(parked_states) > 0:
+                        await unpark_orphaned_followers(next_state_node_template, parked_states)
+                chunk_ids = [current_state.id for current_state in current_states]
+                await mark_success_states(chunk_ids)
+                created_ids.update(chunk_ids)
+
+        remaining_ids = [state_id for state_id in state_ids if state_id not in created_ids]
+        if len(remaining_ids) > 0:
+            await mark_success_states(remaining_ids)
+
+        # the unites are next states of every state, none is done until they are created
+        if len(pending_unites) > 0:
+            created_ids.clear()
 
         # handle unites
         new_unit_states_coroutines = []
+        new_unit_states_templates: list[NodeTemplate] = []
         for pending_unites_identifier in pending_unites:
             next_state_node_template = graph_template.get_node_by_identifier(pending_unites_identifier)
             if not next_state_node_template:
@@ -229,10 +358,19 @@ async def create_next_states(state_ids: list[PydanticObjectId], identifier: str,
             parent_state = parents[next_state_node_template.unites.identifier]
 
             new_unit_states_coroutines.append(generate_next_state(next_state_input_model, next_state_node_template, parents, parent_state))
+            new_unit_states_templates.append(next_state_node_template)
         
         try:
             if len(new_unit_states_coroutines) > 0:
-                await State.insert_many(await asyncio.gather(*new_unit_states_coroutines))
+                new_unit_states = await asyncio.gather(*new_unit_states_coroutines)
+                memoized_unit_states = []
+                for new_unit_state, next_state_node_template in zip(new_unit_states, new_unit_states_templates):
+                    if next_state_node_template.memoize is not None:
+                        memoized_unit_states.extend(await apply_memoized_results(next_state_node_template, [new_unit_state]))
+                await State.insert_documents(new_unit_states)
+                EventBus().publish_documents(new_unit_states)
+                if len(memoized_unit_states) > 0:
+                    await create_completed_next_states(memoized_unit_states)
         except (DuplicateKeyError, BulkWriteError):
             logger.warning(
                 f"Caught duplicate key error for new unit states in namespace={namespace}, "
@@ -241,10 +379,13 @@ async def create_next_states(state_ids: list[PydanticObjectId], identifier: str,
             )
             
     except Exception as e:
+        errored_ids = [state_id for state_id in state_ids if state_id not in created_ids]
         await State.find(
-            In(State.id, state_ids)
+            In(State.id, errored_ids)
         ).set({
             "status": StateStatusEnum.NEXT_CREATED_ERROR,
-            "error": str(e)
+            "error": str(e),
+            "updated_at": datetime.now()
         }) # type: ignore
+        await EventBus().publish_by_ids(errored_ids, StateStatusEnum.NEXT_CREATED_ERROR)
         raise
\ No newline at end of file
@@ -0,0 +1,114 @@
+from typing import Any
+from datetime import datetime, timedelta
+import uuid
+
+from app.models.db.single_flight import SingleFlight
+from app.models.db.state import State
+from app.models.db.state_record import StateRecord
+from app.models.state_status_enum import StateStatusEnum
+from app.singletons.event_bus import EventBus
+from app.singletons.logs_manager import LogsManager
+from app.tasks.create_next_states import create_completed_next_states, NEXT_STATES_CHUNK_SIZE
+
+logger = LogsManager().get_logger()
+
+# Fields of a released follower needed to create its next states
+RELEASED_FOLLOWER_PROJECTION = {
+    "identifier": 1,
+    "namespace_name": 1,
+    "graph_name": 1,
+    "parents": 1
+}
+
+# Parked followers are left to their leader for this long before the sweep looks
+# at them, a follower that has just lost an election checks its flight itself
+PARKED_SWEEP_GRACE = timedelta(minutes=1)
+
+
+async def release_single_flight_followers(leader: State | StateRecord, status: StateStatusEnum, updates: dict[str, Any] | None = None) -> None:
+    """
+    Hand the outcome of a single flight leader to every follower parked on its
+    inputs with one bulk update: EXECUTED followers get the leader's outputs and
+    move on to their next states, CREATED followers are run on their own.
+
+    The flight is ended before the followers are released, so a follower
+    inserted concurrently either sees the ended flight and runs itself, or is
+    parked in time to be released here.
+    """
+    if leader.single_flight_key is None:
+        return
+
+    try:
+        await SingleFlight.release(leader.namespace_name, leader.node_name, leader.single_flight_key)
+
+        release_id = str(uuid.uuid4())
+        collection = State.get_pymongo_collection()
+        result = await collection.update_many(
+            {
+                "namespace_name": leader.namespace_name,
+                "node_name": leader.node_name,
+                "single_flight_key": leader.single_flight_key,
+                "status": StateStatusEnum.PARKED
+            },
+            {"$set": {**(updates or {}), "status": status, "single_flight_release_id": release_id, "updated_at": datetime.now()}}
+        )
+        if result.modified_count == 0:
+            return
+
+        logger.info(f"Released {result.modified_count} followers of single flight leader {leader.id} as {status}")
+
+        chunk: list[dict[str, Any]] = []
+        async for follower in collection.find({"single_flight_release_id": release_id}, projection=RELEASED_FOLLOWER_PROJECTION, batch_size=NEXT_STATES_CHUNK_SIZE):
+            chunk.append(follower)
+            if len(chunk) >= NEXT_STATES_CHUNK_SIZE:
+                await _continue_followers(chunk, status)
+                chunk = []
+        if len(chunk) > 0:
+            await _continue_followers(chunk, status)
+
+    except Exception as e:
+        logger.error(f"Error releasing followers of single flight leader {leader.id}", error=e)
+        raise
+
+
+async def _continue_followers(followers: list[dict[str, Any]], status: StateStatusEnum) -> None:
+    await EventBus().publish_by_ids([follower["_id"] for follower in followers], status)
+    if status == StateStatusEnum.EXECUTED:
+        await create_completed_next_states(followers)
+
+
+async def sweep_parked_followers() -> None:
+    """
+    Run on their own the followers left parked after their flight is gone. The
+    leader normally releases its followers, but a leader that crashed, or a
+    release that failed, leaves them parked until their flight expires and then
+    for good. Expired flights are ended here first, so this also recovers the
+    followers of a leader that never reports back. Their single flight key is
+    dropped, so they do not end a later flight on the same inputs once run.
+    """
+    try:
+        await SingleFlight.expire()
+
+        collection = State.get_pymongo_collection()
+        cursor = await collection.aggregate([
+            {"$match": {"status": StateStatusEnum.PARKED, "updated_at": {"$lt": datetime.now() - PARKED_SWEEP_GRACE}}},
+            {"$group": {"_id": {"namespace_name": "$namespace_name", "node_name": "$node_name"}, "keys": {"$addToSet": "$single_flight_key"}}}
+        ])
+        async for group in cursor:
+            namespace_name, node_name = group["_id"]["namespace_name"], group["_id"]["node_name"]
+            claimed = await SingleFlight.get_claimed(namespace_name, node_name, group["keys"])
+            orphaned_keys = [key for key in group["keys"] if key not in claimed]
+            if len(orphaned_keys) == 0:
+                continue
+
+            query = {"namespace_name": namespace_name, "node_name": node_name, "single_flight_key": {"$in": orphaned_keys}, "status": StateStatusEnum.PARKED}
+            follower_ids = [data["_id"] async for data in collection.find(query, projection={"_id": 1})]
+            result = await collection.update_many(
+                {**query, "_id": {"$in": follower_ids}},
+                {"$set": {"status": StateStatusEnum.CREATED, "updated_at": datetime.now()}, "$unset": {"single_flight_key": ""}}
+            )
+            logger.info(f"Unparked {result.modified_count} followers of {node_name} in namespace {namespace_name} whose flight is gone")
+            await EventBus().publish_by_ids(follower_ids, StateStatusEnum.CREATED)
+
+    except Exception as e:
+        logger.error("Error sweeping parked single flight followers", error=e)
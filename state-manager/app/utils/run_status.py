@@ -0,0 +1,80 @@
+import asyncio
+
+from ..models.db.state import State
+from ..models.run_models import RunStatusEnum
+from ..models.state_status_enum import StateStatusEnum
+from ..singletons.event_bus import Subscription
+
+PENDING_STATUSES = [StateStatusEnum.CREATED, StateStatusEnum.QUEUED, StateStatusEnum.EXECUTED, StateStatusEnum.PARKED]
+ERRORED_STATUSES = [StateStatusEnum.ERRORED, StateStatusEnum.NEXT_CREATED_ERROR]
+
+# Statuses after which a run may have nothing left to do
+SETTLED_STATUSES = [
+    StateStatusEnum.SUCCESS,
+    StateStatusEnum.PRUNED,
+    StateStatusEnum.ERRORED,
+    StateStatusEnum.NEXT_CREATED_ERROR,
+]
+
+
+async def get_run_status(namespace_name: str, run_id: str) -> RunStatusEnum | None:
+    """
+    Compute the status of a run the same way runs are listed: pending while any
+    state is still pending, failed if any state errored, success otherwise.
+    Returns None when the namespace has no state of the run. All lookups are
+    served by the run_id/status index.
+    """
+    collection = State.get_pymongo_collection()
+
+    pending = await collection.find_one(
+        {"run_id": run_id, "namespace_name": namespace_name, "status": {"$in": PENDING_STATUSES}},
+        projection={"_id": 1}
+    )
+    if pending:
+        return RunStatusEnum.PENDING
+
+    errored = await collection.find_one(
+        {"run_id": run_id, "namespace_name": namespace_name, "status": {"$in": ERRORED_STATUSES}},
+        projection={"_id": 1}
+    )
+    if errored:
+        return RunStatusEnum.FAILED
+
+    exists = await collection.find_one(
+        {"run_id": run_id, "namespace_name": namespace_name},
+        projection={"_id": 1}
+    )
+    if not exists:
+        return None
+
+    return RunStatusEnum.SUCCESS
+
+
+async def wait_for_run_status(subscription: Subscription, run_id: str, timeout: float, recheck_interval: float = 5.0) -> RunStatusEnum | None:
+    """
+    Wait on a run subscription until the run is no longer pending or the
+    timeout elapses, returning the last known status.
+
+    The run is only looked up after a state settles, plus once per idle
+    recheck_interval to catch transitions made by other replicas. The run is
+    looked up in the namespace of the subscription.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    run_status = await get_run_status(subscription.namespace_name, run_id)
+    while run_status == RunStatusEnum.PENDING:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+
+        try:
+            event = await asyncio.wait_for(subscription.get(), timeout=min(remaining, recheck_interval))
+        except asyncio.TimeoutError:
+            run_status = await get_run_status(subscription.namespace_name, run_id)
+            continue
+
+        if event.status in SETTLED_STATUSES:
+            run_status = await get_run_status(subscription.namespace_name, run_id)
+
+    return run_status
@@ -0,0 +1,247 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException, status
+from beanie import PydanticObjectId
+
+from app.controller.append_outputs import append_outputs
+from app.models.db.state_record import StateRecord
+from app.models.executed_models import AppendOutputsRequestModel
+from app.models.state_status_enum import StateStatusEnum
+
+
+def make_record(state_id, status=StateStatusEnum.QUEUED, namespace_name="test_namespace", memoize_ttl=None, single_flight_key=None, appended_count=0):
+    return StateRecord({
+        "_id": state_id,
+        "node_name": "test_node",
+        "namespace_name": namespace_name,
+        "identifier": "test_identifier",
+        "graph_name": "test_graph",
+        "run_id": "test_run",
+        "status": status,
+        "inputs": {"key": "value"},
+        "parents": {"root": PydanticObjectId()},
+        "memoize_ttl": memoize_ttl,
+        "single_flight_key": single_flight_key,
+        "appended_count": appended_count
+    })
+
+
+def patch_collection(mock_state_class, modified_count=1):
+    collection = MagicMock()
+    collection.update_one = AsyncMock(return_value=MagicMock(modified_count=modified_count))
+    mock_state_class.get_pymongo_collection.return_value = collection
+    return collection
+
+
+class TestAppendOutputs:
+    """Test cases for append_outputs function"""
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_creates_states_and_next_states(self):
+        state_id = PydanticObjectId()
+        record = make_record(state_id)
+        inserted_ids = [PydanticObjectId(), PydanticObjectId()]
+        background_tasks = MagicMock()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class, \
+             patch('app.controller.append_outputs.create_next_states') as mock_create_next_states:
+            mock_state_class.find_records = AsyncMock(return_value=[record])
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=inserted_ids))
+            collection = patch_collection(mock_state_class)
+
+            body = AppendOutputsRequestModel(outputs=[{"result": 1}, {"result": 2}])
+            result = await append_outputs("test_namespace", state_id, body, "test_request_id", background_tasks)
+
+            assert result.status == StateStatusEnum.QUEUED
+            assert result.count == 2
+
+            documents = mock_state_class.insert_documents.await_args.args[0]
+            assert [document["outputs"] for document in documents] == [{"result": 1}, {"result": 2}]
+            for document in documents:
+                assert document["status"] == StateStatusEnum.EXECUTED
+                assert document["identifier"] == "test_identifier"
+                assert document["parents"] == record.parents
+
+            # The appended chunk is handed to create_next_states right away
+            background_tasks.add_task.assert_called_once_with(
+                mock_create_next_states, inserted_ids, "test_identifier", "test_namespace", "test_graph", record.parents
+            )
+
+            # The source state is read without its outputs or data
+            projection = mock_state_class.find_records.await_args.kwargs["projection"]
+            assert "outputs" not in projection
+            assert "data" not in projection
+
+            # The appended positions are claimed on the source state
+            collection.update_one.assert_awaited_once_with(
+                {"_id": state_id, "status": StateStatusEnum.QUEUED, "appended_count": {"$in": [0, None]}},
+                {"$set": {"appended_count": 2}}
+            )
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_skips_outputs_appended_by_earlier_run(self):
+        """Test that a re-run of the state only fans out the outputs it had not appended yet"""
+        state_id = PydanticObjectId()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class, \
+             patch('app.controller.append_outputs.create_next_states'):
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id, appended_count=3)])
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=[PydanticObjectId()]))
+            collection = patch_collection(mock_state_class)
+
+            body = AppendOutputsRequestModel(outputs=[{"result": 2}, {"result": 3}], offset=2)
+            result = await append_outputs("test_namespace", state_id, body, "test_request_id", MagicMock())
+
+            assert result.count == 1
+            documents = mock_state_class.insert_documents.await_args.args[0]
+            assert [document["outputs"] for document in documents] == [{"result": 3}]
+            collection.update_one.assert_awaited_once_with(
+                {"_id": state_id, "status": StateStatusEnum.QUEUED, "appended_count": 3},
+                {"$set": {"appended_count": 4}}
+            )
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_chunk_already_appended(self):
+        """Test that a chunk appended in full by an earlier run is a no-op"""
+        state_id = PydanticObjectId()
+        background_tasks = MagicMock()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class:
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id, appended_count=4)])
+
+            body = AppendOutputsRequestModel(outputs=[{"result": 0}, {"result": 1}], offset=0)
+            result = await append_outputs("test_namespace", state_id, body, "test_request_id", background_tasks)
+
+            assert result.count == 0
+            mock_state_class.get_pymongo_collection.assert_not_called()
+            background_tasks.add_task.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_out_of_order(self):
+        """Test that a chunk leaving a gap after the appended outputs is rejected"""
+        state_id = PydanticObjectId()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class:
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id, appended_count=1)])
+
+            body = AppendOutputsRequestModel(outputs=[{"result": 1}], offset=2)
+            with pytest.raises(HTTPException) as exc_info:
+                await append_outputs("test_namespace", state_id, body, "test_request_id", MagicMock())
+
+            assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_concurrent_append(self):
+        """Test that losing the claim on the appended positions creates nothing"""
+        state_id = PydanticObjectId()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class:
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+            mock_state_class.insert_documents = AsyncMock()
+            patch_collection(mock_state_class, modified_count=0)
+
+            body = AppendOutputsRequestModel(outputs=[{"result": 1}])
+            with pytest.raises(HTTPException) as exc_info:
+                await append_outputs("test_namespace", state_id, body, "test_request_id", MagicMock())
+
+            assert exc_info.value.status_code == status.HTTP_409_CONFLICT
+            mock_state_class.insert_documents.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_stops_memoizing_state(self):
+        """Test that a streamed fan-out turns memoization off for its state"""
+        state_id = PydanticObjectId()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class, \
+             patch('app.controller.append_outputs.create_next_states'):
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id, memoize_ttl=60)])
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=[PydanticObjectId()]))
+            collection = patch_collection(mock_state_class)
+
+            body = AppendOutputsRequestModel(outputs=[{"result": 1}])
+            await append_outputs("test_namespace", state_id, body, "test_request_id", MagicMock())
+
+            collection.update_one.assert_awaited_once_with(
+                {"_id": state_id, "status": StateStatusEnum.QUEUED, "appended_count": {"$in": [0, None]}},
+                {"$set": {"appended_count": 1, "memoize_ttl": None, "single_flight_key": None}}
+            )
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_unparks_single_flight_followers(self):
+        """Test that the followers of a streaming leader run on their own"""
+        state_id = PydanticObjectId()
+        record = make_record(state_id, single_flight_key="hash1")
+        background_tasks = MagicMock()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class, \
+             patch('app.controller.append_outputs.create_next_states'), \
+             patch('app.controller.append_outputs.release_single_flight_followers') as mock_release_single_flight_followers:
+            mock_state_class.find_records = AsyncMock(return_value=[record])
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=[PydanticObjectId()]))
+            collection = patch_collection(mock_state_class)
+
+            body = AppendOutputsRequestModel(outputs=[{"result": 1}])
+            await append_outputs("test_namespace", state_id, body, "test_request_id", background_tasks)
+
+            collection.update_one.assert_awaited_once_with(
+                {"_id": state_id, "status": StateStatusEnum.QUEUED, "appended_count": {"$in": [0, None]}},
+                {"$set": {"appended_count": 1, "memoize_ttl": None, "single_flight_key": None}}
+            )
+            background_tasks.add_task.assert_any_call(mock_release_single_flight_followers, record, StateStatusEnum.CREATED, {"single_flight_key": None})
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_state_not_found(self):
+        with patch('app.controller.append_outputs.State') as mock_state_class:
+            mock_state_class.find_records = AsyncMock(return_value=[])
+
+            with pytest.raises(HTTPException) as exc_info:
+                await append_outputs("test_namespace", PydanticObjectId(), AppendOutputsRequestModel(outputs=[{}]), "test_request_id", MagicMock())
+
+            assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_other_namespace(self):
+        state_id = PydanticObjectId()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class:
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id, namespace_name="other_namespace")])
+
+            with pytest.raises(HTTPException) as exc_info:
+                await append_outputs("test_namespace", state_id, AppendOutputsRequestModel(outputs=[{}]), "test_request_id", MagicMock())
+
+            assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_state_not_queued(self):
+        state_id = PydanticObjectId()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class:
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id, StateStatusEnum.EXECUTED)])
+            mock_state_class.insert_documents = AsyncMock()
+
+            with pytest.raises(HTTPException) as exc_info:
+                await append_outputs("test_namespace", state_id, AppendOutputsRequestModel(outputs=[{}]), "test_request_id", MagicMock())
+
+            assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+            assert exc_info.value.detail == "State is not queued"
+            mock_state_class.insert_documents.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_append_outputs_database_error(self):
+        state_id = PydanticObjectId()
+
+        with patch('app.controller.append_outputs.State') as mock_state_class:
+            mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock(side_effect=Exception("Database error"))
+            collection = patch_collection(mock_state_class)
+
+            with pytest.raises(Exception, match="Database error"):
+                await append_outputs("test_namespace", state_id, AppendOutputsRequestModel(outputs=[{}]), "test_request_id", MagicMock())
+
+            # the claimed positions are given back
+            collection.update_one.assert_awaited_with({"_id": state_id, "appended_count": 1}, {"$set": {"appended_count": 0}})
@@ -0,0 +1,131 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from fastapi import HTTPException
+
+from app.controller.bulk_trigger_graph import bulk_trigger_graph
+from app.models.trigger_graph_model import BulkTriggerGraphRequestModel, BulkTriggerItemModel
+from app.models.state_status_enum import StateStatusEnum
+
+
+def make_graph_template(required_keys=None):
+    mock_graph_template = MagicMock()
+    mock_graph_template.is_valid.return_value = True
+    mock_root_node = MagicMock()
+    mock_root_node.node_name = "root_node"
+    mock_root_node.identifier = "root_id"
+    mock_root_node.inputs = {"input1": "default"}
+    mock_graph_template.get_root_node.return_value = mock_root_node
+    mock_graph_template.store_config.required_keys = required_keys or []
+    mock_graph_template.store_config.default_values = {}
+    return mock_graph_template
+
+
+def insert_result(documents, *args, **kwargs):
+    result = MagicMock()
+    result.inserted_ids = [f"id{i}" for i in range(len(documents))]
+    return result
+
+
+@pytest.mark.asyncio
+async def test_bulk_trigger_graph_success():
+    body = BulkTriggerGraphRequestModel(triggers=[
+        BulkTriggerItemModel(inputs={"input1": "a"}, store={"k1": "v1"}),
+        BulkTriggerItemModel(inputs={"input1": "b"}, store={"k1": "v2", "k2": "v3"}, start_delay=1000),
+        BulkTriggerItemModel(),
+    ])
+
+    with patch('app.controller.trigger_graph.GraphTemplate') as mock_graph_template_cls, \
+         patch('app.controller.bulk_trigger_graph.Store') as mock_store_cls, \
+         patch('app.controller.bulk_trigger_graph.State') as mock_state_cls, \
+         patch('app.controller.bulk_trigger_graph.Run') as mock_run_cls:
+
+        mock_graph_template_cls.get = AsyncMock(return_value=make_graph_template())
+        mock_run_cls.insert_many = AsyncMock(side_effect=insert_result)
+        mock_store_cls.insert_many = AsyncMock(side_effect=insert_result)
+        mock_state_cls.insert_many = AsyncMock(side_effect=insert_result)
+
+        result = await bulk_trigger_graph("test_namespace", "test_graph", body, "test_request_id")
+
+        assert result.status == StateStatusEnum.CREATED
+        assert len(result.run_ids) == 3
+        assert len(set(result.run_ids)) == 3
+
+        # template is loaded once for the whole batch
+        mock_graph_template_cls.get.assert_awaited_once_with("test_namespace", "test_graph")
+
+        # one bulk write per collection, all unordered
+        for mock_cls in (mock_run_cls, mock_store_cls, mock_state_cls):
+            mock_cls.insert_many.assert_awaited_once()
+            assert mock_cls.insert_many.await_args.kwargs["ordered"] is False
+        assert len(mock_run_cls.insert_many.await_args.args[0]) == 3
+        assert len(mock_store_cls.insert_many.await_args.args[0]) == 3
+        assert len(mock_state_cls.insert_many.await_args.args[0]) == 3
+
+        state_kwargs = [call.kwargs for call in mock_state_cls.call_args_list]
+        assert [kwargs["run_id"] for kwargs in state_kwargs] == result.run_ids
+        assert [kwargs["inputs"] for kwargs in state_kwargs] == [{"input1": "a"}, {"input1": "b"}, {"input1": "default"}]
+        assert state_kwargs[1]["enqueue_after"] - state_kwargs[0]["enqueue_after"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_bulk_trigger_graph_writes_in_chunks():
+    body = BulkTriggerGraphRequestModel(triggers=[BulkTriggerItemModel() for _ in range(5)])
+
+    with patch('app.controller.trigger_graph.GraphTemplate') as mock_graph_template_cls, \
+         patch('app.controller.bulk_trigger_graph.BULK_TRIGGER_CHUNK_SIZE', 2), \
+         patch('app.controller.bulk_trigger_graph.Store') as mock_store_cls, \
+         patch('app.controller.bulk_trigger_graph.State') as mock_state_cls, \
+         patch('app.controller.bulk_trigger_graph.Run') as mock_run_cls:
+
+        mock_graph_template_cls.get = AsyncMock(return_value=make_graph_template())
+        mock_run_cls.insert_many = AsyncMock(side_effect=insert_result)
+        mock_store_cls.insert_many = AsyncMock(side_effect=insert_result)
+        mock_state_cls.insert_many = AsyncMock(side_effect=insert_result)
+
+        result = await bulk_trigger_graph("test_namespace", "test_graph", body, "test_request_id")
+
+        assert len(result.run_ids) == 5
+        assert [len(call.args[0]) for call in mock_run_cls.insert_many.await_args_list] == [2, 2, 1]
+        assert [len(call.args[0]) for call in mock_state_cls.insert_many.await_args_list] == [2, 2, 1]
+        # no store entries means no store writes
+        mock_store_cls.insert_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_trigger_graph_invalid_item_writes_nothing():
+    body = BulkTriggerGraphRequestModel(triggers=[
+        BulkTriggerItemModel(store={"required": "v"}),
+        BulkTriggerItemModel(),
+    ])
+
+    with patch('app.controller.trigger_graph.GraphTemplate') as mock_graph_template_cls, \
+         patch('app.controller.bulk_trigger_graph.Store') as mock_store_cls, \
+         patch('app.controller.bulk_trigger_graph.State') as mock_state_cls, \
+         patch('app.controller.bulk_trigger_graph.Run') as mock_run_cls:
+
+        mock_graph_template_cls.get = AsyncMock(return_value=make_graph_template(required_keys=["required"]))
+        mock_run_cls.insert_many = AsyncMock()
+        mock_store_cls.insert_many = AsyncMock()
+        mock_state_cls.insert_many = AsyncMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await bulk_trigger_graph("test_namespace", "test_graph", body, "test_request_id")
+
+        assert exc_info.value.status_code == 400
+        assert "index 1" in exc_info.value.detail
+        mock_run_cls.insert_many.assert_not_awaited()
+        mock_store_cls.insert_many.assert_not_awaited()
+        mock_state_cls.insert_many.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_trigger_graph_template_not_found():
+    body = BulkTriggerGraphRequestModel(triggers=[BulkTriggerItemModel()])
+
+    with patch('app.controller.trigger_graph.GraphTemplate') as mock_graph_template_cls:
+        mock_graph_template_cls.get = AsyncMock(side_effect=ValueError("Graph template not found"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await bulk_trigger_graph("test_namespace", "test_graph", body, "test_request_id")
+
+        assert exc_info.value.status_code == 404
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from beanie import PydanticObjectId
 from datetime import datetime
 
@@ -31,6 +31,7 @@ class TestEnqueueStates:
         state = MagicMock()
         state.id = PydanticObjectId()
         state.node_name = "node1"
+        state.graph_name = "test_graph"
         state.identifier = "test_identifier"
         state.inputs = {"key": "value"}
         state.created_at = datetime.now()
@@ -64,6 +65,7 @@ class TestEnqueueStates:
         assert len(result.states) == 10
         assert result.states[0].state_id == str(mock_state.id)
         assert result.states[0].node_name == "node1"
+        assert result.states[0].graph_name == "test_graph"
         assert result.states[0].identifier == "test_identifier"
         assert result.states[0].inputs == {"key": "value"}
 
@@ -71,6 +73,102 @@ class TestEnqueueStates:
         assert mock_find_state.call_count == 10  # Called batch_size times
         mock_find_state.assert_called_with(mock_namespace, ["node1", "node2"])
 
+    @patch('app.controller.enqueue_states.SecretsCache')
+    @patch('app.controller.enqueue_states.find_state')
+    async def test_enqueue_states_with_secrets(
+        self,
+        mock_find_state,
+        mock_secrets_cache_class,
+        mock_namespace,
+        mock_request_id
+    ):
+        """Test that requested secrets are returned once per graph"""
+        states = []
+        for graph_name in ["graph1", "graph1", "graph2", "missing_graph"]:
+            state = MagicMock()
+            state.id = PydanticObjectId()
+            state.node_name = "node1"
+            state.graph_name = graph_name
+            state.identifier = "test_identifier"
+            state.inputs = {}
+            state.created_at = datetime.now()
+            states.append(state)
+        mock_find_state.side_effect = states
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(
+            side_effect=lambda namespace_name, graph_name: None if graph_name == "missing_graph" else {"api_key": graph_name}
+        )
+
+        result = await enqueue_states(
+            mock_namespace,
+            EnqueueRequestModel(nodes=["node1"], batch_size=4, include_secrets=True),
+            mock_request_id
+        )
+
+        assert result.count == 4
+        assert result.secrets == {"graph1": {"api_key": "graph1"}, "graph2": {"api_key": "graph2"}}
+        assert mock_secrets_cache_class.return_value.get_secrets.await_count == 3
+
+    @patch('app.controller.enqueue_states.SecretsCache')
+    @patch('app.controller.enqueue_states.find_state')
+    async def test_enqueue_states_secrets_error_leaves_graph_out(
+        self,
+        mock_find_state,
+        mock_secrets_cache_class,
+        mock_namespace,
+        mock_request_id
+    ):
+        """Test that claimed states are returned even when secrets of a graph cannot be read"""
+        states = []
+        for graph_name in ["graph1", "broken_graph"]:
+            state = MagicMock()
+            state.id = PydanticObjectId()
+            state.node_name = "node1"
+            state.graph_name = graph_name
+            state.identifier = "test_identifier"
+            state.inputs = {}
+            state.created_at = datetime.now()
+            states.append(state)
+        mock_find_state.side_effect = states
+
+        async def get_secrets(namespace_name, graph_name):
+            if graph_name == "broken_graph":
+                raise Exception("Decryption failed")
+            return {"api_key": graph_name}
+
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(side_effect=get_secrets)
+
+        result = await enqueue_states(
+            mock_namespace,
+            EnqueueRequestModel(nodes=["node1"], batch_size=2, include_secrets=True),
+            mock_request_id
+        )
+
+        assert result.count == 2
+        assert result.secrets == {"graph1": {"api_key": "graph1"}}
+
+    @patch('app.controller.enqueue_states.SecretsCache')
+    @patch('app.controller.enqueue_states.find_state')
+    async def test_enqueue_states_without_secrets(
+        self,
+        mock_find_state,
+        mock_secrets_cache_class,
+        mock_namespace,
+        mock_enqueue_request,
+        mock_state,
+        mock_request_id
+    ):
+        """Test that secrets are only looked up when requested"""
+        mock_find_state.return_value = mock_state
+
+        result = await enqueue_states(
+            mock_namespace,
+            mock_enqueue_request,
+            mock_request_id
+        )
+
+        assert result.secrets is None
+        mock_secrets_cache_class.assert_not_called()
+
     @patch('app.controller.enqueue_states.find_state')
     async def test_enqueue_states_no_states_found(
         self,
@@ -110,6 +208,7 @@ class TestEnqueueStates:
         state1 = MagicMock()
         state1.id = PydanticObjectId()
         state1.node_name = "node1"
+        state1.graph_name = "test_graph"
         state1.identifier = "identifier1"
         state1.inputs = {"input1": "value1"}
         state1.created_at = datetime.now()
@@ -117,6 +216,7 @@ class TestEnqueueStates:
         state2 = MagicMock()
         state2.id = PydanticObjectId()
         state2.node_name = "node2"
+        state2.graph_name = "test_graph"
         state2.identifier = "identifier2"
         state2.inputs = {"input2": "value2"}
         state2.created_at = datetime.now()
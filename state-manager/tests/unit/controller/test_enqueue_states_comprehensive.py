@@ -15,7 +15,7 @@ class TestEnqueueStatesComprehensive:
         """Test successful enqueue states"""
         # Create mock state data
         mock_state_data = {
-            "id": "state1",
+            "_id": "state1",
             "node_name": "test_node",
             "identifier": "test_identifier",
             "inputs": {"test": "input"},
@@ -28,14 +28,6 @@ class TestEnqueueStatesComprehensive:
             mock_collection.find_one_and_update = AsyncMock(return_value=mock_state_data)
             mock_state_class.get_pymongo_collection.return_value = mock_collection
 
-            # Mock the State constructor
-            mock_state_instance = MagicMock()
-            mock_state_instance.id = "state1"
-            mock_state_instance.node_name = "test_node"
-            mock_state_instance.identifier = "test_identifier"
-            mock_state_instance.inputs = {"test": "input"}
-            mock_state_instance.created_at = datetime.now()
-            mock_state_class.return_value = mock_state_instance
 
             request_model = EnqueueRequestModel(nodes=["test_node"], batch_size=1)
             result = await enqueue_states("test_namespace", request_model, "test_request_id")
@@ -47,6 +39,23 @@ class TestEnqueueStatesComprehensive:
             assert result.states[0].state_id == "state1"
             assert result.states[0].node_name == "test_node"
 
+    @pytest.mark.asyncio
+    async def test_enqueue_states_claim_uses_projection(self):
+        """Test that the claim does not fetch outputs, data or the ancestor map"""
+        with patch('app.controller.enqueue_states.State') as mock_state_class:
+            mock_collection = MagicMock()
+            mock_collection.find_one_and_update = AsyncMock(return_value=None)
+            mock_state_class.get_pymongo_collection.return_value = mock_collection
+
+            request_model = EnqueueRequestModel(nodes=["test_node"], batch_size=1)
+            await enqueue_states("test_namespace", request_model, "test_request_id")
+
+            projection = mock_collection.find_one_and_update.await_args.kwargs["projection"]
+            for field in ("_id", "node_name", "identifier", "inputs", "created_at"):
+                assert projection[field] == 1
+            for field in ("outputs", "data", "parents", "state_fingerprint"):
+                assert field not in projection
+
     @pytest.mark.asyncio
     async def test_enqueue_states_no_states_found(self):
         """Test enqueue states when no states are found"""
@@ -85,7 +94,7 @@ class TestEnqueueStatesComprehensive:
         """Test enqueue states with partial success"""
         # Create mock state data
         mock_state_data = {
-            "id": "state1",
+            "_id": "state1",
             "node_name": "test_node",
             "identifier": "test_identifier",
             "inputs": {"test": "input"},
@@ -101,14 +110,6 @@ class TestEnqueueStatesComprehensive:
             ])
             mock_state_class.get_pymongo_collection.return_value = mock_collection
 
-            # Mock the State constructor
-            mock_state_instance = MagicMock()
-            mock_state_instance.id = "state1"
-            mock_state_instance.node_name = "test_node"
-            mock_state_instance.identifier = "test_identifier"
-            mock_state_instance.inputs = {"test": "input"}
-            mock_state_instance.created_at = datetime.now()
-            mock_state_class.return_value = mock_state_instance
 
             request_model = EnqueueRequestModel(nodes=["test_node"], batch_size=2)
             result = await enqueue_states("test_namespace", request_model, "test_request_id")
@@ -125,7 +126,7 @@ class TestEnqueueStatesComprehensive:
         """Test enqueue states with large batch size"""
         # Create mock state data
         mock_state_data = {
-            "id": "state1",
+            "_id": "state1",
             "node_name": "test_node",
             "identifier": "test_identifier",
             "inputs": {"test": "input"},
@@ -137,14 +138,6 @@ class TestEnqueueStatesComprehensive:
             mock_collection.find_one_and_update = AsyncMock(return_value=mock_state_data)
             mock_state_class.get_pymongo_collection.return_value = mock_collection
 
-            # Mock the State constructor
-            mock_state_instance = MagicMock()
-            mock_state_instance.id = "state1"
-            mock_state_instance.node_name = "test_node"
-            mock_state_instance.identifier = "test_identifier"
-            mock_state_instance.inputs = {"test": "input"}
-            mock_state_instance.created_at = datetime.now()
-            mock_state_class.return_value = mock_state_instance
 
             request_model = EnqueueRequestModel(nodes=["test_node"], batch_size=10)
             result = await enqueue_states("test_namespace", request_model, "test_request_id")
@@ -175,14 +168,14 @@ class TestEnqueueStatesComprehensive:
         """Test enqueue states with multiple nodes"""
         # Create mock state data
         mock_state_data1 = {
-            "id": "state1",
+            "_id": "state1",
             "node_name": "node1",
             "identifier": "identifier1",
             "inputs": {"test": "input1"},
             "created_at": datetime.now()
         }
         mock_state_data2 = {
-            "id": "state2",
+            "_id": "state2",
             "node_name": "node2",
             "identifier": "identifier2",
             "inputs": {"test": "input2"},
@@ -194,23 +187,6 @@ class TestEnqueueStatesComprehensive:
             mock_collection.find_one_and_update = AsyncMock(side_effect=[mock_state_data1, mock_state_data2])
             mock_state_class.get_pymongo_collection.return_value = mock_collection
 
-            # Mock the State constructor
-            mock_state_instance1 = MagicMock()
-            mock_state_instance1.id = "state1"
-            mock_state_instance1.node_name = "node1"
-            mock_state_instance1.identifier = "identifier1"
-            mock_state_instance1.inputs = {"test": "input1"}
-            mock_state_instance1.created_at = datetime.now()
-
-            mock_state_instance2 = MagicMock()
-            mock_state_instance2.id = "state2"
-            mock_state_instance2.node_name = "node2"
-            mock_state_instance2.identifier = "identifier2"
-            mock_state_instance2.inputs = {"test": "input2"}
-            mock_state_instance2.created_at = datetime.now()
-
-            mock_state_class.side_effect = [mock_state_instance1, mock_state_instance2]
-
             request_model = EnqueueRequestModel(nodes=["node1", "node2"], batch_size=2)
             result = await enqueue_states("test_namespace", request_model, "test_request_id")
 
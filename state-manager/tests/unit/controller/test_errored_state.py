@@ -4,11 +4,23 @@ from fastapi import HTTPException, status
 from beanie import PydanticObjectId
 from pymongo.errors import DuplicateKeyError
 
-from app.controller.errored_state import errored_state
+from app.controller.errored_state import errored_state, RETRY_DECISION_PROJECTION
+from app.models.db.state_record import StateRecord
 from app.models.errored_models import ErroredRequestModel
 from app.models.state_status_enum import StateStatusEnum
 
 
+def applying_transition(state):
+    """Mock State.transition that applies the $set to the given mock state while it is in from_statuses"""
+    async def transition(state_id, from_statuses, updates):
+        if state.status not in from_statuses:
+            return None
+        for field, value in updates.items():
+            setattr(state, field, value)
+        return state
+    return AsyncMock(side_effect=transition)
+
+
 class TestErroredState:
     """Test cases for errored_state function"""
 
@@ -45,6 +57,7 @@ class TestErroredState:
         state.parents = []
         state.does_unites = False
         state.fanout_id = None
+        state.single_flight_key = None
         return state
 
     @pytest.fixture
@@ -62,6 +75,7 @@ class TestErroredState:
         state.parents = []
         state.does_unites = False
         state.fanout_id = None
+        state.single_flight_key = None
         return state
 
     @patch('app.controller.errored_state.State')
@@ -78,19 +92,19 @@ class TestErroredState:
     ):
         """Test successful error marking of queued state"""      
         
-        # Mock GraphTemplate.get to return a valid graph template
+        # Mock GraphTemplate.get_retry_policy to return a valid graph template
         mock_graph_template = MagicMock()
         mock_graph_template.retry_policy.max_retries = 3
         mock_graph_template.retry_policy.compute_delay = MagicMock(return_value=1000)
-        mock_graph_template_class.get = AsyncMock(return_value=mock_graph_template)
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
         
         # Mock State constructor and insert method
         mock_retry_state = MagicMock()
         mock_retry_state.insert = AsyncMock(return_value=mock_retry_state)
         mock_state_class.return_value = mock_retry_state
         
-        mock_state_queued.save = AsyncMock()     
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_queued)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
+        mock_state_class.transition = applying_transition(mock_state_queued)
 
         # Act
         result = await errored_state(
@@ -102,7 +116,7 @@ class TestErroredState:
 
         # Assert
         assert result.status == StateStatusEnum.ERRORED
-        assert mock_state_class.find_one.call_count == 1  # Called once for finding
+        assert mock_state_class.find_records.call_count == 1  # Called once for finding
         
 
     @patch('app.controller.errored_state.State')
@@ -120,7 +134,7 @@ class TestErroredState:
         """Test that executed states cannot be marked as errored"""
         # Arrange
         mock_state_executed.status = StateStatusEnum.EXECUTED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_executed)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_executed])
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -145,7 +159,7 @@ class TestErroredState:
     ):
         """Test when state is not found"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(return_value=None)
+        mock_state_class.find_records = AsyncMock(return_value=[])
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -172,7 +186,7 @@ class TestErroredState:
         # Arrange
         mock_state = MagicMock()
         mock_state.status = StateStatusEnum.CREATED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -199,7 +213,7 @@ class TestErroredState:
         # Arrange
         mock_state = MagicMock()
         mock_state.status = StateStatusEnum.ERRORED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -227,7 +241,7 @@ class TestErroredState:
         mock_state = MagicMock()
         mock_state.status = StateStatusEnum.EXECUTED
         mock_state.graph_name = "test_graph"
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -252,7 +266,7 @@ class TestErroredState:
     ):
         """Test handling of database errors"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(side_effect=Exception("Database error"))
+        mock_state_class.find_records = AsyncMock(side_effect=Exception("Database error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -283,19 +297,19 @@ class TestErroredState:
             error="Different error message"
         )
         
-        # Mock GraphTemplate.get to return a valid graph template
+        # Mock GraphTemplate.get_retry_policy to return a valid graph template
         mock_graph_template = MagicMock()
         mock_graph_template.retry_policy.max_retries = 3
         mock_graph_template.retry_policy.compute_delay = MagicMock(return_value=1000)
-        mock_graph_template_class.get = AsyncMock(return_value=mock_graph_template)
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
         
         # Mock State constructor and insert method
         mock_retry_state = MagicMock()
         mock_retry_state.insert = AsyncMock(return_value=mock_retry_state)
         mock_state_class.return_value = mock_retry_state
         
-        mock_state_queued.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_queued)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
+        mock_state_class.transition = applying_transition(mock_state_queued)
 
         # Act
         result = await errored_state(
@@ -307,7 +321,7 @@ class TestErroredState:
 
         # Assert
         assert result.status == StateStatusEnum.ERRORED
-        assert mock_state_class.find_one.call_count == 1  # Called once for finding
+        assert mock_state_class.find_records.call_count == 1  # Called once for finding
         assert mock_state_queued.error == "Different error message"
 
     @patch('app.controller.errored_state.State')
@@ -324,11 +338,10 @@ class TestErroredState:
     ):
         """Test when graph template is not found"""
         # Arrange
-        mock_state_queued.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_queued)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
         
-        # Mock GraphTemplate.get to raise ValueError with "Graph template not found"
-        mock_graph_template_class.get = AsyncMock(side_effect=ValueError("Graph template not found"))
+        # Mock GraphTemplate.get_retry_policy to raise ValueError with "Graph template not found"
+        mock_graph_template_class.get_retry_policy = AsyncMock(side_effect=ValueError("Graph template not found"))
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -356,11 +369,10 @@ class TestErroredState:
     ):
         """Test when graph template raises other exceptions"""
         # Arrange
-        mock_state_queued.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_queued)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
         
-        # Mock GraphTemplate.get to raise a different exception
-        mock_graph_template_class.get = AsyncMock(side_effect=Exception("Database connection error"))
+        # Mock GraphTemplate.get_retry_policy to raise a different exception
+        mock_graph_template_class.get_retry_policy = AsyncMock(side_effect=Exception("Database connection error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -387,14 +399,14 @@ class TestErroredState:
     ):
         """Test when creating retry state encounters DuplicateKeyError"""
         # Arrange
-        mock_state_queued.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_queued)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
+        mock_state_class.transition = applying_transition(mock_state_queued)
         
-        # Mock GraphTemplate.get to return a valid graph template
+        # Mock GraphTemplate.get_retry_policy to return a valid graph template
         mock_graph_template = MagicMock()
         mock_graph_template.retry_policy.max_retries = 3
         mock_graph_template.retry_policy.compute_delay = MagicMock(return_value=1000)
-        mock_graph_template_class.get = AsyncMock(return_value=mock_graph_template)
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
         
         # Mock State constructor and insert method to raise DuplicateKeyError
         mock_retry_state = MagicMock()
@@ -440,14 +452,15 @@ class TestErroredState:
         mock_state.parents = []
         mock_state.does_unites = False
         mock_state.fanout_id = None
-        mock_state.save = AsyncMock()
+        mock_state.single_flight_key = None
         
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
+        mock_state_class.transition = applying_transition(mock_state)
         
-        # Mock GraphTemplate.get to return a valid graph template with max_retries = 3
+        # Mock GraphTemplate.get_retry_policy to return a valid graph template with max_retries = 3
         mock_graph_template = MagicMock()
         mock_graph_template.retry_policy.max_retries = 3
-        mock_graph_template_class.get = AsyncMock(return_value=mock_graph_template)
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
 
         # Act
         result = await errored_state(
@@ -465,6 +478,47 @@ class TestErroredState:
         # Verify that State constructor was not called (no retry created)
         mock_state_class.assert_not_called()
 
+    @patch('app.controller.errored_state.release_single_flight_followers', new_callable=AsyncMock)
+    @patch('app.controller.errored_state.State')
+    @patch('app.controller.errored_state.GraphTemplate')
+    async def test_errored_state_fails_single_flight_followers(
+        self,
+        mock_graph_template_class,
+        mock_state_class,
+        mock_release_single_flight_followers,
+        mock_namespace,
+        mock_state_id,
+        mock_errored_request,
+        mock_state_queued,
+        mock_request_id
+    ):
+        """Test that only the final error of a single flight leader fails its followers"""
+        mock_state_queued.single_flight_key = "hash1"
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
+        mock_state_class.transition = applying_transition(mock_state_queued)
+        mock_retry_state = MagicMock()
+        mock_retry_state.insert = AsyncMock(return_value=mock_retry_state)
+        mock_state_class.return_value = mock_retry_state
+
+        mock_graph_template = MagicMock()
+        mock_graph_template.retry_policy.max_retries = 3
+        mock_graph_template.retry_policy.compute_delay = MagicMock(return_value=1000)
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
+
+        # The retry keeps leading the flight
+        mock_state_queued.retry_count = 0
+        await errored_state(mock_namespace, mock_state_id, mock_errored_request, mock_request_id)
+        mock_release_single_flight_followers.assert_not_awaited()
+        assert mock_state_class.call_args.kwargs["single_flight_key"] == "hash1"
+
+        mock_state_queued.status = StateStatusEnum.QUEUED
+        mock_state_queued.retry_count = 3
+        await errored_state(mock_namespace, mock_state_id, mock_errored_request, mock_request_id)
+        mock_release_single_flight_followers.assert_awaited_once()
+        leader, status = mock_release_single_flight_followers.await_args.args[:2]
+        assert leader is mock_state_queued
+        assert status == StateStatusEnum.ERRORED
+
     @patch('app.controller.errored_state.State')
     async def test_errored_state_general_exception(
         self,
@@ -476,7 +530,7 @@ class TestErroredState:
     ):
         """Test handling of general exceptions in the main try-catch block"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(side_effect=Exception("Unexpected error"))
+        mock_state_class.find_records = AsyncMock(side_effect=Exception("Unexpected error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -489,3 +543,130 @@ class TestErroredState:
         
         assert str(exc_info.value) == "Unexpected error"
 
+
+    @patch('app.controller.errored_state.State')
+    @patch('app.controller.errored_state.GraphTemplate')
+    async def test_errored_state_concurrent_duplicate_creates_no_retry(
+        self,
+        mock_graph_template_class,
+        mock_state_class,
+        mock_namespace,
+        mock_state_id,
+        mock_errored_request,
+        mock_state_queued,
+        mock_request_id
+    ):
+        """Test that a duplicate notification losing the transition does not create a second retry"""
+        # Arrange
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
+        # another request moved the state on between the read and the transition
+        mock_state_class.transition = AsyncMock(return_value=None)
+
+        mock_graph_template = MagicMock()
+        mock_graph_template.retry_policy.max_retries = 3
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
+
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await errored_state(
+                mock_namespace,
+                mock_state_id,
+                mock_errored_request,
+                mock_request_id
+            )
+
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+        assert exc_info.value.detail == "State is not queued"
+        mock_state_class.assert_not_called()
+
+    @patch('app.controller.errored_state.State')
+    @patch('app.controller.errored_state.GraphTemplate')
+    async def test_errored_state_retry_insert_failure_marks_errored(
+        self,
+        mock_graph_template_class,
+        mock_state_class,
+        mock_namespace,
+        mock_state_id,
+        mock_errored_request,
+        mock_state_queued,
+        mock_request_id
+    ):
+        """Test that a state whose retry could not be created ends up errored"""
+        # Arrange
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state_queued])
+        mock_state_class.transition = applying_transition(mock_state_queued)
+
+        mock_graph_template = MagicMock()
+        mock_graph_template.retry_policy.max_retries = 3
+        mock_graph_template.retry_policy.compute_delay = MagicMock(return_value=1000)
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
+
+        mock_retry_state = MagicMock()
+        mock_retry_state.insert = AsyncMock(side_effect=Exception("Insert error"))
+        mock_state_class.return_value = mock_retry_state
+
+        # Act
+        result = await errored_state(
+            mock_namespace,
+            mock_state_id,
+            mock_errored_request,
+            mock_request_id
+        )
+
+        # Assert
+        assert not result.retry_created
+        assert mock_state_queued.status == StateStatusEnum.ERRORED
+        assert mock_state_queued.error == mock_errored_request.error
+        assert mock_state_class.transition.await_args_list[1].args[1] == [StateStatusEnum.RETRY_CREATED]
+
+    @patch('app.controller.errored_state.EventBus')
+    @patch('app.controller.errored_state.State')
+    @patch('app.controller.errored_state.GraphTemplate')
+    async def test_errored_state_retry_is_built_from_transitioned_state(
+        self,
+        mock_graph_template_class,
+        mock_state_class,
+        mock_event_bus_class,
+        mock_namespace,
+        mock_state_id,
+        mock_errored_request,
+        mock_request_id
+    ):
+        """Test that only the retry decision fields are read before the transition, which returns the rest"""
+        mock_state_class.find_records = AsyncMock(return_value=[StateRecord({"_id": mock_state_id, "status": StateStatusEnum.QUEUED, "graph_name": "test_graph", "retry_count": 1})])
+        transitioned = StateRecord({
+            "_id": mock_state_id,
+            "node_name": "test_node",
+            "namespace_name": mock_namespace,
+            "identifier": "test_identifier",
+            "graph_name": "test_graph",
+            "run_id": "test_run_id",
+            "status": StateStatusEnum.RETRY_CREATED,
+            "inputs": {"url": "a"},
+            "parents": {},
+            "retry_count": 1,
+            "fanout_id": "test_fanout_id"
+        })
+        mock_state_class.transition = AsyncMock(return_value=transitioned)
+
+        mock_graph_template = MagicMock()
+        mock_graph_template.retry_policy.max_retries = 3
+        mock_graph_template.retry_policy.compute_delay = MagicMock(return_value=1000)
+        mock_graph_template_class.get_retry_policy = AsyncMock(return_value=mock_graph_template.retry_policy)
+
+        mock_retry_state = MagicMock()
+        mock_retry_state.insert = AsyncMock(return_value=mock_retry_state)
+        mock_state_class.return_value = mock_retry_state
+
+        result = await errored_state(mock_namespace, mock_state_id, mock_errored_request, mock_request_id)
+
+        assert result.retry_created
+        mock_state_class.find_records.assert_awaited_once_with([mock_state_id], projection=RETRY_DECISION_PROJECTION)
+        mock_graph_template_class.get_retry_policy.assert_awaited_once_with(mock_namespace, "test_graph")
+        mock_graph_template.retry_policy.compute_delay.assert_called_once_with(2)
+
+        retry_kwargs = mock_state_class.call_args.kwargs
+        assert retry_kwargs["inputs"] == {"url": "a"}
+        assert retry_kwargs["fanout_id"] == "test_fanout_id"
+        assert retry_kwargs["retry_count"] == 2
+        mock_event_bus_class.return_value.publish.assert_any_call(transitioned)
@@ -8,6 +8,27 @@ from app.models.executed_models import ExecutedRequestModel
 from app.models.state_status_enum import StateStatusEnum
 
 
+def mock_stored_state(mock_state_class, state, side_effect=None):
+    """
+    Emulate State.transition and State.get_status against a single stored
+    (mock) state: the transition only applies while the state is queued.
+    """
+    async def transition(state_id, from_statuses, updates):
+        if side_effect is not None:
+            raise side_effect
+        if state is None or state.status not in from_statuses:
+            return None
+        for field, value in updates.items():
+            setattr(state, field, value)
+        return state
+
+    async def get_status(state_id):
+        return None if state is None or state.id is None else state.status
+
+    mock_state_class.transition = AsyncMock(side_effect=transition)
+    mock_state_class.get_status = AsyncMock(side_effect=get_status)
+
+
 class TestExecutedState:
     """Test cases for executed_state function"""
 
@@ -38,6 +59,8 @@ class TestExecutedState:
         state.graph_name = "test_graph"
         state.inputs = {"key": "value"}
         state.parents = {}
+        state.memoize_ttl = None
+        state.single_flight_key = None
         return state
 
     @pytest.fixture
@@ -61,16 +84,8 @@ class TestExecutedState:
     ):
         """Test successful execution of state with single output"""
         # Arrange
-        # Mock State.find_one() for finding the state
-        # Mock State.find_one().set() for updating the state
-        mock_update_query = MagicMock()
-        mock_update_query.set = AsyncMock()
-
-        mock_state.save = AsyncMock()
-
-        mock_state.status = StateStatusEnum.QUEUED 
-        mock_state.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)   
+        mock_state.status = StateStatusEnum.QUEUED
+        mock_stored_state(mock_state_class, mock_state)
 
         # Act
         result = await executed_state(
@@ -83,7 +98,7 @@ class TestExecutedState:
 
         # Assert
         assert result.status == StateStatusEnum.EXECUTED
-        assert mock_state_class.find_one.call_count == 1  # Called once for finding
+        mock_state_class.transition.assert_awaited_once_with(mock_state_id, [StateStatusEnum.QUEUED], {"status": StateStatusEnum.EXECUTED, "outputs": {"result": "success"}})
         mock_background_tasks.add_task.assert_called_once_with(mock_create_next_states, [mock_state.id], mock_state.identifier, mock_state.namespace_name, mock_state.graph_name, mock_state.parents)
 
     @patch('app.controller.executed_state.State')
@@ -108,24 +123,9 @@ class TestExecutedState:
             ]
         )
 
-        # Mock State.find_one() for finding the state
-        # Mock State.find_one().set() for updating the state
-        mock_update_query = MagicMock()
-        mock_update_query.set = AsyncMock()
-        
-        # Configure State.find_one to return different values based on call
-        # First call returns the state object, second call returns a query object with set method
-        # Additional calls in the loop also return query objects with set method
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
-        mock_state.save = AsyncMock()
+        mock_stored_state(mock_state_class, mock_state)
         new_ids = [PydanticObjectId(), PydanticObjectId()]
-        mock_state_class.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=new_ids))
-        mock_state_class.find = MagicMock(return_value=AsyncMock(to_list=AsyncMock(return_value=[mock_state, mock_state])))
-        
-        # Mock State.save() for new states
-        mock_new_state = MagicMock()
-        mock_new_state.save = AsyncMock()
-        mock_state_class.return_value = mock_new_state
+        mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=new_ids))
 
         # Act
         result = await executed_state(
@@ -139,11 +139,108 @@ class TestExecutedState:
         # Assert
         assert result.status == StateStatusEnum.EXECUTED
         # Should create 2 additional states (3 outputs total, 1 for main state, 2 new states)
-        assert mock_state_class.call_count == 2
+        assert mock_state_class.new_document.call_count == 2
         # Should add 1 background task with all state IDs
-        assert mock_background_tasks.add_task.call_count == 1
-        # State.find_one should be called once for finding the state
-        assert mock_state_class.find_one.call_count == 1
+        mock_background_tasks.add_task.assert_called_once()
+        assert mock_background_tasks.add_task.call_args.args[1] == [mock_state.id, *new_ids]
+        # The state is transitioned with a single conditional update
+        assert mock_state_class.transition.await_count == 1
+
+    @patch('app.controller.executed_state.MemoizedResult')
+    @patch('app.controller.executed_state.State')
+    @patch('app.controller.executed_state.create_next_states')
+    async def test_executed_state_memoizes_single_output(
+        self,
+        mock_create_next_states,
+        mock_state_class,
+        mock_memoized_result,
+        mock_namespace,
+        mock_state_id,
+        mock_executed_request,
+        mock_state,
+        mock_background_tasks,
+        mock_request_id
+    ):
+        """Test that the output of a memoized state is remembered for its ttl"""
+        mock_state.memoize_ttl = 60
+        mock_stored_state(mock_state_class, mock_state)
+        mock_memoized_result.remember = AsyncMock()
+
+        await executed_state(mock_namespace, mock_state_id, mock_executed_request, mock_request_id, mock_background_tasks)
+
+        mock_memoized_result.remember.assert_awaited_once_with("test_namespace", "test_node", {"key": "value"}, {"result": "success"}, 60)
+
+    @patch('app.controller.executed_state.MemoizedResult')
+    @patch('app.controller.executed_state.State')
+    @patch('app.controller.executed_state.create_next_states')
+    async def test_executed_state_does_not_memoize_fan_out(
+        self,
+        mock_create_next_states,
+        mock_state_class,
+        mock_memoized_result,
+        mock_namespace,
+        mock_state_id,
+        mock_state,
+        mock_background_tasks,
+        mock_request_id
+    ):
+        """Test that a fan-out of a memoized state is not remembered"""
+        mock_state.memoize_ttl = 60
+        mock_stored_state(mock_state_class, mock_state)
+        mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=[PydanticObjectId()]))
+        mock_memoized_result.remember = AsyncMock()
+
+        executed_request = ExecutedRequestModel(outputs=[{"result": "success1"}, {"result": "success2"}])
+        await executed_state(mock_namespace, mock_state_id, executed_request, mock_request_id, mock_background_tasks)
+
+        mock_memoized_result.remember.assert_not_awaited()
+
+    @patch('app.controller.executed_state.State')
+    @patch('app.controller.executed_state.create_next_states')
+    async def test_executed_state_releases_single_flight_followers(
+        self,
+        mock_create_next_states,
+        mock_state_class,
+        mock_namespace,
+        mock_state_id,
+        mock_executed_request,
+        mock_state,
+        mock_background_tasks,
+        mock_request_id
+    ):
+        """Test that a single flight leader hands its output to its followers"""
+        from app.controller.executed_state import release_single_flight_followers
+
+        mock_state.single_flight_key = "hash1"
+        mock_stored_state(mock_state_class, mock_state)
+
+        await executed_state(mock_namespace, mock_state_id, mock_executed_request, mock_request_id, mock_background_tasks)
+
+        mock_background_tasks.add_task.assert_any_call(release_single_flight_followers, mock_state, StateStatusEnum.EXECUTED, {"outputs": {"result": "success"}})
+
+    @patch('app.controller.executed_state.State')
+    @patch('app.controller.executed_state.create_next_states')
+    async def test_executed_state_fan_out_unparks_single_flight_followers(
+        self,
+        mock_create_next_states,
+        mock_state_class,
+        mock_namespace,
+        mock_state_id,
+        mock_state,
+        mock_background_tasks,
+        mock_request_id
+    ):
+        """Test that the followers of a fanned out leader run on their own"""
+        from app.controller.executed_state import release_single_flight_followers
+
+        mock_state.single_flight_key = "hash1"
+        mock_stored_state(mock_state_class, mock_state)
+        mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=[PydanticObjectId()]))
+
+        executed_request = ExecutedRequestModel(outputs=[{"result": "success1"}, {"result": "success2"}])
+        await executed_state(mock_namespace, mock_state_id, executed_request, mock_request_id, mock_background_tasks)
+
+        mock_background_tasks.add_task.assert_any_call(release_single_flight_followers, mock_state, StateStatusEnum.CREATED, {"single_flight_key": None})
 
     @patch('app.controller.executed_state.State')
     async def test_executed_state_not_found(
@@ -157,7 +254,7 @@ class TestExecutedState:
     ):
         """Test when state is not found"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(return_value=None)
+        mock_stored_state(mock_state_class, None)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -186,7 +283,7 @@ class TestExecutedState:
         # Arrange
         mock_state = MagicMock()
         mock_state.status = StateStatusEnum.CREATED  # Not QUEUED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_stored_state(mock_state_class, mock_state)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -216,16 +313,7 @@ class TestExecutedState:
         """Test execution with empty outputs"""
         # Arrange
         executed_request = ExecutedRequestModel(outputs=[])
-        
-        # Mock State.find_one() for finding the state
-        # Mock State.find_one().set() for updating the state
-        mock_update_query = MagicMock()
-        mock_update_query.set = AsyncMock()
-        
-        # Configure State.find_one to return different values based on call
-        # First call returns the state object, second call returns a query object with set method
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
-        mock_state.save = AsyncMock()
+        mock_stored_state(mock_state_class, mock_state)
 
         # Act
         result = await executed_state(
@@ -253,7 +341,7 @@ class TestExecutedState:
     ):
         """Test handling of database errors"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(side_effect=Exception("Database error"))
+        mock_stored_state(mock_state_class, None, Exception("Database error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -282,8 +370,7 @@ class TestExecutedState:
     ):
         """Test general exception handling in executed_state function"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
-        mock_state.save = AsyncMock(side_effect=Exception("Save error"))
+        mock_stored_state(mock_state_class, mock_state, Exception("Save error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -313,7 +400,7 @@ class TestExecutedState:
         # Arrange
         mock_state = MagicMock()
         mock_state.id = None
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_stored_state(mock_state_class, mock_state)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -350,12 +437,11 @@ class TestExecutedState:
             ]
         )
 
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
-        mock_state.save = AsyncMock()
+        mock_stored_state(mock_state_class, mock_state)
         
         # Mock partial insert - only 1 state inserted instead of 2 (this is valid)
         new_ids = [PydanticObjectId()]
-        mock_state_class.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=new_ids))
+        mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=new_ids))
         mock_state_class.find = MagicMock(return_value=AsyncMock(to_list=AsyncMock(return_value=[mock_state])))
 
         # Act
@@ -391,11 +477,10 @@ class TestExecutedState:
             ]
         )
 
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
-        mock_state.save = AsyncMock()
+        mock_stored_state(mock_state_class, mock_state)
         
         # Mock complete insert failure - no states inserted (this is valid)
-        mock_state_class.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=[]))
+        mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=[]))
         mock_state_class.find = MagicMock(return_value=AsyncMock(to_list=AsyncMock(return_value=[])))
 
         # Act
@@ -429,8 +514,9 @@ class TestExecutedState:
         mock_state = MagicMock()
         mock_state.id = PydanticObjectId()
         mock_state.status = StateStatusEnum.QUEUED
-        mock_state.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state.memoize_ttl = None
+        mock_state.single_flight_key = None
+        mock_stored_state(mock_state_class, mock_state)
 
         # Act - Success scenario
         await executed_state(
@@ -449,7 +535,7 @@ class TestExecutedState:
 
         # Arrange - Error scenario
         mock_logger.reset_mock()
-        mock_state_class.find_one = AsyncMock(side_effect=Exception("Test error"))
+        mock_stored_state(mock_state_class, None, Exception("Test error"))
 
         # Act - Error scenario
         with pytest.raises(Exception):
@@ -496,11 +582,10 @@ class TestExecutedState:
         mock_state.inputs = {"key": "value"}
         mock_state.parents = {"parent1": PydanticObjectId()}
 
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
-        mock_state.save = AsyncMock()
-        
+        mock_stored_state(mock_state_class, mock_state)
+
         new_ids = [PydanticObjectId()]
-        mock_state_class.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=new_ids))
+        mock_state_class.insert_documents = AsyncMock(return_value=MagicMock(inserted_ids=new_ids))
         mock_state_class.find = MagicMock(return_value=AsyncMock(to_list=AsyncMock(return_value=[mock_state])))
 
         # Act
@@ -512,8 +597,8 @@ class TestExecutedState:
             mock_background_tasks
         )
 
-        # Assert that State was called with correct parameters for new state creation
-        state_call = mock_state_class.call_args
+        # Assert that the new state documents are built with correct parameters
+        state_call = mock_state_class.new_document.call_args
         assert state_call[1]['node_name'] == mock_state.node_name
         assert state_call[1]['namespace_name'] == mock_state.namespace_name
         assert state_call[1]['identifier'] == mock_state.identifier
@@ -540,8 +625,7 @@ class TestExecutedState:
         """Test all valid status transitions in executed_state"""
         # Test with QUEUED status (valid)
         mock_state.status = StateStatusEnum.QUEUED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
-        mock_state.save = AsyncMock()
+        mock_stored_state(mock_state_class, mock_state)
 
         executed_request = ExecutedRequestModel(outputs=[{"result": "success"}])
         
@@ -560,8 +644,8 @@ class TestExecutedState:
         for invalid_status in [StateStatusEnum.CREATED, StateStatusEnum.EXECUTED, 
                               StateStatusEnum.SUCCESS, StateStatusEnum.ERRORED]:
             mock_state.status = invalid_status
-            mock_state_class.find_one = AsyncMock(return_value=mock_state)
-            
+            mock_stored_state(mock_state_class, mock_state)
+
             with pytest.raises(HTTPException) as exc_info:
                 await executed_state(
                     mock_namespace,
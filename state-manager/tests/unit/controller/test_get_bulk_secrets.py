@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.controller.get_bulk_secrets import get_bulk_secrets
+from app.models.bulk_secrets_models import BulkSecretsRequestModel
+from app.models.db.state_record import StateRecord
+
+
+def make_state(graph_name, namespace_name="test_namespace"):
+    return StateRecord({"_id": PydanticObjectId(), "namespace_name": namespace_name, "graph_name": graph_name})
+
+
+def secrets_of(namespace_name, graph_name):
+    if graph_name == "missing_graph":
+        return None
+    return {"api_key": f"{graph_name}_key"}
+
+
+class TestGetBulkSecrets:
+    """Test cases for get_bulk_secrets function"""
+
+    @patch('app.controller.get_bulk_secrets.SecretsCache')
+    @patch('app.controller.get_bulk_secrets.State')
+    async def test_secrets_by_state_ids_are_returned_once_per_graph(self, mock_state_class, mock_secrets_cache_class):
+        states = [make_state("graph1"), make_state("graph1"), make_state("graph2")]
+        mock_state_class.find_records = AsyncMock(return_value=states)
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(side_effect=secrets_of)
+
+        result = await get_bulk_secrets(
+            "test_namespace",
+            BulkSecretsRequestModel(state_ids=[str(state.id) for state in states]),
+            "test_request_id"
+        )
+
+        assert result.graphs == {"graph1": {"api_key": "graph1_key"}, "graph2": {"api_key": "graph2_key"}}
+        assert result.states == {str(state.id): state.graph_name for state in states}
+        assert mock_secrets_cache_class.return_value.get_secrets.await_count == 2
+        assert mock_state_class.find_records.call_args.kwargs["projection"] == {"namespace_name": 1, "graph_name": 1}
+
+    @patch('app.controller.get_bulk_secrets.SecretsCache')
+    @patch('app.controller.get_bulk_secrets.State')
+    async def test_secrets_by_graph_names_skip_state_lookup(self, mock_state_class, mock_secrets_cache_class):
+        mock_state_class.find_records = AsyncMock()
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(side_effect=secrets_of)
+
+        result = await get_bulk_secrets(
+            "test_namespace",
+            BulkSecretsRequestModel(graph_names=["graph1", "missing_graph"]),
+            "test_request_id"
+        )
+
+        assert result.graphs == {"graph1": {"api_key": "graph1_key"}}
+        assert result.states == {}
+        mock_state_class.find_records.assert_not_called()
+
+    @patch('app.controller.get_bulk_secrets.SecretsCache')
+    @patch('app.controller.get_bulk_secrets.State')
+    async def test_states_of_other_namespaces_are_left_out(self, mock_state_class, mock_secrets_cache_class):
+        own_state = make_state("graph1")
+        other_state = make_state("graph2", namespace_name="other_namespace")
+        mock_state_class.find_records = AsyncMock(return_value=[own_state, other_state])
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(side_effect=secrets_of)
+
+        result = await get_bulk_secrets(
+            "test_namespace",
+            BulkSecretsRequestModel(state_ids=[str(own_state.id), str(other_state.id)]),
+            "test_request_id"
+        )
+
+        assert result.states == {str(own_state.id): "graph1"}
+        assert list(result.graphs.keys()) == ["graph1"]
+
+    async def test_invalid_state_id(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_bulk_secrets("test_namespace", BulkSecretsRequestModel(state_ids=["invalid"]), "test_request_id")
+
+        assert exc_info.value.status_code == 400
+
+    def test_empty_request_is_rejected(self):
+        with pytest.raises(ValidationError):
+            BulkSecretsRequestModel()
+
+    @patch('app.controller.get_bulk_secrets.State')
+    async def test_database_error(self, mock_state_class):
+        mock_state_class.find_records = AsyncMock(side_effect=Exception("Database error"))
+
+        with pytest.raises(Exception, match="Database error"):
+            await get_bulk_secrets("test_namespace", BulkSecretsRequestModel(state_ids=[str(PydanticObjectId())]), "test_request_id")
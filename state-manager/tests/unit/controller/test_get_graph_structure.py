@@ -1,6 +1,5 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from datetime import datetime
 from bson import ObjectId
 
 from app.controller.get_graph_structure import get_graph_structure
@@ -8,52 +7,85 @@ from app.models.state_status_enum import StateStatusEnum
 from app.models.graph_structure_models import GraphStructureResponse
 
 
+class MockCursor:
+    """Minimal stand-in for a pymongo async aggregation cursor"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self):
+        return list(self.documents)
+
+    def __aiter__(self):
+        self._iterator = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def make_state(identifier, status=StateStatusEnum.SUCCESS, parents=None, error=None, node_name=None, graph_name="test_graph"):
+    return {
+        "_id": ObjectId(),
+        "node_name": node_name or identifier,
+        "identifier": identifier,
+        "status": status.value,
+        "error": error,
+        "graph_name": graph_name,
+        "parents": parents or {},
+    }
+
+
+def summarize(states):
+    groups = {}
+    for state in states:
+        key = (state["identifier"], state["status"])
+        if key not in groups:
+            groups[key] = {
+                "_id": {"identifier": state["identifier"], "status": state["status"]},
+                "count": 0,
+                "node_name": state["node_name"],
+                "graph_name": state["graph_name"],
+            }
+        groups[key]["count"] += 1
+    return list(groups.values())
+
+
+def project(states):
+    projected = []
+    for state in states:
+        document = {key: state[key] for key in ("_id", "node_name", "identifier", "status", "error")}
+        if state["parents"]:
+            key, value = list(state["parents"].items())[-1]
+            document["parent"] = {"k": key, "v": value}
+        projected.append(document)
+    return projected
+
+
+def patch_collection(mock_state_class, states):
+    collection = MagicMock()
+    collection.aggregate = AsyncMock(side_effect=[MockCursor(summarize(states)), MockCursor(project(states))])
+    mock_state_class.get_pymongo_collection.return_value = collection
+    return collection
+
+
 class TestGetGraphStructure:
     """Test cases for get_graph_structure function"""
 
     @pytest.mark.asyncio
     async def test_get_graph_structure_success(self):
         """Test successful graph structure building"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
-        # Create mock states
-        mock_state1 = MagicMock()
-        mock_state1.id = ObjectId()
-        mock_state1.node_name = "node1"
-        mock_state1.identifier = "id1"
-        mock_state1.status = StateStatusEnum.SUCCESS
-        mock_state1.inputs = {"input1": "value1"}
-        mock_state1.outputs = {"output1": "result1"}
-        mock_state1.error = None
-        mock_state1.created_at = datetime.now()
-        mock_state1.updated_at = datetime.now()
-        mock_state1.graph_name = "test_graph"
-        mock_state1.parents = {}
-
-        mock_state2 = MagicMock()
-        mock_state2.id = ObjectId()
-        mock_state2.node_name = "node2"
-        mock_state2.identifier = "id2"
-        mock_state2.status = StateStatusEnum.CREATED
-        mock_state2.inputs = {"input2": "value2"}
-        mock_state2.outputs = {"output2": "result2"}
-        mock_state2.error = None
-        mock_state2.created_at = datetime.now()
-        mock_state2.updated_at = datetime.now()
-        mock_state2.graph_name = "test_graph"
-        # Use the actual state1 ID as parent
-        mock_state2.parents = {"id1": mock_state1.id}
+        state1 = make_state("id1", node_name="node1")
+        state2 = make_state("id2", StateStatusEnum.CREATED, parents={"id1": state1["_id"]}, node_name="node2")
 
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_state1, mock_state2]
-            mock_state_class.find.return_value = mock_find
+            patch_collection(mock_state_class, [state1, state2])
 
-            result = await get_graph_structure(namespace, run_id, request_id)
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
 
-            # Verify the result
             assert isinstance(result, GraphStructureResponse)
             assert result.graph_name == "test_graph"
             assert result.node_count == 2
@@ -61,38 +93,45 @@ class TestGetGraphStructure:
             assert len(result.nodes) == 2
             assert len(result.edges) == 1
             assert len(result.root_states) == 1
+            assert result.collapsed_nodes == []
 
-            # Verify nodes
             node1 = result.nodes[0]
-            assert node1.id == str(mock_state1.id)
+            assert node1.id == str(state1["_id"])
             assert node1.node_name == "node1"
             assert node1.identifier == "id1"
             assert node1.status == StateStatusEnum.SUCCESS
 
-            # Verify edges
             edge = result.edges[0]
-            assert edge.source == str(mock_state1.id)
-            assert edge.target == str(mock_state2.id)
+            assert edge.source == str(state1["_id"])
+            assert edge.target == str(state2["_id"])
 
-            # Verify execution summary
             assert result.execution_summary["SUCCESS"] == 1
             assert result.execution_summary["CREATED"] == 1
 
+    @pytest.mark.asyncio
+    async def test_get_graph_structure_uses_narrow_projection(self):
+        """Test that large state fields are never requested from the database"""
+        state = make_state("id1")
+
+        with patch('app.controller.get_graph_structure.State') as mock_state_class:
+            collection = patch_collection(mock_state_class, [state])
+
+            await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
+
+            pipeline = collection.aggregate.call_args_list[1].args[0]
+            assert pipeline[0] == {"$match": {"run_id": "test_run_id", "namespace_name": "test_namespace"}}
+            projection = pipeline[1]["$project"]
+            for field in ("inputs", "outputs", "data", "parents"):
+                assert field not in projection
+
     @pytest.mark.asyncio
     async def test_get_graph_structure_no_states(self):
         """Test graph structure building when no states are found"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.return_value = []
-            mock_state_class.find.return_value = mock_find
+            collection = patch_collection(mock_state_class, [])
 
-            result = await get_graph_structure(namespace, run_id, request_id)
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
 
-            # Verify empty result
             assert isinstance(result, GraphStructureResponse)
             assert result.graph_name == ""
             assert result.node_count == 0
@@ -100,39 +139,21 @@ class TestGetGraphStructure:
             assert len(result.nodes) == 0
             assert len(result.edges) == 0
             assert len(result.root_states) == 0
-            # All states should be initialized to 0
             expected_summary = {status.value: 0 for status in StateStatusEnum}
             assert result.execution_summary == expected_summary
+            # States are not streamed when the run is empty
+            assert collection.aggregate.call_count == 1
 
     @pytest.mark.asyncio
     async def test_get_graph_structure_with_errors(self):
         """Test graph structure building with states that have errors"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
-        # Create mock state with error
-        mock_state = MagicMock()
-        mock_state.id = ObjectId()
-        mock_state.node_name = "error_node"
-        mock_state.identifier = "error_id"
-        mock_state.status = StateStatusEnum.ERRORED
-        mock_state.inputs = {}
-        mock_state.outputs = {}
-        mock_state.error = "Something went wrong"
-        mock_state.created_at = datetime.now()
-        mock_state.updated_at = datetime.now()
-        mock_state.graph_name = "test_graph"
-        mock_state.parents = {}
+        state = make_state("error_id", StateStatusEnum.ERRORED, error="Something went wrong", node_name="error_node")
 
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_state]
-            mock_state_class.find.return_value = mock_find
+            patch_collection(mock_state_class, [state])
 
-            result = await get_graph_structure(namespace, run_id, request_id)
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
 
-            # Verify the result
             assert result.node_count == 1
             assert result.edge_count == 0
             assert len(result.root_states) == 1
@@ -145,98 +166,50 @@ class TestGetGraphStructure:
     @pytest.mark.asyncio
     async def test_get_graph_structure_complex_parents(self):
         """Test graph structure building with complex parent relationships"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
-        # Create mock states with multiple parents
-        mock_state1 = MagicMock()
-        mock_state1.id = ObjectId()
-        mock_state1.node_name = "parent1"
-        mock_state1.identifier = "parent1"
-        mock_state1.status = StateStatusEnum.SUCCESS
-        mock_state1.inputs = {}
-        mock_state1.outputs = {}
-        mock_state1.error = None
-        mock_state1.created_at = datetime.now()
-        mock_state1.updated_at = datetime.now()
-        mock_state1.graph_name = "test_graph"
-        mock_state1.parents = {}
-
-        mock_state2 = MagicMock()
-        mock_state2.id = ObjectId()
-        mock_state2.node_name = "parent2"
-        mock_state2.identifier = "parent2"
-        mock_state2.status = StateStatusEnum.SUCCESS
-        mock_state2.inputs = {}
-        mock_state2.outputs = {}
-        mock_state2.error = None
-        mock_state2.created_at = datetime.now()
-        mock_state2.updated_at = datetime.now()
-        mock_state2.graph_name = "test_graph"
-        mock_state2.parents = {}
-
-        # Child state with multiple parents (accumulated)
-        mock_child = MagicMock()
-        mock_child.id = ObjectId()
-        mock_child.node_name = "child"
-        mock_child.identifier = "child"
-        mock_child.status = StateStatusEnum.CREATED
-        mock_child.inputs = {}
-        mock_child.outputs = {}
-        mock_child.error = None
-        mock_child.created_at = datetime.now()
-        mock_child.updated_at = datetime.now()
-        mock_child.graph_name = "test_graph"
-        # Parents dict with insertion order preserved - use actual state IDs
-        mock_child.parents = {"parent1": mock_state1.id, "parent2": mock_state2.id}
+        parent1 = make_state("parent1")
+        parent2 = make_state("parent2")
+        # Parents dict with insertion order preserved
+        child = make_state("child", StateStatusEnum.CREATED, parents={"parent1": parent1["_id"], "parent2": parent2["_id"]})
 
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_state1, mock_state2, mock_child]
-            mock_state_class.find.return_value = mock_find
+            patch_collection(mock_state_class, [parent1, parent2, child])
 
-            result = await get_graph_structure(namespace, run_id, request_id)
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
 
-            # Verify the result
             assert result.node_count == 3
             assert result.edge_count == 1  # Only direct parent relationship
             assert len(result.root_states) == 2
 
             # Should only create edge for the most recent parent (parent2)
             edge = result.edges[0]
-            assert edge.source == str(mock_state2.id)
-            assert edge.target == str(mock_child.id)
+            assert edge.source == str(parent2["_id"])
+            assert edge.target == str(child["_id"])
+
+    @pytest.mark.asyncio
+    async def test_get_graph_structure_child_streamed_before_parent(self):
+        """Test that edges are kept when a child arrives before its parent on the cursor"""
+        parent = make_state("parent")
+        child = make_state("child", parents={"parent": parent["_id"]})
+
+        with patch('app.controller.get_graph_structure.State') as mock_state_class:
+            patch_collection(mock_state_class, [child, parent])
+
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
+
+            assert result.edge_count == 1
+            assert result.edges[0].source == str(parent["_id"])
 
     @pytest.mark.asyncio
     async def test_get_graph_structure_parent_not_in_nodes(self):
         """Test graph structure building when parent is not in the same run"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
-        # Create mock state with parent that doesn't exist in the same run
-        mock_state = MagicMock()
-        mock_state.id = ObjectId()
-        mock_state.node_name = "child"
-        mock_state.identifier = "child"
-        mock_state.status = StateStatusEnum.CREATED
-        mock_state.inputs = {}
-        mock_state.outputs = {}
-        mock_state.error = None
-        mock_state.created_at = datetime.now()
-        mock_state.updated_at = datetime.now()
-        mock_state.graph_name = "test_graph"
-        mock_state.parents = {"missing_parent": ObjectId()}
+        state = make_state("child", StateStatusEnum.CREATED, parents={"missing_parent": ObjectId()})
 
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_state]
-            mock_state_class.find.return_value = mock_find
+            patch_collection(mock_state_class, [state])
 
-            result = await get_graph_structure(namespace, run_id, request_id)
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
 
-            # Verify the result - no edges should be created
+            # No edges should be created
             assert result.node_count == 1
             assert result.edge_count == 0
             assert len(result.root_states) == 0  # Not a root state since it has parents
@@ -244,53 +217,26 @@ class TestGetGraphStructure:
     @pytest.mark.asyncio
     async def test_get_graph_structure_exception_handling(self):
         """Test graph structure building with exception handling"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.side_effect = Exception("Database error")
-            mock_state_class.find.return_value = mock_find
+            collection = MagicMock()
+            collection.aggregate = AsyncMock(side_effect=Exception("Database error"))
+            mock_state_class.get_pymongo_collection.return_value = collection
 
             with pytest.raises(Exception, match="Database error"):
-                await get_graph_structure(namespace, run_id, request_id)
+                await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
 
     @pytest.mark.asyncio
     async def test_get_graph_structure_multiple_statuses(self):
         """Test graph structure building with multiple status types"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
-        # Create mock states with different statuses
-        states = []
-        statuses = [StateStatusEnum.CREATED, StateStatusEnum.QUEUED, StateStatusEnum.EXECUTED, 
-                   StateStatusEnum.SUCCESS, StateStatusEnum.ERRORED, StateStatusEnum.NEXT_CREATED_ERROR]
-
-        for i, status in enumerate(statuses):
-            mock_state = MagicMock()
-            mock_state.id = ObjectId()
-            mock_state.node_name = f"node{i}"
-            mock_state.identifier = f"id{i}"
-            mock_state.status = status
-            mock_state.inputs = {}
-            mock_state.outputs = {}
-            mock_state.error = None
-            mock_state.created_at = datetime.now()
-            mock_state.updated_at = datetime.now()
-            mock_state.graph_name = "test_graph"
-            mock_state.parents = {}
-            states.append(mock_state)
+        statuses = [StateStatusEnum.CREATED, StateStatusEnum.QUEUED, StateStatusEnum.EXECUTED,
+                    StateStatusEnum.SUCCESS, StateStatusEnum.ERRORED, StateStatusEnum.NEXT_CREATED_ERROR]
+        states = [make_state(f"id{i}", status, node_name=f"node{i}") for i, status in enumerate(statuses)]
 
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.return_value = states
-            mock_state_class.find.return_value = mock_find
+            patch_collection(mock_state_class, states)
 
-            result = await get_graph_structure(namespace, run_id, request_id)
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id")
 
-            # Verify execution summary has all statuses
             assert result.node_count == 6
             assert result.edge_count == 0
             assert len(result.root_states) == 6
@@ -299,33 +245,53 @@ class TestGetGraphStructure:
                 assert result.execution_summary[status.value] == 1
 
     @pytest.mark.asyncio
-    async def test_get_graph_structure_with_position_data(self):
-        """Test graph structure building with position data in nodes"""
-        namespace = "test_namespace"
-        run_id = "test_run_id"
-        request_id = "test_request_id"
-
-        # Create mock state
-        mock_state = MagicMock()
-        mock_state.id = ObjectId()
-        mock_state.node_name = "test_node"
-        mock_state.identifier = "test_id"
-        mock_state.status = StateStatusEnum.SUCCESS
-        mock_state.inputs = {}
-        mock_state.outputs = {}
-        mock_state.error = None
-        mock_state.created_at = datetime.now()
-        mock_state.updated_at = datetime.now()
-        mock_state.graph_name = "test_graph"
-        mock_state.parents = {}
+    async def test_get_graph_structure_collapses_fan_out(self):
+        """Test that identifiers above the threshold are collapsed with status counts"""
+        root = make_state("root")
+        fan_out = [
+            make_state("fan", StateStatusEnum.SUCCESS if i % 2 == 0 else StateStatusEnum.CREATED, parents={"root": root["_id"]})
+            for i in range(6)
+        ]
+        children = [
+            make_state("child", StateStatusEnum.CREATED, parents={"root": root["_id"], "fan": state["_id"]})
+            for state in fan_out[:3]
+        ]
 
         with patch('app.controller.get_graph_structure.State') as mock_state_class:
-            mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_state]
-            mock_state_class.find.return_value = mock_find
+            patch_collection(mock_state_class, [root, *fan_out, *children])
 
-            result = await get_graph_structure(namespace, run_id, request_id)
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id", collapse_threshold=4)
 
-            # Verify node structure
-            node = result.nodes[0]
-            assert node.id == str(mock_state.id) 
\ No newline at end of file
+            assert len(result.nodes) == 4
+            assert len(result.collapsed_nodes) == 1
+            assert result.node_count == 5
+
+            collapsed = result.collapsed_nodes[0]
+            assert collapsed.identifier == "fan"
+            assert collapsed.state_count == 6
+            assert collapsed.status_counts == {"SUCCESS": 3, "CREATED": 3}
+
+            edges = {(edge.source, edge.target) for edge in result.edges}
+            assert (str(root["_id"]), collapsed.id) in edges
+            for child in children:
+                assert (collapsed.id, str(child["_id"])) in edges
+            assert result.edge_count == 4
+
+            # Execution summary still counts every state
+            assert result.execution_summary["SUCCESS"] == 4
+            assert result.execution_summary["CREATED"] == 6
+
+    @pytest.mark.asyncio
+    async def test_get_graph_structure_below_threshold_not_collapsed(self):
+        """Test that identifiers at or below the threshold keep individual nodes"""
+        root = make_state("root")
+        fan_out = [make_state("fan", parents={"root": root["_id"]}) for _ in range(3)]
+
+        with patch('app.controller.get_graph_structure.State') as mock_state_class:
+            patch_collection(mock_state_class, [root, *fan_out])
+
+            result = await get_graph_structure("test_namespace", "test_run_id", "test_request_id", collapse_threshold=3)
+
+            assert len(result.nodes) == 4
+            assert result.collapsed_nodes == []
+            assert result.edge_count == 3
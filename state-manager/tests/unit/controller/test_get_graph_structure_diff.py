@@ -0,0 +1,173 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import datetime
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.controller.get_graph_structure_diff import get_graph_structure_diff, encode_cursor, decode_cursor, CURSOR_LAG
+from app.models.state_status_enum import StateStatusEnum
+from app.models.graph_structure_models import GraphDiffResponse
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async aggregation cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def make_document(identifier, status=StateStatusEnum.CREATED, parent=None, updated_at=None):
+    document = {
+        "_id": ObjectId(),
+        "node_name": identifier,
+        "identifier": identifier,
+        "status": status.value,
+        "error": None,
+        "updated_at": updated_at or datetime(2025, 1, 1, 12, 0, 0),
+    }
+    if parent is not None:
+        document["parent"] = {"k": "parent", "v": parent}
+    return document
+
+
+def patch_collection(mock_state_class, documents):
+    collection = MagicMock()
+    collection.aggregate = AsyncMock(return_value=MockCursor(documents))
+    mock_state_class.get_pymongo_collection.return_value = collection
+    return collection
+
+
+class TestGraphCursor:
+    """Test cases for cursor encoding"""
+
+    def test_cursor_round_trip(self):
+        updated_at = datetime(2025, 1, 1, 12, 0, 0, 123000)
+        state_id = ObjectId()
+
+        decoded_updated_at, decoded_state_id = decode_cursor(encode_cursor(updated_at, state_id))  # type: ignore
+
+        assert decoded_updated_at == updated_at
+        assert decoded_state_id == state_id
+
+    def test_decode_invalid_cursor(self):
+        with pytest.raises(Exception):
+            decode_cursor("not-a-cursor")
+
+
+class TestGetGraphStructureDiff:
+    """Test cases for get_graph_structure_diff function"""
+
+    @pytest.mark.asyncio
+    async def test_diff_without_cursor(self):
+        """Test that the first call returns changes from the beginning of the run"""
+        root = make_document("root", StateStatusEnum.SUCCESS)
+        child = make_document("child", parent=root["_id"], updated_at=datetime(2025, 1, 1, 12, 0, 1))
+
+        with patch('app.controller.get_graph_structure_diff.State') as mock_state_class:
+            collection = patch_collection(mock_state_class, [root, child])
+
+            result = await get_graph_structure_diff("test_namespace", "test_run_id", None, 100, "test_request_id")
+
+            assert isinstance(result, GraphDiffResponse)
+            assert [node.id for node in result.nodes] == [str(root["_id"]), str(child["_id"])]
+            assert len(result.edges) == 1
+            assert result.edges[0].source == str(root["_id"])
+            assert result.edges[0].target == str(child["_id"])
+            assert result.cursor == encode_cursor(child["updated_at"], child["_id"])
+            assert result.has_more is False
+
+            pipeline = collection.aggregate.call_args.args[0]
+            assert pipeline[0] == {"$match": {"run_id": "test_run_id", "namespace_name": "test_namespace"}}
+            assert pipeline[1] == {"$sort": {"updated_at": 1, "_id": 1}}
+            assert pipeline[2] == {"$limit": 100}
+
+    @pytest.mark.asyncio
+    async def test_diff_with_cursor_filters_on_updated_at(self):
+        """Test that a cursor restricts the query to later changes"""
+        updated_at = datetime(2025, 1, 1, 12, 0, 0)
+        state_id = ObjectId()
+        cursor = encode_cursor(updated_at, state_id)  # type: ignore
+
+        with patch('app.controller.get_graph_structure_diff.State') as mock_state_class:
+            collection = patch_collection(mock_state_class, [])
+
+            result = await get_graph_structure_diff("test_namespace", "test_run_id", cursor, 100, "test_request_id")
+
+            assert result.nodes == []
+            assert result.edges == []
+            # The cursor does not move when nothing changed
+            assert result.cursor == cursor
+            assert result.has_more is False
+
+            match = collection.aggregate.call_args.args[0][0]["$match"]
+            assert match["$or"] == [
+                {"updated_at": {"$gt": updated_at}},
+                {"updated_at": updated_at, "_id": {"$gt": state_id}}
+            ]
+
+    @pytest.mark.asyncio
+    async def test_diff_has_more_when_limit_reached(self):
+        """Test that has_more is set when the page is full"""
+        documents = [make_document(f"node{i}") for i in range(3)]
+
+        with patch('app.controller.get_graph_structure_diff.State') as mock_state_class:
+            patch_collection(mock_state_class, documents)
+
+            result = await get_graph_structure_diff("test_namespace", "test_run_id", None, 3, "test_request_id")
+
+            assert len(result.nodes) == 3
+            assert result.has_more is True
+
+    @pytest.mark.asyncio
+    async def test_diff_cursor_stays_behind_lag_window(self):
+        """Test that the cursor does not pass changes that may still be committing"""
+        old = make_document("old")
+        recent = make_document("recent", updated_at=datetime.now())
+
+        with patch('app.controller.get_graph_structure_diff.State') as mock_state_class:
+            patch_collection(mock_state_class, [old, recent])
+
+            result = await get_graph_structure_diff("test_namespace", "test_run_id", None, 2, "test_request_id")
+
+            assert len(result.nodes) == 2
+            updated_at, _ = decode_cursor(result.cursor)
+            assert old["updated_at"] < updated_at <= datetime.now() - CURSOR_LAG
+            assert result.has_more is False
+
+    @pytest.mark.asyncio
+    async def test_diff_invalid_cursor(self):
+        """Test that an invalid cursor is rejected"""
+        with patch('app.controller.get_graph_structure_diff.State'):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_graph_structure_diff("test_namespace", "test_run_id", "invalid", 100, "test_request_id")
+
+            assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_diff_invalid_limit(self):
+        """Test that a non positive limit is rejected"""
+        with patch('app.controller.get_graph_structure_diff.State'):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_graph_structure_diff("test_namespace", "test_run_id", None, 0, "test_request_id")
+
+            assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_diff_database_error(self):
+        """Test that database errors are propagated"""
+        with patch('app.controller.get_graph_structure_diff.State') as mock_state_class:
+            collection = MagicMock()
+            collection.aggregate = AsyncMock(side_effect=Exception("Database error"))
+            mock_state_class.get_pymongo_collection.return_value = collection
+
+            with pytest.raises(Exception, match="Database error"):
+                await get_graph_structure_diff("test_namespace", "test_run_id", None, 100, "test_request_id")
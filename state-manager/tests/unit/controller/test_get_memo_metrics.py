@@ -0,0 +1,26 @@
+import pytest
+
+from app.controller.get_memo_metrics import get_memo_metrics
+from app.singletons.memo_metrics import MemoMetrics
+
+
+@pytest.fixture(autouse=True)
+def clear_memo_metrics():
+    MemoMetrics().clear()
+    yield
+    MemoMetrics().clear()
+
+
+class TestGetMemoMetrics:
+    """Test cases for get_memo_metrics function"""
+
+    @pytest.mark.asyncio
+    async def test_metrics_of_namespace(self):
+        MemoMetrics().record("test_namespace", "parser", 3, 1)
+        MemoMetrics().record("test_namespace", "ocr", 0, 2)
+        MemoMetrics().record("other_namespace", "parser", 7, 7)
+
+        result = await get_memo_metrics("test_namespace", "test_request_id")
+
+        assert result.namespace == "test_namespace"
+        assert [(node.node_name, node.hits, node.misses) for node in result.nodes] == [("ocr", 0, 2), ("parser", 3, 1)]
@@ -30,30 +30,28 @@ class TestGetSecrets:
         return state
 
     @pytest.fixture
-    def mock_graph_template(self):
-        template = MagicMock()
-        template.get_secrets.return_value = {
+    def mock_secrets(self):
+        return {
             "api_key": "encrypted_api_key",
             "database_url": "encrypted_db_url"
         }
-        return template
 
     @patch('app.controller.get_secrets.State')
-    @patch('app.controller.get_secrets.GraphTemplate')
+    @patch('app.controller.get_secrets.SecretsCache')
     async def test_get_secrets_success(
         self,
-        mock_graph_template_class,
+        mock_secrets_cache_class,
         mock_state_class,
         mock_namespace,
         mock_state_id,
         mock_state,
-        mock_graph_template,
+        mock_secrets,
         mock_request_id
     ):
         """Test successful retrieval of secrets"""
         # Arrange
-        mock_state_class.get = AsyncMock(return_value=mock_state)
-        mock_graph_template_class.find_one = AsyncMock(return_value=mock_graph_template)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(return_value=mock_secrets)
 
         # Act
         result = await get_secrets(
@@ -69,8 +67,8 @@ class TestGetSecrets:
             "database_url": "encrypted_db_url"
         }
         
-        mock_state_class.get.assert_called_once_with(mock_state_id)
-        mock_graph_template_class.find_one.assert_called_once()
+        mock_state_class.find_records.assert_called_once_with([mock_state_id], projection={"namespace_name": 1, "graph_name": 1})
+        mock_secrets_cache_class.return_value.get_secrets.assert_called_once_with(mock_namespace, "test_graph")
 
     @patch('app.controller.get_secrets.State')
     async def test_get_secrets_state_not_found(
@@ -82,7 +80,7 @@ class TestGetSecrets:
     ):
         """Test when state is not found"""
         # Arrange
-        mock_state_class.get = AsyncMock(return_value=None)
+        mock_state_class.find_records = AsyncMock(return_value=[])
 
         # Act & Assert
         with pytest.raises(ValueError) as exc_info:
@@ -106,7 +104,7 @@ class TestGetSecrets:
         # Arrange
         mock_state = MagicMock()
         mock_state.namespace_name = "different_namespace"
-        mock_state_class.get = AsyncMock(return_value=mock_state)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
 
         # Act & Assert
         with pytest.raises(ValueError) as exc_info:
@@ -119,10 +117,10 @@ class TestGetSecrets:
         assert str(exc_info.value) == f"State {mock_state_id} does not belong to namespace {mock_namespace}"
 
     @patch('app.controller.get_secrets.State')
-    @patch('app.controller.get_secrets.GraphTemplate')
+    @patch('app.controller.get_secrets.SecretsCache')
     async def test_get_secrets_graph_template_not_found(
         self,
-        mock_graph_template_class,
+        mock_secrets_cache_class,
         mock_state_class,
         mock_namespace,
         mock_state_id,
@@ -131,8 +129,8 @@ class TestGetSecrets:
     ):
         """Test when graph template is not found"""
         # Arrange
-        mock_state_class.get = AsyncMock(return_value=mock_state)
-        mock_graph_template_class.find_one = AsyncMock(return_value=None)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(return_value=None)
 
         # Act & Assert
         with pytest.raises(ValueError) as exc_info:
@@ -145,10 +143,10 @@ class TestGetSecrets:
         assert str(exc_info.value) == f"Graph template {mock_state.graph_name} not found in namespace {mock_namespace}"
 
     @patch('app.controller.get_secrets.State')
-    @patch('app.controller.get_secrets.GraphTemplate')
+    @patch('app.controller.get_secrets.SecretsCache')
     async def test_get_secrets_empty_secrets(
         self,
-        mock_graph_template_class,
+        mock_secrets_cache_class,
         mock_state_class,
         mock_namespace,
         mock_state_id,
@@ -157,11 +155,9 @@ class TestGetSecrets:
     ):
         """Test retrieval when graph template has no secrets"""
         # Arrange
-        mock_state_class.get = AsyncMock(return_value=mock_state)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
         
-        template = MagicMock()
-        template.get_secrets.return_value = {}
-        mock_graph_template_class.find_one = AsyncMock(return_value=template)
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(return_value={})
 
         # Act
         result = await get_secrets(
@@ -175,10 +171,10 @@ class TestGetSecrets:
         assert result.secrets == {}
 
     @patch('app.controller.get_secrets.State')
-    @patch('app.controller.get_secrets.GraphTemplate')
+    @patch('app.controller.get_secrets.SecretsCache')
     async def test_get_secrets_complex_secrets(
         self,
-        mock_graph_template_class,
+        mock_secrets_cache_class,
         mock_state_class,
         mock_namespace,
         mock_state_id,
@@ -187,17 +183,15 @@ class TestGetSecrets:
     ):
         """Test retrieval of complex secrets structure"""
         # Arrange
-        mock_state_class.get = AsyncMock(return_value=mock_state)
+        mock_state_class.find_records = AsyncMock(return_value=[mock_state])
         
-        template = MagicMock()
-        template.get_secrets.return_value = {
+        mock_secrets_cache_class.return_value.get_secrets = AsyncMock(return_value={
             "aws_access_key": "encrypted_aws_key",
             "aws_secret_key": "encrypted_aws_secret",
             "database_password": "encrypted_db_password",
             "api_token": "encrypted_api_token",
             "ssl_certificate": "encrypted_ssl_cert"
-        }
-        mock_graph_template_class.find_one = AsyncMock(return_value=template)
+        })
 
         # Act
         result = await get_secrets(
@@ -226,7 +220,7 @@ class TestGetSecrets:
     ):
         """Test handling of database errors"""
         # Arrange
-        mock_state_class.get = AsyncMock(side_effect=Exception("Database error"))
+        mock_state_class.find_records = AsyncMock(side_effect=Exception("Database error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
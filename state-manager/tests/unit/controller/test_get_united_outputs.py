@@ -0,0 +1,172 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+
+from app.controller.get_united_outputs import get_united_outputs
+from app.models.db.state_record import StateRecord
+from app.models.node_template_model import NodeTemplate, Unites
+from app.models.state_status_enum import StateStatusEnum
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+SPLITTER_ID = PydanticObjectId()
+
+
+def make_unites_state(state_id, namespace_name="test_namespace"):
+    return StateRecord({
+        "_id": state_id,
+        "namespace_name": namespace_name,
+        "graph_name": "test_graph",
+        "run_id": "test_run",
+        "identifier": "merger",
+        "parents": {"splitter": SPLITTER_ID, "processor": PydanticObjectId()}
+    })
+
+
+def make_graph_template(unites=True):
+    merger = NodeTemplate(
+        node_name="MergerNode",
+        identifier="merger",
+        namespace="test",
+        inputs={},
+        next_nodes=None,
+        unites=Unites(identifier="splitter") if unites else None
+    )
+    graph_template = MagicMock()
+    graph_template.get_node_by_identifier.return_value = merger
+    return graph_template
+
+
+@pytest.fixture
+def mocks():
+    with patch('app.controller.get_united_outputs.State') as mock_state_class, \
+         patch('app.controller.get_united_outputs.GraphTemplate') as mock_graph_template_class:
+        collection = MagicMock()
+        mock_state_class.get_pymongo_collection.return_value = collection
+        mock_graph_template_class.get = AsyncMock(return_value=make_graph_template())
+        yield mock_state_class, mock_graph_template_class, collection
+
+
+class TestGetUnitedOutputs:
+    """Test cases for get_united_outputs function"""
+
+    @pytest.mark.asyncio
+    async def test_first_page(self, mocks):
+        """Test that the first page is read in _id order with a narrow projection"""
+        mock_state_class, _, collection = mocks
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_unites_state(state_id)])
+        documents = [{"_id": ObjectId(), "outputs": {"result": i}} for i in range(2)]
+        collection.find.return_value = MockCursor(documents)
+
+        result = await get_united_outputs("test_namespace", state_id, "processor", None, 2, "test_request_id")
+
+        assert [output.outputs for output in result.outputs] == [{"result": 0}, {"result": 1}]
+        assert result.cursor == str(documents[-1]["_id"])
+        assert result.has_more is True
+
+        query = collection.find.call_args.args[0]
+        assert query == {
+            "run_id": "test_run",
+            "identifier": "processor",
+            "status": StateStatusEnum.SUCCESS,
+            "parents.splitter": SPLITTER_ID
+        }
+        assert collection.find.call_args.kwargs["projection"] == {"outputs": 1}
+        assert collection.find.call_args.kwargs["sort"] == [("_id", 1)]
+        assert collection.find.call_args.kwargs["limit"] == 2
+
+    @pytest.mark.asyncio
+    async def test_next_page_after_cursor(self, mocks):
+        """Test that a cursor restricts the query to later states and stays put on an empty page"""
+        mock_state_class, _, collection = mocks
+        state_id = PydanticObjectId()
+        cursor = str(ObjectId())
+        mock_state_class.find_records = AsyncMock(return_value=[make_unites_state(state_id)])
+        collection.find.return_value = MockCursor([])
+
+        result = await get_united_outputs("test_namespace", state_id, "processor", cursor, 100, "test_request_id")
+
+        assert result.outputs == []
+        assert result.cursor == cursor
+        assert result.has_more is False
+        assert collection.find.call_args.args[0]["_id"] == {"$gt": PydanticObjectId(cursor)}
+
+    @pytest.mark.asyncio
+    async def test_state_not_found(self, mocks):
+        """Test that a missing state is rejected"""
+        mock_state_class, _, _ = mocks
+        mock_state_class.find_records = AsyncMock(return_value=[])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_united_outputs("test_namespace", PydanticObjectId(), "processor", None, 100, "test_request_id")
+
+        assert exc_info.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_state_of_other_namespace(self, mocks):
+        """Test that a state of another namespace is not found"""
+        mock_state_class, _, _ = mocks
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_unites_state(state_id, "other_namespace")])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_united_outputs("test_namespace", state_id, "processor", None, 100, "test_request_id")
+
+        assert exc_info.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_state_not_of_unites_node(self, mocks):
+        """Test that states of nodes without unites are rejected"""
+        mock_state_class, mock_graph_template_class, _ = mocks
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_unites_state(state_id)])
+        mock_graph_template_class.get = AsyncMock(return_value=make_graph_template(unites=False))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_united_outputs("test_namespace", state_id, "processor", None, 100, "test_request_id")
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, mocks):
+        """Test that an invalid cursor is rejected"""
+        with pytest.raises(HTTPException) as exc_info:
+            await get_united_outputs("test_namespace", PydanticObjectId(), "processor", "not-a-cursor", 100, "test_request_id")
+
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_invalid_limit(self, mocks):
+        """Test that limits outside 1..1000 are rejected"""
+        for limit in (0, 1001):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_united_outputs("test_namespace", PydanticObjectId(), "processor", None, limit, "test_request_id")
+
+            assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_database_error(self, mocks):
+        """Test that database errors are propagated"""
+        mock_state_class, _, _ = mocks
+        mock_state_class.find_records = AsyncMock(side_effect=Exception("Database error"))
+
+        with pytest.raises(Exception, match="Database error"):
+            await get_united_outputs("test_namespace", PydanticObjectId(), "processor", None, 100, "test_request_id")
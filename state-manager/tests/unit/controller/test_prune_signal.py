@@ -35,8 +35,29 @@ class TestPruneSignal:
         state.id = PydanticObjectId()
         state.status = StateStatusEnum.QUEUED
         state.enqueue_after = 1234567890
+        state.single_flight_key = None
         return state
 
+    @patch('app.controller.prune_signal.release_single_flight_followers', new_callable=AsyncMock)
+    @patch('app.controller.prune_signal.State')
+    async def test_prune_signal_prunes_single_flight_followers(
+        self,
+        mock_state_class,
+        mock_release_single_flight_followers,
+        mock_namespace,
+        mock_state_id,
+        mock_prune_request,
+        mock_state_created,
+        mock_request_id
+    ):
+        """Test that pruning a single flight leader prunes its followers with the same data"""
+        mock_state_created.single_flight_key = "hash1"
+        mock_state_class.transition = AsyncMock(return_value=mock_state_created)
+
+        await prune_signal(mock_namespace, mock_state_id, mock_prune_request, mock_request_id)
+
+        mock_release_single_flight_followers.assert_awaited_once_with(mock_state_created, StateStatusEnum.PRUNED, {"data": mock_prune_request.data})
+
     @patch('app.controller.prune_signal.State')
     async def test_prune_signal_success(
         self,
@@ -49,8 +70,7 @@ class TestPruneSignal:
     ):
         """Test successful pruning of state"""
         # Arrange
-        mock_state_created.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_created)
+        mock_state_class.transition = AsyncMock(return_value=mock_state_created)
 
         # Act
         result = await prune_signal(
@@ -63,10 +83,12 @@ class TestPruneSignal:
         # Assert
         assert result.status == StateStatusEnum.PRUNED
         assert result.enqueue_after == 1234567890
-        assert mock_state_created.status == StateStatusEnum.PRUNED
-        assert mock_state_created.data == mock_prune_request.data
-        assert mock_state_created.save.call_count == 1
-        assert mock_state_class.find_one.call_count == 1
+        # a single conditional update that only sets the changed fields
+        mock_state_class.transition.assert_awaited_once_with(
+            mock_state_id,
+            [StateStatusEnum.QUEUED],
+            {"status": StateStatusEnum.PRUNED, "data": mock_prune_request.data}
+        )
 
     @patch('app.controller.prune_signal.State')
     async def test_prune_signal_state_not_found(
@@ -79,7 +101,8 @@ class TestPruneSignal:
     ):
         """Test when state is not found"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(return_value=None)
+        mock_state_class.transition = AsyncMock(return_value=None)
+        mock_state_class.get_status = AsyncMock(return_value=None)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -104,9 +127,8 @@ class TestPruneSignal:
     ):
         """Test when state is in QUEUED status (invalid for pruning)"""
         # Arrange
-        mock_state = MagicMock()
-        mock_state.status = StateStatusEnum.CREATED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.transition = AsyncMock(return_value=None)
+        mock_state_class.get_status = AsyncMock(return_value=StateStatusEnum.CREATED)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -131,9 +153,8 @@ class TestPruneSignal:
     ):
         """Test when state is in EXECUTED status (invalid for pruning)"""
         # Arrange
-        mock_state = MagicMock()
-        mock_state.status = StateStatusEnum.EXECUTED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.transition = AsyncMock(return_value=None)
+        mock_state_class.get_status = AsyncMock(return_value=StateStatusEnum.EXECUTED)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -158,9 +179,8 @@ class TestPruneSignal:
     ):
         """Test when state is in ERRORED status (invalid for pruning)"""
         # Arrange
-        mock_state = MagicMock()
-        mock_state.status = StateStatusEnum.ERRORED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.transition = AsyncMock(return_value=None)
+        mock_state_class.get_status = AsyncMock(return_value=StateStatusEnum.ERRORED)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -185,9 +205,8 @@ class TestPruneSignal:
     ):
         """Test when state is already in PRUNED status (invalid for pruning)"""
         # Arrange
-        mock_state = MagicMock()
-        mock_state.status = StateStatusEnum.PRUNED
-        mock_state_class.find_one = AsyncMock(return_value=mock_state)
+        mock_state_class.transition = AsyncMock(return_value=None)
+        mock_state_class.get_status = AsyncMock(return_value=StateStatusEnum.PRUNED)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -212,7 +231,7 @@ class TestPruneSignal:
     ):
         """Test handling of database errors"""
         # Arrange
-        mock_state_class.find_one = MagicMock(side_effect=Exception("Database error"))
+        mock_state_class.transition = AsyncMock(side_effect=Exception("Database error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -226,7 +245,7 @@ class TestPruneSignal:
         assert str(exc_info.value) == "Database error"
 
     @patch('app.controller.prune_signal.State')
-    async def test_prune_signal_save_error(
+    async def test_prune_signal_status_lookup_error(
         self,
         mock_state_class,
         mock_namespace,
@@ -235,10 +254,10 @@ class TestPruneSignal:
         mock_state_created,
         mock_request_id
     ):
-        """Test handling of save errors"""
+        """Test handling of errors while looking up a state that was not transitioned"""
         # Arrange
-        mock_state_created.save = AsyncMock(side_effect=Exception("Save error"))
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_created)
+        mock_state_class.transition = AsyncMock(return_value=None)
+        mock_state_class.get_status = AsyncMock(side_effect=Exception("Save error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -263,8 +282,7 @@ class TestPruneSignal:
         """Test pruning with empty data"""
         # Arrange
         prune_request = PruneRequestModel(data={})
-        mock_state_created.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_created)
+        mock_state_class.transition = AsyncMock(return_value=mock_state_created)
 
         # Act
         result = await prune_signal(
@@ -276,8 +294,7 @@ class TestPruneSignal:
 
         # Assert
         assert result.status == StateStatusEnum.PRUNED
-        assert mock_state_created.data == {}
-        assert mock_state_created.save.call_count == 1
+        assert mock_state_class.transition.await_args.args[2]["data"] == {}
 
     @patch('app.controller.prune_signal.State')
     async def test_prune_signal_with_complex_data(
@@ -302,8 +319,7 @@ class TestPruneSignal:
             }
         }
         prune_request = PruneRequestModel(data=complex_data)
-        mock_state_created.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_created)
+        mock_state_class.transition = AsyncMock(return_value=mock_state_created)
 
         # Act
         result = await prune_signal(
@@ -315,5 +331,4 @@ class TestPruneSignal:
 
         # Assert
         assert result.status == StateStatusEnum.PRUNED
-        assert mock_state_created.data == complex_data
-        assert mock_state_created.save.call_count == 1 
\ No newline at end of file
+        assert mock_state_class.transition.await_args.args[2]["data"] == complex_data 
\ No newline at end of file
@@ -8,6 +8,17 @@ from app.models.signal_models import ReEnqueueAfterRequestModel
 from app.models.state_status_enum import StateStatusEnum
 
 
+def applying_transition(state, side_effect=None):
+    """Mock State.transition that applies the $set to the given mock state"""
+    async def transition(state_id, from_statuses, updates):
+        if side_effect is not None:
+            raise side_effect
+        for field, value in updates.items():
+            setattr(state, field, value)
+        return state
+    return AsyncMock(side_effect=transition)
+
+
 class TestReQueueAfterSignal:
     """Test cases for re_queue_after_signal function"""
 
@@ -52,8 +63,7 @@ class TestReQueueAfterSignal:
         """Test successful re-enqueuing of state"""
         # Arrange
         mock_time.time.return_value = 1000.0  # Mock current time
-        mock_state_any_status.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_any_status)
+        mock_state_class.transition = applying_transition(mock_state_any_status)
 
         # Act
         result = await re_queue_after_signal(
@@ -68,8 +78,9 @@ class TestReQueueAfterSignal:
         assert result.enqueue_after == 1005000  # 1000 * 1000 + 5000
         assert mock_state_any_status.status == StateStatusEnum.CREATED
         assert mock_state_any_status.enqueue_after == 1005000
-        assert mock_state_any_status.save.call_count == 1
-        assert mock_state_class.find_one.call_count == 1
+        mock_state_class.transition.assert_awaited_once()
+        # no status precondition, only the changed fields are set
+        assert mock_state_class.transition.await_args.args[1] is None
 
     @patch('app.controller.re_queue_after_signal.State')
     async def test_re_queue_after_signal_state_not_found(
@@ -82,7 +93,7 @@ class TestReQueueAfterSignal:
     ):
         """Test when state is not found"""
         # Arrange
-        mock_state_class.find_one = AsyncMock(return_value=None)
+        mock_state_class.transition = AsyncMock(return_value=None)
 
         # Act & Assert
         with pytest.raises(HTTPException) as exc_info:
@@ -111,8 +122,7 @@ class TestReQueueAfterSignal:
         # Arrange
         mock_time.time.return_value = 1000.0
         re_enqueue_request = ReEnqueueAfterRequestModel(enqueue_after=1)
-        mock_state_any_status.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_any_status)
+        mock_state_class.transition = applying_transition(mock_state_any_status)
 
         # Act
         result = await re_queue_after_signal(
@@ -126,7 +136,7 @@ class TestReQueueAfterSignal:
         assert result.status == StateStatusEnum.CREATED
         assert result.enqueue_after == 1000001  # 1000 * 1000 + 0
         assert mock_state_any_status.enqueue_after == 1000001
-        assert mock_state_any_status.save.call_count == 1
+        mock_state_class.transition.assert_awaited_once()
 
     @patch('app.controller.re_queue_after_signal.State')
     @patch('app.controller.re_queue_after_signal.time')
@@ -143,8 +153,7 @@ class TestReQueueAfterSignal:
         # Arrange
         mock_time.time.return_value = 1000.0
         re_enqueue_request = ReEnqueueAfterRequestModel(enqueue_after=86400000)  # 24 hours
-        mock_state_any_status.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_any_status)
+        mock_state_class.transition = applying_transition(mock_state_any_status)
 
         # Act
         result = await re_queue_after_signal(
@@ -158,7 +167,7 @@ class TestReQueueAfterSignal:
         assert result.status == StateStatusEnum.CREATED
         assert result.enqueue_after == 87400000  # 1000 * 1000 + 86400000
         assert mock_state_any_status.enqueue_after == 87400000
-        assert mock_state_any_status.save.call_count == 1
+        mock_state_class.transition.assert_awaited_once()
 
     @patch('app.controller.re_queue_after_signal.State')
     @patch('app.controller.re_queue_after_signal.time')
@@ -192,7 +201,7 @@ class TestReQueueAfterSignal:
     ):
         """Test handling of database errors"""
         # Arrange
-        mock_state_class.find_one = MagicMock(side_effect=Exception("Database error"))
+        mock_state_class.transition = AsyncMock(side_effect=Exception("Database error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -220,8 +229,7 @@ class TestReQueueAfterSignal:
         """Test handling of save errors"""
         # Arrange
         mock_time.time.return_value = 1000.0
-        mock_state_any_status.save = AsyncMock(side_effect=Exception("Save error"))
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_any_status)
+        mock_state_class.transition = applying_transition(mock_state_any_status, Exception("Save error"))
 
         # Act & Assert
         with pytest.raises(Exception) as exc_info:
@@ -264,8 +272,7 @@ class TestReQueueAfterSignal:
             mock_state = MagicMock()
             mock_state.id = PydanticObjectId()
             mock_state.status = initial_status
-            mock_state.save = AsyncMock()
-            mock_state_class.find_one = AsyncMock(return_value=mock_state)
+            mock_state_class.transition = applying_transition(mock_state)
 
             # Act
             result = await re_queue_after_signal(
@@ -278,7 +285,7 @@ class TestReQueueAfterSignal:
             # Assert
             assert result.status == StateStatusEnum.CREATED
             assert mock_state.status == StateStatusEnum.CREATED
-            assert mock_state.save.call_count == 1
+            mock_state_class.transition.assert_awaited_once()
 
     @patch('app.controller.re_queue_after_signal.State')
     @patch('app.controller.re_queue_after_signal.time')
@@ -295,8 +302,7 @@ class TestReQueueAfterSignal:
         """Test that time calculation is precise"""
         # Arrange
         mock_time.time.return_value = 1234.567  # Test with fractional seconds
-        mock_state_any_status.save = AsyncMock()
-        mock_state_class.find_one = AsyncMock(return_value=mock_state_any_status)
+        mock_state_class.transition = applying_transition(mock_state_any_status)
 
         # Act
         result = await re_queue_after_signal(
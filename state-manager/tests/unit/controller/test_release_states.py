@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from beanie import PydanticObjectId
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.controller.release_states import release_states
+from app.models.release_states_models import ReleaseStatesRequestModel
+from app.models.state_status_enum import StateStatusEnum
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def patch_collection(mock_state_class, selected_ids, modified_count, *reselected_ids):
+    collection = MagicMock()
+    cursors = [MockCursor([{"_id": state_id} for state_id in ids]) for ids in (selected_ids, *reselected_ids)]
+    collection.find = MagicMock(side_effect=cursors)
+    collection.update_many = AsyncMock(return_value=MagicMock(modified_count=modified_count))
+    mock_state_class.get_pymongo_collection.return_value = collection
+    return collection
+
+
+class TestReleaseStates:
+    """Test cases for release_states function"""
+
+    @patch('app.controller.release_states.EventBus')
+    @patch('app.controller.release_states.State')
+    async def test_queued_states_are_released_in_bulk(self, mock_state_class, mock_event_bus_class):
+        queued_id, started_id = PydanticObjectId(), PydanticObjectId()
+        collection = patch_collection(mock_state_class, [queued_id], 1)
+        mock_event_bus_class.return_value.publish_by_ids = AsyncMock()
+
+        result = await release_states("test_namespace", ReleaseStatesRequestModel(state_ids=[str(queued_id), str(started_id)]), "test_request_id")
+
+        assert result.count == 1
+        assert result.status == StateStatusEnum.CREATED
+
+        collection.find.assert_called_once()
+        assert collection.find.call_args.args[0] == {"_id": {"$in": [queued_id, started_id]}, "namespace_name": "test_namespace", "status": StateStatusEnum.QUEUED}
+
+        collection.update_many.assert_awaited_once()
+        query, update = collection.update_many.call_args.args
+        assert query == {"_id": {"$in": [queued_id]}, "namespace_name": "test_namespace", "status": StateStatusEnum.QUEUED}
+        assert update["$set"]["status"] == StateStatusEnum.CREATED
+        mock_event_bus_class.return_value.publish_by_ids.assert_awaited_once_with([queued_id], StateStatusEnum.CREATED)
+
+    @patch('app.controller.release_states.EventBus')
+    @patch('app.controller.release_states.State')
+    async def test_states_started_meanwhile_are_not_published(self, mock_state_class, mock_event_bus_class):
+        released_id, started_id = PydanticObjectId(), PydanticObjectId()
+        collection = patch_collection(mock_state_class, [released_id, started_id], 1, [released_id])
+        mock_event_bus_class.return_value.publish_by_ids = AsyncMock()
+
+        result = await release_states("test_namespace", ReleaseStatesRequestModel(state_ids=[str(released_id), str(started_id)]), "test_request_id")
+
+        assert result.count == 1
+        assert collection.find.call_count == 2
+        reselect = collection.find.call_args.args[0]
+        assert reselect["_id"] == {"$in": [released_id, started_id]}
+        assert reselect["status"] == StateStatusEnum.CREATED
+        assert reselect["updated_at"] == collection.update_many.call_args.args[1]["$set"]["updated_at"]
+        mock_event_bus_class.return_value.publish_by_ids.assert_awaited_once_with([released_id], StateStatusEnum.CREATED)
+
+    @patch('app.controller.release_states.EventBus')
+    @patch('app.controller.release_states.State')
+    async def test_nothing_released_publishes_nothing(self, mock_state_class, mock_event_bus_class):
+        collection = patch_collection(mock_state_class, [], 0)
+        mock_event_bus_class.return_value.publish_by_ids = AsyncMock()
+
+        result = await release_states("test_namespace", ReleaseStatesRequestModel(state_ids=[str(PydanticObjectId())]), "test_request_id")
+
+        assert result.count == 0
+        collection.update_many.assert_not_awaited()
+        mock_event_bus_class.return_value.publish_by_ids.assert_not_awaited()
+
+    @patch('app.controller.release_states.State')
+    async def test_invalid_state_id(self, mock_state_class):
+        with pytest.raises(HTTPException) as exc_info:
+            await release_states("test_namespace", ReleaseStatesRequestModel(state_ids=["invalid"]), "test_request_id")
+
+        assert exc_info.value.status_code == 400
+        mock_state_class.get_pymongo_collection.assert_not_called()
+
+    def test_empty_request_is_rejected(self):
+        with pytest.raises(ValidationError):
+            ReleaseStatesRequestModel(state_ids=[])
@@ -0,0 +1,146 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException, status
+from beanie import PydanticObjectId
+from pymongo.errors import OperationFailure
+
+from app.controller.run_store import (
+    get_store_value,
+    set_store_value,
+    compare_and_set_store_value,
+    increment_store_value
+)
+from app.models.db.state_record import StateRecord
+from app.models.store_models import SetStoreValueRequestModel, CompareAndSetStoreRequestModel, IncrementStoreRequestModel
+
+
+def make_record(state_id, namespace_name="test_namespace"):
+    return StateRecord({"_id": state_id, "namespace_name": namespace_name, "graph_name": "test_graph", "run_id": "test_run"})
+
+
+@pytest.fixture
+def mock_state_class():
+    with patch('app.controller.run_store.State') as mock_state_class:
+        yield mock_state_class
+
+
+@pytest.fixture
+def mock_store_class():
+    with patch('app.controller.run_store.Store') as mock_store_class:
+        yield mock_store_class
+
+
+class TestRunStore:
+    """Test cases for the run store controllers"""
+
+    @pytest.mark.asyncio
+    async def test_get_store_value(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.get_value = AsyncMock(return_value="42")
+
+        result = await get_store_value("test_namespace", state_id, "counter", "test_request_id")
+
+        assert result.key == "counter"
+        assert result.value == "42"
+        mock_store_class.get_value.assert_awaited_once_with("test_run", "test_namespace", "test_graph", "counter")
+
+    @pytest.mark.asyncio
+    async def test_get_store_value_missing_key(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.get_value = AsyncMock(return_value=None)
+
+        result = await get_store_value("test_namespace", state_id, "missing", "test_request_id")
+
+        assert result.value is None
+
+    @pytest.mark.asyncio
+    async def test_store_operations_state_not_found(self, mock_state_class, mock_store_class):
+        mock_state_class.find_records = AsyncMock(return_value=[])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_store_value("test_namespace", PydanticObjectId(), "counter", "test_request_id")
+
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+
+    @pytest.mark.asyncio
+    async def test_store_operations_other_namespace(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id, "other_namespace")])
+        mock_store_class.set_value = AsyncMock()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await set_store_value("test_namespace", state_id, "counter", SetStoreValueRequestModel(value="1"), "test_request_id")
+
+        assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+        mock_store_class.set_value.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_set_store_value(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.set_value = AsyncMock()
+
+        result = await set_store_value("test_namespace", state_id, "cursor", SetStoreValueRequestModel(value="page-2"), "test_request_id")
+
+        assert result.value == "page-2"
+        mock_store_class.set_value.assert_awaited_once_with("test_run", "test_namespace", "test_graph", "cursor", "page-2")
+
+    @pytest.mark.asyncio
+    async def test_compare_and_set_swapped(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.compare_and_set = AsyncMock(return_value=True)
+
+        body = CompareAndSetStoreRequestModel(expected=None, value="owner-1")
+        result = await compare_and_set_store_value("test_namespace", state_id, "lock", body, "test_request_id")
+
+        assert result.swapped is True
+        assert result.value == "owner-1"
+        mock_store_class.compare_and_set.assert_awaited_once_with("test_run", "test_namespace", "test_graph", "lock", None, "owner-1")
+
+    @pytest.mark.asyncio
+    async def test_compare_and_set_not_swapped_returns_current_value(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.compare_and_set = AsyncMock(return_value=False)
+        mock_store_class.get_value = AsyncMock(return_value="owner-2")
+
+        body = CompareAndSetStoreRequestModel(expected=None, value="owner-1")
+        result = await compare_and_set_store_value("test_namespace", state_id, "lock", body, "test_request_id")
+
+        assert result.swapped is False
+        assert result.value == "owner-2"
+
+    @pytest.mark.asyncio
+    async def test_increment_store_value(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.increment = AsyncMock(return_value="5")
+
+        result = await increment_store_value("test_namespace", state_id, "counter", IncrementStoreRequestModel(by=2), "test_request_id")
+
+        assert result.value == "5"
+        mock_store_class.increment.assert_awaited_once_with("test_run", "test_namespace", "test_graph", "counter", 2)
+
+    @pytest.mark.asyncio
+    async def test_increment_store_value_not_an_integer(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.increment = AsyncMock(side_effect=OperationFailure("Failed to parse number"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await increment_store_value("test_namespace", state_id, "name", IncrementStoreRequestModel(), "test_request_id")
+
+        assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.asyncio
+    async def test_store_operations_database_error(self, mock_state_class, mock_store_class):
+        state_id = PydanticObjectId()
+        mock_state_class.find_records = AsyncMock(return_value=[make_record(state_id)])
+        mock_store_class.set_value = AsyncMock(side_effect=Exception("Database error"))
+
+        with pytest.raises(Exception, match="Database error"):
+            await set_store_value("test_namespace", state_id, "counter", SetStoreValueRequestModel(value="1"), "test_request_id")
+
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from beanie import PydanticObjectId
+
+from fastapi import HTTPException
+
+from app.controller.stream_events import stream_events, check_run_exists
+from app.singletons.event_bus import EventBus
+from app.models.event_models import StateEventModel
+from app.models.run_models import RunStatusEnum
+from app.models.state_status_enum import StateStatusEnum
+
+
+def make_event(status):
+    return StateEventModel(
+        state_id=str(PydanticObjectId()),
+        run_id="run1",
+        namespace_name="ns",
+        graph_name="graph",
+        node_name="node",
+        identifier="node_id",
+        status=status
+    )
+
+
+def parse(message):
+    lines = message.strip().split("\n")
+    return lines[0].removeprefix("event: "), json.loads(lines[1].removeprefix("data: "))
+
+
+@pytest.fixture(autouse=True)
+def clear_event_bus():
+    yield
+    EventBus()._subscriptions.clear()
+
+
+class TestStreamEvents:
+    """Test cases for stream_events function"""
+
+    @patch('app.controller.stream_events.get_run_status', new_callable=AsyncMock)
+    async def test_completed_run_ends_immediately(self, mock_get_run_status):
+        mock_get_run_status.return_value = RunStatusEnum.SUCCESS
+
+        messages = [message async for message in stream_events("ns", "run1", "request_id")]
+
+        assert len(messages) == 1
+        event_type, data = parse(messages[0])
+        assert event_type == "run_completed"
+        assert data["status"] == "SUCCESS"
+        assert not EventBus().has_subscribers()
+
+    @patch('app.controller.stream_events.get_run_status', new_callable=AsyncMock)
+    async def test_streams_until_run_completes(self, mock_get_run_status):
+        mock_get_run_status.side_effect = [RunStatusEnum.PENDING, RunStatusEnum.FAILED]
+        stream = stream_events("ns", "run1", "request_id")
+
+        # the generator subscribes on its first step, events are delivered afterwards
+        first = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+        queued = make_event(StateStatusEnum.QUEUED)
+        errored = make_event(StateStatusEnum.ERRORED)
+        EventBus().deliver(queued)
+        EventBus().deliver(errored)
+
+        messages = [await first]
+        async for message in stream:
+            messages.append(message)
+
+        assert [parse(message)[0] for message in messages] == ["state", "state", "run_completed"]
+        assert parse(messages[0])[1]["state_id"] == queued.state_id
+        assert parse(messages[2])[1]["status"] == "FAILED"
+        # run status is only checked again after a settled status
+        assert mock_get_run_status.call_count == 2
+
+    async def test_keep_alive_when_idle(self):
+        stream = stream_events("ns", None, "request_id", keep_alive_interval=0.01)
+
+        assert await stream.__anext__() == ": keep-alive\n\n"
+        await stream.aclose()
+        assert not EventBus().has_subscribers()
+
+
+class TestCheckRunExists:
+    """Test cases for check_run_exists function"""
+
+    @patch('app.controller.stream_events.get_run_status', new_callable=AsyncMock)
+    async def test_unknown_run(self, mock_get_run_status):
+        mock_get_run_status.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            await check_run_exists("ns", "run1", "request_id")
+
+        assert exc_info.value.status_code == 404
+        mock_get_run_status.assert_awaited_once_with("ns", "run1")
+
+    @patch('app.controller.stream_events.get_run_status', new_callable=AsyncMock)
+    async def test_known_run(self, mock_get_run_status):
+        mock_get_run_status.return_value = RunStatusEnum.SUCCESS
+
+        await check_run_exists("ns", "run1", "request_id")
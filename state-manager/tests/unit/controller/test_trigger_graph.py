@@ -410,3 +410,131 @@ async def test_trigger_graph_general_exception():
         
         with pytest.raises(Exception, match="Database connection error"):
             await trigger_graph(namespace_name, graph_name, req, x_exosphere_request_id)
+
+
+def make_wait_mocks(mock_graph_template_cls, mock_store_cls, mock_state_cls, mock_run_cls):
+    mock_graph_template = MagicMock()
+    mock_graph_template.is_valid.return_value = True
+    mock_root_node = MagicMock()
+    mock_root_node.node_name = "root_node"
+    mock_root_node.identifier = "root_id"
+    mock_root_node.inputs = {}
+    mock_root_node.next_nodes = ["leaf_id"]
+    mock_leaf_node = MagicMock()
+    mock_leaf_node.identifier = "leaf_id"
+    mock_leaf_node.next_nodes = None
+    mock_graph_template.nodes = [mock_root_node, mock_leaf_node]
+    mock_graph_template.get_root_node.return_value = mock_root_node
+    mock_graph_template.store_config.required_keys = []
+    mock_graph_template_cls.get = AsyncMock(return_value=mock_graph_template)
+
+    mock_store_cls.insert_many = AsyncMock(return_value=None)
+    mock_state_instance = MagicMock()
+    mock_state_instance.insert = AsyncMock(return_value=None)
+    mock_state_cls.return_value = mock_state_instance
+
+    mock_run_instance = MagicMock()
+    mock_run_instance.insert = AsyncMock(return_value=None)
+    mock_run_cls.return_value = mock_run_instance
+
+    return mock_state_instance
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async find cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+async def test_trigger_graph_wait_returns_leaf_outputs():
+    from bson import ObjectId
+    from app.models.run_models import RunStatusEnum
+
+    leaf_id = ObjectId()
+    body = TriggerGraphRequestModel(wait=True, wait_timeout=5)
+
+    with patch('app.controller.trigger_graph.GraphTemplate') as mock_graph_template_cls, \
+         patch('app.controller.trigger_graph.Store') as mock_store_cls, \
+         patch('app.controller.trigger_graph.State') as mock_state_cls, \
+         patch('app.controller.trigger_graph.Run') as mock_run_cls, \
+         patch('app.controller.trigger_graph.EventBus') as mock_event_bus_cls, \
+         patch('app.controller.trigger_graph.wait_for_run_status', new_callable=AsyncMock) as mock_wait:
+
+        mock_state_instance = make_wait_mocks(mock_graph_template_cls, mock_store_cls, mock_state_cls, mock_run_cls)
+        mock_wait.return_value = RunStatusEnum.SUCCESS
+        collection = MagicMock()
+        collection.find.return_value = MockCursor([
+            {"_id": leaf_id, "identifier": "leaf_id", "node_name": "leaf_node", "outputs": {"answer": "42"}}
+        ])
+        mock_state_cls.get_pymongo_collection.return_value = collection
+
+        result = await trigger_graph("test_namespace", "test_graph", body, "test_request_id")
+
+        assert result.run_status == RunStatusEnum.SUCCESS
+        assert result.outputs is not None
+        assert len(result.outputs) == 1
+        assert result.outputs[0].state_id == str(leaf_id)
+        assert result.outputs[0].outputs == {"answer": "42"}
+
+        mock_state_instance.insert.assert_awaited_once()
+        mock_event_bus_cls.return_value.subscribe.assert_called_once_with("test_namespace", result.run_id)
+        assert mock_wait.await_args.args[1] == result.run_id
+        assert mock_wait.await_args.args[2] == 5
+
+        query = collection.find.call_args.args[0]
+        assert query["identifier"] == {"$in": ["leaf_id"]}
+        assert query["status"] == StateStatusEnum.SUCCESS
+
+
+@pytest.mark.asyncio
+async def test_trigger_graph_wait_timeout_returns_pending():
+    from app.models.run_models import RunStatusEnum
+
+    body = TriggerGraphRequestModel(wait=True, wait_timeout=1)
+
+    with patch('app.controller.trigger_graph.GraphTemplate') as mock_graph_template_cls, \
+         patch('app.controller.trigger_graph.Store') as mock_store_cls, \
+         patch('app.controller.trigger_graph.State') as mock_state_cls, \
+         patch('app.controller.trigger_graph.Run') as mock_run_cls, \
+         patch('app.controller.trigger_graph.EventBus') as mock_event_bus_cls, \
+         patch('app.controller.trigger_graph.wait_for_run_status', new_callable=AsyncMock) as mock_wait:
+
+        make_wait_mocks(mock_graph_template_cls, mock_store_cls, mock_state_cls, mock_run_cls)
+        mock_wait.return_value = RunStatusEnum.PENDING
+
+        result = await trigger_graph("test_namespace", "test_graph", body, "test_request_id")
+
+        assert result.run_status == RunStatusEnum.PENDING
+        assert result.outputs is None
+        mock_state_cls.get_pymongo_collection.assert_not_called()
+        # the subscription is always released
+        mock_event_bus = mock_event_bus_cls.return_value
+        mock_event_bus.unsubscribe.assert_called_once_with(mock_event_bus.subscribe.return_value)
+
+
+@pytest.mark.asyncio
+async def test_trigger_graph_without_wait_does_not_wait(mock_request):
+    with patch('app.controller.trigger_graph.GraphTemplate') as mock_graph_template_cls, \
+         patch('app.controller.trigger_graph.Store') as mock_store_cls, \
+         patch('app.controller.trigger_graph.State') as mock_state_cls, \
+         patch('app.controller.trigger_graph.Run') as mock_run_cls, \
+         patch('app.controller.trigger_graph.wait_for_run_status', new_callable=AsyncMock) as mock_wait:
+
+        make_wait_mocks(mock_graph_template_cls, mock_store_cls, mock_state_cls, mock_run_cls)
+
+        result = await trigger_graph("test_namespace", "test_graph", mock_request, "test_request_id")
+
+        assert result.run_status is None
+        assert result.outputs is None
+        mock_wait.assert_not_awaited()
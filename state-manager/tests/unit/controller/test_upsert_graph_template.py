@@ -136,6 +136,36 @@ class TestUpsertGraphTemplate:
         # Since we're setting triggers in the test, we use the original triggers (which would be stored before the update)
         mock_background_tasks.add_task.assert_called_once()
 
+    @patch('app.controller.upsert_graph_template.SecretsCache')
+    @patch('app.controller.upsert_graph_template.GraphTemplate')
+    @patch('app.controller.upsert_graph_template.verify_graph')
+    async def test_upsert_graph_template_wipes_cached_secrets(
+        self,
+        mock_verify_graph,
+        mock_graph_template_class,
+        mock_secrets_cache_class,
+        mock_namespace,
+        mock_graph_name,
+        mock_upsert_request,
+        mock_existing_template,
+        mock_background_tasks,
+        mock_request_id
+    ):
+        """Test that the decrypted secrets cached for the graph are dropped"""
+        mock_existing_template.save = AsyncMock()
+        mock_existing_template.set_secrets = MagicMock(return_value=mock_existing_template)
+        mock_graph_template_class.find_one = AsyncMock(return_value=mock_existing_template)
+
+        await upsert_graph_template(
+            mock_namespace,
+            mock_graph_name,
+            mock_upsert_request,
+            mock_request_id,
+            mock_background_tasks
+        )
+
+        mock_secrets_cache_class.return_value.invalidate.assert_called_once_with(mock_namespace, mock_graph_name)
+
     @patch('app.controller.upsert_graph_template.GraphTemplate')
     @patch('app.controller.upsert_graph_template.verify_graph')
     async def test_upsert_graph_template_create_new(
@@ -0,0 +1,143 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.middlewares.load_shedding_middleware import LoadSheddingMiddleware
+
+
+def make_scope(path="/v0/namespace/test/states/enqueue"):
+    return {"type": "http", "path": path, "method": "POST", "headers": []}
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+class TestLoadSheddingMiddleware:
+    """Test cases for LoadSheddingMiddleware"""
+
+    @pytest.mark.asyncio
+    async def test_sheds_request_with_retry_after(self):
+        app = MagicMock()
+        middleware = LoadSheddingMiddleware(app)
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        with patch('app.middlewares.load_shedding_middleware.LoadMonitor') as mock_monitor_class:
+            mock_monitor_class.return_value.overload.return_value = (503, 4)
+            mock_monitor_class.return_value.metrics.return_value = {}
+
+            await middleware(make_scope(), receive, send)
+
+        app.assert_not_called()
+        assert sent[0]["status"] == 503
+        assert (b"retry-after", b"4") in sent[0]["headers"]
+        assert json.loads(sent[1]["body"])["success"] is False
+
+    @pytest.mark.asyncio
+    async def test_tracks_request_and_background_work(self):
+        events = []
+
+        with patch('app.middlewares.load_shedding_middleware.LoadMonitor') as mock_monitor_class:
+            monitor = mock_monitor_class.return_value
+            monitor.overload.return_value = None
+            monitor.request_started.side_effect = lambda: events.append("started")
+            monitor.request_responded.side_effect = lambda: events.append("responded")
+            monitor.background_started.side_effect = lambda: events.append("background_started")
+            monitor.background_finished.side_effect = lambda: events.append("background_finished")
+
+            async def app(scope, receive, send):
+                await send({"type": "http.response.start", "status": 200, "headers": []})
+                events.append("streaming")
+                await send({"type": "http.response.body", "body": b"{}", "more_body": False})
+                events.append("background")
+
+            async def send(message):
+                pass
+
+            await LoadSheddingMiddleware(app)(make_scope(), receive, send)
+
+        assert events == ["started", "responded", "streaming", "background_started", "background", "background_finished"]
+
+    @pytest.mark.asyncio
+    async def test_request_failing_before_response_is_released(self):
+        async def app(scope, receive, send):
+            raise ValueError("boom")
+
+        async def send(message):
+            pass
+
+        with patch('app.middlewares.load_shedding_middleware.LoadMonitor') as mock_monitor_class:
+            monitor = mock_monitor_class.return_value
+            monitor.overload.return_value = None
+
+            with pytest.raises(ValueError):
+                await LoadSheddingMiddleware(app)(make_scope(), receive, send)
+
+            monitor.request_started.assert_called_once()
+            monitor.request_responded.assert_called_once()
+            monitor.background_finished.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_health_is_never_shed(self):
+        app = MagicMock(side_effect=lambda scope, receive, send: None)
+
+        async def passthrough(scope, receive, send):
+            app(scope, receive, send)
+
+        with patch('app.middlewares.load_shedding_middleware.LoadMonitor') as mock_monitor_class:
+            mock_monitor_class.return_value.overload.return_value = (429, 1)
+
+            await LoadSheddingMiddleware(passthrough)(make_scope("/health"), receive, MagicMock())
+
+            mock_monitor_class.return_value.overload.assert_not_called()
+        app.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("path", [
+        "/v0/namespace/test/state/abc/executed",
+        "/v0/namespace/test/state/abc/executed/append",
+        "/v0/namespace/test/state/abc/errored",
+        "/v0/namespace/test/state/abc/prune",
+        "/v0/namespace/test/state/abc/re-enqueue-after",
+        "/v0/namespace/test/states/release",
+    ])
+    async def test_state_completions_are_never_shed(self, path):
+        calls = []
+
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}", "more_body": False})
+
+        async def send(message):
+            pass
+
+        with patch('app.middlewares.load_shedding_middleware.LoadMonitor') as mock_monitor_class:
+            monitor = mock_monitor_class.return_value
+            monitor.overload.return_value = (429, 1)
+
+            await LoadSheddingMiddleware(app)(make_scope(path), receive, send)
+
+            monitor.overload.assert_not_called()
+            monitor.request_started.assert_called_once()
+            monitor.request_responded.assert_called_once()
+
+        assert calls == [path]
+
+    @pytest.mark.asyncio
+    async def test_trigger_is_shed(self):
+        app = MagicMock()
+
+        async def send(message):
+            pass
+
+        with patch('app.middlewares.load_shedding_middleware.LoadMonitor') as mock_monitor_class:
+            mock_monitor_class.return_value.overload.return_value = (429, 1)
+            mock_monitor_class.return_value.metrics.return_value = {}
+
+            await LoadSheddingMiddleware(app)(make_scope("/v0/namespace/test/graph/g/trigger"), receive, send)
+
+        app.assert_not_called()
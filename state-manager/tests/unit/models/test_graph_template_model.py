@@ -256,3 +256,31 @@ class TestGraphTemplate:
             
             with pytest.raises(ValueError, match="Graph template is not valid for namespace: test_ns and graph name: test_graph after 1.0 seconds"):
                 await GraphTemplate.get_valid("test_ns", "test_graph", timeout=1.0)
+
+    @pytest.mark.asyncio
+    async def test_get_retry_policy_loads_only_the_policy(self):
+        """Test that get_retry_policy projects the retry policy of the template"""
+        from unittest.mock import AsyncMock
+
+        collection = MagicMock()
+        collection.find_one = AsyncMock(return_value={"_id": "id", "retry_policy": {"max_retries": 5, "strategy": "LINEAR"}})
+
+        with patch.object(GraphTemplate, 'get_pymongo_collection', return_value=collection):
+            retry_policy = await GraphTemplate.get_retry_policy("test_ns", "test_graph")
+
+        assert retry_policy.max_retries == 5
+        assert retry_policy.strategy == "LINEAR"
+        assert collection.find_one.await_args.args[0] == {"namespace": "test_ns", "name": "test_graph"}
+        assert collection.find_one.await_args.kwargs["projection"] == {"retry_policy": 1}
+
+    @pytest.mark.asyncio
+    async def test_get_retry_policy_not_found(self):
+        """Test get_retry_policy when the graph template does not exist"""
+        from unittest.mock import AsyncMock
+
+        collection = MagicMock()
+        collection.find_one = AsyncMock(return_value=None)
+
+        with patch.object(GraphTemplate, 'get_pymongo_collection', return_value=collection):
+            with pytest.raises(ValueError, match="Graph template not found for namespace: test_ns and graph name: test_graph"):
+                await GraphTemplate.get_retry_policy("test_ns", "test_graph")
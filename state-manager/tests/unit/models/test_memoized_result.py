@@ -0,0 +1,65 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models.db.memoized_result import MemoizedResult, compute_inputs_hash
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestMemoizedResult:
+    """Test cases for MemoizedResult model"""
+
+    def test_inputs_hash_ignores_key_order(self):
+        assert compute_inputs_hash({"a": "1", "b": "2"}) == compute_inputs_hash({"b": "2", "a": "1"})
+        assert compute_inputs_hash({"a": "1"}) != compute_inputs_hash({"a": "2"})
+
+    def test_settings_indexes(self):
+        indexes = {index.document["name"]: index.document for index in MemoizedResult.Settings.indexes}
+
+        assert indexes["uniq_namespace_node_name_inputs_hash"]["unique"] is True
+        assert indexes["ttl_expires_at"]["expireAfterSeconds"] == 0
+
+    @pytest.mark.asyncio
+    async def test_get_outputs_skips_expired_results(self):
+        collection = MagicMock()
+        collection.find.return_value = MockCursor([{"inputs_hash": "hash1", "outputs": {"pages": "3"}}])
+        with patch.object(MemoizedResult, 'get_pymongo_collection', return_value=collection):
+            assert await MemoizedResult.get_outputs("ns", "parser", ["hash1", "hash2"]) == {"hash1": {"pages": "3"}}
+
+        query = collection.find.call_args.args[0]
+        assert query["namespace"] == "ns"
+        assert query["node_name"] == "parser"
+        assert query["inputs_hash"] == {"$in": ["hash1", "hash2"]}
+        assert isinstance(query["expires_at"]["$gt"], datetime)
+        assert collection.find.call_args.kwargs["projection"] == {"_id": 0, "inputs_hash": 1, "outputs": 1}
+
+    @pytest.mark.asyncio
+    async def test_remember_upserts_with_expiry(self):
+        collection = MagicMock()
+        collection.update_one = AsyncMock()
+        before = datetime.now(timezone.utc)
+        with patch.object(MemoizedResult, 'get_pymongo_collection', return_value=collection):
+            await MemoizedResult.remember("ns", "parser", {"document": "a"}, {"pages": "3"}, 60)
+
+        query, update = collection.update_one.await_args.args
+        assert query == {"namespace": "ns", "node_name": "parser", "inputs_hash": compute_inputs_hash({"document": "a"})}
+        assert update["$set"]["outputs"] == {"pages": "3"}
+        # the TTL monitor compares against UTC, so the expiry is timezone aware
+        assert update["$set"]["expires_at"].tzinfo is not None
+        assert (update["$set"]["expires_at"] - before).total_seconds() >= 60
+        assert collection.update_one.await_args.kwargs["upsert"] is True
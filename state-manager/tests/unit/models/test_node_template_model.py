@@ -1,5 +1,5 @@
 ﻿import pytest
-from app.models.node_template_model import NodeTemplate, Unites, UnitesStrategyEnum
+from app.models.node_template_model import NodeTemplate, Unites, UnitesStrategyEnum, Memoize
 from app.models.dependent_string import DependentString
 
 
@@ -68,6 +68,22 @@ class TestUnites:
         assert unites.strategy == UnitesStrategyEnum.ALL_DONE
 
 
+class TestMemoize:
+    """Test cases for Memoize model"""
+
+    def test_memoize_default_ttl(self):
+        """Test that memoization is off unless configured, with an hour long default ttl"""
+        node = NodeTemplate(node_name="test_node", namespace="test_ns", identifier="test_id", inputs={}, next_nodes=[], unites=None)
+        assert node.memoize is None
+        assert node.single_flight is False
+        assert Memoize().ttl == 3600
+
+    def test_memoize_ttl_must_be_positive(self):
+        """Test that a non positive ttl is rejected"""
+        with pytest.raises(ValueError):
+            Memoize(ttl=0)
+
+
 class TestUnitesStrategyEnum:
     """Test cases for UnitesStrategyEnum"""
 
@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError
+
+from app.models.db.single_flight import SingleFlight, SINGLE_FLIGHT_TTL
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight model"""
+
+    def test_settings_indexes(self):
+        indexes = {index.document["name"]: index.document for index in SingleFlight.Settings.indexes}
+
+        assert indexes["uniq_namespace_node_name_inputs_hash"]["unique"] is True
+        assert "expireAfterSeconds" in indexes["ttl_created_at"]
+
+    @pytest.mark.asyncio
+    async def test_claim_elects_first_candidate_per_inputs(self):
+        first, duplicate, other = PydanticObjectId(), PydanticObjectId(), PydanticObjectId()
+        collection = MagicMock()
+        collection.insert_many = AsyncMock()
+        with patch.object(SingleFlight, 'get_pymongo_collection', return_value=collection):
+            leaders = await SingleFlight.claim("ns", "fetch", [("hash1", first), ("hash1", duplicate), ("hash2", other)])
+
+        assert leaders == {first, other}
+        documents = collection.insert_many.await_args.args[0]
+        assert [(document["inputs_hash"], document["state_id"]) for document in documents] == [("hash1", first), ("hash2", other)]
+        assert collection.insert_many.await_args.kwargs["ordered"] is False
+
+    @pytest.mark.asyncio
+    async def test_claim_loses_to_leader_in_flight(self):
+        first, second = PydanticObjectId(), PydanticObjectId()
+        collection = MagicMock()
+        collection.insert_many = AsyncMock(side_effect=BulkWriteError({"writeErrors": [{"index": 0, "code": 11000}]}))
+        with patch.object(SingleFlight, 'get_pymongo_collection', return_value=collection):
+            assert await SingleFlight.claim("ns", "fetch", [("hash1", first), ("hash2", second)]) == {second}
+
+    @pytest.mark.asyncio
+    async def test_claim_raises_on_other_write_errors(self):
+        collection = MagicMock()
+        collection.insert_many = AsyncMock(side_effect=BulkWriteError({"writeErrors": [{"index": 0, "code": 2}]}))
+        with patch.object(SingleFlight, 'get_pymongo_collection', return_value=collection):
+            with pytest.raises(BulkWriteError):
+                await SingleFlight.claim("ns", "fetch", [("hash1", PydanticObjectId())])
+
+    @pytest.mark.asyncio
+    async def test_get_claimed_and_release(self):
+        collection = MagicMock()
+        collection.find.return_value = MockCursor([{"inputs_hash": "hash1"}])
+        collection.delete_one = AsyncMock()
+        with patch.object(SingleFlight, 'get_pymongo_collection', return_value=collection):
+            assert await SingleFlight.get_claimed("ns", "fetch", ["hash1", "hash2"]) == {"hash1"}
+            await SingleFlight.release("ns", "fetch", "hash1")
+
+        collection.delete_one.assert_awaited_once_with({"namespace": "ns", "node_name": "fetch", "inputs_hash": "hash1"})
+
+    @pytest.mark.asyncio
+    async def test_claim_and_expire_use_utc(self):
+        """Test that flights are timed in UTC, which the TTL monitor compares against"""
+        collection = MagicMock()
+        collection.insert_many = AsyncMock()
+        collection.delete_many = AsyncMock()
+        with patch.object(SingleFlight, 'get_pymongo_collection', return_value=collection):
+            await SingleFlight.claim("ns", "fetch", [("hash1", PydanticObjectId())])
+            await SingleFlight.expire()
+
+        assert collection.insert_many.await_args.args[0][0]["created_at"].tzinfo is not None
+        cutoff = collection.delete_many.await_args.args[0]["created_at"]["$lt"]
+        assert cutoff.tzinfo is not None
+        assert datetime.now(timezone.utc) - cutoff >= SINGLE_FLIGHT_TTL
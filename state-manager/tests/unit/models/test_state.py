@@ -0,0 +1,196 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+
+from app.models.db.state import State
+from app.models.db.state_record import StateRecord
+from app.models.state_status_enum import StateStatusEnum
+
+
+def make_document(state_id, status=StateStatusEnum.EXECUTED):
+    return {
+        "_id": state_id,
+        "node_name": "node",
+        "namespace_name": "ns",
+        "identifier": "id",
+        "graph_name": "graph",
+        "run_id": "run",
+        "status": status,
+        "inputs": {},
+        "outputs": {"result": "ok"},
+    }
+
+
+class TestStateTransition:
+    """Test cases for State.transition and State.get_status"""
+
+    @pytest.mark.asyncio
+    async def test_transition_sets_only_given_fields_with_status_precondition(self):
+        state_id = PydanticObjectId()
+        collection = MagicMock()
+        collection.find_one_and_update = AsyncMock(return_value=make_document(state_id))
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            state = await State.transition(state_id, [StateStatusEnum.QUEUED], {"status": StateStatusEnum.EXECUTED, "outputs": {"result": "ok"}})
+
+        assert state is not None
+        assert state.id == state_id
+        assert state.status == StateStatusEnum.EXECUTED
+
+        query, update = collection.find_one_and_update.await_args.args
+        assert query == {"_id": state_id, "status": {"$in": [StateStatusEnum.QUEUED]}}
+        assert set(update["$set"].keys()) == {"status", "outputs", "updated_at"}
+        assert collection.find_one_and_update.await_args.kwargs["return_document"] == ReturnDocument.AFTER
+
+    @pytest.mark.asyncio
+    async def test_transition_without_precondition(self):
+        state_id = PydanticObjectId()
+        collection = MagicMock()
+        collection.find_one_and_update = AsyncMock(return_value=make_document(state_id, StateStatusEnum.CREATED))
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            await State.transition(state_id, None, {"status": StateStatusEnum.CREATED})
+
+        query = collection.find_one_and_update.await_args.args[0]
+        assert query == {"_id": state_id}
+        assert "$unset" not in collection.find_one_and_update.await_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_transition_unsets_fields(self):
+        state_id = PydanticObjectId()
+        collection = MagicMock()
+        collection.find_one_and_update = AsyncMock(return_value=make_document(state_id, StateStatusEnum.CREATED))
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            await State.transition(state_id, [StateStatusEnum.PARKED], {"status": StateStatusEnum.CREATED}, unset=["single_flight_key"])
+
+        update = collection.find_one_and_update.await_args.args[1]
+        assert update["$set"]["status"] == StateStatusEnum.CREATED
+        assert update["$unset"] == {"single_flight_key": ""}
+
+    @pytest.mark.asyncio
+    async def test_transition_precondition_not_met(self):
+        collection = MagicMock()
+        collection.find_one_and_update = AsyncMock(return_value=None)
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            state = await State.transition(PydanticObjectId(), [StateStatusEnum.QUEUED], {"status": StateStatusEnum.PRUNED})
+
+        assert state is None
+
+    @pytest.mark.asyncio
+    async def test_get_status(self):
+        state_id = PydanticObjectId()
+        collection = MagicMock()
+        collection.find_one = AsyncMock(return_value={"_id": state_id, "status": "SUCCESS"})
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            assert await State.get_status(state_id) == StateStatusEnum.SUCCESS
+
+        assert collection.find_one.await_args.kwargs["projection"] == {"status": 1}
+
+    @pytest.mark.asyncio
+    async def test_get_status_not_found(self):
+        collection = MagicMock()
+        collection.find_one = AsyncMock(return_value=None)
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            assert await State.get_status(PydanticObjectId()) is None
+
+
+class TestStateDocuments:
+    """Test cases for the raw document helpers used on hot paths"""
+
+    def test_new_document_matches_model_defaults(self):
+        parents = {"root": PydanticObjectId()}
+        fields = dict(
+            node_name="node",
+            namespace_name="ns",
+            identifier="id",
+            graph_name="graph",
+            run_id="run",
+            status=StateStatusEnum.CREATED,
+            inputs={"a": "b"},
+            outputs={},
+            parents=parents,
+            does_unites=True,
+        )
+
+        document = State.new_document(**fields)
+        state = State.model_construct(**fields)
+        state._generate_fingerprint()
+
+        assert document["state_fingerprint"] == state.state_fingerprint
+        assert document["data"] == {}
+        assert document["retry_count"] == 0
+        assert document["fanout_id"]
+        assert document["enqueue_after"] > 0
+
+    def test_new_document_without_unites_has_no_fingerprint(self):
+        document = State.new_document(
+            node_name="node",
+            namespace_name="ns",
+            identifier="id",
+            graph_name="graph",
+            run_id="run",
+            status=StateStatusEnum.CREATED,
+            inputs={},
+            outputs={},
+        )
+
+        assert document["state_fingerprint"] == ""
+        assert document["parents"] == {}
+
+    def test_state_record_defaults_for_projected_fields(self):
+        state_id = PydanticObjectId()
+
+        record = StateRecord({"_id": state_id, "identifier": "id", "status": "QUEUED"})
+
+        assert record.id == state_id
+        assert record.status == StateStatusEnum.QUEUED
+        assert record.inputs == {}
+        assert record.parents == {}
+        assert record.created_at is None
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class TestStateRecordChunks:
+    """Test cases for State.find_record_chunks"""
+
+    @pytest.mark.asyncio
+    async def test_find_record_chunks_splits_cursor(self):
+        state_ids = [PydanticObjectId() for _ in range(5)]
+        collection = MagicMock()
+        collection.find.return_value = MockCursor([make_document(state_id) for state_id in state_ids])
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            chunks = [chunk async for chunk in State.find_record_chunks(state_ids, 2)]
+
+        assert [[record.id for record in chunk] for chunk in chunks] == [state_ids[0:2], state_ids[2:4], state_ids[4:]]
+        assert collection.find.call_args.kwargs["batch_size"] == 2
+
+    @pytest.mark.asyncio
+    async def test_find_record_chunks_empty(self):
+        collection = MagicMock()
+        collection.find.return_value = MockCursor([])
+
+        with patch.object(State, 'get_pymongo_collection', return_value=collection):
+            chunks = [chunk async for chunk in State.find_record_chunks([PydanticObjectId()], 2)]
+
+        assert chunks == []
@@ -1,5 +1,6 @@
 ﻿import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+from pymongo.errors import DuplicateKeyError
 from app.models.db.store import Store
 
 
@@ -62,3 +63,78 @@ class TestStore:
                 result = await Store.get_value(run_id, namespace, graph_name, key)
                 
                 assert result == expected_value
+
+    @pytest.mark.asyncio
+    async def test_get_values_reads_whole_run(self):
+        """Test get_values returns every key of a run from a single query"""
+        documents = [{"key": "key1", "value": "value1"}, {"key": "key2", "value": "value2"}]
+
+        class MockCursor:
+            def __init__(self):
+                self._iterator = iter(documents)
+
+            def __aiter__(self):
+                return self
+
+            async def __anext__(self):
+                try:
+                    return next(self._iterator)
+                except StopIteration:
+                    raise StopAsyncIteration
+
+        with patch('app.models.db.store.Store') as mock_store_class:
+            collection = MagicMock()
+            collection.find.return_value = MockCursor()
+            mock_store_class.get_pymongo_collection.return_value = collection
+
+            result = await Store.get_values("test_run", "test_ns", "test_graph")
+
+            assert result == {"key1": "value1", "key2": "value2"}
+            collection.find.assert_called_once_with(
+                {"run_id": "test_run", "namespace": "test_ns", "graph_name": "test_graph"},
+                projection={"_id": 0, "key": 1, "value": 1}
+            )
+
+
+class TestStoreModelOperations:
+    """Test cases for the atomic Store operations"""
+
+    @pytest.mark.asyncio
+    async def test_set_value_upserts(self):
+        collection = MagicMock()
+        collection.update_one = AsyncMock()
+        with patch.object(Store, 'get_pymongo_collection', return_value=collection):
+            await Store.set_value("run", "ns", "graph", "key", "value")
+
+        query, update = collection.update_one.await_args.args
+        assert query == {"run_id": "run", "namespace": "ns", "graph_name": "graph", "key": "key"}
+        assert update == {"$set": {"value": "value"}}
+        assert collection.update_one.await_args.kwargs["upsert"] is True
+
+    @pytest.mark.asyncio
+    async def test_compare_and_set_matches_expected_value(self):
+        collection = MagicMock()
+        collection.update_one = AsyncMock(return_value=MagicMock(matched_count=0))
+        with patch.object(Store, 'get_pymongo_collection', return_value=collection):
+            assert await Store.compare_and_set("run", "ns", "graph", "key", "old", "new") is False
+
+        assert collection.update_one.await_args.args[0]["value"] == "old"
+
+    @pytest.mark.asyncio
+    async def test_compare_and_set_absent_key_inserts(self):
+        collection = MagicMock()
+        collection.insert_one = AsyncMock(side_effect=[None, DuplicateKeyError("duplicate")])
+        with patch.object(Store, 'get_pymongo_collection', return_value=collection):
+            assert await Store.compare_and_set("run", "ns", "graph", "key", None, "first") is True
+            assert await Store.compare_and_set("run", "ns", "graph", "key", None, "second") is False
+
+    @pytest.mark.asyncio
+    async def test_increment_is_single_pipeline_upsert(self):
+        collection = MagicMock()
+        collection.find_one_and_update = AsyncMock(return_value={"value": "3"})
+        with patch.object(Store, 'get_pymongo_collection', return_value=collection):
+            assert await Store.increment("run", "ns", "graph", "key", 3) == "3"
+
+        pipeline = collection.find_one_and_update.await_args.args[1]
+        assert isinstance(pipeline, list)
+        assert collection.find_one_and_update.await_args.kwargs["upsert"] is True
@@ -0,0 +1,167 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from beanie import PydanticObjectId
+
+from app.singletons.event_bus import EventBus, Subscription
+from app.models.event_models import StateEventModel
+from app.models.state_status_enum import StateStatusEnum
+
+
+def make_state(run_id="run1", namespace_name="ns", status=StateStatusEnum.CREATED):
+    state = MagicMock()
+    state.id = PydanticObjectId()
+    state.run_id = run_id
+    state.namespace_name = namespace_name
+    state.graph_name = "graph"
+    state.node_name = "node"
+    state.identifier = "node_id"
+    state.status = status
+    return state
+
+
+def make_event(run_id="run1", namespace_name="ns", status=StateStatusEnum.CREATED):
+    return StateEventModel(
+        state_id=str(PydanticObjectId()),
+        run_id=run_id,
+        namespace_name=namespace_name,
+        graph_name="graph",
+        node_name="node",
+        identifier="node_id",
+        status=status
+    )
+
+
+@pytest.fixture
+def event_bus():
+    bus = EventBus()
+    yield bus
+    bus._subscriptions.clear()
+    bus._subscribed.clear()
+
+
+class TestSubscription:
+    """Test cases for Subscription"""
+
+    def test_matches_namespace(self):
+        subscription = Subscription("ns")
+        assert subscription.matches(make_event(namespace_name="ns"))
+        assert not subscription.matches(make_event(namespace_name="other"))
+
+    def test_matches_run(self):
+        subscription = Subscription("ns", "run1")
+        assert subscription.matches(make_event(run_id="run1"))
+        assert not subscription.matches(make_event(run_id="run2"))
+
+    async def test_drops_oldest_when_full(self):
+        subscription = Subscription("ns", max_size=2)
+        events = [make_event() for _ in range(3)]
+        for event in events:
+            subscription.put(event)
+
+        assert await subscription.get() == events[1]
+        assert await subscription.get() == events[2]
+
+
+class TestEventBus:
+    """Test cases for EventBus"""
+
+    def test_singleton(self):
+        assert EventBus() is EventBus()
+
+    async def test_publish_delivers_to_matching_subscriptions(self, event_bus):
+        run_subscription = event_bus.subscribe("ns", "run1")
+        namespace_subscription = event_bus.subscribe("ns")
+        other_subscription = event_bus.subscribe("ns", "run2")
+
+        state = make_state(status=StateStatusEnum.QUEUED)
+        event_bus.publish(state)
+
+        run_event = await run_subscription.get()
+        assert run_event.state_id == str(state.id)
+        assert run_event.status == StateStatusEnum.QUEUED
+        assert (await namespace_subscription.get()).state_id == str(state.id)
+        assert other_subscription._queue.empty()
+
+    def test_publish_without_subscribers_is_noop(self, event_bus):
+        # a MagicMock without the required attributes would fail validation if an event were built
+        event_bus.publish(MagicMock(spec=[]))
+
+    async def test_publish_inserted_uses_inserted_ids(self, event_bus):
+        subscription = event_bus.subscribe("ns")
+        states = [make_state(), make_state()]
+        inserted_ids = [PydanticObjectId(), PydanticObjectId()]
+
+        event_bus.publish_inserted(states, inserted_ids)
+
+        assert (await subscription.get()).state_id == str(inserted_ids[0])
+        assert (await subscription.get()).state_id == str(inserted_ids[1])
+
+    def test_unsubscribe(self, event_bus):
+        subscription = event_bus.subscribe("ns")
+        event_bus.unsubscribe(subscription)
+
+        assert not event_bus.has_subscribers()
+
+    def test_change_stream_mode_ignores_local_publishes(self, event_bus):
+        subscription = event_bus.subscribe("ns")
+        with patch.object(event_bus, "_use_change_stream", True):
+            event_bus.publish(make_state())
+
+        assert subscription._queue.empty()
+
+    async def test_publish_by_ids_looks_up_states_only_with_subscribers(self, event_bus):
+        with patch('app.singletons.event_bus.State') as mock_state_class:
+            await event_bus.publish_by_ids([PydanticObjectId()], StateStatusEnum.SUCCESS)
+            mock_state_class.get_pymongo_collection.assert_not_called()
+
+    async def test_publish_by_ids(self, event_bus):
+        subscription = event_bus.subscribe("ns", "run1")
+        state_id = PydanticObjectId()
+        document = {"_id": state_id, "run_id": "run1", "namespace_name": "ns", "graph_name": "graph", "node_name": "node", "identifier": "node_id"}
+
+        cursor = MagicMock()
+        cursor.__aiter__.return_value = [document]
+        with patch('app.singletons.event_bus.State') as mock_state_class:
+            mock_state_class.get_pymongo_collection.return_value.find.return_value = cursor
+            await event_bus.publish_by_ids([state_id], StateStatusEnum.SUCCESS)
+
+        event = await subscription.get()
+        assert event.state_id == str(state_id)
+        assert event.status == StateStatusEnum.SUCCESS
+
+    async def test_publish_by_ids_swallows_errors(self, event_bus):
+        event_bus.subscribe("ns")
+        with patch('app.singletons.event_bus.State') as mock_state_class:
+            mock_state_class.get_pymongo_collection.return_value.find = MagicMock(side_effect=Exception("Database error"))
+            await event_bus.publish_by_ids([PydanticObjectId()], StateStatusEnum.SUCCESS)
+
+    async def test_change_stream_only_open_with_subscribers(self, event_bus):
+        state_id = PydanticObjectId()
+        document = {"_id": state_id, "run_id": "run1", "namespace_name": "ns", "graph_name": "graph", "node_name": "node", "identifier": "node_id", "status": "SUCCESS"}
+
+        stream = MagicMock()
+        stream.__aenter__ = AsyncMock(return_value=stream)
+        stream.__aexit__ = AsyncMock(return_value=False)
+        stream.try_next = AsyncMock(side_effect=[None, {"fullDocument": document}, None, None, None])
+        stream.resume_token = {"_data": "token"}
+
+        with patch('app.singletons.event_bus.State') as mock_state_class:
+            collection = mock_state_class.get_pymongo_collection.return_value
+            collection.watch = AsyncMock(return_value=stream)
+            watcher = asyncio.create_task(event_bus.watch_change_stream())
+            try:
+                await asyncio.sleep(0.01)
+                collection.watch.assert_not_called()
+
+                subscription = event_bus.subscribe("ns", "run1")
+                event = await asyncio.wait_for(subscription.get(), timeout=1)
+                assert event.state_id == str(state_id)
+                assert "start_at_operation_time" in collection.watch.call_args.kwargs
+
+                event_bus.unsubscribe(subscription)
+                await asyncio.sleep(0.01)
+                stream.__aexit__.assert_awaited_once()
+                assert collection.watch.await_count == 1
+            finally:
+                watcher.cancel()
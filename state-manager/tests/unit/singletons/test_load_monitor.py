@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.singletons.load_monitor import LoadMonitor, MongoLatencyListener
+
+
+@pytest.fixture
+def load_monitor():
+    monitor = LoadMonitor()
+    with patch.object(monitor, "_max_in_flight_requests", 2), \
+         patch.object(monitor, "_max_background_tasks", 4), \
+         patch.object(monitor, "_max_mongo_latency_ms", 100), \
+         patch.object(monitor, "_in_flight_requests", 0), \
+         patch.object(monitor, "_background_tasks", 0), \
+         patch.object(monitor, "_mongo_latency_ms", None):
+        yield monitor
+
+
+class TestLoadMonitor:
+    """Test cases for LoadMonitor"""
+
+    def test_idle_replica_is_not_overloaded(self, load_monitor):
+        assert load_monitor.overload() is None
+        assert load_monitor.metrics() == {"in_flight_requests": 0, "background_tasks": 0, "mongo_latency_ms": None}
+
+    def test_too_many_requests_answer_429(self, load_monitor):
+        load_monitor.request_started()
+        assert load_monitor.overload() is None
+
+        load_monitor.request_started()
+        assert load_monitor.overload() == (429, 1)
+
+        load_monitor.request_responded()
+        assert load_monitor.overload() is None
+
+    def test_background_backlog_answers_503(self, load_monitor):
+        for _ in range(8):
+            load_monitor.background_started()
+        assert load_monitor.overload() == (503, 2)
+
+        for _ in range(5):
+            load_monitor.background_finished()
+        assert load_monitor.overload() is None
+
+    def test_slow_mongo_answers_503(self, load_monitor):
+        load_monitor.record_mongo_latency(250)
+        assert load_monitor.overload() == (503, 3)
+
+    def test_mongo_latency_is_averaged(self, load_monitor):
+        load_monitor.record_mongo_latency(100)
+        load_monitor.record_mongo_latency(50)
+
+        assert load_monitor.mongo_latency_ms() == pytest.approx(90)
+
+    def test_stale_mongo_latency_is_ignored(self, load_monitor):
+        with patch('app.singletons.load_monitor.time.monotonic', return_value=100.0):
+            load_monitor.record_mongo_latency(500)
+        with patch('app.singletons.load_monitor.time.monotonic', return_value=200.0):
+            assert load_monitor.mongo_latency_ms() is None
+            assert load_monitor.overload() is None
+
+    def test_retry_after_is_capped(self, load_monitor):
+        load_monitor.record_mongo_latency(100_000)
+        assert load_monitor.overload() == (503, 30)
+
+    def test_zero_limit_disables_check(self, load_monitor):
+        with patch.object(load_monitor, "_max_in_flight_requests", 0):
+            for _ in range(10):
+                load_monitor.request_started()
+            assert load_monitor.overload() is None
+
+
+class TestMongoLatencyListener:
+    """Test cases for MongoLatencyListener"""
+
+    def test_records_command_durations(self, load_monitor):
+        listener = MongoLatencyListener()
+        listener.succeeded(MagicMock(command_name="find", duration_micros=20_000))
+
+        assert load_monitor.mongo_latency_ms() == pytest.approx(20)
+
+    def test_ignores_waiting_commands(self, load_monitor):
+        listener = MongoLatencyListener()
+        listener.succeeded(MagicMock(command_name="getMore", duration_micros=1_000_000))
+        listener.failed(MagicMock(command_name="hello", duration_micros=1_000_000))
+
+        assert load_monitor.mongo_latency_ms() is None
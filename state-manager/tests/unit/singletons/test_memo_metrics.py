@@ -0,0 +1,24 @@
+import pytest
+
+from app.singletons.memo_metrics import MemoMetrics
+
+
+@pytest.fixture
+def memo_metrics():
+    metrics = MemoMetrics()
+    metrics.clear()
+    yield metrics
+    metrics.clear()
+
+
+class TestMemoMetrics:
+    """Test cases for MemoMetrics"""
+
+    def test_counts_accumulate_per_node(self, memo_metrics):
+        memo_metrics.record("ns", "parser", 2, 1)
+        memo_metrics.record("ns", "parser", 1, 0)
+        memo_metrics.record("ns", "ocr", 0, 4)
+        memo_metrics.record("other", "parser", 5, 5)
+
+        assert memo_metrics.get("ns") == {"parser": (3, 1), "ocr": (0, 4)}
+        assert memo_metrics.get("missing") == {}
@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from bson import ObjectId
+
+from app.singletons.secrets_cache import SecretsCache
+
+TEMPLATE_ID = ObjectId()
+
+
+def make_template(secrets, updated_at=datetime(2025, 1, 1)):
+    return {"_id": TEMPLATE_ID, "updated_at": updated_at, "secrets": secrets}
+
+
+@pytest.fixture
+def secrets_cache():
+    cache = SecretsCache()
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+class TestSecretsCache:
+    """Test cases for SecretsCache"""
+
+    @pytest.mark.asyncio
+    async def test_secrets_are_decrypted_once_per_graph(self, secrets_cache):
+        with patch('app.singletons.secrets_cache.GraphTemplate') as mock_template_class:
+            mock_template_class.find_encrypted_secrets = AsyncMock(return_value=make_template({"api_key": "encrypted"}))
+            mock_template_class.decrypt_secrets.return_value = {"api_key": "decrypted"}
+
+            assert await secrets_cache.get_secrets("ns", "graph") == {"api_key": "decrypted"}
+            assert await secrets_cache.get_secrets("ns", "graph") == {"api_key": "decrypted"}
+
+            mock_template_class.find_encrypted_secrets.assert_awaited_once_with("ns", "graph")
+            mock_template_class.decrypt_secrets.assert_called_once_with({"api_key": "encrypted"})
+
+    @pytest.mark.asyncio
+    async def test_concurrent_readers_share_one_load(self, secrets_cache):
+        with patch('app.singletons.secrets_cache.GraphTemplate') as mock_template_class:
+            async def find_encrypted_secrets(namespace, name):
+                await asyncio.sleep(0.01)
+                return make_template({})
+
+            mock_template_class.find_encrypted_secrets = AsyncMock(side_effect=find_encrypted_secrets)
+            mock_template_class.decrypt_secrets.return_value = {}
+
+            results = await asyncio.gather(*[secrets_cache.get_secrets("ns", "graph") for _ in range(10)])
+
+            assert all(result == {} for result in results)
+            assert mock_template_class.find_encrypted_secrets.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_template_is_not_cached(self, secrets_cache):
+        with patch('app.singletons.secrets_cache.GraphTemplate') as mock_template_class:
+            mock_template_class.find_encrypted_secrets = AsyncMock(return_value=None)
+
+            assert await secrets_cache.get_secrets("ns", "graph") is None
+            assert await secrets_cache.get_secrets("ns", "graph") is None
+
+            assert mock_template_class.find_encrypted_secrets.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_of_same_version_is_not_decrypted_again(self, secrets_cache):
+        with patch('app.singletons.secrets_cache.GraphTemplate') as mock_template_class, \
+             patch('app.singletons.secrets_cache.time') as mock_time:
+            mock_template_class.find_encrypted_secrets = AsyncMock(return_value=make_template({"api_key": "encrypted"}))
+            mock_template_class.decrypt_secrets.return_value = {"api_key": "decrypted"}
+            mock_time.monotonic.return_value = 100.0
+
+            await secrets_cache.get_secrets("ns", "graph")
+            mock_time.monotonic.return_value = 100.0 + secrets_cache._ttl + 1
+            assert await secrets_cache.get_secrets("ns", "graph") == {"api_key": "decrypted"}
+
+            assert mock_template_class.find_encrypted_secrets.await_count == 2
+            mock_template_class.decrypt_secrets.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_of_new_version_is_decrypted(self, secrets_cache):
+        with patch('app.singletons.secrets_cache.GraphTemplate') as mock_template_class, \
+             patch('app.singletons.secrets_cache.time') as mock_time:
+            mock_template_class.find_encrypted_secrets = AsyncMock(side_effect=[
+                make_template({"api_key": "old"}),
+                make_template({"api_key": "new"}, updated_at=datetime(2025, 1, 2))
+            ])
+            mock_template_class.decrypt_secrets.side_effect = lambda secrets: secrets
+            mock_time.monotonic.return_value = 100.0
+
+            await secrets_cache.get_secrets("ns", "graph")
+            mock_time.monotonic.return_value = 100.0 + secrets_cache._ttl + 1
+
+            assert await secrets_cache.get_secrets("ns", "graph") == {"api_key": "new"}
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, secrets_cache):
+        with patch('app.singletons.secrets_cache.GraphTemplate') as mock_template_class:
+            mock_template_class.find_encrypted_secrets = AsyncMock(side_effect=[
+                make_template({"api_key": "old"}),
+                make_template({"api_key": "new"})
+            ])
+            mock_template_class.decrypt_secrets.side_effect = lambda secrets: secrets
+
+            assert await secrets_cache.get_secrets("ns", "graph") == {"api_key": "old"}
+            secrets_cache.invalidate("ns", "graph")
+            assert await secrets_cache.get_secrets("ns", "graph") == {"api_key": "new"}
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_graph_is_evicted(self, secrets_cache):
+        secrets_cache._max_graphs = 2
+        try:
+            with patch('app.singletons.secrets_cache.GraphTemplate') as mock_template_class:
+                mock_template_class.find_encrypted_secrets = AsyncMock(return_value=make_template({}))
+                mock_template_class.decrypt_secrets.return_value = {}
+
+                await secrets_cache.get_secrets("ns", "graph1")
+                await secrets_cache.get_secrets("ns", "graph2")
+                await secrets_cache.get_secrets("ns", "graph1")
+                await secrets_cache.get_secrets("ns", "graph3")
+
+                assert list(secrets_cache._entries.keys()) == [("ns", "graph1"), ("ns", "graph3")]
+        finally:
+            secrets_cache._max_graphs = 1024
@@ -1,17 +1,42 @@
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 from beanie import PydanticObjectId
 from app.tasks.create_next_states import (
     mark_success_states,
     check_unites_satisfied,
     validate_dependencies,
-    create_next_states
+    create_next_states,
+    apply_memoized_results,
+    create_completed_next_states,
+    park_single_flight_followers,
+    unpark_orphaned_followers
 )
 from app.models.dependent_string import Dependent, DependentString
 from app.models.state_status_enum import StateStatusEnum
-from app.models.node_template_model import NodeTemplate, Unites, UnitesStrategyEnum
+from app.models.node_template_model import NodeTemplate, Unites, UnitesStrategyEnum, Memoize
+from app.models.db.memoized_result import compute_inputs_hash
 from app.models.store_config_model import StoreConfig
 from pydantic import BaseModel
+from app.singletons.memo_metrics import MemoMetrics
+
+
+def record_chunks(*calls):
+    """
+    Stand-in for State.find_record_chunks, each call streams the next entry
+    of calls as a single chunk.
+    """
+    remaining = list(calls)
+
+    async def find_record_chunks(state_ids, chunk_size, projection=None):
+        yield remaining.pop(0)
+
+    return MagicMock(side_effect=find_record_chunks)
+
+
+async def yield_chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
 
 
 class TestDependent:
@@ -181,7 +206,7 @@ class TestMarkSuccessStates:
             await mark_success_states(state_ids)
             
             mock_state.find.assert_called_once()
-            mock_find.set.assert_called_once_with({"status": StateStatusEnum.SUCCESS})
+            mock_find.set.assert_called_once_with({"status": StateStatusEnum.SUCCESS, "updated_at": ANY})
 
 
 class TestCheckUnitesSatisfied:
@@ -429,7 +454,8 @@ class TestCreateNextStates:
             mock_state_cls.find.assert_called_once()
             mock_find_result.set.assert_called_once_with({
                 "status": StateStatusEnum.NEXT_CREATED_ERROR,
-                "error": "State ids is empty"
+                "error": "State ids is empty",
+                "updated_at": ANY
             })
 
     @pytest.mark.asyncio
@@ -457,6 +483,7 @@ class TestCreateNextStates:
             mock_set = AsyncMock()
             mock_find.set.return_value = mock_set
             mock_state_class.find.return_value = mock_find
+            mock_state_class.find_records = AsyncMock(return_value=[])
             
             with patch('app.tasks.create_next_states.State', mock_state_class):
                 
@@ -464,7 +491,7 @@ class TestCreateNextStates:
                 
                 # Should mark states as successful
                 mock_state_class.find.assert_called()
-                mock_find.set.assert_called_with({"status": StateStatusEnum.SUCCESS})
+                mock_find.set.assert_called_with({"status": StateStatusEnum.SUCCESS, "updated_at": ANY})
 
     @pytest.mark.asyncio
     async def test_create_next_states_node_template_not_found(self):
@@ -483,6 +510,7 @@ class TestCreateNextStates:
             mock_set = AsyncMock()
             mock_find.set.return_value = mock_set
             mock_state_class.find.return_value = mock_find
+            mock_state_class.find_records = AsyncMock(return_value=[])
             
             with patch('app.tasks.create_next_states.State', mock_state_class):
                 with pytest.raises(ValueError, match="Current state node template not found"):
@@ -513,6 +541,7 @@ class TestCreateNextStates:
             mock_set = AsyncMock()
             mock_find.set.return_value = mock_set
             mock_state_class.find.return_value = mock_find
+            mock_state_class.find_records = AsyncMock(return_value=[])
             
             with patch('app.tasks.create_next_states.State', mock_state_class):
                 with pytest.raises(ValueError, match="Next state node template not found"):
@@ -551,6 +580,7 @@ class TestCreateNextStates:
             mock_set = AsyncMock()
             mock_find.set.return_value = mock_set
             mock_state_class.find.return_value = mock_find
+            mock_state_class.find_records = AsyncMock(return_value=[])
             
             with patch('app.tasks.create_next_states.State', mock_state_class):
                 with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -596,7 +626,7 @@ class TestCreateNextStates:
                 mock_find = AsyncMock()
                 mock_set = AsyncMock()
                 mock_insert_many = AsyncMock()
-                mock_state_class.insert_many = mock_insert_many
+                mock_state_class.insert_documents = mock_insert_many
                 mock_current_state = MagicMock()
                 mock_current_state.node_name = "test_node"
                 mock_current_state.identifier = "test_id"
@@ -609,7 +639,7 @@ class TestCreateNextStates:
                 mock_current_state.does_unites = False
                 mock_current_state.run_id = "test_run"
                 mock_current_state.error = None
-                mock_find.to_list.return_value = [mock_current_state]
+                mock_state_class.find_record_chunks = record_chunks([mock_current_state])
                 mock_find.set.return_value = mock_set
                 mock_state_class.find.return_value = mock_find
                 
@@ -623,7 +653,7 @@ class TestCreateNextStates:
                         
                         # Should insert new states and mark current states as successful
                         mock_insert_many.assert_called_once()
-                        mock_find.set.assert_called_with({"status": StateStatusEnum.SUCCESS})
+                        mock_find.set.assert_called_with({"status": StateStatusEnum.SUCCESS, "updated_at": ANY})
 
     @pytest.mark.asyncio
     async def test_create_next_states_exception_handling(self):
@@ -640,6 +670,7 @@ class TestCreateNextStates:
             mock_set = AsyncMock()
             mock_find.set.return_value = mock_set
             mock_state_class.find.return_value = mock_find
+            mock_state_class.find_records = AsyncMock(return_value=[])
             
             with patch('app.tasks.create_next_states.State', mock_state_class):
                 with pytest.raises(Exception, match="Graph template error"):
@@ -648,7 +679,8 @@ class TestCreateNextStates:
                 # Should mark states as error
                 mock_find.set.assert_called_with({
                     "status": StateStatusEnum.NEXT_CREATED_ERROR,
-                    "error": "Graph template error"
+                    "error": "Graph template error",
+                    "updated_at": ANY
                 })
 
 
@@ -702,7 +734,7 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock
-            mock_store.get_value = AsyncMock(return_value="store_value")
+            mock_store.get_values = AsyncMock(return_value={"test_field": "store_value"})
             
             # Setup State mock
             mock_state_class.id = "id"
@@ -711,10 +743,10 @@ class TestGetStoreValue:
             mock_current_state.identifier = "current_id"
             mock_current_state.outputs = {"field1": "output_value"}
             mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_current_state]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -733,8 +765,8 @@ class TestGetStoreValue:
                     # Single call that should use the same store field twice
                     await create_next_states([PydanticObjectId()], "current_id", "test_namespace", "test_graph", {})
                     
-                    # Verify Store.get_value was called only once despite being used twice (cached)
-                    mock_store.get_value.assert_called_once_with("test_run", "test_namespace", "test_graph", "test_field")
+                    # Verify Store.get_values was called only once despite being used twice (cached)
+                    mock_store.get_values.assert_called_once_with("test_run", "test_namespace", "test_graph")
 
     @pytest.mark.asyncio
     async def test_get_store_value_from_store(self):
@@ -777,7 +809,7 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock to return a value
-            mock_store.get_value = AsyncMock(return_value="store_value")
+            mock_store.get_values = AsyncMock(return_value={"test_field": "store_value"})
             
             # Setup State mock
             mock_state_class.id = "id"
@@ -786,10 +818,10 @@ class TestGetStoreValue:
             mock_current_state.identifier = "current_id"
             mock_current_state.outputs = {"field1": "output_value"}
             mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_current_state]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -804,8 +836,8 @@ class TestGetStoreValue:
                     
                     await create_next_states([PydanticObjectId()], "current_id", "test_namespace", "test_graph", {})
                     
-                    # Verify Store.get_value was called with correct parameters
-                    mock_store.get_value.assert_called_once_with("test_run", "test_namespace", "test_graph", "test_field")
+                    # Verify Store.get_values was called with correct parameters
+                    mock_store.get_values.assert_called_once_with("test_run", "test_namespace", "test_graph")
 
     @pytest.mark.asyncio
     async def test_get_store_value_from_default(self):
@@ -848,7 +880,7 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock to return None (not found)
-            mock_store.get_value = AsyncMock(return_value=None)
+            mock_store.get_values = AsyncMock(return_value={})
             
             # Setup State mock
             mock_state_class.id = "id"
@@ -857,10 +889,10 @@ class TestGetStoreValue:
             mock_current_state.identifier = "current_id"
             mock_current_state.outputs = {"field1": "output_value"}
             mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_current_state]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -876,8 +908,8 @@ class TestGetStoreValue:
                     # Should complete successfully using default value
                     await create_next_states([PydanticObjectId()], "current_id", "test_namespace", "test_graph", {})
                     
-                    # Verify Store.get_value was called
-                    mock_store.get_value.assert_called_once_with("test_run", "test_namespace", "test_graph", "test_field")
+                    # Verify Store.get_values was called
+                    mock_store.get_values.assert_called_once_with("test_run", "test_namespace", "test_graph")
 
     @pytest.mark.asyncio
     async def test_get_store_value_not_found_error(self):
@@ -920,7 +952,7 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock to return None (not found)
-            mock_store.get_value = AsyncMock(return_value=None)
+            mock_store.get_values = AsyncMock(return_value={})
             
             # Setup State mock
             mock_state_class.id = "id"
@@ -929,10 +961,10 @@ class TestGetStoreValue:
             mock_current_state.identifier = "current_id"
             mock_current_state.outputs = {"field1": "output_value"}
             mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_current_state]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -989,14 +1021,7 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock to return different values for different fields
-            def mock_get_value(run_id, namespace, graph_name, field):
-                if field == "field1":
-                    return "value1"
-                elif field == "field2":
-                    return "value2"
-                return None
-            
-            mock_store.get_value = AsyncMock(side_effect=mock_get_value)
+            mock_store.get_values = AsyncMock(return_value={"field1": "value1", "field2": "value2"})
             
             # Setup State mock
             mock_state_class.id = "id"
@@ -1005,10 +1030,11 @@ class TestGetStoreValue:
             mock_current_state.identifier = "current_id"
             mock_current_state.outputs = {"field1": "output_value"}
             mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_current_state]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
+            mock_state_class.new_document.side_effect = lambda **fields: fields
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -1026,14 +1052,14 @@ class TestGetStoreValue:
                     
                     await create_next_states([PydanticObjectId()], "current_id", "test_namespace", "test_graph", {})
                     
-                    # Verify Store.get_value was called for both fields
-                    assert mock_store.get_value.call_count == 2
-                    mock_store.get_value.assert_any_call("test_run", "test_namespace", "test_graph", "field1")
-                    mock_store.get_value.assert_any_call("test_run", "test_namespace", "test_graph", "field2")
+                    # Verify both fields were read with a single query for the run
+                    mock_store.get_values.assert_called_once_with("test_run", "test_namespace", "test_graph")
+                    documents = mock_state_class.insert_documents.await_args.args[0]
+                    assert documents[0]["inputs"] == {"input1": "value1", "input2": "value2"}
 
     @pytest.mark.asyncio
     async def test_get_store_value_default_fallback(self):
-        """Test that default values are used when Store.get_value returns None"""
+        """Test that default values are used when the store has no value"""
         
         with patch('app.tasks.create_next_states.GraphTemplate') as mock_graph_template, \
              patch('app.tasks.create_next_states.Store') as mock_store, \
@@ -1072,7 +1098,7 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock to return None
-            mock_store.get_value = AsyncMock(return_value=None)
+            mock_store.get_values = AsyncMock(return_value={})
             
             # Setup State mock
             mock_state_class.id = "id"
@@ -1081,10 +1107,10 @@ class TestGetStoreValue:
             mock_current_state.identifier = "current_id"
             mock_current_state.outputs = {"field1": "output_value"}
             mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_current_state]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -1100,8 +1126,8 @@ class TestGetStoreValue:
                     # Should complete successfully using default value
                     await create_next_states([PydanticObjectId()], "current_id", "test_namespace", "test_graph", {})
                     
-                    # Verify Store.get_value was called
-                    mock_store.get_value.assert_called_once_with("test_run", "test_namespace", "test_graph", "test_field")
+                    # Verify Store.get_values was called
+                    mock_store.get_values.assert_called_once_with("test_run", "test_namespace", "test_graph")
 
     @pytest.mark.asyncio
     async def test_get_store_value_cache_key_isolation(self):
@@ -1145,10 +1171,10 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock to return different values based on run_id
-            def mock_get_value(run_id, namespace, graph_name, field):
-                return f"value_{run_id}_{field}"
+            def mock_get_values(run_id, namespace, graph_name):
+                return {"test_field": f"value_{run_id}_test_field"}
             
-            mock_store.get_value = AsyncMock(side_effect=mock_get_value)
+            mock_store.get_values = AsyncMock(side_effect=mock_get_values)
             
             # Setup State mock for first run
             mock_state_class.id = "id"
@@ -1163,10 +1189,10 @@ class TestGetStoreValue:
             mock_current_state2.outputs = {"field1": "output_value"}
             
             mock_find = AsyncMock()
-            mock_find.to_list.side_effect = [[mock_current_state1], [mock_current_state2]]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state1], [mock_current_state2])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -1185,14 +1211,14 @@ class TestGetStoreValue:
                     # Second call with run2
                     await create_next_states([PydanticObjectId()], "current_id", "test_namespace", "test_graph", {})
                     
-                    # Verify Store.get_value was called twice with different run_ids
-                    assert mock_store.get_value.call_count == 2
-                    mock_store.get_value.assert_any_call("run1", "test_namespace", "test_graph", "test_field")
-                    mock_store.get_value.assert_any_call("run2", "test_namespace", "test_graph", "test_field")
+                    # Verify the store was read once per run
+                    assert mock_store.get_values.call_count == 2
+                    mock_store.get_values.assert_any_call("run1", "test_namespace", "test_graph")
+                    mock_store.get_values.assert_any_call("run2", "test_namespace", "test_graph")
 
     @pytest.mark.asyncio
     async def test_get_store_value_exception_handling(self):
-        """Test that exceptions from Store.get_value are properly propagated"""
+        """Test that exceptions from Store.get_values are properly propagated"""
         
         with patch('app.tasks.create_next_states.GraphTemplate') as mock_graph_template, \
              patch('app.tasks.create_next_states.Store') as mock_store, \
@@ -1231,7 +1257,7 @@ class TestGetStoreValue:
             mock_validate.return_value = None
             
             # Setup Store mock to raise an exception
-            mock_store.get_value = AsyncMock(side_effect=Exception("Database connection error"))
+            mock_store.get_values = AsyncMock(side_effect=Exception("Database connection error"))
             
             # Setup State mock
             mock_state_class.id = "id"
@@ -1240,10 +1266,10 @@ class TestGetStoreValue:
             mock_current_state.identifier = "current_id"
             mock_current_state.outputs = {"field1": "output_value"}
             mock_find = AsyncMock()
-            mock_find.to_list.return_value = [mock_current_state]
+            mock_state_class.find_record_chunks = record_chunks([mock_current_state])
             mock_find.set = AsyncMock()
             mock_state_class.find.return_value = mock_find
-            mock_state_class.insert_many = AsyncMock()
+            mock_state_class.insert_documents = AsyncMock()
             
             # Setup RegisteredNode mock
             with patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node:
@@ -1258,3 +1284,408 @@ class TestGetStoreValue:
                     
                     with pytest.raises(Exception, match="Database connection error"):
                         await create_next_states([PydanticObjectId()], "current_id", "test_namespace", "test_graph", {})
+
+
+class TestCreateNextStatesChunking:
+    """Test cases for the chunked processing of current states"""
+
+    @pytest.mark.asyncio
+    async def test_next_states_inserted_per_chunk(self):
+        """Test that each chunk of current states is written on its own, unordered"""
+        current_node = NodeTemplate(
+            node_name="test_node",
+            identifier="current_id",
+            namespace="test",
+            inputs={},
+            next_nodes=["next_node"],
+            unites=None
+        )
+        next_node = NodeTemplate(
+            node_name="next_node",
+            identifier="next_node",
+            namespace="test",
+            inputs={"input1": "${{current_id.outputs.field1}}"},
+            next_nodes=None,
+            unites=None
+        )
+
+        def make_current_state(value):
+            current_state = MagicMock()
+            current_state.id = PydanticObjectId()
+            current_state.identifier = "current_id"
+            current_state.graph_name = "test_graph"
+            current_state.run_id = "test_run"
+            current_state.parents = {}
+            current_state.outputs = {"field1": value}
+            return current_state
+
+        first_chunk = [make_current_state("a"), make_current_state("b")]
+        second_chunk = [make_current_state("c")]
+
+        with patch('app.tasks.create_next_states.GraphTemplate') as mock_graph_template, \
+             patch('app.tasks.create_next_states.State') as mock_state_class, \
+             patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node, \
+             patch('app.tasks.create_next_states.create_model') as mock_create_model:
+
+            mock_template = MagicMock()
+            mock_template.get_node_by_identifier.side_effect = lambda identifier: {"current_id": current_node, "next_node": next_node}.get(identifier)
+            mock_graph_template.get_valid = AsyncMock(return_value=mock_template)
+
+            mock_registered_node.get_by_name_and_namespace = AsyncMock(return_value=MagicMock())
+            mock_input_model = MagicMock()
+            mock_input_model.model_fields = {"input1": MagicMock(annotation=str)}
+            mock_create_model.return_value = mock_input_model
+
+            mock_state_class.id = "id"
+            mock_state_class.find_record_chunks = MagicMock(side_effect=lambda state_ids, chunk_size, projection=None: yield_chunks(first_chunk, second_chunk))
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock()
+            mock_find = AsyncMock()
+            mock_find.set = AsyncMock()
+            mock_state_class.find.return_value = mock_find
+
+            state_ids = [state.id for state in first_chunk + second_chunk]
+            await create_next_states(state_ids, "current_id", "test_namespace", "test_graph", {})
+
+            assert mock_state_class.insert_documents.await_count == 2
+            inserted = [call.args[0] for call in mock_state_class.insert_documents.await_args_list]
+            assert [[document["inputs"]["input1"] for document in documents] for documents in inserted] == [["a", "b"], ["c"]]
+            for call in mock_state_class.insert_documents.await_args_list:
+                assert call.kwargs["ordered"] is False
+
+            # States are marked successful chunk by chunk, once each chunk has been written
+            assert [call.args[0].query for call in mock_state_class.find.call_args_list] == [
+                {"id": {"$in": [state.id for state in first_chunk]}},
+                {"id": {"$in": [state.id for state in second_chunk]}}
+            ]
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_only_errors_its_states(self):
+        """Test that states of chunks written before a failure keep their success"""
+        current_node = NodeTemplate(
+            node_name="test_node",
+            identifier="current_id",
+            namespace="test",
+            inputs={},
+            next_nodes=["next_node"],
+            unites=None
+        )
+        next_node = NodeTemplate(
+            node_name="next_node",
+            identifier="next_node",
+            namespace="test",
+            inputs={"input1": "${{current_id.outputs.field1}}"},
+            next_nodes=None,
+            unites=None
+        )
+
+        def make_current_state(value):
+            current_state = MagicMock()
+            current_state.id = PydanticObjectId()
+            current_state.identifier = "current_id"
+            current_state.graph_name = "test_graph"
+            current_state.run_id = "test_run"
+            current_state.parents = {}
+            current_state.outputs = {"field1": value}
+            return current_state
+
+        first_chunk = [make_current_state("a"), make_current_state("b")]
+        second_chunk = [make_current_state("c")]
+
+        with patch('app.tasks.create_next_states.GraphTemplate') as mock_graph_template, \
+             patch('app.tasks.create_next_states.State') as mock_state_class, \
+             patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node, \
+             patch('app.tasks.create_next_states.create_model') as mock_create_model:
+
+            mock_template = MagicMock()
+            mock_template.get_node_by_identifier.side_effect = lambda identifier: {"current_id": current_node, "next_node": next_node}.get(identifier)
+            mock_graph_template.get_valid = AsyncMock(return_value=mock_template)
+
+            mock_registered_node.get_by_name_and_namespace = AsyncMock(return_value=MagicMock())
+            mock_input_model = MagicMock()
+            mock_input_model.model_fields = {"input1": MagicMock(annotation=str)}
+            mock_create_model.return_value = mock_input_model
+
+            mock_state_class.id = "id"
+            mock_state_class.find_record_chunks = MagicMock(side_effect=lambda state_ids, chunk_size, projection=None: yield_chunks(first_chunk, second_chunk))
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock(side_effect=[None, Exception("Insert failed")])
+            mock_find = AsyncMock()
+            mock_find.set = AsyncMock()
+            mock_state_class.find.return_value = mock_find
+
+            state_ids = [state.id for state in first_chunk + second_chunk]
+            with pytest.raises(Exception, match="Insert failed"):
+                await create_next_states(state_ids, "current_id", "test_namespace", "test_graph", {})
+
+            errored_query = mock_state_class.find.call_args_list[-1].args[0].query
+            assert errored_query == {"id": {"$in": [state.id for state in second_chunk]}}
+            assert mock_find.set.await_args_list[-1].args[0]["status"] == StateStatusEnum.NEXT_CREATED_ERROR
+
+
+class TestCreateNextStatesMemoization:
+    """Test cases for completing next states from memoized results"""
+
+    @pytest.fixture(autouse=True)
+    def clear_memo_metrics(self):
+        MemoMetrics().clear()
+        yield
+        MemoMetrics().clear()
+
+    @staticmethod
+    def make_memoized_node():
+        return NodeTemplate(
+            node_name="parser",
+            identifier="parse",
+            namespace="test",
+            inputs={"document": "${{current_id.outputs.document}}"},
+            next_nodes=None,
+            unites=None,
+            memoize=Memoize(ttl=60)
+        )
+
+    @pytest.mark.asyncio
+    async def test_apply_memoized_results(self):
+        """Test that states with a cached result are completed and the others left to run"""
+        node_template = self.make_memoized_node()
+        hit = {"inputs": {"document": "a"}, "status": StateStatusEnum.CREATED, "outputs": {}, "memoize_ttl": 60}
+        miss = {"inputs": {"document": "b"}, "status": StateStatusEnum.CREATED, "outputs": {}, "memoize_ttl": 60}
+
+        with patch('app.tasks.create_next_states.MemoizedResult') as mock_memoized_result:
+            mock_memoized_result.get_outputs = AsyncMock(return_value={compute_inputs_hash({"document": "a"}): {"pages": "3"}})
+
+            memoized_states = await apply_memoized_results(node_template, [hit, miss])
+
+            assert memoized_states == [hit]
+            assert hit["status"] == StateStatusEnum.EXECUTED
+            assert hit["outputs"] == {"pages": "3"}
+            assert hit["memoize_ttl"] is None
+            assert miss["status"] == StateStatusEnum.CREATED
+            assert miss["memoize_ttl"] == 60
+
+            namespace, node_name, inputs_hashes = mock_memoized_result.get_outputs.await_args.args
+            assert (namespace, node_name) == ("test", "parser")
+            assert sorted(inputs_hashes) == sorted([compute_inputs_hash({"document": "a"}), compute_inputs_hash({"document": "b"})])
+
+        assert MemoMetrics().get("test") == {"parser": (1, 1)}
+
+    @pytest.mark.asyncio
+    async def test_create_completed_next_states(self):
+        """Test that the run carries on past each memoized state, and failures stay isolated"""
+        parents = {"current_id": PydanticObjectId()}
+        memoized_states = [
+            {"_id": PydanticObjectId(), "identifier": "parse", "namespace_name": "test", "graph_name": "test_graph", "parents": parents}
+            for _ in range(2)
+        ]
+
+        with patch('app.tasks.create_next_states.create_next_states', new_callable=AsyncMock) as mock_create_next_states:
+            mock_create_next_states.side_effect = [None, ValueError("boom")]
+
+            await create_completed_next_states(memoized_states)
+
+            assert mock_create_next_states.await_count == 2
+            for call, memoized_state in zip(mock_create_next_states.await_args_list, memoized_states):
+                assert call.args == ([memoized_state["_id"]], "parse", "test", "test_graph", parents)
+
+    @pytest.mark.asyncio
+    async def test_create_completed_next_states_is_bounded(self):
+        """Test that only a bounded number of completed states are processed at once"""
+        completed_states = [
+            {"_id": PydanticObjectId(), "identifier": "parse", "namespace_name": "test", "graph_name": "test_graph", "parents": {}}
+            for _ in range(5)
+        ]
+        running = 0
+        peak = 0
+
+        async def create(*args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+
+        with patch('app.tasks.create_next_states.create_next_states', new_callable=AsyncMock) as mock_create_next_states, \
+             patch('app.tasks.create_next_states.COMPLETED_NEXT_STATES_CONCURRENCY', 2):
+            mock_create_next_states.side_effect = create
+
+            await create_completed_next_states(completed_states)
+
+            assert mock_create_next_states.await_count == 5
+            assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_memoized_next_states_skip_the_queue(self):
+        """Test that hits are inserted as executed and continued, misses are created with their ttl"""
+        current_node = NodeTemplate(
+            node_name="test_node",
+            identifier="current_id",
+            namespace="test",
+            inputs={},
+            next_nodes=["parse"],
+            unites=None
+        )
+        memoized_node = self.make_memoized_node()
+
+        def make_current_state(value):
+            current_state = MagicMock()
+            current_state.id = PydanticObjectId()
+            current_state.identifier = "current_id"
+            current_state.graph_name = "test_graph"
+            current_state.run_id = "test_run"
+            current_state.parents = {}
+            current_state.outputs = {"document": value}
+            return current_state
+
+        current_states = [make_current_state("a"), make_current_state("b")]
+
+        async def insert_documents(documents, **kwargs):
+            for document in documents:
+                document["_id"] = PydanticObjectId()
+
+        with patch('app.tasks.create_next_states.GraphTemplate') as mock_graph_template, \
+             patch('app.tasks.create_next_states.State') as mock_state_class, \
+             patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node, \
+             patch('app.tasks.create_next_states.create_model') as mock_create_model, \
+             patch('app.tasks.create_next_states.MemoizedResult') as mock_memoized_result, \
+             patch('app.tasks.create_next_states.create_completed_next_states', new_callable=AsyncMock) as mock_create_completed_next_states:
+
+            mock_template = MagicMock()
+            mock_template.get_node_by_identifier.side_effect = lambda identifier: {"current_id": current_node, "parse": memoized_node}.get(identifier)
+            mock_graph_template.get_valid = AsyncMock(return_value=mock_template)
+
+            mock_registered_node.get_by_name_and_namespace = AsyncMock(return_value=MagicMock())
+            mock_input_model = MagicMock()
+            mock_input_model.model_fields = {"document": MagicMock(annotation=str)}
+            mock_create_model.return_value = mock_input_model
+
+            mock_memoized_result.get_outputs = AsyncMock(return_value={compute_inputs_hash({"document": "a"}): {"pages": "3"}})
+
+            mock_state_class.id = "id"
+            mock_state_class.find_record_chunks = MagicMock(side_effect=lambda state_ids, chunk_size, projection=None: yield_chunks(current_states))
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock(side_effect=insert_documents)
+            mock_find = AsyncMock()
+            mock_find.set = AsyncMock()
+            mock_state_class.find.return_value = mock_find
+
+            await create_next_states([state.id for state in current_states], "current_id", "test_namespace", "test_graph", {})
+
+            inserted = mock_state_class.insert_documents.await_args.args[0]
+            assert [(document["status"], document["outputs"], document["memoize_ttl"]) for document in inserted] == [
+                (StateStatusEnum.EXECUTED, {"pages": "3"}, None),
+                (StateStatusEnum.CREATED, {}, 60)
+            ]
+            mock_create_completed_next_states.assert_awaited_once_with([inserted[0]])
+
+
+class TestCreateNextStatesSingleFlight:
+    """Test cases for parking identical next states behind a single flight leader"""
+
+    @staticmethod
+    def make_single_flight_node():
+        return NodeTemplate(
+            node_name="fetch",
+            identifier="fetch",
+            namespace="test",
+            inputs={"url": "${{current_id.outputs.url}}"},
+            next_nodes=None,
+            unites=None,
+            single_flight=True
+        )
+
+    @pytest.mark.asyncio
+    async def test_park_single_flight_followers(self):
+        """Test that only the elected leaders stay created"""
+        new_states = [{"inputs": {"url": url}, "status": StateStatusEnum.CREATED} for url in ("a", "a", "b")]
+
+        async def claim(namespace, node_name, candidates):
+            firsts = {}
+            for inputs_hash, state_id in candidates:
+                firsts.setdefault(inputs_hash, state_id)
+            return set(firsts.values())
+
+        with patch('app.tasks.create_next_states.SingleFlight') as mock_single_flight:
+            mock_single_flight.claim = AsyncMock(side_effect=claim)
+
+            followers = await park_single_flight_followers(self.make_single_flight_node(), new_states)
+
+        assert followers == [new_states[1]]
+        assert [new_state["status"] for new_state in new_states] == [StateStatusEnum.CREATED, StateStatusEnum.PARKED, StateStatusEnum.CREATED]
+        assert new_states[0]["single_flight_key"] == new_states[1]["single_flight_key"] == compute_inputs_hash({"url": "a"})
+        assert all(isinstance(new_state["_id"], PydanticObjectId) for new_state in new_states)
+        assert mock_single_flight.claim.await_args.args[:2] == ("test", "fetch")
+
+    @pytest.mark.asyncio
+    async def test_unpark_orphaned_followers(self):
+        """Test that followers whose flight already ended are run on their own"""
+        waiting = {"_id": PydanticObjectId(), "single_flight_key": "hash1"}
+        orphaned = {"_id": PydanticObjectId(), "single_flight_key": "hash2"}
+
+        with patch('app.tasks.create_next_states.SingleFlight') as mock_single_flight, \
+             patch('app.tasks.create_next_states.State') as mock_state_class, \
+             patch('app.tasks.create_next_states.EventBus'):
+            mock_single_flight.get_claimed = AsyncMock(return_value={"hash1"})
+            mock_state_class.transition = AsyncMock(return_value=MagicMock())
+
+            await unpark_orphaned_followers(self.make_single_flight_node(), [waiting, orphaned])
+
+            mock_state_class.transition.assert_awaited_once_with(orphaned["_id"], [StateStatusEnum.PARKED], {"status": StateStatusEnum.CREATED}, unset=["single_flight_key"])
+
+    @pytest.mark.asyncio
+    async def test_identical_next_states_are_parked(self):
+        """Test that identical next states are inserted with one leader and parked followers"""
+        current_node = NodeTemplate(
+            node_name="test_node",
+            identifier="current_id",
+            namespace="test",
+            inputs={},
+            next_nodes=["fetch"],
+            unites=None
+        )
+        single_flight_node = self.make_single_flight_node()
+
+        def make_current_state():
+            current_state = MagicMock()
+            current_state.id = PydanticObjectId()
+            current_state.identifier = "current_id"
+            current_state.graph_name = "test_graph"
+            current_state.run_id = "test_run"
+            current_state.parents = {}
+            current_state.outputs = {"url": "https://example.com"}
+            return current_state
+
+        current_states = [make_current_state() for _ in range(3)]
+
+        with patch('app.tasks.create_next_states.GraphTemplate') as mock_graph_template, \
+             patch('app.tasks.create_next_states.State') as mock_state_class, \
+             patch('app.tasks.create_next_states.RegisteredNode') as mock_registered_node, \
+             patch('app.tasks.create_next_states.create_model') as mock_create_model, \
+             patch('app.tasks.create_next_states.SingleFlight') as mock_single_flight:
+
+            mock_template = MagicMock()
+            mock_template.get_node_by_identifier.side_effect = lambda identifier: {"current_id": current_node, "fetch": single_flight_node}.get(identifier)
+            mock_graph_template.get_valid = AsyncMock(return_value=mock_template)
+
+            mock_registered_node.get_by_name_and_namespace = AsyncMock(return_value=MagicMock())
+            mock_input_model = MagicMock()
+            mock_input_model.model_fields = {"url": MagicMock(annotation=str)}
+            mock_create_model.return_value = mock_input_model
+
+            mock_single_flight.claim = AsyncMock(side_effect=lambda namespace, node_name, candidates: {candidates[0][1]})
+            mock_single_flight.get_claimed = AsyncMock(return_value={compute_inputs_hash({"url": "https://example.com"})})
+
+            mock_state_class.id = "id"
+            mock_state_class.find_record_chunks = MagicMock(side_effect=lambda state_ids, chunk_size, projection=None: yield_chunks(current_states))
+            mock_state_class.new_document.side_effect = lambda **fields: fields
+            mock_state_class.insert_documents = AsyncMock()
+            mock_state_class.transition = AsyncMock()
+            mock_find = AsyncMock()
+            mock_find.set = AsyncMock()
+            mock_state_class.find.return_value = mock_find
+
+            await create_next_states([state.id for state in current_states], "current_id", "test_namespace", "test_graph", {})
+
+            inserted = mock_state_class.insert_documents.await_args.args[0]
+            assert [document["status"] for document in inserted] == [StateStatusEnum.CREATED, StateStatusEnum.PARKED, StateStatusEnum.PARKED]
+            # The flight is still in the air, so no follower is unparked
+            mock_state_class.transition.assert_not_awaited()
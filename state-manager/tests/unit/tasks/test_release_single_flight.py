@@ -0,0 +1,163 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from beanie import PydanticObjectId
+
+from app.models.db.state_record import StateRecord
+from app.models.state_status_enum import StateStatusEnum
+from app.tasks.release_single_flight import release_single_flight_followers, sweep_parked_followers
+
+
+class MockCursor:
+    """Minimal stand-in for a pymongo async cursor"""
+
+    def __init__(self, documents):
+        self._iterator = iter(documents)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def make_leader(single_flight_key="hash1"):
+    return StateRecord({
+        "_id": PydanticObjectId(),
+        "node_name": "fetch",
+        "namespace_name": "test_namespace",
+        "identifier": "fetch",
+        "graph_name": "test_graph",
+        "single_flight_key": single_flight_key
+    })
+
+
+@pytest.fixture
+def mocks():
+    with patch('app.tasks.release_single_flight.State') as mock_state_class, \
+         patch('app.tasks.release_single_flight.SingleFlight') as mock_single_flight, \
+         patch('app.tasks.release_single_flight.EventBus') as mock_event_bus, \
+         patch('app.tasks.release_single_flight.create_completed_next_states', new_callable=AsyncMock) as mock_create_completed_next_states:
+        collection = MagicMock()
+        mock_state_class.get_pymongo_collection.return_value = collection
+        mock_single_flight.release = AsyncMock()
+        mock_event_bus.return_value.publish_by_ids = AsyncMock()
+        yield collection, mock_single_flight, mock_event_bus.return_value, mock_create_completed_next_states
+
+
+class TestReleaseSingleFlightFollowers:
+    """Test cases for release_single_flight_followers function"""
+
+    @pytest.mark.asyncio
+    async def test_executed_followers_move_on(self, mocks):
+        """Test that followers get the leader's outputs in one update and then their next states"""
+        collection, mock_single_flight, event_bus, mock_create_completed_next_states = mocks
+        leader = make_leader()
+        followers = [{"_id": PydanticObjectId(), "identifier": "fetch", "namespace_name": "test_namespace", "graph_name": "test_graph", "parents": {}} for _ in range(2)]
+        collection.update_many = AsyncMock(return_value=MagicMock(modified_count=2))
+        collection.find.return_value = MockCursor(followers)
+
+        await release_single_flight_followers(leader, StateStatusEnum.EXECUTED, {"outputs": {"body": "ok"}})
+
+        mock_single_flight.release.assert_awaited_once_with("test_namespace", "fetch", "hash1")
+
+        query, update = collection.update_many.await_args.args
+        assert query == {"namespace_name": "test_namespace", "node_name": "fetch", "single_flight_key": "hash1", "status": StateStatusEnum.PARKED}
+        assert update["$set"]["status"] == StateStatusEnum.EXECUTED
+        assert update["$set"]["outputs"] == {"body": "ok"}
+        release_id = update["$set"]["single_flight_release_id"]
+
+        assert collection.find.call_args.args[0] == {"single_flight_release_id": release_id}
+        event_bus.publish_by_ids.assert_awaited_once_with([follower["_id"] for follower in followers], StateStatusEnum.EXECUTED)
+        mock_create_completed_next_states.assert_awaited_once_with(followers)
+
+    @pytest.mark.asyncio
+    async def test_errored_followers_do_not_move_on(self, mocks):
+        """Test that failed followers get no next states"""
+        collection, _, event_bus, mock_create_completed_next_states = mocks
+        collection.update_many = AsyncMock(return_value=MagicMock(modified_count=1))
+        collection.find.return_value = MockCursor([{"_id": PydanticObjectId()}])
+
+        await release_single_flight_followers(make_leader(), StateStatusEnum.ERRORED, {"error": "boom"})
+
+        assert collection.update_many.await_args.args[1]["$set"]["error"] == "boom"
+        event_bus.publish_by_ids.assert_awaited_once()
+        mock_create_completed_next_states.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_no_parked_followers(self, mocks):
+        """Test that nothing is read back when no follower was parked"""
+        collection, mock_single_flight, _, _ = mocks
+        collection.update_many = AsyncMock(return_value=MagicMock(modified_count=0))
+
+        await release_single_flight_followers(make_leader(), StateStatusEnum.EXECUTED, {"outputs": {}})
+
+        mock_single_flight.release.assert_awaited_once()
+        collection.find.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_state_without_single_flight(self, mocks):
+        """Test that states of nodes without single flight are ignored"""
+        collection, mock_single_flight, _, _ = mocks
+
+        await release_single_flight_followers(make_leader(None), StateStatusEnum.EXECUTED)
+
+        mock_single_flight.release.assert_not_called()
+        collection.update_many.assert_not_called()
+
+
+class TestSweepParkedFollowers:
+    """Test cases for sweep_parked_followers function"""
+
+    @pytest.mark.asyncio
+    async def test_followers_of_gone_flights_are_unparked(self, mocks):
+        """Test that only the followers whose flight is gone or expired run on their own"""
+        collection, mock_single_flight, event_bus, _ = mocks
+        mock_single_flight.expire = AsyncMock()
+        mock_single_flight.get_claimed = AsyncMock(return_value={"hash1"})
+        collection.aggregate = AsyncMock(return_value=MockCursor([
+            {"_id": {"namespace_name": "test_namespace", "node_name": "fetch"}, "keys": ["hash1", "hash2"]}
+        ]))
+        follower_ids = [PydanticObjectId(), PydanticObjectId()]
+        collection.find.return_value = MockCursor([{"_id": follower_id} for follower_id in follower_ids])
+        collection.update_many = AsyncMock(return_value=MagicMock(modified_count=2))
+
+        await sweep_parked_followers()
+
+        # expired flights are ended before the parked followers are checked
+        mock_single_flight.expire.assert_awaited_once()
+        mock_single_flight.get_claimed.assert_awaited_once_with("test_namespace", "fetch", ["hash1", "hash2"])
+
+        query, update = collection.update_many.await_args.args
+        assert query["single_flight_key"] == {"$in": ["hash2"]}
+        assert query["status"] == StateStatusEnum.PARKED
+        assert query["_id"] == {"$in": follower_ids}
+        assert update["$set"]["status"] == StateStatusEnum.CREATED
+        # an unparked follower is no longer part of the flight on its inputs
+        assert update["$unset"] == {"single_flight_key": ""}
+        event_bus.publish_by_ids.assert_awaited_once_with(follower_ids, StateStatusEnum.CREATED)
+
+    @pytest.mark.asyncio
+    async def test_followers_of_flights_in_progress_stay_parked(self, mocks):
+        collection, mock_single_flight, event_bus, _ = mocks
+        mock_single_flight.expire = AsyncMock()
+        mock_single_flight.get_claimed = AsyncMock(return_value={"hash1"})
+        collection.aggregate = AsyncMock(return_value=MockCursor([
+            {"_id": {"namespace_name": "test_namespace", "node_name": "fetch"}, "keys": ["hash1"]}
+        ]))
+        collection.update_many = AsyncMock()
+
+        await sweep_parked_followers()
+
+        collection.update_many.assert_not_awaited()
+        event_bus.publish_by_ids.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_errors_are_logged(self, mocks):
+        """Test that a failed sweep is left to the next one"""
+        _, mock_single_flight, _, _ = mocks
+        mock_single_flight.expire = AsyncMock(side_effect=Exception("Database error"))
+
+        await sweep_parked_followers()
@@ -1,6 +1,6 @@
 import os
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 from fastapi import FastAPI
 
 
@@ -137,7 +137,7 @@ class TestLifespan:
             # During startup, these should be called
             mock_logs_manager.assert_called()
             mock_logger.info.assert_any_call("server starting")
-            mock_mongo_client.assert_called_with('mongodb://test:27017')
+            mock_mongo_client.assert_called_with('mongodb://test:27017', event_listeners=[ANY])
             mock_client.__getitem__.assert_called_with('test_db')
             mock_init_beanie.assert_called()
             mock_logger.info.assert_any_call("beanie dbs initialized")
@@ -217,8 +217,10 @@ class TestLifespan:
         from app.models.db.store import Store
         from app.models.db.run import Run
         from app.models.db.trigger import DatabaseTriggers
+        from app.models.db.memoized_result import MemoizedResult
+        from app.models.db.single_flight import SingleFlight
         
-        expected_models = [State, GraphTemplate, RegisteredNode, Store, Run, DatabaseTriggers]
+        expected_models = [State, GraphTemplate, RegisteredNode, Store, Run, DatabaseTriggers, MemoizedResult, SingleFlight]
         assert document_models == expected_models
 
 
@@ -1,6 +1,7 @@
 from app.routes import router
+from pydantic import ValidationError
 from app.models.enqueue_request import EnqueueRequestModel
-from app.models.trigger_graph_model import TriggerGraphRequestModel
+from app.models.trigger_graph_model import TriggerGraphRequestModel, BulkTriggerGraphRequestModel, BulkTriggerItemModel
 from app.models.executed_models import ExecutedRequestModel
 from app.models.errored_models import ErroredRequestModel
 from app.models.graph_models import UpsertGraphTemplateRequest, UpsertGraphTemplateResponse
@@ -12,7 +13,7 @@ from app.models.manual_retry import ManualRetryRequestModel, ManualRetryResponse
 
 
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
 class TestRouteStructure:
@@ -27,9 +28,17 @@ class TestRouteStructure:
         
         # State management routes
         assert any('/v0/namespace/{namespace_name}/states/enqueue' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/states/release' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/graph/{graph_name}/trigger' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/graph/{graph_name}/trigger/bulk' in path for path in paths)
         # Removed deprecated create states route assertion
         assert any('/v0/namespace/{namespace_name}/state/{state_id}/executed' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/state/{state_id}/executed/append' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/state/{state_id}/store/{key}' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/state/{state_id}/store/{key}/compare-and-set' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/state/{state_id}/store/{key}/increment' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/state/{state_id}/united-outputs' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/nodes/memoization' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/state/{state_id}/errored' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/state/{state_id}/prune' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/state/{state_id}/re-enqueue-after' in path for path in paths)
@@ -43,12 +52,15 @@ class TestRouteStructure:
         
         # Secrets routes
         assert any('/v0/namespace/{namespace_name}/state/{state_id}/secrets' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/secrets' in path for path in paths)
         
         # List routes
         assert any('/v0/namespace/{namespace_name}/nodes' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/graphs' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/runs/{page}/{size}' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/states/run/{run_id}' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/states/run/{run_id}/graph/diff' in path for path in paths)
+        assert any('/v0/namespace/{namespace_name}/events' in path for path in paths)
         assert any('/v0/namespace/{namespace_name}/states' in path for path in paths)
         
         # Node run details route
@@ -95,6 +107,15 @@ class TestModelValidation:
         assert model.store == {"s1": "v1"}
         assert model.inputs == {"input1": "value1"}
 
+    def test_bulk_trigger_graph_request_model_validation(self):
+        """Test BulkTriggerGraphRequestModel validation"""
+        model = BulkTriggerGraphRequestModel(triggers=[{"inputs": {"input1": "value1"}}, {"store": {"s1": "v1"}, "start_delay": 5}]) # type: ignore
+        assert len(model.triggers) == 2
+        assert model.triggers[1].start_delay == 5
+
+        with pytest.raises(ValidationError):
+            BulkTriggerGraphRequestModel(triggers=[])
+
     def test_prune_request_model_validation(self):
         """Test PruneRequestModel validation"""
         from app.models.signal_models import PruneRequestModel
@@ -182,6 +203,19 @@ class TestModelValidation:
         model = ExecutedRequestModel(**valid_data)
         assert model.outputs == [{"field1": "value1"}, {"field2": "value2"}]
 
+    def test_append_outputs_request_model_validation(self):
+        """Test AppendOutputsRequestModel validation"""
+        from app.models.executed_models import AppendOutputsRequestModel
+
+        model = AppendOutputsRequestModel(outputs=[{"field1": "value1"}])
+        assert model.outputs == [{"field1": "value1"}]
+
+        with pytest.raises(ValidationError):
+            AppendOutputsRequestModel(outputs=[])
+
+        with pytest.raises(ValidationError):
+            AppendOutputsRequestModel(outputs=[{"field1": "value1"}] * 1001)
+
     def test_errored_request_model_validation(self):
         """Test ErroredRequestModel validation"""
         # Test with valid data
@@ -448,6 +482,33 @@ class TestRouteHandlerAPIKeyValidation:
         assert exc_info.value.status_code == 401
         assert exc_info.value.detail == "Invalid API key"
 
+    @patch('app.routes.bulk_trigger_graph')
+    async def test_bulk_trigger_graph_route_with_valid_api_key(self, mock_bulk_trigger_graph, mock_request):
+        """Test bulk_trigger_graph_route with valid API key"""
+        from app.routes import bulk_trigger_graph_route
+
+        body = BulkTriggerGraphRequestModel(triggers=[BulkTriggerItemModel()])
+        mock_bulk_trigger_graph.return_value = MagicMock()
+
+        result = await bulk_trigger_graph_route("test_namespace", "test_graph", body, mock_request, "valid_key")
+
+        mock_bulk_trigger_graph.assert_called_once_with("test_namespace", "test_graph", body, "test-request-id")
+        assert result == mock_bulk_trigger_graph.return_value
+
+    @patch('app.routes.bulk_trigger_graph')
+    async def test_bulk_trigger_graph_route_with_invalid_api_key(self, mock_bulk_trigger_graph, mock_request):
+        """Test bulk_trigger_graph_route with invalid API key"""
+        from app.routes import bulk_trigger_graph_route
+        from fastapi import HTTPException
+
+        body = BulkTriggerGraphRequestModel(triggers=[BulkTriggerItemModel()])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await bulk_trigger_graph_route("test_namespace", "test_graph", body, mock_request, None) # type: ignore
+
+        assert exc_info.value.status_code == 401
+        mock_bulk_trigger_graph.assert_not_called()
+
     def test_no_create_state_route(self):
         from app.routes import router
         routes = [route for route in router.routes if hasattr(route, 'path')]
@@ -471,6 +532,160 @@ class TestRouteHandlerAPIKeyValidation:
         mock_executed_state.assert_called_once()
         assert result == mock_executed_state.return_value
 
+    @patch('app.routes.append_outputs')
+    async def test_append_outputs_route_with_valid_api_key(self, mock_append_outputs, mock_request, mock_background_tasks):
+        """Test append_outputs_route with valid API key"""
+        from app.routes import append_outputs_route
+        from app.models.executed_models import AppendOutputsRequestModel
+
+        mock_append_outputs.return_value = MagicMock()
+        body = AppendOutputsRequestModel(outputs=[{"field1": "value1"}])
+
+        result = await append_outputs_route("test_namespace", "507f1f77bcf86cd799439011", body, mock_request, mock_background_tasks, "valid_key")
+
+        mock_append_outputs.assert_called_once()
+        assert result == mock_append_outputs.return_value
+
+    @patch('app.routes.increment_store_value')
+    async def test_increment_store_value_route_with_valid_api_key(self, mock_increment_store_value, mock_request):
+        """Test increment_store_value_route with valid API key"""
+        from app.routes import increment_store_value_route
+        from app.models.store_models import IncrementStoreRequestModel
+
+        mock_increment_store_value.return_value = MagicMock()
+        body = IncrementStoreRequestModel(by=2)
+
+        result = await increment_store_value_route("test_namespace", "507f1f77bcf86cd799439011", "counter", body, mock_request, "valid_key")
+
+        mock_increment_store_value.assert_called_once()
+        assert mock_increment_store_value.call_args.args[2] == "counter"
+        assert result == mock_increment_store_value.return_value
+
+    @patch('app.routes.get_united_outputs')
+    async def test_get_united_outputs_route_with_valid_api_key(self, mock_get_united_outputs, mock_request):
+        """Test get_united_outputs_route with valid API key"""
+        from app.routes import get_united_outputs_route
+
+        mock_get_united_outputs.return_value = MagicMock()
+
+        result = await get_united_outputs_route("test_namespace", "507f1f77bcf86cd799439011", "processor", mock_request, "valid_key", "cursor", 10)
+
+        mock_get_united_outputs.assert_called_once()
+        assert mock_get_united_outputs.call_args.args[2:5] == ("processor", "cursor", 10)
+        assert result == mock_get_united_outputs.return_value
+
+    async def test_get_united_outputs_route_with_invalid_api_key(self, mock_request):
+        """Test get_united_outputs_route with invalid API key"""
+        from fastapi import HTTPException
+        from app.routes import get_united_outputs_route
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_united_outputs_route("test_namespace", "507f1f77bcf86cd799439011", "processor", mock_request, None) # type: ignore
+
+        assert exc_info.value.status_code == 401
+
+    @patch('app.routes.get_bulk_secrets')
+    async def test_get_bulk_secrets_route_with_valid_api_key(self, mock_get_bulk_secrets, mock_request):
+        """Test get_bulk_secrets_route with valid API key"""
+        from app.routes import get_bulk_secrets_route
+        from app.models.bulk_secrets_models import BulkSecretsRequestModel
+
+        mock_get_bulk_secrets.return_value = MagicMock()
+        body = BulkSecretsRequestModel(graph_names=["graph"])
+
+        result = await get_bulk_secrets_route("test_namespace", body, mock_request, "valid_key")
+
+        mock_get_bulk_secrets.assert_called_once_with("test_namespace", body, "test-request-id")
+        assert result == mock_get_bulk_secrets.return_value
+
+    async def test_get_bulk_secrets_route_with_invalid_api_key(self, mock_request):
+        """Test get_bulk_secrets_route with invalid API key"""
+        from fastapi import HTTPException
+        from app.routes import get_bulk_secrets_route
+        from app.models.bulk_secrets_models import BulkSecretsRequestModel
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_bulk_secrets_route("test_namespace", BulkSecretsRequestModel(graph_names=["graph"]), mock_request, None) # type: ignore
+
+        assert exc_info.value.status_code == 401
+
+    @patch('app.routes.release_states')
+    async def test_release_states_route_with_valid_api_key(self, mock_release_states, mock_request):
+        """Test release_states_route with valid API key"""
+        from app.routes import release_states_route
+        from app.models.release_states_models import ReleaseStatesRequestModel
+
+        mock_release_states.return_value = MagicMock()
+        body = ReleaseStatesRequestModel(state_ids=["507f1f77bcf86cd799439011"])
+
+        result = await release_states_route("test_namespace", body, mock_request, "valid_key")
+
+        mock_release_states.assert_called_once_with("test_namespace", body, "test-request-id")
+        assert result == mock_release_states.return_value
+
+    async def test_release_states_route_with_invalid_api_key(self, mock_request):
+        """Test release_states_route with invalid API key"""
+        from fastapi import HTTPException
+        from app.routes import release_states_route
+        from app.models.release_states_models import ReleaseStatesRequestModel
+
+        with pytest.raises(HTTPException) as exc_info:
+            await release_states_route("test_namespace", ReleaseStatesRequestModel(state_ids=["507f1f77bcf86cd799439011"]), mock_request, None) # type: ignore
+
+        assert exc_info.value.status_code == 401
+
+    @patch('app.routes.get_memo_metrics')
+    async def test_get_memo_metrics_route_with_valid_api_key(self, mock_get_memo_metrics, mock_request):
+        """Test get_memo_metrics_route with valid API key"""
+        from app.routes import get_memo_metrics_route
+
+        mock_get_memo_metrics.return_value = MagicMock()
+
+        result = await get_memo_metrics_route("test_namespace", mock_request, "valid_key")
+
+        mock_get_memo_metrics.assert_called_once_with("test_namespace", "test-request-id")
+        assert result == mock_get_memo_metrics.return_value
+
+    async def test_get_memo_metrics_route_with_invalid_api_key(self, mock_request):
+        """Test get_memo_metrics_route with invalid API key"""
+        from fastapi import HTTPException
+        from app.routes import get_memo_metrics_route
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_memo_metrics_route("test_namespace", mock_request, None) # type: ignore
+
+        assert exc_info.value.status_code == 401
+
+    async def test_store_routes_with_invalid_api_key(self, mock_request):
+        """Test store routes reject an invalid API key"""
+        from fastapi import HTTPException
+        from app.routes import get_store_value_route, set_store_value_route, compare_and_set_store_value_route
+        from app.models.store_models import SetStoreValueRequestModel, CompareAndSetStoreRequestModel
+
+        state_id = "507f1f77bcf86cd799439011"
+        calls = [
+            get_store_value_route("test_namespace", state_id, "key", mock_request, None), # type: ignore
+            set_store_value_route("test_namespace", state_id, "key", SetStoreValueRequestModel(value="1"), mock_request, None), # type: ignore
+            compare_and_set_store_value_route("test_namespace", state_id, "key", CompareAndSetStoreRequestModel(expected=None, value="1"), mock_request, None), # type: ignore
+        ]
+        for call in calls:
+            with pytest.raises(HTTPException) as exc_info:
+                await call
+            assert exc_info.value.status_code == 401
+
+    async def test_append_outputs_route_with_invalid_api_key(self, mock_request, mock_background_tasks):
+        """Test append_outputs_route with invalid API key"""
+        from fastapi import HTTPException
+        from app.routes import append_outputs_route
+        from app.models.executed_models import AppendOutputsRequestModel
+
+        body = AppendOutputsRequestModel(outputs=[{"field1": "value1"}])
+
+        with pytest.raises(HTTPException) as exc_info:
+            await append_outputs_route("test_namespace", "507f1f77bcf86cd799439011", body, mock_request, mock_background_tasks, None) # type: ignore
+
+        assert exc_info.value.status_code == 401
+
     @patch('app.routes.errored_state')
     async def test_errored_state_route_with_valid_api_key(self, mock_errored_state, mock_request):
         """Test errored_state_route with valid API key"""
@@ -1007,7 +1222,7 @@ class TestRouteHandlerAPIKeyValidation:
         result = await get_graph_structure_route("test_namespace", "test_run_id", mock_request, "valid_key")
         
         # Assert
-        mock_get_graph_structure.assert_called_once_with("test_namespace", "test_run_id", "test-request-id")
+        mock_get_graph_structure.assert_called_once_with("test_namespace", "test_run_id", "test-request-id", None)
         assert result == mock_get_graph_structure.return_value
 
     @patch('app.routes.get_graph_structure')
@@ -1027,6 +1242,85 @@ class TestRouteHandlerAPIKeyValidation:
         assert exc_info.value.detail == "Invalid API key"
         mock_get_graph_structure.assert_not_called()
 
+    @patch('app.routes.get_graph_structure_diff')
+    async def test_get_graph_structure_diff_route_with_valid_api_key(self, mock_get_graph_structure_diff, mock_request):
+        """Test get_graph_structure_diff_route with valid API key"""
+        from app.routes import get_graph_structure_diff_route
+        
+        # Arrange
+        mock_get_graph_structure_diff.return_value = MagicMock()
+        
+        # Act
+        result = await get_graph_structure_diff_route("test_namespace", "test_run_id", mock_request, "valid_key", "test_cursor", 50)
+        
+        # Assert
+        mock_get_graph_structure_diff.assert_called_once_with("test_namespace", "test_run_id", "test_cursor", 50, "test-request-id")
+        assert result == mock_get_graph_structure_diff.return_value
+
+    @patch('app.routes.get_graph_structure_diff')
+    async def test_get_graph_structure_diff_route_with_invalid_api_key(self, mock_get_graph_structure_diff, mock_request):
+        """Test get_graph_structure_diff_route with invalid API key"""
+        from app.routes import get_graph_structure_diff_route
+        from fastapi import HTTPException
+        
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await get_graph_structure_diff_route("test_namespace", "test_run_id", mock_request, None) # type: ignore
+        
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Invalid API key"
+        mock_get_graph_structure_diff.assert_not_called()
+
+    @patch('app.routes.check_run_exists', new_callable=AsyncMock)
+    @patch('app.routes.stream_events')
+    async def test_stream_events_route_with_valid_api_key(self, mock_stream_events, mock_check_run_exists, mock_request):
+        """Test stream_events_route with valid API key"""
+        from app.routes import stream_events_route
+        from fastapi.responses import StreamingResponse
+        
+        # Arrange
+        async def events():
+            yield "event: state\ndata: {}\n\n"
+        mock_stream_events.return_value = events()
+        
+        # Act
+        result = await stream_events_route("test_namespace", mock_request, "valid_key", "test_run_id")
+        
+        # Assert
+        mock_check_run_exists.assert_awaited_once_with("test_namespace", "test_run_id", "test-request-id")
+        mock_stream_events.assert_called_once_with("test_namespace", "test_run_id", "test-request-id")
+        assert isinstance(result, StreamingResponse)
+        assert result.media_type == "text/event-stream"
+
+    @patch('app.routes.check_run_exists', new_callable=AsyncMock)
+    @patch('app.routes.stream_events')
+    async def test_stream_events_route_with_unknown_run(self, mock_stream_events, mock_check_run_exists, mock_request):
+        """Test stream_events_route returns 404 before streaming for an unknown run"""
+        from app.routes import stream_events_route
+        from fastapi import HTTPException
+
+        mock_check_run_exists.side_effect = HTTPException(status_code=404, detail="Run test_run_id not found")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await stream_events_route("test_namespace", mock_request, "valid_key", "test_run_id")
+
+        assert exc_info.value.status_code == 404
+        mock_stream_events.assert_not_called()
+
+    @patch('app.routes.stream_events')
+    async def test_stream_events_route_with_invalid_api_key(self, mock_stream_events, mock_request):
+        """Test stream_events_route with invalid API key"""
+        from app.routes import stream_events_route
+        from fastapi import HTTPException
+        
+        # Act & Assert
+        with pytest.raises(HTTPException) as exc_info:
+            await stream_events_route("test_namespace", mock_request, None) # type: ignore
+        
+        assert exc_info.value.status_code == 401
+        assert exc_info.value.detail == "Invalid API key"
+        mock_stream_events.assert_not_called()
+
     @patch('app.routes.get_node_run_details')
     async def test_get_node_run_details_route_with_valid_api_key(self, mock_get_node_run_details, mock_request):
         """Test get_node_run_details_route with valid API key"""
@@ -0,0 +1,87 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from beanie import PydanticObjectId
+
+from app.utils.run_status import get_run_status, wait_for_run_status
+from app.singletons.event_bus import Subscription
+from app.models.event_models import StateEventModel
+from app.models.run_models import RunStatusEnum
+from app.models.state_status_enum import StateStatusEnum
+
+
+def make_event(status):
+    return StateEventModel(
+        state_id=str(PydanticObjectId()),
+        run_id="run1",
+        namespace_name="ns",
+        graph_name="graph",
+        node_name="node",
+        identifier="node_id",
+        status=status
+    )
+
+
+class TestGetRunStatus:
+    """Test cases for get_run_status function"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("found, expected", [
+        ([{"_id": 1}], RunStatusEnum.PENDING),
+        ([None, {"_id": 1}], RunStatusEnum.FAILED),
+        ([None, None, {"_id": 1}], RunStatusEnum.SUCCESS),
+        ([None, None, None], None),
+    ])
+    async def test_status(self, found, expected):
+        with patch('app.utils.run_status.State') as mock_state_class:
+            collection = MagicMock()
+            collection.find_one = AsyncMock(side_effect=found)
+            mock_state_class.get_pymongo_collection.return_value = collection
+
+            assert await get_run_status("ns", "run1") == expected
+
+            for call in collection.find_one.call_args_list:
+                assert call.args[0]["namespace_name"] == "ns"
+                assert call.args[0]["run_id"] == "run1"
+
+
+class TestWaitForRunStatus:
+    """Test cases for wait_for_run_status function"""
+
+    @pytest.mark.asyncio
+    @patch('app.utils.run_status.get_run_status', new_callable=AsyncMock)
+    async def test_returns_immediately_when_run_done(self, mock_get_run_status):
+        mock_get_run_status.return_value = RunStatusEnum.SUCCESS
+
+        result = await wait_for_run_status(Subscription("ns", "run1"), "run1", timeout=1)
+
+        assert result == RunStatusEnum.SUCCESS
+        assert mock_get_run_status.await_count == 1
+
+    @pytest.mark.asyncio
+    @patch('app.utils.run_status.get_run_status', new_callable=AsyncMock)
+    async def test_rechecks_only_after_settled_events(self, mock_get_run_status):
+        mock_get_run_status.side_effect = [RunStatusEnum.PENDING, RunStatusEnum.FAILED]
+        subscription = Subscription("ns", "run1")
+        subscription.put(make_event(StateStatusEnum.QUEUED))
+        subscription.put(make_event(StateStatusEnum.EXECUTED))
+        subscription.put(make_event(StateStatusEnum.ERRORED))
+
+        result = await wait_for_run_status(subscription, "run1", timeout=1)
+
+        assert result == RunStatusEnum.FAILED
+        assert mock_get_run_status.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch('app.utils.run_status.get_run_status', new_callable=AsyncMock)
+    async def test_times_out_while_pending(self, mock_get_run_status):
+        mock_get_run_status.return_value = RunStatusEnum.PENDING
+
+        result = await asyncio.wait_for(
+            wait_for_run_status(Subscription("ns", "run1"), "run1", timeout=0.05, recheck_interval=0.01),
+            timeout=1
+        )
+
+        assert result == RunStatusEnum.PENDING
+        # idle rechecks catch transitions made by other replicas
+        assert mock_get_run_status.await_count > 1